@@ -7,6 +7,15 @@ from flask_cors import CORS
 from config import config
 from models import db
 from routes import register_blueprints
+from routes.debug import debug_bp
+from utils.profiler import sql_profiler
+from utils.rollup import status_counters
+from utils.events import status_events
+from utils.cache import response_cache
+from utils.search import order_search
+from utils.status_log import status_log
+from utils.estimates import stage_estimator
+from utils.json_provider import OrjsonJSONProvider
 
 def create_app(config_name=None):
     """
@@ -24,6 +33,10 @@ def create_app(config_name=None):
     config_name = config_name or os.getenv('FLASK_CONFIG', 'default')
     app.config.from_object(config[config_name])
     
+    # orjson response encoding (FAST_JSON=false to disable)
+    if app.config.get('FAST_JSON'):
+        app.json = OrjsonJSONProvider(app)
+    
     # Initialize extensions
     db.init_app(app)
     
@@ -33,8 +46,41 @@ def create_app(config_name=None):
     # Register blueprints
     register_blueprints(app)
     
+    # Opt-in per-request SQL profiling (SQL_PROFILER=true)
+    if app.config.get('SQL_PROFILER_ENABLED'):
+        enable_sql_profiler(app)
+    
+    # Opt-in status counters for summary endpoints (STATUS_COUNTERS=true)
+    if app.config.get('STATUS_COUNTERS_ENABLED'):
+        status_counters.init_app(app)
+    
+    # Opt-in push of committed status changes to /api/events/stream (STATUS_EVENTS=true; see config.py)
+    if app.config.get('STATUS_EVENTS_ENABLED'):
+        status_events.init_app(app)
+    
+    # Opt-in response cache for dashboard reads (RESPONSE_CACHE=true)
+    if app.config.get('RESPONSE_CACHE_ENABLED'):
+        response_cache.init_app(app)
+    
+    # Keep order search documents current on commit (ORDER_SEARCH=false to disable)
+    if app.config.get('ORDER_SEARCH_ENABLED'):
+        order_search.init_app(app)
+    
+    # Record every order chain status change in status_event (STATUS_LOG=false to disable)
+    if app.config.get('STATUS_LOG_ENABLED'):
+        status_log.init_app(app)
+    
+    # Order ETAs from learned stage durations (STAGE_ESTIMATES=false to disable)
+    if app.config.get('STAGE_ESTIMATES_ENABLED'):
+        stage_estimator.init_app(app)
+    
     return app
 
+def enable_sql_profiler(app):
+    """Attach the request query profiler and the /api/debug/profile endpoint"""
+    sql_profiler.init_app(app)
+    app.register_blueprint(debug_bp, url_prefix='/api')
+
 def initialize_database(app):
     """Initialize database with tables and sample data"""
     with app.app_context():
@@ -43,34 +89,6 @@ def initialize_database(app):
             db.create_all()
             print("✅ Database tables created successfully!")
             
-            # Check and add missing columns for MySQL
-            from sqlalchemy import text
-            
-            try:
-                result = db.session.execute(text("""
-                    SELECT COLUMN_NAME 
-                    FROM INFORMATION_SCHEMA.COLUMNS 
-                    WHERE TABLE_SCHEMA = DATABASE() 
-                    AND TABLE_NAME = 'purchase_order' 
-                    AND COLUMN_NAME = 'original_requirements'
-                """))
-                
-                column_exists = result.fetchone() is not None
-                
-                if not column_exists:
-                    print("🔄 Adding missing original_requirements column...")
-                    db.session.execute(text(
-                        "ALTER TABLE purchase_order ADD COLUMN original_requirements TEXT"
-                    ))
-                    db.session.commit()
-                    print("✅ original_requirements column added successfully!")
-                else:
-                    print("ℹ️ original_requirements column already exists")
-                    
-            except Exception as e:
-                print(f"⚠️ Error checking/adding column: {e}")
-                db.session.rollback()
-            
             # Create admin user if it doesn't exist
             from models import User, ShowroomProduct
             admin_created = User.create_admin_user()
@@ -0,0 +1,135 @@
+"""
+Stage estimate backtest - learns stage durations from status events before a
+cutoff and reports the ETA error on orders delivered after it, next to the
+error of the old progress based estimate.
+
+Without --database-url a synthetic history is seeded into in-memory SQLite.
+
+Usage:
+    python backtest_stage_estimates.py                             # 2000 synthetic orders
+    python backtest_stage_estimates.py --orders 10000 --seed 7
+    python backtest_stage_estimates.py --database-url mysql+pymysql://... --cutoff 2025-06-01
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from app import create_app
+from models import db, ProductionOrder, StatusEvent
+from utils.estimates import load_events, backtest, STAGE_NAMES
+
+DEFAULT_ORDERS = 2000
+DEFAULT_SEED = 42
+START = datetime(2025, 1, 1)
+# Median hours per stage, scaled per category
+STAGE_HOURS = {
+    'purchase_approval': 20, 'store_check': 8, 'assembly': 72, 'showroom_review': 12, 'awaiting_sale': 96,
+    'dispatch': 18, 'transit': 30,
+}
+CATEGORY_SCALE = {'Furniture': 1.0, 'Electronics': 0.6, 'Machinery': 1.8}
+# (entity, status reached at the end of each stage)
+STAGE_EVENTS = [
+    ('purchase_order', 'pending_request'),
+    ('purchase_order', 'finance_approved'),
+    ('purchase_order', 'store_allocated'),
+    ('assembly_order', 'completed'),
+    ('showroom_product', 'available'),
+]
+
+
+def seed_history(orders=DEFAULT_ORDERS, seed=DEFAULT_SEED):
+    """Insert production orders and the status events of their way to delivery (requires an app context)"""
+    rng = random.Random(seed)
+    categories = list(CATEGORY_SCALE)
+    production_orders, events = [], []
+    for order_id in range(1, orders + 1):
+        category = rng.choice(categories)
+        created = START + timedelta(hours=order_id * 365 * 24 / orders)
+        production_orders.append({
+            'id': order_id, 'product_name': f'Product {order_id}', 'category': category, 'quantity': 1,
+            'status': 'completed', 'created_at': created
+        })
+
+        def hours(stage):
+            return rng.lognormvariate(0, 0.5) * STAGE_HOURS[stage] * CATEGORY_SCALE[category]
+
+        at = created
+        for (entity, status), stage in zip(STAGE_EVENTS, (None,) + STAGE_NAMES):
+            at += timedelta(hours=hours(stage)) if stage else timedelta(0)
+            events.append({'entity': entity, 'entity_id': order_id, 'status': status,
+                           'production_order_id': order_id, 'occurred_at': at})
+        at += timedelta(hours=hours('awaiting_sale'))
+        events.append({'entity': 'dispatch_request', 'entity_id': order_id, 'status': 'pending',
+                       'production_order_id': order_id, 'sales_order_id': order_id, 'occurred_at': at})
+        at += timedelta(hours=hours('dispatch'))
+        events.append({'entity': 'transport_job', 'entity_id': order_id, 'status': 'in_transit',
+                       'production_order_id': order_id, 'sales_order_id': order_id, 'occurred_at': at})
+        at += timedelta(hours=hours('transit'))
+        events.append({'entity': 'transport_job', 'entity_id': order_id, 'status': 'delivered',
+                       'production_order_id': order_id, 'sales_order_id': order_id, 'occurred_at': at})
+    db.session.bulk_insert_mappings(ProductionOrder, production_orders)
+    db.session.bulk_insert_mappings(StatusEvent, events)
+    db.session.commit()
+
+def run_backtest(cutoff=None, since=None):
+    """
+    Backtest stage estimates on the events in the database (requires an app context)
+
+    Args:
+        cutoff: Training/evaluation split (default: 80% of the way through the events)
+        since: Ignore events before this time
+
+    Returns:
+        dict: See utils.estimates.backtest
+    """
+    events = load_events(since)
+    if events.empty:
+        raise ValueError('No status events to backtest')
+    if cutoff is None:
+        first, last = events['occurred_at'].min(), events['occurred_at'].max()
+        cutoff = first + (last - first) * 0.8
+    return backtest(events, cutoff)
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest learned order completion estimates')
+    parser.add_argument('--orders', type=int, default=DEFAULT_ORDERS, help='synthetic orders to seed')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='random seed for the synthetic history')
+    parser.add_argument('--cutoff', type=datetime.fromisoformat, help='train before, evaluate after (ISO date)')
+    parser.add_argument('--since', type=datetime.fromisoformat, help='ignore events before this ISO date')
+    parser.add_argument('--database-url', help='database with a real status_event history (default: synthetic)')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    if args.database_url:
+        app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+
+    with app.app_context():
+        if not args.database_url:
+            db.create_all()
+            seed_history(args.orders, args.seed)
+        try:
+            report = run_backtest(args.cutoff, args.since)
+        finally:
+            db.session.remove()
+            if not args.database_url:
+                db.drop_all()
+
+    print(f"Trained before {report['cutoff']} on {report['trainingOrders']} orders; "
+          f"{report['deliveredOrders']} delivered after it, {report['predictionPoints']} prediction points "
+          f"({report['unpredicted']} without an estimate)")
+    print(f"  {'':<20}{'count':>7}{'MAE h':>10}{'p50 h':>10}{'p90 h':>10}{'bias h':>10}")
+    rows = [('learned', report['error']), ('progress based', report['progressBaselineError'])]
+    rows += [(f'  {name}', stats) for name, stats in report['stages'].items()]
+    for label, stats in rows:
+        if not stats['count']:
+            print(f"  {label:<20}{0:>7}")
+            continue
+        print(f"  {label:<20}{stats['count']:>7}{stats['maeHours']:>10.1f}{stats['p50Hours']:>10.1f}"
+              f"{stats['p90Hours']:>10.1f}{stats['biasHours']:>10.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Query plan benchmark - seeds a synthetic dataset, runs the service entry
+points that back the list and summary pages, and records the EXPLAIN plan and
+timing of every statement they issue.
+
+A statement whose plan reads a large table with a full (sequential) scan is a
+regression: the run reports it and exits non-zero, so it can gate CI.
+
+Usage:
+    python benchmark_query_plans.py                      # in-memory SQLite
+    python benchmark_query_plans.py --scale 20000 --output plans.json
+    python benchmark_query_plans.py --database-url postgresql+psycopg2://...
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import re
+import time
+from flask import current_app
+from sqlalchemy import event
+from app import create_app
+from models import db
+from services.approval_service import ApprovalService
+from services.assembly_service import AssemblyService
+from services.dispatch_service import DispatchService
+from services.finance_service import FinanceService
+from services.inventory_service import InventoryService
+from services.order_tracking_service import OrderTrackingService
+from services.purchase_service import PurchaseService
+from services.sales_service import SalesService
+from services.transport_service import TransportService
+from services.watchman_service import WatchmanService
+from utils.rollup import status_counters
+from utils.search import order_search
+from synthetic_data import seed_dataset, DEFAULT_SCALE, DEFAULT_SEED
+
+# With planner statistics a scan of a table this small is a legitimate choice
+MIN_SCAN_ROWS = 1000
+PAGE = {'limit': 50, 'cursor': None}
+
+# Tables that grow with order volume; a full scan of any of them fails the run.
+# Lookup tables (vehicle, user, store_inventory, customer) stay small.
+LARGE_TABLES = {
+    'production_order', 'purchase_order', 'purchase_order_line', 'assembly_order', 'showroom_product',
+    'showroom_stock', 'sales_order', 'transport_approval_request', 'sales_transaction',
+    'approval_request', 'finance_transaction', 'dispatch_request', 'gate_pass',
+    'transport_job', 'part_load_detail', 'order_search_document',
+}
+
+# (name, callable) for each service entry point covered by the benchmark
+ENTRY_POINTS = [
+    ('order_tracking.get_current_order_log(page)', lambda: OrderTrackingService.get_current_order_log(page=PAGE)),
+    ('purchase.get_pending_store_orders', PurchaseService.get_pending_store_orders),
+    ('assembly.get_ready_assembly_orders', AssemblyService.get_ready_assembly_orders),
+    ('sales.get_sales_orders(page)', lambda: SalesService.get_sales_orders(page=PAGE)),
+    ('sales.get_sales_orders(status, page)', lambda: SalesService.get_sales_orders(status='confirmed', page=PAGE)),
+    ('sales.get_sales_orders(sales_person, page)', lambda: SalesService.get_sales_orders(sales_person='Sales 3', page=PAGE)),
+    ('dispatch.get_all_dispatch_orders(page)', lambda: DispatchService.get_all_dispatch_orders(page=PAGE)),
+    ('dispatch.get_all_dispatch_orders(status, page)', lambda: DispatchService.get_all_dispatch_orders(status='pending', page=PAGE)),
+    ('watchman.get_all_gate_passes(page)', lambda: WatchmanService.get_all_gate_passes(page=PAGE)),
+    ('watchman.get_all_gate_passes(status, page)', lambda: WatchmanService.get_all_gate_passes(status='pending', page=PAGE)),
+    ('transport.get_all_transport_jobs(page)', lambda: TransportService.get_all_transport_jobs(page=PAGE)),
+    ('transport.get_all_transport_jobs(status, page)', lambda: TransportService.get_all_transport_jobs(status='assigned', page=PAGE)),
+    ('transport.get_pending_transport_approvals', TransportService.get_pending_transport_approvals),
+    ('approval.get_all_approvals(status, page)', lambda: ApprovalService.get_all_approvals(status='pending', page=PAGE)),
+    ('finance.get_transactions', FinanceService.get_transactions),
+    ('finance.get_dashboard_data', FinanceService.get_dashboard_data),
+    ('store.get_shortage_report', InventoryService.get_shortage_report),
+    ('dispatch.get_dispatch_summary', DispatchService.get_dispatch_summary),
+    ('sales.get_sales_summary', SalesService.get_sales_summary),
+    ('transport.get_transport_summary', TransportService.get_transport_summary),
+    ('watchman.get_daily_summary', WatchmanService.get_daily_summary),
+    ('order_tracking.get_order_status_tracking(q)',
+     lambda: OrderTrackingService.get_order_status_tracking('customer 99', limit=50)),
+]
+
+_SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?: AS \w+)?(?!.*\bUSING\b)')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+_ALIAS_SUFFIX = re.compile(r'_\d+$')
+
+
+def capture_statements(func):
+    """
+    Run a callable and record the SELECT statements it sends to the database
+
+    Returns:
+        tuple: (elapsed seconds, [(statement, parameters), ...])
+    """
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+        db.session.rollback()
+    return elapsed, statements
+
+def explain(statement, parameters):
+    """Get the plan of a statement as a list of text lines"""
+    dialect = db.engine.dialect.name
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    with db.engine.connect() as conn:
+        result = conn.exec_driver_sql(prefix + statement, parameters)
+        if dialect == 'sqlite':
+            # Rows are (id, parent, notused, detail)
+            return [row[-1] for row in result]
+        return [row[0] for row in result]
+
+def full_scans(plan):
+    """
+    Find large tables read with a full table scan in a plan
+
+    SQLite reports ``SCAN <table>`` without ``USING ... INDEX`` and PostgreSQL
+    ``Seq Scan on <table>``. Aliases such as ``sales_order_1`` map back to the
+    table name.
+    """
+    pattern = _SQLITE_SCAN if db.engine.dialect.name == 'sqlite' else _POSTGRES_SCAN
+    tables = set()
+    for line in plan:
+        for match in pattern.finditer(line):
+            table = match.group(1)
+            if table not in LARGE_TABLES:
+                table = _ALIAS_SUFFIX.sub('', table)
+            if table in LARGE_TABLES:
+                tables.add(table)
+    return sorted(tables)
+
+def run_benchmark(scale=DEFAULT_SCALE, seed=DEFAULT_SEED, repeat=3, entry_points=None, analyze=True):
+    """
+    Seed a dataset and profile every entry point (requires an app context)
+
+    Args:
+        scale: Number of sales orders to seed
+        seed: Random seed for the dataset
+        repeat: Timed runs per entry point; the best time is reported
+        entry_points: Optional list of (name, callable); defaults to ENTRY_POINTS
+        analyze: Collect planner statistics; scans of tables under
+            MIN_SCAN_ROWS rows are then not counted as regressions
+
+    Returns:
+        dict: Report with per-entry timings, statement plans and regressions
+    """
+    seed_dataset(scale, seed, analyze)
+    # Summaries are measured with status counters on; without them a status
+    # rollup is one full pass over its table by design
+    if not status_counters.enabled():
+        status_counters.init_app(current_app)
+    status_counters.rebuild_all()
+    # Bulk-inserted rows bypass the commit hooks that maintain search documents
+    order_search.rebuild()
+    row_counts = {
+        table: db.session.execute(db.text(f'SELECT COUNT(*) FROM {table}')).scalar()
+        for table in LARGE_TABLES
+    }
+    report = {'dialect': db.engine.dialect.name, 'scale': scale, 'entryPoints': [], 'regressions': []}
+
+    for name, func in entry_points or ENTRY_POINTS:
+        timings = []
+        for _ in range(max(repeat, 1)):
+            elapsed, statements = capture_statements(func)
+            timings.append(elapsed)
+
+        plans = []
+        seen = set()
+        for statement, parameters in statements:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            plan = explain(statement, parameters)
+            scans = [
+                table for table in full_scans(plan)
+                if not analyze or row_counts[table] >= MIN_SCAN_ROWS
+            ]
+            plans.append({'statement': statement, 'plan': plan, 'fullScans': scans})
+            for table in scans:
+                report['regressions'].append({'entryPoint': name, 'table': table, 'statement': statement})
+
+        report['entryPoints'].append({
+            'name': name,
+            'bestMs': round(min(timings) * 1000, 2),
+            'queries': len(statements),
+            'statements': plans,
+        })
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Record query plans and timings for service entry points')
+    parser.add_argument('--scale', type=int, default=DEFAULT_SCALE, help='number of sales orders to seed')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='random seed for the dataset')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per entry point')
+    parser.add_argument('--database-url', help='empty database to seed (default: in-memory SQLite)')
+    parser.add_argument('--output', help='write the full report as JSON to this file')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    if args.database_url:
+        app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+
+    with app.app_context():
+        db.create_all()
+        try:
+            report = run_benchmark(args.scale, args.seed, args.repeat)
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+    print(f"{report['dialect']} - {report['scale']} sales orders")
+    for entry in report['entryPoints']:
+        flag = ' FULL SCAN' if any(s['fullScans'] for s in entry['statements']) else ''
+        print(f"  {entry['bestMs']:>9.2f} ms  {entry['queries']:>3} queries  {entry['name']}{flag}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if report['regressions']:
+        print(f"\n✗ {len(report['regressions'])} full table scan(s):")
+        for regression in report['regressions']:
+            print(f"  {regression['entryPoint']}: {regression['table']}")
+        return 1
+    print("\n✓ No full table scans on large tables")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Vehicle planner benchmark - seeds pending transport jobs and a fleet, then
+times TransportService.plan_vehicle_assignments as a dry run and as a commit.
+
+Usage:
+    python benchmark_vehicle_planner.py                  # 1000 jobs x 100 vehicles
+    python benchmark_vehicle_planner.py --jobs 5000 --vehicles 300
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import random
+import time
+from datetime import datetime
+from app import create_app
+from models import db, DispatchRequest, TransportJob, Vehicle
+from services.transport_service import TransportService
+from utils.fleet import PlanJob, PlanVehicle, plan_loads
+
+DEFAULT_JOBS = 1000
+DEFAULT_VEHICLES = 100
+DEFAULT_SEED = 42
+CITIES = ['Pune', 'Mumbai', 'Nashik', 'Nagpur', 'Aurangabad', 'Kolhapur', 'Solapur', 'Satara']
+CAPACITIES = ['500 kg', '1000 kg', '1.5 ton', '2 ton', '40 units', '3000']
+
+
+def seed_fleet(jobs=DEFAULT_JOBS, vehicles=DEFAULT_VEHICLES, seed=DEFAULT_SEED):
+    """Insert pending transport jobs and available vehicles (requires an app context)"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    dispatches, transport_jobs = [], []
+    for i in range(1, jobs + 1):
+        city = rng.choice(CITIES)
+        address = f'{rng.randint(1, 500)} Main Road, {city}' if rng.random() < 0.5 else \
+            f'Plot {i}, {city} {411000 + CITIES.index(city) * 1000 + rng.randint(0, 99)}'
+        dispatches.append({
+            'id': i, 'sales_order_id': i, 'showroom_product_id': 1, 'party_name': f'Party {i}',
+            'party_address': address, 'quantity': rng.choice([1, 1, 2, 5, 10, 25, 60]),
+            'delivery_type': 'transport', 'status': 'assigned_transport', 'created_at': now, 'updated_at': now
+        })
+        transport_jobs.append({
+            'id': i, 'dispatch_request_id': i, 'status': 'pending', 'created_at': now, 'updated_at': now
+        })
+    fleet = [{
+        'id': i, 'vehicle_number': f'MH12FL{i:04d}', 'vehicle_type': 'truck', 'driver_name': f'Driver {i}',
+        'capacity': rng.choice(CAPACITIES), 'status': 'available', 'created_at': now, 'updated_at': now
+    } for i in range(1, vehicles + 1)]
+    db.session.bulk_insert_mappings(DispatchRequest, dispatches)
+    db.session.bulk_insert_mappings(TransportJob, transport_jobs)
+    db.session.bulk_insert_mappings(Vehicle, fleet)
+    db.session.commit()
+
+def run_benchmark(jobs=DEFAULT_JOBS, vehicles=DEFAULT_VEHICLES, seed=DEFAULT_SEED, repeat=3):
+    """
+    Seed the fleet and time planning (requires an app context)
+
+    Args:
+        jobs: Number of pending transport jobs
+        vehicles: Number of available vehicles
+        seed: Random seed for the dataset
+        repeat: Timed runs of the in-memory planner and the dry run; the best time is reported
+
+    Returns:
+        dict: Timings in ms and the plan summary
+    """
+    seed_fleet(jobs, vehicles, seed)
+    rng = random.Random(seed)
+    plan_jobs = [PlanJob(i, rng.choice([1, 2, 5, 10, 25, 60]), rng.choice(CITIES)) for i in range(jobs)]
+    plan_vehicles = [PlanVehicle(i, rng.choice([40, 500, 1000, 1500, 2000])) for i in range(vehicles)]
+
+    timings = {'planOnlyMs': [], 'dryRunMs': []}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        plan_loads(plan_jobs, plan_vehicles)
+        timings['planOnlyMs'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        preview = TransportService.plan_vehicle_assignments(dry_run=True)
+        timings['dryRunMs'].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    result = TransportService.plan_vehicle_assignments(dry_run=False)
+    commit_ms = (time.perf_counter() - started) * 1000
+
+    assigned = TransportJob.query.filter_by(status='assigned').count()
+    return {
+        'jobs': jobs,
+        'vehicles': vehicles,
+        'planOnlyMs': round(min(timings['planOnlyMs']) * 1000, 2),
+        'dryRunMs': round(min(timings['dryRunMs']) * 1000, 2),
+        'commitMs': round(commit_ms, 2),
+        'preview': preview['summary'],
+        'committed': result['summary'],
+        'assignedJobs': assigned
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Time capacity-aware vehicle assignment planning')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help='number of pending transport jobs')
+    parser.add_argument('--vehicles', type=int, default=DEFAULT_VEHICLES, help='number of available vehicles')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='random seed for the dataset')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs of the planner and the dry run')
+    parser.add_argument('--database-url', help='empty database to seed (default: in-memory SQLite)')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    if args.database_url:
+        app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+
+    with app.app_context():
+        db.create_all()
+        try:
+            report = run_benchmark(args.jobs, args.vehicles, args.seed, args.repeat)
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+    summary = report['committed']
+    print(f"{report['jobs']} pending jobs x {report['vehicles']} vehicles")
+    print(f"  {report['planOnlyMs']:>9.2f} ms  packing only (plan_loads)")
+    print(f"  {report['dryRunMs']:>9.2f} ms  dry run (load, plan, serialize)")
+    print(f"  {report['commitMs']:>9.2f} ms  plan and commit in one transaction")
+    print(f"  {summary['assignedJobs']} jobs on {summary['vehiclesUsed']} vehicles, "
+          f"{summary['unassignedJobs']} unassigned, utilization {summary['utilization']:.1%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
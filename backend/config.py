@@ -34,6 +34,54 @@ class Config:
     # CORS configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
 
+    # Request-scoped SQL profiler (adds X-Query-* headers and /api/debug/profile)
+    SQL_PROFILER_ENABLED = os.getenv('SQL_PROFILER', 'False').lower() == 'true'
+    # Flag endpoints that run the same statement shape more than this many times per request
+    SQL_PROFILER_REPEAT_THRESHOLD = int(os.getenv('SQL_PROFILER_REPEAT_THRESHOLD', '5'))
+
+    # Incrementally maintained per-status counters for the department summary endpoints
+    STATUS_COUNTERS_ENABLED = os.getenv('STATUS_COUNTERS', 'False').lower() == 'true'
+
+    # Server-sent status events (/api/events/stream) for live dashboards. Off by default: an open
+    # stream holds its worker for up to STATUS_EVENTS_STREAM_SECONDS, so only enable it under a
+    # threaded or async worker class (gunicorn --worker-class gthread --threads N, or gevent), and
+    # with more than one worker process also a shared STATUS_EVENTS_BROKER. Dashboards keep a slow
+    # polling refresh either way
+    STATUS_EVENTS_ENABLED = os.getenv('STATUS_EVENTS', 'False').lower() == 'true'
+    # Broker class path; the default in-process broker only reaches clients of the same process
+    STATUS_EVENTS_BROKER = os.getenv('STATUS_EVENTS_BROKER', 'utils.events.LocalEventBroker')
+    # Streams end after this long (clients reconnect and resume) so workers are not held forever
+    STATUS_EVENTS_STREAM_SECONDS = int(os.getenv('STATUS_EVENTS_STREAM_SECONDS', '300'))
+    STATUS_EVENTS_KEEPALIVE_SECONDS = int(os.getenv('STATUS_EVENTS_KEEPALIVE_SECONDS', '15'))
+
+    # Notifications older than this are pruned
+    NOTIFICATION_TTL_DAYS = int(os.getenv('NOTIFICATION_TTL_DAYS', '30'))
+
+    # Write-invalidated cache for dashboard reads (RESPONSE_CACHE=true). The local
+    # backend is per process; use utils.cache.RedisCacheBackend with several workers
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE', 'False').lower() == 'true'
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'utils.cache.LocalCacheBackend')
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '512'))
+    RESPONSE_CACHE_TTL_SECONDS = int(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '60'))
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+    # Append-only status_event log of order chain status changes (STATUS_LOG=false to disable)
+    STATUS_LOG_ENABLED = os.getenv('STATUS_LOG', 'True').lower() == 'true'
+
+    # Weight of one order quantity unit, for planning loads on vehicles whose capacity is in kg/tons
+    FLEET_UNIT_WEIGHT_KG = float(os.getenv('FLEET_UNIT_WEIGHT_KG', '1'))
+
+    # Indexed order search for /api/orders/status-tracking?q= (needs the add_order_search migration)
+    ORDER_SEARCH_ENABLED = os.getenv('ORDER_SEARCH', 'True').lower() == 'true'
+
+    # Order ETAs from stage durations learned off status_event (STAGE_ESTIMATES=false to disable).
+    # Refresh with POST /api/orders/analytics/estimates/refresh; workers reread the table after the TTL
+    STAGE_ESTIMATES_ENABLED = os.getenv('STAGE_ESTIMATES', 'True').lower() == 'true'
+    STAGE_ESTIMATES_TTL_SECONDS = int(os.getenv('STAGE_ESTIMATES_TTL_SECONDS', '300'))
+
+    # Encode JSON responses with orjson when it is installed (FAST_JSON=false to use the stdlib encoder)
+    FAST_JSON = os.getenv('FAST_JSON', 'True').lower() == 'true'
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+One-shot import of the legacy gate entry Excel workbooks into the database.
+
+Reads data/gate_users.xlsx, data/gate_entry_logs.xlsx and data/going_out_logs.xlsx
+(or the directory given as the first argument). Safe to re-run: users are matched
+on phone and log workbooks are only imported into empty tables.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import db
+from services.gate_entry_service import gate_entry_service
+
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    app = create_app(os.getenv('FLASK_CONFIG', 'default'))
+    with app.app_context():
+        db.create_all()
+        result = gate_entry_service.import_excel_files(data_dir)
+
+    if result['success']:
+        print(f"✅ {result['message']}: {result['imported']}")
+    else:
+        print(f"❌ {result['message']}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
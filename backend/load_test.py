@@ -0,0 +1,271 @@
+"""
+Load test - replays a department traffic mix against the Flask API and
+reports per-endpoint latency percentiles and throughput.
+
+The database is filled by synthetic_data.seed_dataset first (skip with
+--seeded for a database that already holds a synthetic history). Requests go
+through the WSGI app in process, so the numbers cover routing, services,
+serialization and the database, without network overhead.
+
+Usage:
+    python load_test.py                                   # in-memory SQLite, 5000 orders, office_day mix
+    python load_test.py --mix dispatch_peak --requests 5000
+    python load_test.py --database-url postgresql+psycopg2://... --scale 1000000 --workers 8 --duration 60
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import contextlib
+import json
+import random
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Dict, List, Optional
+from flask import Flask
+from app import create_app
+from models import db
+from synthetic_data import seed_dataset, DEFAULT_SCALE, DEFAULT_SEED, CUSTOMERS, GATE_USERS
+from utils.estimates import stage_estimator
+from utils.search import order_search
+from utils.status_log import percentile
+
+DEFAULT_REQUESTS = 2000
+DEFAULT_WARMUP = 50
+
+# path and body are templates filled per request; see _fill
+Route = namedtuple('Route', ['weight', 'method', 'path', 'body'])
+
+# Requests each department's screens send, weighted by how often they are sent
+DEPARTMENT_TRAFFIC = {
+    'sales': [
+        Route(5, 'GET', '/api/sales/orders?limit=50', None),
+        Route(3, 'GET', '/api/sales/orders/{sales_id}', None),
+        Route(2, 'GET', '/api/sales/showroom/available', None),
+        Route(1, 'GET', '/api/sales/summary', None),
+        Route(1, 'GET', '/api/orders/status-tracking?q=Customer+{customer}&limit=50', None),
+    ],
+    'production': [
+        Route(3, 'GET', '/api/orders/current-log?limit=50', None),
+        Route(2, 'GET', '/api/orders/{production_id}/details', None),
+        Route(2, 'GET', '/api/orders/{production_id}/timeline', None),
+        Route(1, 'PUT', '/api/assembly-orders/{production_id}/progress', {'progress': '{progress}'}),
+    ],
+    'store': [
+        Route(3, 'GET', '/api/store/orders/pending', None),
+        Route(1, 'GET', '/api/store/shortages', None),
+        Route(1, 'GET', '/api/store/inventory', None),
+    ],
+    'finance': [
+        Route(2, 'GET', '/api/finance/dashboard', None),
+        Route(2, 'GET', '/api/finance/transactions', None),
+        Route(1, 'POST', '/api/finance/transactions/expense', {'amount': '{amount}', 'description': 'Load test expense'}),
+    ],
+    'dispatch': [
+        Route(4, 'GET', '/api/dispatch/all?limit=50', None),
+        Route(2, 'GET', '/api/dispatch/all?status=pending&limit=50', None),
+        Route(2, 'GET', '/api/dispatch/summary', None),
+    ],
+    'transport': [
+        Route(3, 'GET', '/api/transport/all?limit=50', None),
+        Route(2, 'GET', '/api/transport/summary', None),
+        Route(1, 'GET', '/api/transport/approvals/pending', None),
+        Route(1, 'GET', '/api/fleet/available', None),
+    ],
+    'watchman': [
+        Route(3, 'GET', '/api/watchman/gate-passes?limit=50', None),
+        Route(1, 'GET', '/api/watchman/summary', None),
+        Route(1, 'POST', '/api/gate-entry/manual-entry', {'phone': '{phone}', 'details': 'Load test'}),
+    ],
+    'approvals': [
+        Route(1, 'GET', '/api/approval/all?status=pending&limit=50', None),
+    ],
+}
+
+# Share of requests per department
+MIXES = {
+    'office_day': {'sales': 30, 'production': 15, 'store': 10, 'finance': 10, 'dispatch': 15,
+                   'transport': 12, 'watchman': 6, 'approvals': 2},
+    'dispatch_peak': {'sales': 15, 'dispatch': 35, 'transport': 30, 'watchman': 20},
+    'month_end': {'sales': 20, 'finance': 50, 'production': 10, 'approvals': 20},
+}
+
+Request = namedtuple('Request', ['endpoint', 'method', 'path', 'body'])
+Sample = namedtuple('Sample', ['endpoint', 'status', 'seconds'])
+
+
+def _fill(template: Any, values: Dict[str, Any]) -> Any:
+    # A template that is exactly one placeholder keeps the value's type (numbers stay numbers)
+    if isinstance(template, dict):
+        return {key: _fill(value, values) for key, value in template.items()}
+    if isinstance(template, str) and template.startswith('{') and template.endswith('}') \
+            and template[1:-1] in values:
+        return values[template[1:-1]]
+    return template.format(**values) if isinstance(template, str) else template
+
+def build_schedule(mix: str, count: int, scale: int, seed: int = DEFAULT_SEED) -> List[Request]:
+    """
+    Draw ``count`` requests from a traffic mix, with ids spread over the seeded rows
+
+    Raises:
+        ValueError: If the mix is unknown
+    """
+    if mix not in MIXES:
+        raise ValueError(f"Unknown mix. Must be one of: {sorted(MIXES)}")
+    rng = random.Random(seed)
+    routes, weights = [], []
+    for department, share in MIXES[mix].items():
+        department_routes = DEPARTMENT_TRAFFIC[department]
+        total = sum(route.weight for route in department_routes)
+        for route in department_routes:
+            routes.append((department, route))
+            weights.append(share * route.weight / total)
+
+    schedule = []
+    for department, route in rng.choices(routes, weights=weights, k=count):
+        values = {
+            'sales_id': rng.randint(1, max(scale, 1)),
+            'production_id': rng.randint(1, max(scale // 2, 1)),
+            'customer': rng.randint(1, CUSTOMERS - 1),
+            'phone': f'7{rng.randint(1, GATE_USERS):09d}',
+            'progress': rng.randint(0, 100),
+            'amount': rng.randint(100, 5000),
+        }
+        schedule.append(Request(
+            f'{route.method} {route.path}', route.method, _fill(route.path, values), _fill(route.body, values)
+        ))
+    return schedule
+
+def run_load(app: Flask, schedule: List[Request], workers: int = 1,
+             duration: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Send the scheduled requests from ``workers`` threads and summarize the latencies
+
+    Args:
+        app: Application to send requests to
+        schedule: Requests from build_schedule, split round-robin across workers
+        workers: Concurrent clients
+        duration: Stop after this many seconds even if requests remain
+
+    Returns:
+        dict: Totals and per-endpoint count, status codes, p50/p95/p99 (ms) and throughput
+    """
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+
+    def client_loop(requests):
+        client = app.test_client()
+        local = []
+        for item in requests:
+            if deadline and time.perf_counter() > deadline:
+                break
+            started = time.perf_counter()
+            response = client.open(item.path, method=item.method, json=item.body)
+            local.append(Sample(item.endpoint, response.status_code, time.perf_counter() - started))
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client_loop, args=(schedule[index::workers],)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    by_endpoint: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample.endpoint, []).append(sample)
+
+    def summarize(items):
+        latencies = sorted(sample.seconds * 1000 for sample in items)
+        statuses: Dict[int, int] = {}
+        for sample in items:
+            statuses[sample.status] = statuses.get(sample.status, 0) + 1
+        return {
+            'count': len(items),
+            'errors': sum(count for status, count in statuses.items() if status >= 500),
+            'statuses': statuses,
+            'p50Ms': round(percentile(latencies, 0.50), 2),
+            'p95Ms': round(percentile(latencies, 0.95), 2),
+            'p99Ms': round(percentile(latencies, 0.99), 2),
+            'throughput': round(len(items) / elapsed, 2) if elapsed else None,
+        }
+
+    return {
+        'workers': workers,
+        'elapsedSeconds': round(elapsed, 2),
+        'total': summarize(samples) if samples else {'count': 0},
+        'endpoints': {name: summarize(items) for name, items in sorted(
+            by_endpoint.items(), key=lambda entry: -len(entry[1])
+        )},
+    }
+
+def prepare(scale: int = DEFAULT_SCALE, seed: int = DEFAULT_SEED, seeded: bool = False) -> None:
+    """Seed the synthetic history and build the tables its bulk insert skipped (requires an app context)"""
+    if not seeded:
+        seed_dataset(scale, seed)
+    if order_search.enabled():
+        order_search.rebuild()
+    if stage_estimator.enabled():
+        stage_estimator.refresh()
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay department traffic against the API and report latencies')
+    parser.add_argument('--mix', default='office_day', choices=sorted(MIXES), help='department traffic mix')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help='requests to send')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help='unrecorded requests sent first')
+    parser.add_argument('--workers', type=int, default=1, help='concurrent clients (needs --database-url above 1)')
+    parser.add_argument('--duration', type=float, help='stop after this many seconds')
+    parser.add_argument('--scale', type=int, default=DEFAULT_SCALE, help='sales orders to seed')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='random seed for data and traffic')
+    parser.add_argument('--database-url', help='database to run against (default: in-memory SQLite)')
+    parser.add_argument('--seeded', action='store_true', help='the database already holds a synthetic history')
+    parser.add_argument('--output', help='write the full report as JSON to this file')
+    args = parser.parse_args()
+    if args.workers > 1 and not args.database_url:
+        # Flask-SQLAlchemy shares one connection for in-memory SQLite
+        parser.error('--workers above 1 needs --database-url')
+
+    app = create_app('testing')
+    if args.database_url:
+        app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+
+    with app.app_context():
+        if not args.seeded:
+            db.create_all()
+        prepare(args.scale, args.seed, args.seeded)
+        db.session.remove()
+
+    schedule = build_schedule(args.mix, args.warmup + args.requests, args.scale, args.seed)
+    try:
+        # Some routes print debug output per request
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            run_load(app, schedule[:args.warmup])
+            report = run_load(app, schedule[args.warmup:], args.workers, args.duration)
+    finally:
+        if not args.database_url:
+            with app.app_context():
+                db.drop_all()
+    report.update({'mix': args.mix, 'scale': args.scale})
+
+    total = report['total']
+    print(f"{args.mix} mix, {total['count']} requests from {report['workers']} worker(s) in "
+          f"{report['elapsedSeconds']}s - {total.get('throughput')} req/s, {total.get('errors', 0)} errors")
+    print(f"  {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}  endpoint")
+    for name, stats in report['endpoints'].items():
+        flag = f"  ({stats['errors']} errors)" if stats['errors'] else ''
+        print(f"  {stats['count']:>6} {stats['p50Ms']:>9.2f} {stats['p95Ms']:>9.2f} {stats['p99Ms']:>9.2f} "
+              f"{stats['throughput']:>8.2f}  {name}{flag}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 1 if total.get('errors') else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
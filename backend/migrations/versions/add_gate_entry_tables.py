@@ -0,0 +1,70 @@
+"""Add gate entry tables replacing the gate entry Excel workbooks
+
+Revision ID: add_gate_entry_tables
+Revises: add_delivery_type
+Create Date: 2025-10-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_gate_entry_tables'
+down_revision = 'add_delivery_type'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('gate_user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('phone', sa.String(length=50), nullable=False),
+        sa.Column('registered_at', sa.DateTime(), nullable=True),
+        sa.Column('last_entry', sa.DateTime(), nullable=True),
+        sa.Column('last_exit', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('photo', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_gate_user_phone', 'gate_user', ['phone'], unique=True)
+
+    op.create_table('gate_entry_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('user_name', sa.String(length=200), nullable=True),
+        sa.Column('user_phone', sa.String(length=50), nullable=True),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        sa.Column('method', sa.String(length=20), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_gate_entry_log_timestamp', 'gate_entry_log', ['timestamp'])
+    op.create_index('ix_gate_entry_log_phone_timestamp', 'gate_entry_log', ['user_phone', 'timestamp'])
+
+    op.create_table('going_out_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('user_name', sa.String(length=200), nullable=True),
+        sa.Column('user_phone', sa.String(length=50), nullable=True),
+        sa.Column('reason', sa.String(length=100), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('return_time', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_going_out_log_timestamp', 'going_out_log', ['timestamp'])
+    op.create_index('ix_going_out_log_phone_timestamp', 'going_out_log', ['user_phone', 'timestamp'])
+
+
+def downgrade():
+    op.drop_index('ix_going_out_log_phone_timestamp', table_name='going_out_log')
+    op.drop_index('ix_going_out_log_timestamp', table_name='going_out_log')
+    op.drop_table('going_out_log')
+    op.drop_index('ix_gate_entry_log_phone_timestamp', table_name='gate_entry_log')
+    op.drop_index('ix_gate_entry_log_timestamp', table_name='gate_entry_log')
+    op.drop_table('gate_entry_log')
+    op.drop_index('ix_gate_user_phone', table_name='gate_user')
+    op.drop_table('gate_user')
@@ -0,0 +1,42 @@
+"""Add notification table
+
+Revision ID: add_notifications
+Revises: add_status_counters
+Create Date: 2025-10-13 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_notifications'
+down_revision = 'add_status_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Unread counters are built from this table on first read
+    op.create_table('notification',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.Column('department', sa.String(length=50), nullable=True),
+        sa.Column('priority', sa.String(length=20), nullable=True),
+        sa.Column('read', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('read_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_department_read_timestamp', 'notification', ['department', 'read', 'timestamp'])
+    op.create_index('ix_notification_timestamp', 'notification', ['timestamp'])
+
+
+def downgrade():
+    op.drop_index('ix_notification_timestamp', table_name='notification')
+    op.drop_index('ix_notification_department_read_timestamp', table_name='notification')
+    op.execute("DELETE FROM status_counter WHERE entity = 'notification'")
+    op.drop_table('notification')
@@ -0,0 +1,106 @@
+"""Add order_search_document table
+
+Revision ID: add_order_search
+Revises: add_notifications
+Create Date: 2025-10-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_order_search'
+down_revision = 'add_notifications'
+branch_labels = None
+depends_on = None
+
+
+def _normalize(*values):
+    return ' '.join(word for value in values for word in str(value or '').lower().split())
+
+
+def upgrade():
+    op.create_table('order_search_document',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('ref_id', sa.Integer(), nullable=False),
+        sa.Column('production_order_id', sa.Integer(), nullable=True),
+        sa.Column('order_number', sa.String(length=50), nullable=False),
+        sa.Column('search_text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kind', 'ref_id', name='uq_order_search_document_ref')
+    )
+    op.create_index('ix_order_search_document_created_at', 'order_search_document', ['created_at'])
+
+    # Substring search index: trigram GIN on PostgreSQL, ngram FULLTEXT on MySQL.
+    # Other databases use the application's in-process index.
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute(
+            'CREATE INDEX ix_order_search_document_search_text_trgm '
+            'ON order_search_document USING gin (search_text gin_trgm_ops)'
+        )
+    elif dialect == 'mysql':
+        op.execute(
+            'CREATE FULLTEXT INDEX ix_order_search_document_search_text '
+            'ON order_search_document (search_text) WITH PARSER ngram'
+        )
+
+    # Backfill documents for existing orders
+    bind = op.get_bind()
+    documents = []
+    for row in bind.execute(sa.text(
+        'SELECT id, product_name, category, created_at FROM production_order'
+    )):
+        number = 'po-%04d' % row.id
+        documents.append({
+            'kind': 'production', 'ref_id': row.id, 'production_order_id': row.id, 'order_number': number,
+            'search_text': _normalize(number, row.product_name, row.category), 'created_at': row.created_at
+        })
+
+    sales = {}
+    for row in bind.execute(sa.text(
+        'SELECT so.id, so.order_number, so.customer_name, so.created_at, sp.name AS product_name, '
+        'sp.production_order_id, dr.party_name, tj.transporter_name, tj.vehicle_no, '
+        'gp.vehicle_no AS gate_vehicle_no, gp.driver_name '
+        'FROM sales_order so '
+        'LEFT JOIN showroom_product sp ON sp.id = so.showroom_product_id '
+        'LEFT JOIN dispatch_request dr ON dr.sales_order_id = so.id '
+        'LEFT JOIN transport_job tj ON tj.dispatch_request_id = dr.id '
+        'LEFT JOIN gate_pass gp ON gp.dispatch_request_id = dr.id'
+    )):
+        document = sales.get(row.id)
+        if document is None:
+            document = sales[row.id] = {
+                'kind': 'sales', 'ref_id': row.id, 'production_order_id': row.production_order_id,
+                'order_number': _normalize(row.order_number), 'created_at': row.created_at,
+                'parts': ['so-%d' % row.id, row.order_number, row.customer_name, row.product_name]
+            }
+        document['parts'].extend([
+            row.party_name, row.transporter_name, row.vehicle_no, row.gate_vehicle_no, row.driver_name
+        ])
+    for document in sales.values():
+        parts = document.pop('parts')
+        document['search_text'] = ' '.join(dict.fromkeys(_normalize(part) for part in parts if _normalize(part)))
+        documents.append(document)
+
+    if documents:
+        table = sa.table('order_search_document',
+            sa.column('kind', sa.String), sa.column('ref_id', sa.Integer),
+            sa.column('production_order_id', sa.Integer), sa.column('order_number', sa.String),
+            sa.column('search_text', sa.Text), sa.column('created_at', sa.DateTime)
+        )
+        op.bulk_insert(table, documents)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_order_search_document_search_text_trgm')
+    elif dialect == 'mysql':
+        op.drop_index('ix_order_search_document_search_text', table_name='order_search_document')
+    op.drop_index('ix_order_search_document_created_at', table_name='order_search_document')
+    op.drop_table('order_search_document')
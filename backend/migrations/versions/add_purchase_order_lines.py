@@ -0,0 +1,155 @@
+"""Replace purchase order materials JSON with purchase_order_line rows
+
+Revision ID: add_purchase_order_lines
+Revises: add_query_indexes
+Create Date: 2025-10-11 10:00:00.000000
+
+"""
+import json
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_purchase_order_lines'
+down_revision = 'add_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+purchase_order = sa.table('purchase_order',
+    sa.column('id', sa.Integer),
+    sa.column('materials', sa.Text),
+    sa.column('original_requirements', sa.Text),
+)
+purchase_order_line = sa.table('purchase_order_line',
+    sa.column('purchase_order_id', sa.Integer),
+    sa.column('material_id', sa.Integer),
+    sa.column('required_quantity', sa.Integer),
+    sa.column('purchased_quantity', sa.Integer),
+    sa.column('unit_cost', sa.Float),
+)
+store_inventory = sa.table('store_inventory',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('quantity', sa.Integer),
+    sa.column('category', sa.String),
+    sa.column('created_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+
+
+def _parse(text):
+    """Sum a materials JSON list by name; unreadable values count as empty"""
+    try:
+        items = json.loads(text) if text else []
+    except (TypeError, ValueError):
+        return {}
+    merged = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or not item.get('name'):
+            continue
+        entry = merged.setdefault(item['name'], {
+            'quantity': 0, 'unit_cost': 0.0, 'category': item.get('category') or 'Raw Material'
+        })
+        try:
+            entry['quantity'] += int(float(item.get('quantity') or 0))
+            entry['unit_cost'] = float(item.get('unit_cost') or entry['unit_cost'])
+        except (TypeError, ValueError):
+            continue
+    return merged
+
+
+def upgrade():
+    op.create_table('purchase_order_line',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('purchase_order_id', sa.Integer(), nullable=False),
+        sa.Column('material_id', sa.Integer(), nullable=False),
+        sa.Column('required_quantity', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('purchased_quantity', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unit_cost', sa.Float(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['purchase_order_id'], ['purchase_order.id'], ),
+        sa.ForeignKeyConstraint(['material_id'], ['store_inventory.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('purchase_order_id', 'material_id', name='uq_purchase_order_line_material')
+    )
+    op.create_index('ix_purchase_order_line_material_id', 'purchase_order_line', ['material_id'])
+
+    # Backfill: one line per material name of each order; "materials" holds
+    # the purchased quantities and unit costs, "original_requirements" the
+    # required quantities. Names not in the store get a zero-stock item.
+    bind = op.get_bind()
+    orders = []
+    for order_id, materials, requirements in bind.execute(
+        sa.select(purchase_order.c.id, purchase_order.c.materials, purchase_order.c.original_requirements)
+    ):
+        orders.append((order_id, _parse(materials), _parse(requirements)))
+
+    material_ids = {}
+    for material_id, name in bind.execute(
+        sa.select(store_inventory.c.id, store_inventory.c.name).order_by(store_inventory.c.id)
+    ):
+        material_ids.setdefault(name, material_id)
+
+    now = datetime.utcnow()
+    for order_id, purchased, required in orders:
+        for name, item in list(purchased.items()) + list(required.items()):
+            if name not in material_ids:
+                bind.execute(store_inventory.insert().values(
+                    name=name, quantity=0, category=item['category'], created_at=now, updated_at=now
+                ))
+                material_ids[name] = bind.execute(
+                    sa.select(store_inventory.c.id).where(store_inventory.c.name == name)
+                ).scalar()
+
+    lines = []
+    for order_id, purchased, required in orders:
+        for name in list(dict.fromkeys(list(required) + list(purchased))):
+            line = {
+                'purchase_order_id': order_id,
+                'material_id': material_ids[name],
+                'required_quantity': required.get(name, {}).get('quantity', 0),
+                'purchased_quantity': purchased.get(name, {}).get('quantity', 0),
+                'unit_cost': purchased.get(name, {}).get('unit_cost', 0.0),
+            }
+            if line['required_quantity'] or line['purchased_quantity']:
+                lines.append(line)
+    if lines:
+        op.bulk_insert(purchase_order_line, lines)
+
+    with op.batch_alter_table('purchase_order') as batch_op:
+        batch_op.drop_column('materials')
+        batch_op.drop_column('original_requirements')
+
+
+def downgrade():
+    with op.batch_alter_table('purchase_order') as batch_op:
+        batch_op.add_column(sa.Column('materials', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('original_requirements', sa.Text(), nullable=True))
+
+    # Serialize the lines back into the JSON columns
+    bind = op.get_bind()
+    purchased, required = {}, {}
+    for order_id, name, required_qty, purchased_qty, unit_cost in bind.execute(
+        sa.select(
+            purchase_order_line.c.purchase_order_id, store_inventory.c.name,
+            purchase_order_line.c.required_quantity, purchase_order_line.c.purchased_quantity,
+            purchase_order_line.c.unit_cost
+        ).select_from(
+            purchase_order_line.join(store_inventory, purchase_order_line.c.material_id == store_inventory.c.id)
+        ).order_by(purchase_order_line.c.purchase_order_id, sa.literal_column('purchase_order_line.id'))
+    ):
+        if purchased_qty:
+            purchased.setdefault(order_id, []).append({'name': name, 'quantity': purchased_qty, 'unit_cost': unit_cost})
+        if required_qty:
+            required.setdefault(order_id, []).append({'name': name, 'quantity': required_qty})
+
+    for order_id in set(purchased) | set(required):
+        bind.execute(purchase_order.update().where(purchase_order.c.id == order_id).values(
+            materials=json.dumps(purchased[order_id]) if order_id in purchased else None,
+            original_requirements=json.dumps(required[order_id]) if order_id in required else None,
+        ))
+
+    op.drop_index('ix_purchase_order_line_material_id', table_name='purchase_order_line')
+    op.drop_table('purchase_order_line')
@@ -0,0 +1,62 @@
+"""Add foreign key and status/date indexes matched to service query shapes
+
+Revision ID: add_query_indexes
+Revises: add_showroom_stock
+Create Date: 2025-10-10 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_query_indexes'
+down_revision = 'add_showroom_stock'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns). Foreign keys back the joins and selectin
+# loads; (status, date) pairs serve "status = ? ORDER BY date DESC" lists and
+# status counts; single date indexes serve unfiltered newest-first pages.
+INDEXES = [
+    ('ix_production_order_status_created_at', 'production_order', ['status', 'created_at']),
+    ('ix_production_order_created_at', 'production_order', ['created_at']),
+    ('ix_assembly_order_production_order_id', 'assembly_order', ['production_order_id']),
+    ('ix_assembly_order_status_created_at', 'assembly_order', ['status', 'created_at']),
+    ('ix_purchase_order_production_order_id', 'purchase_order', ['production_order_id']),
+    ('ix_purchase_order_status_created_at', 'purchase_order', ['status', 'created_at']),
+    ('ix_sales_order_showroom_product_id', 'sales_order', ['showroom_product_id']),
+    ('ix_sales_order_order_status_created_at', 'sales_order', ['order_status', 'created_at']),
+    ('ix_sales_order_sales_person_created_at', 'sales_order', ['sales_person', 'created_at']),
+    ('ix_sales_order_created_at', 'sales_order', ['created_at']),
+    ('ix_transport_approval_request_sales_order_id', 'transport_approval_request', ['sales_order_id']),
+    ('ix_transport_approval_request_status_created_at', 'transport_approval_request', ['status', 'created_at']),
+    ('ix_sales_transaction_sales_order_id', 'sales_transaction', ['sales_order_id']),
+    ('ix_approval_request_sales_order_id', 'approval_request', ['sales_order_id']),
+    ('ix_approval_request_status_created_at', 'approval_request', ['status', 'created_at']),
+    ('ix_finance_transaction_reference', 'finance_transaction', ['reference_type', 'reference_id']),
+    ('ix_finance_transaction_created_at', 'finance_transaction', ['created_at']),
+    ('ix_part_load_detail_sales_order_id', 'part_load_detail', ['sales_order_id']),
+    ('ix_showroom_product_production_order_id', 'showroom_product', ['production_order_id']),
+    ('ix_showroom_product_showroom_status_created_at', 'showroom_product', ['showroom_status', 'created_at']),
+    ('ix_dispatch_request_sales_order_id', 'dispatch_request', ['sales_order_id']),
+    ('ix_dispatch_request_showroom_product_id', 'dispatch_request', ['showroom_product_id']),
+    ('ix_dispatch_request_status_created_at', 'dispatch_request', ['status', 'created_at']),
+    ('ix_dispatch_request_created_at', 'dispatch_request', ['created_at']),
+    ('ix_transport_job_dispatch_request_id', 'transport_job', ['dispatch_request_id']),
+    ('ix_transport_job_status_created_at', 'transport_job', ['status', 'created_at']),
+    ('ix_transport_job_created_at', 'transport_job', ['created_at']),
+    ('ix_gate_pass_dispatch_request_id', 'gate_pass', ['dispatch_request_id']),
+    ('ix_gate_pass_status_issued_at', 'gate_pass', ['status', 'issued_at']),
+    ('ix_gate_pass_issued_at', 'gate_pass', ['issued_at']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
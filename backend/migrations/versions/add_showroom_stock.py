@@ -0,0 +1,62 @@
+"""Add showroom stock ledger with per-product original, reserved and sold quantities
+
+Revision ID: add_showroom_stock
+Revises: add_gate_entry_tables
+Create Date: 2025-10-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_showroom_stock'
+down_revision = 'add_gate_entry_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('showroom_stock',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('showroom_product_id', sa.Integer(), nullable=False),
+        sa.Column('original_quantity', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('reserved_quantity', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sold_quantity', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('available_quantity', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['showroom_product_id'], ['showroom_product.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('showroom_product_id')
+    )
+    op.create_index('ix_showroom_stock_available_quantity', 'showroom_stock', ['available_quantity'])
+
+    # Backfill: original quantity from the first assembly order of the product's
+    # production order; delivered orders count as sold, open orders as reserved
+    op.execute("""
+        INSERT INTO showroom_stock
+            (showroom_product_id, original_quantity, reserved_quantity, sold_quantity, available_quantity, updated_at)
+        SELECT p.id, t.original_quantity, t.reserved_quantity, t.sold_quantity,
+               CASE WHEN t.original_quantity - t.reserved_quantity - t.sold_quantity > 0
+                    THEN t.original_quantity - t.reserved_quantity - t.sold_quantity ELSE 0 END,
+               CURRENT_TIMESTAMP
+        FROM showroom_product p
+        JOIN (
+            SELECT sp.id AS product_id,
+                   COALESCE((SELECT a.quantity FROM assembly_order a
+                             WHERE a.production_order_id = sp.production_order_id
+                             ORDER BY a.id LIMIT 1), 1) AS original_quantity,
+                   COALESCE((SELECT SUM(s.quantity) FROM sales_order s
+                             WHERE s.showroom_product_id = sp.id
+                             AND s.order_status NOT IN ('delivered', 'cancelled', 'returned')), 0) AS reserved_quantity,
+                   COALESCE((SELECT SUM(s.quantity) FROM sales_order s
+                             WHERE s.showroom_product_id = sp.id
+                             AND s.order_status = 'delivered'), 0) AS sold_quantity
+            FROM showroom_product sp
+        ) t ON t.product_id = p.id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_showroom_stock_available_quantity', table_name='showroom_stock')
+    op.drop_table('showroom_stock')
@@ -0,0 +1,36 @@
+"""Add stage_estimate lookup table
+
+Revision ID: add_stage_estimates
+Revises: add_status_events
+Create Date: 2025-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_stage_estimates'
+down_revision = 'add_status_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by StageEstimator.refresh (POST /api/orders/analytics/estimates/refresh);
+    # until then order ETAs keep the progress based estimate
+    op.create_table('stage_estimate',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+        sa.Column('median_seconds', sa.Float(), nullable=False),
+        sa.Column('p90_seconds', sa.Float(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('category', 'stage', name='uq_stage_estimate_key')
+    )
+
+
+def downgrade():
+    op.drop_table('stage_estimate')
@@ -0,0 +1,47 @@
+"""Add status_counter table and summary window indexes
+
+Revision ID: add_status_counters
+Revises: add_purchase_order_lines
+Create Date: 2025-10-12 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_status_counters'
+down_revision = 'add_purchase_order_lines'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns) for the "changed to <status> today" summary windows
+INDEXES = [
+    ('ix_dispatch_request_status_updated_at', 'dispatch_request', ['status', 'updated_at']),
+    ('ix_transport_job_status_updated_at', 'transport_job', ['status', 'updated_at']),
+    ('ix_gate_pass_status_verified_at', 'gate_pass', ['status', 'verified_at']),
+]
+
+
+def upgrade():
+    # Counters start empty; each entity is counted from its table on first read
+    op.create_table('status_counter',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('dimension', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('entity', 'status', 'dimension', name='uq_status_counter_key')
+    )
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_table('status_counter')
@@ -0,0 +1,69 @@
+"""Add status_event log
+
+Revision ID: add_status_events
+Revises: add_order_search
+Create Date: 2025-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_status_events'
+down_revision = 'add_order_search'
+branch_labels = None
+depends_on = None
+
+# Seed one event per existing record with its current status, dated when the
+# record was created; earlier transitions were never recorded
+BACKFILL = [
+    "SELECT 'production_order', id, status, id, NULL, COALESCE(created_at, CURRENT_TIMESTAMP) FROM production_order",
+    "SELECT 'purchase_order', id, status, production_order_id, NULL, COALESCE(created_at, CURRENT_TIMESTAMP) FROM purchase_order",
+    "SELECT 'assembly_order', id, status, production_order_id, NULL, COALESCE(created_at, CURRENT_TIMESTAMP) FROM assembly_order",
+    "SELECT 'showroom_product', id, showroom_status, production_order_id, NULL, COALESCE(created_at, CURRENT_TIMESTAMP) FROM showroom_product",
+    "SELECT 'sales_order', so.id, so.order_status, sp.production_order_id, so.id, COALESCE(so.created_at, CURRENT_TIMESTAMP) "
+    "FROM sales_order so LEFT JOIN showroom_product sp ON sp.id = so.showroom_product_id",
+    "SELECT 'sales_payment', so.id, so.payment_status, sp.production_order_id, so.id, COALESCE(so.created_at, CURRENT_TIMESTAMP) "
+    "FROM sales_order so LEFT JOIN showroom_product sp ON sp.id = so.showroom_product_id",
+    "SELECT 'dispatch_request', dr.id, dr.status, sp.production_order_id, dr.sales_order_id, COALESCE(dr.created_at, CURRENT_TIMESTAMP) "
+    "FROM dispatch_request dr LEFT JOIN showroom_product sp ON sp.id = dr.showroom_product_id",
+    "SELECT 'transport_job', tj.id, tj.status, sp.production_order_id, dr.sales_order_id, COALESCE(tj.created_at, CURRENT_TIMESTAMP) "
+    "FROM transport_job tj JOIN dispatch_request dr ON dr.id = tj.dispatch_request_id "
+    "LEFT JOIN showroom_product sp ON sp.id = dr.showroom_product_id",
+    "SELECT 'gate_pass', gp.id, gp.status, sp.production_order_id, dr.sales_order_id, COALESCE(gp.issued_at, CURRENT_TIMESTAMP) "
+    "FROM gate_pass gp JOIN dispatch_request dr ON dr.id = gp.dispatch_request_id "
+    "LEFT JOIN showroom_product sp ON sp.id = dr.showroom_product_id",
+]
+
+
+def upgrade():
+    op.create_table('status_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('previous_status', sa.String(length=50), nullable=True),
+        sa.Column('production_order_id', sa.Integer(), nullable=True),
+        sa.Column('sales_order_id', sa.Integer(), nullable=True),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_status_event_entity_entity_id_occurred_at', 'status_event', ['entity', 'entity_id', 'occurred_at'])
+    op.create_index('ix_status_event_production_order_id_occurred_at', 'status_event', ['production_order_id', 'occurred_at'])
+    op.create_index('ix_status_event_sales_order_id_occurred_at', 'status_event', ['sales_order_id', 'occurred_at'])
+    op.create_index('ix_status_event_entity_occurred_at', 'status_event', ['entity', 'occurred_at'])
+
+    for select in BACKFILL:
+        op.execute(
+            'INSERT INTO status_event (entity, entity_id, status, production_order_id, sales_order_id, occurred_at) '
+            + select
+        )
+
+
+def downgrade():
+    op.drop_index('ix_status_event_entity_occurred_at', table_name='status_event')
+    op.drop_index('ix_status_event_sales_order_id_occurred_at', table_name='status_event')
+    op.drop_index('ix_status_event_production_order_id_occurred_at', table_name='status_event')
+    op.drop_index('ix_status_event_entity_entity_id_occurred_at', table_name='status_event')
+    op.drop_table('status_event')
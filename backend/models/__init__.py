@@ -9,13 +9,19 @@ db = SQLAlchemy()
 # Import all models to ensure they're registered with SQLAlchemy
 from .user import User, UserStatus
 from .production import ProductionOrder, AssemblyOrder, AssemblyTestResult
-from .purchase import PurchaseOrder
+from .purchase import PurchaseOrder, PurchaseOrderLine
 from .inventory import StoreInventory
-from .showroom import ShowroomProduct, DispatchRequest, TransportJob, GatePass, Vehicle
+from .showroom import ShowroomProduct, ShowroomStock, DispatchRequest, TransportJob, GatePass, Vehicle
 from .finance import FinanceTransaction
 from .sales import SalesOrder, Customer, SalesTransaction
 from .transport import PartLoadDetail
 from .approval import ApprovalRequest
+from .gate_entry import GateUser, GateEntryLog, GoingOutLog
+from .status_counter import StatusCounter
+from .notification import Notification
+from .search import OrderSearchDocument
+from .status_event import StatusEvent
+from .stage_estimate import StageEstimate
 
 # Export commonly used models
 __all__ = [
@@ -25,8 +31,10 @@ __all__ = [
     'ProductionOrder',
     'AssemblyOrder',
     'PurchaseOrder',
+    'PurchaseOrderLine',
     'StoreInventory',
     'ShowroomProduct',
+    'ShowroomStock',
     'DispatchRequest',
     'TransportJob',
     'GatePass',
@@ -36,5 +44,13 @@ __all__ = [
     'Customer',
     'SalesTransaction',
     'ApprovalRequest',
-    'PartLoadDetail'
+    'PartLoadDetail',
+    'GateUser',
+    'GateEntryLog',
+    'GoingOutLog',
+    'StatusCounter',
+    'Notification',
+    'OrderSearchDocument',
+    'StatusEvent',
+    'StageEstimate'
 ]
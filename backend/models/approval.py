@@ -3,9 +3,14 @@ Approval system for orders requiring admin verification
 """
 from datetime import datetime
 from . import db
+from .serialization import ModelSerializer, nested
 
 class ApprovalRequest(db.Model):
     """Model for approval requests requiring admin verification"""
+    __table_args__ = (
+        db.Index('ix_approval_request_sales_order_id', 'sales_order_id'),
+        db.Index('ix_approval_request_status_created_at', 'status', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sales_order_id = db.Column(db.Integer, db.ForeignKey('sales_order.id'), nullable=False)
@@ -24,21 +29,8 @@ class ApprovalRequest(db.Model):
     # Relationship
     sales_order = db.relationship('SalesOrder', backref='approval_requests')
     
-    def to_dict(self):
+    _serializer = ModelSerializer(extra={'salesOrder': nested('sales_order')})
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'salesOrderId': self.sales_order_id,
-            'requestType': self.request_type,
-            'requestedBy': self.requested_by,
-            'requestDetails': self.request_details,
-            'couponCode': self.coupon_code,
-            'discountAmount': self.discount_amount,
-            'status': self.status,
-            'approvedBy': self.approved_by,
-            'approvalNotes': self.approval_notes,
-            'priority': self.priority,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat(),
-            'salesOrder': self.sales_order.to_dict() if self.sales_order else None
-        }
+        return ApprovalRequest._serializer.dump(self, fields)
@@ -3,9 +3,14 @@ Finance-related database models
 """
 from datetime import datetime
 from . import db
+from .serialization import ModelSerializer
 
 class FinanceTransaction(db.Model):
     """Model for financial transactions"""
+    __table_args__ = (
+        db.Index('ix_finance_transaction_reference', 'reference_type', 'reference_id'),
+        db.Index('ix_finance_transaction_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     transaction_type = db.Column(db.String(20), nullable=False)  # 'revenue' or 'expense'
@@ -15,17 +20,11 @@ class FinanceTransaction(db.Model):
     reference_type = db.Column(db.String(50))  # 'purchase_order' or 'product_sale'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'transactionType': self.transaction_type,
-            'amount': self.amount,
-            'description': self.description,
-            'referenceId': self.reference_id,
-            'referenceType': self.reference_type,
-            'createdAt': self.created_at.isoformat()
-        }
+        return FinanceTransaction._serializer.dump(self, fields)
     
     @classmethod
     def create_expense(cls, amount, description, reference_id=None, reference_type=None):
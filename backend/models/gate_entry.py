@@ -0,0 +1,90 @@
+"""
+Gate entry (staff in/out) database models
+"""
+from datetime import datetime
+from . import db
+
+class GateUser(db.Model):
+    """Model for staff registered with the gate entry system"""
+    __tablename__ = 'gate_user'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    phone = db.Column(db.String(50), unique=True, nullable=False, index=True)
+    registered_at = db.Column(db.DateTime, default=datetime.now)
+    last_entry = db.Column(db.DateTime, nullable=True)
+    last_exit = db.Column(db.DateTime, nullable=True)
+    status = db.Column(db.String(20), default='active')
+    photo = db.Column(db.Text, nullable=True)
+
+    def to_dict(self):
+        """Convert model instance to dictionary (keys match the legacy workbook columns)"""
+        return {
+            'id': self.id,
+            'user_id': self.id,
+            'name': self.name,
+            'phone': self.phone,
+            'registered_at': self.registered_at.isoformat() if self.registered_at else None,
+            'last_entry': self.last_entry.isoformat() if self.last_entry else None,
+            'last_exit': self.last_exit.isoformat() if self.last_exit else None,
+            'status': self.status,
+            'photo': self.photo
+        }
+
+class GateEntryLog(db.Model):
+    """Append-only log of gate entries and exits"""
+    __tablename__ = 'gate_entry_log'
+    __table_args__ = (
+        db.Index('ix_gate_entry_log_phone_timestamp', 'user_phone', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    timestamp = db.Column(db.DateTime, default=datetime.now, nullable=False, index=True)
+    user_name = db.Column(db.String(200), nullable=True)
+    user_phone = db.Column(db.String(50), nullable=True)
+    action = db.Column(db.String(20), nullable=False)  # entry, exit
+    method = db.Column(db.String(20), default='manual')
+    details = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), default='completed')
+
+    def to_dict(self):
+        """Convert model instance to dictionary (keys match the legacy workbook columns)"""
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'user_name': self.user_name,
+            'user_phone': self.user_phone,
+            'action': self.action,
+            'method': self.method,
+            'details': self.details,
+            'status': self.status
+        }
+
+class GoingOutLog(db.Model):
+    """Log of staff stepping out for work/personal reasons"""
+    __tablename__ = 'going_out_log'
+    __table_args__ = (
+        db.Index('ix_going_out_log_phone_timestamp', 'user_phone', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    timestamp = db.Column(db.DateTime, default=datetime.now, nullable=False, index=True)
+    user_name = db.Column(db.String(200), nullable=True)
+    user_phone = db.Column(db.String(50), nullable=True)
+    reason = db.Column(db.String(100), nullable=True)
+    details = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), default='out')  # out, returned
+    return_time = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        """Convert model instance to dictionary (keys match the legacy workbook columns)"""
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'user_name': self.user_name,
+            'user_phone': self.user_phone,
+            'reason': self.reason,
+            'details': self.details,
+            'status': self.status,
+            'return_time': self.return_time.isoformat() if self.return_time else None
+        }
@@ -3,6 +3,7 @@ Inventory-related database models
 """
 from datetime import datetime
 from . import db
+from .serialization import ModelSerializer
 
 class StoreInventory(db.Model):
     """Model for store inventory items"""
@@ -14,16 +15,11 @@ class StoreInventory(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'quantity': self.quantity,
-            'category': self.category,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
-        }
+        return StoreInventory._serializer.dump(self, fields)
     
     def is_sufficient_for(self, required_quantity):
         """Check if current stock is sufficient for required quantity"""
@@ -0,0 +1,50 @@
+"""
+Notification database models
+"""
+import json
+from datetime import datetime
+from . import db
+
+class Notification(db.Model):
+    """Department notification (driver assigned, delivery status change, ...)"""
+    __tablename__ = 'notification'
+    __table_args__ = (
+        # "Newest (unread) notifications of a department" lists and unread recounts
+        db.Index('ix_notification_department_read_timestamp', 'department', 'read', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    data = db.Column(db.Text, nullable=True)  # JSON object
+    department = db.Column(db.String(50), nullable=True)
+    priority = db.Column(db.String(20), default='normal')  # low, normal, high, urgent
+    read = db.Column(db.Boolean, nullable=False, default=False)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    read_at = db.Column(db.DateTime, nullable=True)
+
+    def get_data(self):
+        """Get the notification payload as a dict"""
+        try:
+            return json.loads(self.data) if self.data else {}
+        except (TypeError, ValueError):
+            return {}
+
+    def set_data(self, data):
+        """Store the notification payload"""
+        self.data = json.dumps(data or {})
+
+    def to_dict(self):
+        """Convert model instance to dictionary"""
+        return {
+            'id': self.id,
+            'type': self.type,
+            'title': self.title,
+            'message': self.message,
+            'data': self.get_data(),
+            'department': self.department,
+            'priority': self.priority,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'read': bool(self.read)
+        }
@@ -3,9 +3,14 @@ Production-related database models
 """
 from datetime import datetime
 from . import db
+from .serialization import ModelSerializer, ist_timestamp
 
 class ProductionOrder(db.Model):
     """Model for production orders"""
+    __table_args__ = (
+        db.Index('ix_production_order_status_created_at', 'status', 'created_at'),
+        db.Index('ix_production_order_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     product_name = db.Column(db.String(200), nullable=False)
@@ -15,32 +20,18 @@ class ProductionOrder(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     created_by = db.Column(db.String(100))
     
-    def to_dict(self):
-        """Convert model instance to dictionary with fixed IST timestamp"""
-        try:
-            from zoneinfo import ZoneInfo
-            ist = ZoneInfo("Asia/Kolkata")
-            created_utc = self.created_at
-            if created_utc.tzinfo is None:
-                from datetime import timezone
-                created_utc = created_utc.replace(tzinfo=timezone.utc)
-            created_ist = created_utc.astimezone(ist)
-            created_fixed = created_ist.strftime("%Y-%m-%d %H:%M:%S %Z")
-        except Exception:
-            created_fixed = self.created_at.isoformat()
+    _serializer = ModelSerializer(convert={'created_at': ist_timestamp})
 
-        return {
-            'id': self.id,
-            'productName': self.product_name,
-            'category': self.category,
-            'quantity': self.quantity,
-            'status': self.status,
-            'createdAt': created_fixed,
-            'createdBy': self.created_by
-        }
+    def to_dict(self, fields=None):
+        """Convert model instance to dictionary with fixed IST timestamp"""
+        return ProductionOrder._serializer.dump(self, fields)
 
 class AssemblyOrder(db.Model):
     """Model for assembly orders"""
+    __table_args__ = (
+        db.Index('ix_assembly_order_production_order_id', 'production_order_id'),
+        db.Index('ix_assembly_order_status_created_at', 'status', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     production_order_id = db.Column(db.Integer, db.ForeignKey('production_order.id'), nullable=False)
@@ -61,36 +52,14 @@ class AssemblyOrder(db.Model):
     # Test results relationship
     test_results = db.relationship('AssemblyTestResult', backref='assembly_order', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Convert model instance to dictionary with fixed IST created timestamp"""
-        # Format createdAt as a fixed Asia/Kolkata time string to match Purchase
-        try:
-            from zoneinfo import ZoneInfo
-            ist = ZoneInfo("Asia/Kolkata")
-            created_utc = self.created_at
-            if created_utc.tzinfo is None:
-                from datetime import timezone
-                created_utc = created_utc.replace(tzinfo=timezone.utc)
-            created_ist = created_utc.astimezone(ist)
-            created_fixed = created_ist.strftime("%Y-%m-%d %H:%M:%S %Z")
-        except Exception:
-            created_fixed = self.created_at.isoformat()
+    _serializer = ModelSerializer(convert={
+        'created_at': ist_timestamp,
+        'progress': lambda progress: progress if progress is not None else 0,
+    })
 
-        return {
-            'id': self.id,
-            'productionOrderId': self.production_order_id,
-            'productName': self.product_name,
-            'quantity': self.quantity,
-            'status': self.status,
-            'progress': self.progress if self.progress is not None else 0,
-            'createdAt': created_fixed,
-            'startedAt': self.started_at.isoformat() if self.started_at else None,
-            'completedAt': self.completed_at.isoformat() if self.completed_at else None,
-            'pausedAt': self.paused_at.isoformat() if self.paused_at else None,
-            'resumedAt': self.resumed_at.isoformat() if self.resumed_at else None,
-            'qualityCheck': self.quality_check,
-            'testingPassed': self.testing_passed
-        }
+    def to_dict(self, fields=None):
+        """Convert model instance to dictionary with fixed IST created timestamp"""
+        return AssemblyOrder._serializer.dump(self, fields)
 
 
 class AssemblyTestResult(db.Model):
@@ -104,14 +73,8 @@ class AssemblyTestResult(db.Model):
     tested_at = db.Column(db.DateTime, default=datetime.utcnow)
     notes = db.Column(db.Text, nullable=True)
 
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'assemblyOrderId': self.assembly_order_id,
-            'testType': self.test_type,
-            'testName': self.test_name,
-            'result': self.result,
-            'testedAt': self.tested_at.isoformat(),
-            'notes': self.notes
-        }
+        return AssemblyTestResult._serializer.dump(self, fields)
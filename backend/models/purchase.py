@@ -1,88 +1,147 @@
 """
 Purchase-related database models
 """
-import json
 from datetime import datetime
 from . import db
+from .serialization import ModelSerializer, ist_timestamp
+from .inventory import StoreInventory
 
 class PurchaseOrder(db.Model):
     """Model for purchase orders"""
+    __table_args__ = (
+        db.Index('ix_purchase_order_production_order_id', 'production_order_id'),
+        db.Index('ix_purchase_order_status_created_at', 'status', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     production_order_id = db.Column(db.Integer, db.ForeignKey('production_order.id'), nullable=False)
     product_name = db.Column(db.String(200), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(50), default='pending_request')
-    materials = db.Column(db.Text)  # JSON string of materials (purchased quantities)
-    original_requirements = db.Column(db.Text)  # JSON string of original required materials
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    def to_dict(self):
-        """Convert model instance to dictionary with fixed IST timestamp"""
-        # Convert UTC stored time to Asia/Kolkata (IST) and format once
-        try:
-            from zoneinfo import ZoneInfo  # Python 3.9+
-            ist = ZoneInfo("Asia/Kolkata")
-            # Ensure created_at is timezone-aware; treat as UTC if naive
-            created_utc = self.created_at
-            if created_utc.tzinfo is None:
-                from datetime import timezone
-                created_utc = created_utc.replace(tzinfo=timezone.utc)
-            created_ist = created_utc.astimezone(ist)
-            created_fixed = created_ist.strftime("%Y-%m-%d %H:%M:%S %Z")
-        except Exception:
-            # Fallback to original isoformat on any failure
-            created_fixed = self.created_at.isoformat()
 
-        # Handle missing original_requirements column gracefully
-        try:
-            original_reqs = json.loads(self.original_requirements) if self.original_requirements else []
-        except (AttributeError, json.JSONDecodeError, TypeError):
-            original_reqs = []
+    # Material lines, loaded for a whole result set in one extra query. Ordering
+    # by the foreign key first lets the batched load walk the line index.
+    lines = db.relationship('PurchaseOrderLine', backref='purchase_order', lazy='selectin',
+                            order_by='(PurchaseOrderLine.purchase_order_id, PurchaseOrderLine.id)',
+                            cascade='all, delete-orphan')
+    
+    _serializer = ModelSerializer(convert={'created_at': ist_timestamp}, extra={
+        'materials': lambda order, context: order.get_materials_list(),
+        'originalRequirements': lambda order, context: order.get_original_requirements(),
+    })
 
-        return {
-            'id': self.id,
-            'productionOrderId': self.production_order_id,
-            'productName': self.product_name,
-            'quantity': self.quantity,
-            'status': self.status,
-            'materials': json.loads(self.materials) if self.materials else [],
-            'originalRequirements': original_reqs,
-            'createdAt': created_fixed
-        }
+    def to_dict(self, fields=None):
+        """Convert model instance to dictionary with fixed IST timestamp"""
+        return PurchaseOrder._serializer.dump(self, fields)
     
     def get_materials_list(self):
-        """Get materials as a list of dictionaries"""
-        if not self.materials:
-            return []
-        try:
-            materials = json.loads(self.materials) if isinstance(self.materials, str) else self.materials
-            # Ensure each material has a unit_cost field (default to 0 if missing)
-            for material in materials:
-                if isinstance(material, dict) and 'unit_cost' not in material:
-                    material['unit_cost'] = 0
-            return materials
-        except (json.JSONDecodeError, TypeError):
-            return []
+        """Get the materials still to be allocated or purchased as a list of dictionaries"""
+        return [
+            {'name': line.material.name, 'quantity': line.purchased_quantity, 'unit_cost': line.unit_cost}
+            for line in self.lines if line.purchased_quantity
+        ]
     
     def get_original_requirements(self):
         """Get original requirements as a list of dictionaries"""
-        try:
-            if not hasattr(self, 'original_requirements') or not self.original_requirements:
-                return []
-            return json.loads(self.original_requirements) if isinstance(self.original_requirements, str) else self.original_requirements
-        except (AttributeError, json.JSONDecodeError, TypeError):
-            return []
+        return [
+            {'name': line.material.name, 'quantity': line.required_quantity}
+            for line in self.lines if line.required_quantity
+        ]
     
     def set_materials_list(self, materials_list):
-        """Set materials from a list of dictionaries"""
-        self.materials = json.dumps(materials_list) if materials_list else None
+        """Set purchased quantities and unit costs from a list of dictionaries
+
+        Materials missing from the list drop to zero purchased quantity.
+        """
+        items = self._merge_items(materials_list)
+        lines = self._lines_for(items)
+        for name, line in lines.items():
+            item = items.get(name)
+            line.purchased_quantity = item['quantity'] if item else 0
+            line.unit_cost = item['unit_cost'] if item else 0.0
+        self._prune_lines()
     
     def set_original_requirements(self, requirements_list):
-        """Set original requirements from a list of dictionaries"""
-        try:
-            if hasattr(self, 'original_requirements'):
-                self.original_requirements = json.dumps(requirements_list) if requirements_list else None
-        except AttributeError:
-            # Column doesn't exist yet, skip silently
-            pass
\ No newline at end of file
+        """Set required quantities from a list of dictionaries"""
+        items = self._merge_items(requirements_list)
+        lines = self._lines_for(items)
+        for name, line in lines.items():
+            item = items.get(name)
+            line.required_quantity = item['quantity'] if item else 0
+        self._prune_lines()
+
+    @staticmethod
+    def _merge_items(items_list):
+        """Sum a list of {name, quantity, unit_cost} dictionaries by material name"""
+        items = {}
+        for item in items_list or []:
+            if not isinstance(item, dict) or not item.get('name'):
+                continue
+            merged = items.setdefault(item['name'], {
+                'quantity': 0, 'unit_cost': 0.0, 'category': item.get('category') or 'Raw Material'
+            })
+            merged['quantity'] += int(float(item.get('quantity') or 0))
+            merged['unit_cost'] = float(item.get('unit_cost') or merged['unit_cost'])
+        return items
+
+    def _lines_for(self, items):
+        """Get this order's lines keyed by material name, adding lines for new materials
+
+        Materials are looked up by name in one query; names not yet in the
+        store get a zero-quantity inventory row so every line has a material.
+        """
+        lines = {line.material.name: line for line in self.lines}
+        missing = [name for name in items if name not in lines]
+        if missing:
+            materials = {}
+            for material in StoreInventory.query.filter(
+                StoreInventory.name.in_(missing)
+            ).order_by(StoreInventory.id).all():
+                materials.setdefault(material.name, material)
+            for name in missing:
+                material = materials.get(name)
+                if material is None:
+                    material = StoreInventory(name=name, quantity=0, category=items[name]['category'])
+                    db.session.add(material)
+                line = PurchaseOrderLine(material=material)
+                self.lines.append(line)
+                lines[name] = line
+        return lines
+
+    def _prune_lines(self):
+        """Drop lines that are neither required nor to be purchased"""
+        for line in list(self.lines):
+            if not line.required_quantity and not line.purchased_quantity:
+                self.lines.remove(line)
+
+
+class PurchaseOrderLine(db.Model):
+    """Material line of a purchase order
+
+    required_quantity is what production originally asked for;
+    purchased_quantity is what is still to be allocated from store or bought,
+    which drops to the shortage after a partial allocation.
+    """
+    __tablename__ = 'purchase_order_line'
+    __table_args__ = (
+        db.UniqueConstraint('purchase_order_id', 'material_id', name='uq_purchase_order_line_material'),
+        db.Index('ix_purchase_order_line_material_id', 'material_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    purchase_order_id = db.Column(db.Integer, db.ForeignKey('purchase_order.id'), nullable=False)
+    material_id = db.Column(db.Integer, db.ForeignKey('store_inventory.id'), nullable=False)
+    required_quantity = db.Column(db.Integer, nullable=False, default=0)
+    purchased_quantity = db.Column(db.Integer, nullable=False, default=0)
+    unit_cost = db.Column(db.Float, nullable=False, default=0.0)
+
+    material = db.relationship('StoreInventory', lazy='joined')
+
+    _serializer = ModelSerializer(extra={
+        'name': lambda line, context: line.material.name if line.material else None,
+    })
+
+    def to_dict(self, fields=None):
+        """Convert model instance to dictionary"""
+        return PurchaseOrderLine._serializer.dump(self, fields)
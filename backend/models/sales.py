@@ -3,9 +3,16 @@ Sales-related database models
 """
 from datetime import datetime
 from . import db
+from .serialization import ModelSerializer, nested
 
 class SalesOrder(db.Model):
     """Model for sales orders"""
+    __table_args__ = (
+        db.Index('ix_sales_order_showroom_product_id', 'showroom_product_id'),
+        db.Index('ix_sales_order_order_status_created_at', 'order_status', 'created_at'),
+        db.Index('ix_sales_order_sales_person_created_at', 'sales_person', 'created_at'),
+        db.Index('ix_sales_order_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(50), unique=True, nullable=False)
@@ -37,52 +44,42 @@ class SalesOrder(db.Model):
     # Relationship
     showroom_product = db.relationship('ShowroomProduct', backref='sales_orders')
     
-    def to_dict(self):
-        """Convert model instance to dictionary"""
-        # Compute payment aggregates by querying database directly to ensure accuracy
-        total_paid = 0.0
-        try:
-            # Query database directly for current payment transactions
-            from . import db
-            payment_sum = db.session.query(db.func.coalesce(db.func.sum(SalesTransaction.amount), 0)).filter_by(
-                sales_order_id=self.id,
-                transaction_type='payment'
-            ).scalar()
-            total_paid = float(payment_sum or 0)
-        except Exception:
-            total_paid = 0.0
-        balance_amount = float(self.final_amount or 0) - float(total_paid or 0)
+    _serializer = ModelSerializer(rename={'Delivery_type': 'deliveryType'}, extra={
+        'amountPaid': lambda order, context: order._amount_paid(context),
+        'balanceAmount': lambda order, context: max(float(order.final_amount or 0) - order._amount_paid(context), 0.0),
+        'showroomProduct': nested('showroom_product'),
+    })
+
+    @staticmethod
+    def amounts_paid(order_ids):
+        """Sum of payment transactions per sales order id, one query per CHUNK_SIZE ids"""
+        # utils imports the models, so import on use
+        from utils.changes import chunks
+        paid = {order_id: 0.0 for order_id in order_ids}
+        for chunk in chunks(paid):
+            rows = db.session.query(
+                SalesTransaction.sales_order_id, db.func.coalesce(db.func.sum(SalesTransaction.amount), 0)
+            ).filter(
+                SalesTransaction.sales_order_id.in_(chunk),
+                SalesTransaction.transaction_type == 'payment'
+            ).group_by(SalesTransaction.sales_order_id).all()
+            paid.update((order_id, float(total or 0)) for order_id, total in rows)
+        return paid
 
-        return {
-            'id': self.id,
-            'orderNumber': self.order_number,
-            'customerName': self.customer_name,
-            'customerContact': self.customer_contact,
-            'customerEmail': self.customer_email,
-            'customerAddress': self.customer_address,
-            'showroomProductId': self.showroom_product_id,
-            'quantity': self.quantity,
-            'unitPrice': self.unit_price,
-            'totalAmount': self.total_amount,
-            'discountAmount': self.discount_amount,
-            'transportCost': self.transport_cost,
-            'finalAmount': self.final_amount,
-            'amountPaid': total_paid,
-            'balanceAmount': max(balance_amount, 0.0),
-            'paymentMethod': self.payment_method,
-            'paymentStatus': self.payment_status,
-            'orderStatus': self.order_status,
-            'salesPerson': self.sales_person,
-            'deliveryType': self.Delivery_type,
-            'notes': self.notes,
-            'couponCode': self.coupon_code,
-            'financeBypass': self.finance_bypass,
-            'bypassReason': self.bypass_reason,
-            'bypassedAt': self.bypassed_at.isoformat() if self.bypassed_at else None,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat(),
-            'showroomProduct': self.showroom_product.to_dict() if self.showroom_product else None
-        }
+    def _amount_paid(self, context):
+        # List endpoints fill context['amount_paid'] for the whole page; a single
+        # order queries the database directly to ensure accuracy
+        paid = context.setdefault('amount_paid', {})
+        if self.id not in paid:
+            try:
+                paid.update(SalesOrder.amounts_paid([self.id]))
+            except Exception:
+                paid[self.id] = 0.0
+        return paid[self.id]
+
+    def to_dict(self, fields=None, context=None):
+        """Convert model instance to dictionary"""
+        return SalesOrder._serializer.dump(self, fields, context)
 
 class Customer(db.Model):
     """Model for customer information"""
@@ -99,24 +96,18 @@ class Customer(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'contact': self.contact,
-            'email': self.email,
-            'address': self.address,
-            'customerType': self.customer_type,
-            'creditLimit': self.credit_limit,
-            'currentBalance': self.current_balance,
-            'isActive': self.is_active,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
-        }
+        return Customer._serializer.dump(self, fields)
 
 class TransportApprovalRequest(db.Model):
     """Model for transport approval requests for orders with part load and company delivery"""
+    __table_args__ = (
+        db.Index('ix_transport_approval_request_sales_order_id', 'sales_order_id'),
+        db.Index('ix_transport_approval_request_status_created_at', 'status', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sales_order_id = db.Column(db.Integer, db.ForeignKey('sales_order.id'), nullable=False)
@@ -133,26 +124,18 @@ class TransportApprovalRequest(db.Model):
     # Relationship
     sales_order = db.relationship('SalesOrder', backref='transport_approval_requests')
     
-    def to_dict(self):
+    _serializer = ModelSerializer(extra={'salesOrder': nested('sales_order')})
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'salesOrderId': self.sales_order_id,
-            'deliveryType': self.delivery_type,
-            'originalTransportCost': self.original_transport_cost,
-            'requestedTransportCost': self.requested_transport_cost,
-            'status': self.status,
-            'transportNotes': self.transport_notes,
-            'demandAmount': self.demand_amount,
-            'approvedBy': self.approved_by,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat(),
-            'salesOrder': self.sales_order.to_dict() if self.sales_order else None
-        }
+        return TransportApprovalRequest._serializer.dump(self, fields)
 
 
 class SalesTransaction(db.Model):
     """Model for sales transactions/payments"""
+    __table_args__ = (
+        db.Index('ix_sales_transaction_sales_order_id', 'sales_order_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sales_order_id = db.Column(db.Integer, db.ForeignKey('sales_order.id'), nullable=False)
@@ -166,15 +149,8 @@ class SalesTransaction(db.Model):
     # Relationship
     sales_order = db.relationship('SalesOrder', backref='transactions')
     
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'salesOrderId': self.sales_order_id,
-            'transactionType': self.transaction_type,
-            'amount': self.amount,
-            'paymentMethod': self.payment_method,
-            'referenceNumber': self.reference_number,
-            'notes': self.notes,
-            'createdAt': self.created_at.isoformat()
-        }
+        return SalesTransaction._serializer.dump(self, fields)
@@ -0,0 +1,33 @@
+"""
+Order search database models
+"""
+from datetime import datetime
+from . import db
+from .serialization import ModelSerializer
+
+class OrderSearchDocument(db.Model):
+    """Denormalized, lower-cased search text of one production or sales order
+
+    Kept current by utils.search.OrderSearch on every commit that touches an
+    order or the rows its text is built from (product, dispatch, transport
+    job, gate pass), so a search reads this table only.
+    """
+    __tablename__ = 'order_search_document'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'ref_id', name='uq_order_search_document_ref'),
+        db.Index('ix_order_search_document_created_at', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # production, sales
+    ref_id = db.Column(db.Integer, nullable=False)
+    production_order_id = db.Column(db.Integer, nullable=True)
+    order_number = db.Column(db.String(50), nullable=False)  # lower-cased, for exact-match ranking
+    search_text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
+        """Convert model instance to dictionary"""
+        return OrderSearchDocument._serializer.dump(self, fields)
@@ -0,0 +1,202 @@
+"""
+Compiled model serializers
+
+A ModelSerializer reads a model's mapped columns once, on first use, and turns
+them into the camelCase keys, attribute getter and value converters that
+to_dict used to spell out by hand. Dumping a row is then one attrgetter call,
+a dict(zip(...)) and a pass over the few date/enum columns.
+
+A dump can be limited to a set of output keys (the ``?fields=`` parameter of
+list endpoints); each distinct set is compiled once and cached. ``id`` is
+always included so projected rows stay addressable.
+"""
+import enum
+from datetime import timezone
+from operator import attrgetter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import types as sa_types
+
+# fn(instance, context) -> value
+ExtraField = Callable[[Any, Dict[str, Any]], Any]
+
+
+def camelize(name: str) -> str:
+    """Convert a snake_case column name to the camelCase key used in API payloads"""
+    head, *rest = name.split('_')
+    return head + ''.join(part[:1].upper() + part[1:] for part in rest)
+
+def parse_fields(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a ``fields`` query parameter ("id,orderNumber,finalAmount")
+
+    Returns:
+        frozenset or None: Requested keys, or None when every field is wanted
+
+    Raises:
+        ValueError: If the parameter is present but names no field
+    """
+    if value is None:
+        return None
+    fields = frozenset(part.strip() for part in value.split(',') if part.strip())
+    if not fields:
+        raise ValueError('fields must be a comma separated list of field names')
+    return fields
+
+def project(row: Dict[str, Any], fields: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+    """Limit an already serialized row to the requested keys (plus id)"""
+    if fields is None:
+        return row
+    return {key: value for key, value in row.items() if key in fields or key == 'id'}
+
+def wants(fields: Optional[FrozenSet[str]], *keys: str) -> bool:
+    """Whether a projection includes any of ``keys`` (no projection includes everything)"""
+    return fields is None or any(key in fields for key in keys)
+
+def ist_timestamp(value):
+    """Format a UTC timestamp as a fixed Asia/Kolkata string ("2025-01-31 17:30:00 IST")"""
+    if value is None:
+        return None
+    try:
+        from zoneinfo import ZoneInfo
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(ZoneInfo("Asia/Kolkata")).strftime("%Y-%m-%d %H:%M:%S %Z")
+    except Exception:
+        return value.isoformat()
+
+def nested(relationship: str) -> ExtraField:
+    """
+    Extra field serializing a related instance in full (None when unset)
+
+    A related model with its own ModelSerializer is dumped with the parent's
+    context, so values a list endpoint batched for the page reach nested rows too.
+    """
+    def dump_related(obj, context):
+        related = getattr(obj, relationship)
+        if related is None:
+            return None
+        serializer = getattr(type(related), '_serializer', None)
+        if serializer is None:
+            return related.to_dict()
+        return serializer.dump(related, None, context)
+    return dump_related
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+def _enum_value(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+def _converter(column_type) -> Optional[Callable[[Any], Any]]:
+    if isinstance(column_type, (sa_types.DateTime, sa_types.Date, sa_types.Time)):
+        return _isoformat
+    if isinstance(column_type, sa_types.Enum) and column_type.enum_class is not None:
+        return _enum_value
+    return None
+
+
+class _Plan:
+    """Compiled dump of one model for one projection"""
+    __slots__ = ('keys', 'getter', 'single', 'converted', 'extras')
+
+    def __init__(self, columns, extras):
+        self.keys = tuple(key for key, _, _ in columns)
+        attributes = [attribute for _, attribute, _ in columns]
+        self.getter = attrgetter(*attributes) if attributes else None
+        self.single = len(attributes) == 1
+        self.converted = tuple((key, convert) for key, _, convert in columns if convert is not None)
+        self.extras = tuple(extras)
+
+    def dump(self, obj, context):
+        if self.getter is None:
+            data = {}
+        elif self.single:
+            data = {self.keys[0]: self.getter(obj)}
+        else:
+            data = dict(zip(self.keys, self.getter(obj)))
+        for key, convert in self.converted:
+            data[key] = convert(data[key])
+        for key, extra in self.extras:
+            data[key] = extra(obj, context)
+        return data
+
+
+class ModelSerializer:
+    """
+    Column to key mapping for a model, declared as a class attribute:
+
+        class SalesOrder(db.Model):
+            _serializer = ModelSerializer(rename={'Delivery_type': 'deliveryType'},
+                                          extra={'amountPaid': _amount_paid})
+
+            def to_dict(self, fields=None):
+                return SalesOrder._serializer.dump(self, fields)
+
+    Args:
+        rename: Column attribute -> output key, where camelize() is not right
+        exclude: Column attributes never serialized (e.g. password hashes)
+        convert: Column attribute -> fn(value) replacing the default conversion
+            (dates to ISO strings, enums to their values); called for None too
+        extra: Output key -> fn(instance, context) for computed or nested values,
+            added after the columns in declaration order
+    """
+
+    def __init__(self, rename: Optional[Dict[str, str]] = None, exclude: Iterable[str] = (),
+                 convert: Optional[Dict[str, Callable[[Any], Any]]] = None,
+                 extra: Optional[Dict[str, ExtraField]] = None):
+        self.rename = dict(rename or {})
+        self.exclude = frozenset(exclude)
+        self.convert = dict(convert or {})
+        self.extra = dict(extra or {})
+        self.model = None
+        self._columns = None
+        self._plans: Dict[Optional[FrozenSet[str]], _Plan] = {}
+
+    def __set_name__(self, owner, name):
+        self.model = owner
+
+    @property
+    def columns(self):
+        """(key, attribute, converter) for every serialized column, in mapper order"""
+        if self._columns is None:
+            columns = []
+            for prop in sa_inspect(self.model).column_attrs:
+                if prop.key in self.exclude:
+                    continue
+                key = self.rename.get(prop.key) or camelize(prop.key)
+                convert = self.convert.get(prop.key) or _converter(prop.columns[0].type)
+                columns.append((key, prop.key, convert))
+            self._columns = columns
+        return self._columns
+
+    @property
+    def keys(self) -> List[str]:
+        """Every output key, columns first"""
+        return [key for key, _, _ in self.columns] + list(self.extra)
+
+    def plan(self, fields: Optional[FrozenSet[str]] = None) -> _Plan:
+        """Compiled dump for a projection (None for every field); unknown keys are ignored"""
+        if fields is not None and not isinstance(fields, frozenset):
+            fields = frozenset(fields)
+        plan = self._plans.get(fields)
+        if plan is None:
+            if fields is None:
+                columns, extras = self.columns, self.extra.items()
+            else:
+                columns = [column for column in self.columns if column[0] in fields or column[0] == 'id']
+                extras = [(key, extra) for key, extra in self.extra.items() if key in fields]
+            plan = self._plans[fields] = _Plan(columns, extras)
+        return plan
+
+    def dump(self, obj, fields: Optional[FrozenSet[str]] = None,
+             context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Serialize one instance"""
+        return self.plan(fields).dump(obj, context if context is not None else {})
+
+    def dump_many(self, objs: Iterable[Any], fields: Optional[FrozenSet[str]] = None,
+                  context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Serialize instances sharing one compiled plan and context"""
+        plan = self.plan(fields)
+        context = context if context is not None else {}
+        return [plan.dump(obj, context) for obj in objs]
@@ -3,9 +3,14 @@ Showroom-related database models
 """
 from datetime import datetime
 from . import db
+from .serialization import ModelSerializer
 
 class ShowroomProduct(db.Model):
     """Model for showroom products"""
+    __table_args__ = (
+        db.Index('ix_showroom_product_production_order_id', 'production_order_id'),
+        db.Index('ix_showroom_product_showroom_status_created_at', 'showroom_status', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -17,24 +22,48 @@ class ShowroomProduct(db.Model):
     sold_date = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'category': self.category,
-            'costPrice': self.cost_price,
-            'salePrice': self.sale_price,
-            'showroomStatus': self.showroom_status,
-            'productionOrderId': self.production_order_id,
-            'soldDate': self.sold_date.isoformat() if self.sold_date else None,
-            'createdAt': self.created_at.isoformat()
-        }
+        return ShowroomProduct._serializer.dump(self, fields)
     
     # Removed mark_as_sold method - selling is handled by Sales department
 
+class ShowroomStock(db.Model):
+    """Stock ledger for a showroom product
+
+    original = reserved + sold + available at all times. Sales orders
+    reserve units when created; delivery moves them to sold, cancellation
+    releases them and a return puts sold units back on sale. Rows are
+    updated by ShowroomStockService under a row lock.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    showroom_product_id = db.Column(db.Integer, db.ForeignKey('showroom_product.id'), unique=True, nullable=False)
+    original_quantity = db.Column(db.Integer, nullable=False, default=1)
+    reserved_quantity = db.Column(db.Integer, nullable=False, default=0)
+    sold_quantity = db.Column(db.Integer, nullable=False, default=0)
+    available_quantity = db.Column(db.Integer, nullable=False, default=1, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    showroom_product = db.relationship('ShowroomProduct', backref=db.backref('stock', uselist=False))
+
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
+        """Convert model instance to dictionary"""
+        return ShowroomStock._serializer.dump(self, fields)
+
 class DispatchRequest(db.Model):
     """Model for dispatch requests"""
+    __table_args__ = (
+        db.Index('ix_dispatch_request_sales_order_id', 'sales_order_id'),
+        db.Index('ix_dispatch_request_showroom_product_id', 'showroom_product_id'),
+        db.Index('ix_dispatch_request_status_created_at', 'status', 'created_at'),
+        db.Index('ix_dispatch_request_status_updated_at', 'status', 'updated_at'),
+        db.Index('ix_dispatch_request_created_at', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     sales_order_id = db.Column(db.Integer, db.ForeignKey('sales_order.id'), nullable=False)
@@ -51,27 +80,36 @@ class DispatchRequest(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
+    # Relationships - lazy by default; use utils.loaders for batched eager loading
+    sales_order = db.relationship('SalesOrder', backref=db.backref('dispatch_requests', lazy=True))
+    showroom_product = db.relationship('ShowroomProduct', backref=db.backref('dispatch_requests', lazy=True))
+    gate_passes = db.relationship('GatePass', backref='dispatch_request', lazy=True, order_by='GatePass.id')
+    transport_jobs = db.relationship('TransportJob', backref='dispatch_request', lazy=True, order_by='TransportJob.id')
+
+    @property
+    def gate_pass(self):
+        """First gate pass issued for this request, if any"""
+        return self.gate_passes[0] if self.gate_passes else None
+
+    @property
+    def transport_job(self):
+        """First transport job created for this request, if any"""
+        return self.transport_jobs[0] if self.transport_jobs else None
+
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'salesOrderId': self.sales_order_id,
-            'showroomProductId': self.showroom_product_id,
-            'partyName': self.party_name,
-            'partyContact': self.party_contact,
-            'partyAddress': self.party_address,
-            'partyEmail': self.party_email,
-            'quantity': self.quantity,
-            'deliveryType': self.delivery_type,
-            'originalDeliveryType': self.original_delivery_type,
-            'status': self.status,
-            'dispatchNotes': self.dispatch_notes,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
-        }
+        return DispatchRequest._serializer.dump(self, fields)
 
 class TransportJob(db.Model):
     """Model for transport jobs"""
+    __table_args__ = (
+        db.Index('ix_transport_job_dispatch_request_id', 'dispatch_request_id'),
+        db.Index('ix_transport_job_status_created_at', 'status', 'created_at'),
+        db.Index('ix_transport_job_status_updated_at', 'status', 'updated_at'),
+        db.Index('ix_transport_job_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     dispatch_request_id = db.Column(db.Integer, db.ForeignKey('dispatch_request.id'), nullable=False)
@@ -81,20 +119,20 @@ class TransportJob(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'dispatchRequestId': self.dispatch_request_id,
-            'transporterName': self.transporter_name,
-            'vehicleNo': self.vehicle_no,
-            'status': self.status,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
-        }
+        return TransportJob._serializer.dump(self, fields)
 
 class GatePass(db.Model):
     """Model for gate passes"""
+    __table_args__ = (
+        db.Index('ix_gate_pass_dispatch_request_id', 'dispatch_request_id'),
+        db.Index('ix_gate_pass_status_issued_at', 'status', 'issued_at'),
+        db.Index('ix_gate_pass_status_verified_at', 'status', 'verified_at'),
+        db.Index('ix_gate_pass_issued_at', 'issued_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     dispatch_request_id = db.Column(db.Integer, db.ForeignKey('dispatch_request.id'), nullable=False)
@@ -106,19 +144,11 @@ class GatePass(db.Model):
     issued_at = db.Column(db.DateTime, default=datetime.utcnow)
     verified_at = db.Column(db.DateTime, nullable=True)
 
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'dispatchRequestId': self.dispatch_request_id,
-            'partyName': self.party_name,
-            'vehicleNo': self.vehicle_no,
-            'driverName': self.driver_name,
-            'driverContact': self.driver_contact,
-            'status': self.status,
-            'issuedAt': self.issued_at.isoformat(),
-            'verifiedAt': self.verified_at.isoformat() if self.verified_at else None
-        }
+        return GatePass._serializer.dump(self, fields)
 
 class Vehicle(db.Model):
     """Model for fleet vehicles"""
@@ -136,19 +166,8 @@ class Vehicle(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
         """Convert model instance to dictionary"""
-        return {
-            'id': self.id,
-            'vehicleNumber': self.vehicle_number,
-            'vehicleType': self.vehicle_type,
-            'driverName': self.driver_name,
-            'driverContact': self.driver_contact,
-            'driverLicense': self.driver_license,
-            'capacity': self.capacity,
-            'status': self.status,
-            'currentLocation': self.current_location,
-            'notes': self.notes,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
-        }
+        return Vehicle._serializer.dump(self, fields)
@@ -0,0 +1,39 @@
+"""
+Stage estimate database models
+"""
+from datetime import datetime
+from . import db
+
+# Category of the rows computed over all categories; used when a category has too few samples
+ALL_CATEGORIES = '*'
+
+class StageEstimate(db.Model):
+    """Learned duration of one order chain stage for a product category
+
+    Recomputed from status_event by utils.estimates.StageEstimator.refresh,
+    a batch job; order ETAs are then looked up per (category, stage) instead
+    of being derived from the progress percentage.
+    """
+    __tablename__ = 'stage_estimate'
+    __table_args__ = (
+        db.UniqueConstraint('category', 'stage', name='uq_stage_estimate_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    category = db.Column(db.String(50), nullable=False)
+    stage = db.Column(db.String(50), nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=0)
+    median_seconds = db.Column(db.Float, nullable=False)
+    p90_seconds = db.Column(db.Float, nullable=False)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert model instance to dictionary"""
+        return {
+            'category': self.category,
+            'stage': self.stage,
+            'sampleCount': self.sample_count,
+            'medianHours': round(self.median_seconds / 3600, 2),
+            'p90Hours': round(self.p90_seconds / 3600, 2),
+            'refreshedAt': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
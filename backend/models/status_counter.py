@@ -0,0 +1,40 @@
+"""
+Status counter database models
+"""
+from datetime import datetime
+from . import db
+
+# Status value of the row holding an entity's overall count; its presence
+# marks the entity's counters as initialized
+TOTAL_STATUS = '*'
+
+class StatusCounter(db.Model):
+    """Running row count (and amount) per status and optional dimension of a tracked table
+
+    Kept in step with status transitions by utils.rollup.StatusCounters when
+    STATUS_COUNTERS is enabled, so summary totals are read without scanning
+    the table.
+    """
+    __tablename__ = 'status_counter'
+    __table_args__ = (
+        db.UniqueConstraint('entity', 'status', 'dimension', name='uq_status_counter_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    dimension = db.Column(db.String(50), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    amount = db.Column(db.Float, nullable=False, default=0)  # running total of the tracked amount column, if any
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert model instance to dictionary"""
+        return {
+            'entity': self.entity,
+            'status': self.status,
+            'dimension': self.dimension,
+            'count': self.count,
+            'amount': self.amount,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
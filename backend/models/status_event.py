@@ -0,0 +1,36 @@
+"""
+Status event database models
+"""
+from datetime import datetime
+from . import db
+from .serialization import ModelSerializer
+
+class StatusEvent(db.Model):
+    """One status transition of an order-chain record (append-only)
+
+    Written by utils.status_log.StatusLog in the transaction that changes the
+    status. Besides the record itself, each event carries the production and
+    sales order it belongs to, so an order's whole history is one index range.
+    """
+    __tablename__ = 'status_event'
+    __table_args__ = (
+        db.Index('ix_status_event_entity_entity_id_occurred_at', 'entity', 'entity_id', 'occurred_at'),
+        db.Index('ix_status_event_production_order_id_occurred_at', 'production_order_id', 'occurred_at'),
+        db.Index('ix_status_event_sales_order_id_occurred_at', 'sales_order_id', 'occurred_at'),
+        db.Index('ix_status_event_entity_occurred_at', 'entity', 'occurred_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(50), nullable=False)  # table name, or e.g. sales_payment for a second status column
+    entity_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(50), nullable=True)
+    previous_status = db.Column(db.String(50), nullable=True)
+    production_order_id = db.Column(db.Integer, nullable=True)
+    sales_order_id = db.Column(db.Integer, nullable=True)
+    occurred_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    _serializer = ModelSerializer()
+
+    def to_dict(self, fields=None):
+        """Convert model instance to dictionary"""
+        return StatusEvent._serializer.dump(self, fields)
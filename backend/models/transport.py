@@ -1,9 +1,13 @@
 from datetime import datetime
 from . import db
+from .serialization import ModelSerializer
 
 
 class PartLoadDetail(db.Model):
     __tablename__ = 'part_load_detail'
+    __table_args__ = (
+        db.Index('ix_part_load_detail_sales_order_id', 'sales_order_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     sales_order_id = db.Column(db.Integer, db.ForeignKey('sales_order.id'), nullable=False)
@@ -20,18 +24,7 @@ class PartLoadDetail(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'salesOrderId': self.sales_order_id,
-            'lrNo': self.lr_no,
-            'loadingDate': self.loading_date.isoformat() if self.loading_date else None,
-            'unloadingDate': self.unloading_date.isoformat() if self.unloading_date else None,
-            'expectedDeliveryDate': self.expected_delivery_date.isoformat() if self.expected_delivery_date else None,
-            'paymentType': self.payment_type,
-            'transporterName': self.transporter_name,
-            'customerName': self.customer_name,
-            'productName': self.product_name,
-            'notes': self.notes,
-            'actualDeliveryDate': self.actual_delivery_date.isoformat() if self.actual_delivery_date else None,
-        }
+    _serializer = ModelSerializer(exclude=('created_at', 'updated_at'))
+
+    def to_dict(self, fields=None):
+        return PartLoadDetail._serializer.dump(self, fields)
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Script to recreate database with all current model columns including original_requirements
+Script to recreate database with all current model tables including purchase_order_line
 """
 import os
 import shutil
@@ -32,22 +32,22 @@ def backup_and_recreate_database():
         print("🔄 Creating new database with all current model columns...")
         initialize_database(app)
         
-        # Verify the purchase_order table has original_requirements column
+        # Verify the purchase order line table was created
         with app.app_context():
             from models import db
             import sqlite3
             
             conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
-            cursor.execute("PRAGMA table_info(purchase_order)")
+            cursor.execute("PRAGMA table_info(purchase_order_line)")
             columns = [row[1] for row in cursor.fetchall()]
             conn.close()
             
-            if 'original_requirements' in columns:
-                print("✅ SUCCESS: original_requirements column created in purchase_order table!")
+            if 'required_quantity' in columns:
+                print("✅ SUCCESS: purchase_order_line table created!")
                 print(f"📋 All columns: {columns}")
             else:
-                print("❌ ERROR: original_requirements column still missing!")
+                print("❌ ERROR: purchase_order_line table still missing!")
                 
         return True
         
@@ -67,7 +67,7 @@ if __name__ == "__main__":
     
     if success:
         print("\n✅ Database recreation completed successfully!")
-        print("The original_requirements column is now available in the purchase_order table.")
+        print("Purchase order materials are now stored in the purchase_order_line table.")
         print("Your ERP system should now work without HTTP 500 errors.")
     else:
         print("\n❌ Database recreation failed. Check the error messages above.")
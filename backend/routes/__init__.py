@@ -19,6 +19,9 @@ from .transport import transport_bp
 from .auth import auth_bp
 from .gate_entry import gate_entry_bp
 from .approval import approval_bp
+from .export import export_bp
+from .events import events_bp
+from .notifications import notifications_bp
 
 # List of all blueprints
 blueprints = [
@@ -37,6 +40,9 @@ blueprints = [
     auth_bp,
     gate_entry_bp,
     approval_bp,
+    export_bp,
+    events_bp,
+    notifications_bp,
 ]
 
 def register_blueprints(app):
@@ -68,5 +74,8 @@ __all__ = [
     'auth_bp',
     'gate_entry_bp',
     'approval_bp',
+    'export_bp',
+    'events_bp',
+    'notifications_bp',
     'unified_tracking_bp'
 ]
@@ -4,6 +4,8 @@ API endpoints for approval management
 """
 from flask import Blueprint, request, jsonify
 from services.approval_service import ApprovalService
+from utils.pagination import get_page_params
+from models.serialization import parse_fields
 
 approval_bp = Blueprint('approval', __name__)
 
@@ -20,8 +22,16 @@ def get_pending_approvals():
 def get_all_approvals():
     """Get all approval requests"""
     try:
-        approvals = ApprovalService.get_all_approvals()
+        page = get_page_params(request.args)
+        approvals = ApprovalService.get_all_approvals(
+            status=request.args.get('status'),
+            request_type=request.args.get('request_type'),
+            page=page,
+            fields=parse_fields(request.args.get('fields'))
+        )
         return jsonify(approvals), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
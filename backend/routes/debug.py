@@ -0,0 +1,17 @@
+"""
+Debug API routes (only registered when the SQL profiler is enabled)
+"""
+from flask import Blueprint, current_app, jsonify
+
+debug_bp = Blueprint('debug', __name__)
+
+@debug_bp.route('/debug/profile', methods=['GET'])
+def get_query_profile():
+    """Get per-endpoint query counts, DB time and repeated statements"""
+    return jsonify(current_app.extensions['sql_profiler'].summary()), 200
+
+@debug_bp.route('/debug/profile', methods=['DELETE'])
+def reset_query_profile():
+    """Reset collected profiling statistics"""
+    current_app.extensions['sql_profiler'].reset()
+    return jsonify({'message': 'Profile statistics reset'}), 200
@@ -4,6 +4,7 @@ API endpoints for dispatch operations
 """
 from flask import Blueprint, request, jsonify
 from services.dispatch_service import DispatchService
+from utils.pagination import get_page_params
 
 dispatch_bp = Blueprint('dispatch', __name__)
 
@@ -22,8 +23,15 @@ def get_pending_dispatch_orders():
 def get_all_dispatch_orders():
     """Get all dispatch orders"""
     try:
-        orders = DispatchService.get_all_dispatch_orders()
+        page = get_page_params(request.args)
+        orders = DispatchService.get_all_dispatch_orders(
+            status=request.args.get('status'),
+            delivery_type=request.args.get('delivery_type'),
+            page=page
+        )
         return jsonify(orders), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
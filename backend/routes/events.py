@@ -0,0 +1,63 @@
+"""
+Status event API routes
+Server-sent events stream of committed status changes, filtered by department topic
+"""
+from flask import Blueprint, Response, current_app, jsonify, request
+from utils.events import (
+    DEFAULT_KEEPALIVE_SECONDS, DEFAULT_STREAM_SECONDS,
+    parse_last_event_id, parse_topics, status_events, stream_events
+)
+
+events_bp = Blueprint('events', __name__)
+
+
+def get_broker():
+    """Get the application's event broker, or None when status events are disabled"""
+    return status_events.broker()
+
+
+@events_bp.route('/events/stream', methods=['GET'])
+def stream_status_events():
+    """Stream status events (?topics=dispatch,transport); resumes from Last-Event-ID"""
+    broker = get_broker()
+    if broker is None:
+        return jsonify({'error': 'Status events are disabled'}), 404
+    try:
+        topics = parse_topics(request.args.get('topics'))
+        # Browsers send the header on reconnect; the query parameter covers the first connect
+        last_id = parse_last_event_id(request.headers.get('Last-Event-ID') or request.args.get('lastEventId'))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+
+    if last_id is None:
+        last_id = broker.last_id()
+    generator = stream_events(
+        broker, last_id, topics,
+        keepalive=current_app.config.get('STATUS_EVENTS_KEEPALIVE_SECONDS', DEFAULT_KEEPALIVE_SECONDS),
+        lifetime=current_app.config.get('STATUS_EVENTS_STREAM_SECONDS', DEFAULT_STREAM_SECONDS)
+    )
+    return Response(generator, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@events_bp.route('/events', methods=['GET'])
+def get_status_events():
+    """Get status events after an id without streaming (?after=<id>&topics=...)"""
+    broker = get_broker()
+    if broker is None:
+        return jsonify({'error': 'Status events are disabled'}), 404
+    try:
+        topics = parse_topics(request.args.get('topics'))
+        last_id = parse_last_event_id(request.args.get('after'))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+
+    # Read the head first: nothing on these topics can then fall between it and the result
+    head = broker.last_id()
+    events = broker.since(head if last_id is None else last_id, topics)
+    return jsonify({
+        'events': events,
+        'lastEventId': max([head] + [item['id'] for item in events])
+    }), 200
@@ -0,0 +1,40 @@
+"""
+Export API routes
+Streaming CSV/Excel downloads for logs and operational reports
+"""
+from datetime import datetime
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from services.export_service import ExportService
+from utils.export import MIMETYPES, parse_export_args, stream_export
+
+export_bp = Blueprint('export', __name__)
+
+
+def build_export_response(dataset):
+    """Build a streamed download response for an export dataset"""
+    start, end, export_format = parse_export_args(request.args)
+    title, headers, rows = ExportService.get_export(dataset, start, end)
+
+    filename = f"{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(stream_export(headers, rows, export_format, title)),
+        mimetype=MIMETYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@export_bp.route('/exports', methods=['GET'])
+def list_exports():
+    """List exportable datasets"""
+    return jsonify({'datasets': ExportService.get_dataset_names(), 'formats': list(MIMETYPES.keys())}), 200
+
+
+@export_bp.route('/exports/<dataset>', methods=['GET'])
+def export_dataset(dataset):
+    """Stream a dataset as CSV or Excel (?from=YYYY-MM-DD&to=YYYY-MM-DD&format=csv|xlsx)"""
+    try:
+        return build_export_response(dataset)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from services.gate_entry_service import gate_entry_service
+from routes.export import build_export_response
 
 gate_entry_bp = Blueprint('gate_entry', __name__)
 
@@ -80,3 +81,12 @@ def get_going_out_logs():
 def get_today_logs():
     summary = gate_entry_service.get_today_logs()
     return jsonify(summary)
+
+@gate_entry_bp.route('/gate-entry/export', methods=['GET'])
+def export_gate_logs():
+    """Stream gate logs as CSV or Excel (?from=&to=&format=csv|xlsx&type=gate|going-out)"""
+    dataset = 'going-out' if request.args.get('type') == 'going-out' else 'gate-entry'
+    try:
+        return build_export_response(dataset)
+    except ValueError as ve:
+        return jsonify({'success': False, 'message': str(ve)}), 400
@@ -2,6 +2,7 @@
 Health check API routes
 """
 from flask import Blueprint, jsonify
+from utils.cache import response_cache
 
 health_bp = Blueprint('health', __name__)
 
@@ -12,4 +13,9 @@ def health_check():
         'status': 'healthy',
         'database': 'mysql',
         'service': 'production_management'
-    }), 200
\ No newline at end of file
+    }), 200
+
+@health_bp.route('/health/cache', methods=['GET'])
+def cache_stats():
+    """Get response cache hit/miss counts and backend usage"""
+    return jsonify(response_cache.stats()), 200
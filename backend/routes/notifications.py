@@ -0,0 +1,61 @@
+"""
+Notification API routes
+"""
+from flask import Blueprint, request, jsonify
+from services.notification_service import NotificationService
+
+notifications_bp = Blueprint('notifications', __name__)
+
+@notifications_bp.route('/notifications', methods=['GET'])
+def get_notifications():
+    """Get notifications (?department=&unreadOnly=true&limit=50), newest first"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        if limit is None or limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        notifications = NotificationService.get_notifications(
+            department=request.args.get('department'),
+            unread_only=request.args.get('unreadOnly', 'false').lower() == 'true',
+            limit=min(limit, 500)
+        )
+        return jsonify(notifications), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@notifications_bp.route('/notifications/unread-count', methods=['GET'])
+def get_unread_count():
+    """Get the unread notification count, optionally for one department"""
+    try:
+        department = request.args.get('department')
+        return jsonify({
+            'department': department,
+            'unreadCount': NotificationService.get_unread_count(department)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@notifications_bp.route('/notifications/read', methods=['POST'])
+def mark_notifications_read():
+    """Mark notifications read: {"ids": [...]} for a batch, else all (optionally {"department": ...})"""
+    try:
+        data = request.get_json(silent=True) or {}
+        ids = data.get('ids')
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+                return jsonify({'error': 'ids must be a list of integers'}), 400
+            marked = NotificationService.mark_many_as_read(ids)
+        else:
+            marked = NotificationService.mark_all_as_read(data.get('department'))
+        return jsonify({'marked': marked}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@notifications_bp.route('/notifications/<int:notification_id>/read', methods=['POST'])
+def mark_notification_read(notification_id):
+    """Mark one notification as read"""
+    try:
+        if not NotificationService.mark_as_read(notification_id):
+            return jsonify({'error': 'Notification not found'}), 404
+        return jsonify({'status': 'success'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
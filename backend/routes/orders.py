@@ -1,8 +1,10 @@
 """
 Order tracking and status API routes
 """
+from datetime import datetime
 from flask import Blueprint, jsonify, request
 from services import OrderTrackingService
+from utils.pagination import get_page_params, MAX_PAGE_SIZE
 
 orders_bp = Blueprint('orders', __name__)
 
@@ -10,8 +12,15 @@ orders_bp = Blueprint('orders', __name__)
 def get_current_order_log():
     """Get comprehensive order log showing current status across all departments"""
     try:
-        result = OrderTrackingService.get_current_order_log()
+        page = get_page_params(request.args)
+        result = OrderTrackingService.get_current_order_log(
+            category=request.args.get('category'),
+            status=request.args.get('status'),
+            page=page
+        )
         return jsonify(result), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -24,12 +33,89 @@ def get_order_detailed_status(order_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@orders_bp.route('/orders/<int:order_id>/timeline', methods=['GET'])
+def get_order_timeline(order_id):
+    """Get the status history of a production order across departments"""
+    try:
+        result = OrderTrackingService.get_order_timeline(production_order_id=order_id)
+        return jsonify(result), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@orders_bp.route('/orders/sales/<int:sales_order_id>/timeline', methods=['GET'])
+def get_sales_order_timeline(sales_order_id):
+    """Get the status history of a sales order, including its product's production"""
+    try:
+        result = OrderTrackingService.get_order_timeline(sales_order_id=sales_order_id)
+        return jsonify(result), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@orders_bp.route('/orders/analytics/stages', methods=['GET'])
+def get_stage_analytics():
+    """Get time spent in each status, and optionally a from → to cycle time"""
+    try:
+        since = request.args.get('since')
+        try:
+            since = datetime.fromisoformat(since) if since else None
+        except ValueError:
+            raise ValueError('since must be an ISO date/time')
+        result = OrderTrackingService.get_stage_analytics(
+            request.args.get('entity', 'production_order'),
+            since=since,
+            from_status=request.args.get('from'),
+            to_status=request.args.get('to')
+        )
+        return jsonify(result), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@orders_bp.route('/orders/analytics/estimates', methods=['GET'])
+def get_completion_estimates():
+    """Get the learned stage durations used for order completion estimates"""
+    try:
+        result = OrderTrackingService.get_completion_estimates(request.args.get('category'))
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@orders_bp.route('/orders/analytics/estimates/refresh', methods=['POST'])
+def refresh_completion_estimates():
+    """Relearn stage durations from the status log"""
+    try:
+        data = request.get_json(silent=True) or {}
+        since = data.get('since')
+        try:
+            since = datetime.fromisoformat(since) if since else None
+        except (TypeError, ValueError):
+            raise ValueError('since must be an ISO date/time')
+        result = OrderTrackingService.refresh_completion_estimates(since)
+        return jsonify(result), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @orders_bp.route('/orders/status-tracking', methods=['GET'])
 def get_order_status_tracking():
     """Get real-time order status tracking across all departments"""
     try:
-        query = request.args.get('q')
-        result = OrderTrackingService.get_order_status_tracking(query)
+        limit = request.args.get('limit', type=int)
+        if limit is not None and limit < 1:
+            raise ValueError('limit must be a positive integer')
+        result = OrderTrackingService.get_order_status_tracking(
+            request.args.get('q'),
+            limit=min(limit, MAX_PAGE_SIZE) if limit else None,
+            cursor=request.args.get('cursor') or None
+        )
         return jsonify(result), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
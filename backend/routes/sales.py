@@ -5,6 +5,8 @@ API endpoints for sales operations
 from flask import Blueprint, request, jsonify
 from services.sales_service import SalesService
 from services.gst_verification_service import GSTVerificationService
+from utils.pagination import get_page_params
+from models.serialization import parse_fields
 
 sales_bp = Blueprint('sales', __name__)
 
@@ -25,9 +27,13 @@ def get_sales_orders():
     try:
         status = request.args.get('status')
         sales_person = request.args.get('sales_person')
+        page = get_page_params(request.args)
+        fields = parse_fields(request.args.get('fields'))
         
-        orders = SalesService.get_sales_orders(status=status, sales_person=sales_person)
+        orders = SalesService.get_sales_orders(status=status, sales_person=sales_person, page=page, fields=fields)
         return jsonify(orders), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
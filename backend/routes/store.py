@@ -65,6 +65,28 @@ def check_stock_for_order(purchase_order_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@store_bp.route('/store/orders/allocate-pending', methods=['POST'])
+def allocate_pending_store_orders():
+    """Run stock allocation for all orders pending a store check, oldest first"""
+    try:
+        data = request.get_json(silent=True) or {}
+        limit = data.get('limit')
+        if limit is not None and (not isinstance(limit, int) or limit < 1):
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        result = InventoryService.allocate_pending_orders(limit)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@store_bp.route('/store/shortages', methods=['GET'])
+def get_material_shortages():
+    """Get materials whose open purchase order demand exceeds stock"""
+    try:
+        shortages = InventoryService.get_shortage_report()
+        return jsonify(shortages), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @store_bp.route('/store/orders/<int:purchase_order_id>/verify-purchase', methods=['POST'])
 def verify_purchase_and_add_to_inventory(purchase_order_id):
     """Verify purchase and add materials to inventory"""
@@ -24,6 +24,8 @@ API endpoints for transport operations (company delivery)
 """
 from flask import Blueprint, request, jsonify
 from services.transport_service import TransportService
+from utils.pagination import get_page_params
+from models.serialization import parse_fields
 
 transport_bp = Blueprint('transport', __name__)
 
@@ -32,8 +34,11 @@ transport_bp = Blueprint('transport', __name__)
 def get_pending_transport_approvals():
     """Get all pending transport approval requests"""
     try:
-        approvals = TransportService.get_pending_transport_approvals()
+        fields = parse_fields(request.args.get('fields'))
+        approvals = TransportService.get_pending_transport_approvals(fields=fields)
         return jsonify(approvals), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -101,8 +106,15 @@ def get_pending_transport_jobs():
 def get_all_transport_jobs():
     """Get all transport jobs with all statuses"""
     try:
-        jobs = TransportService.get_all_transport_jobs()
+        page = get_page_params(request.args)
+        jobs = TransportService.get_all_transport_jobs(
+            status=request.args.get('status'),
+            transporter_name=request.args.get('transporter_name'),
+            page=page
+        )
         return jsonify(jobs), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -130,6 +142,22 @@ def assign_transporter(transport_job_id):
         return jsonify({'error': str(e)}), 500
 
 
+@transport_bp.route('/transport/plan-assignments', methods=['POST'])
+def plan_vehicle_assignments():
+    """Plan pending transport jobs onto available vehicles; commits unless dryRun"""
+    try:
+        data = request.get_json(silent=True) or {}
+        dry_run = data.get('dryRun', True)
+        if not isinstance(dry_run, bool):
+            return jsonify({'error': 'dryRun must be a boolean'}), 400
+        
+        result = TransportService.plan_vehicle_assignments(dry_run=dry_run)
+        return jsonify(result), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @transport_bp.route('/transport/status/<int:transport_job_id>', methods=['PUT'])
 def update_delivery_status(transport_job_id):
     """Update delivery status of transport job"""
@@ -4,6 +4,7 @@ API endpoints for watchman operations (gate security)
 """
 from flask import Blueprint, request, jsonify
 from services.watchman_service import WatchmanService
+from utils.pagination import get_page_params
 
 watchman_bp = Blueprint('watchman', __name__)
 
@@ -22,8 +23,11 @@ def get_pending_pickups():
 def get_all_gate_passes():
     """Get all gate passes (completed and pending)"""
     try:
-        passes = WatchmanService.get_all_gate_passes()
+        page = get_page_params(request.args)
+        passes = WatchmanService.get_all_gate_passes(status=request.args.get('status'), page=page)
         return jsonify(passes), 200
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
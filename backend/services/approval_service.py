@@ -4,6 +4,9 @@ Handles business logic for approval requests requiring admin verification
 """
 from datetime import datetime
 from models import db, ApprovalRequest, SalesOrder, ShowroomProduct
+from models.serialization import wants, project
+from utils.pagination import paginate_query, build_page
+from sqlalchemy.orm import selectinload
 
 class ApprovalService:
     """Service class for approval operations"""
@@ -253,25 +256,53 @@ class ApprovalService:
             raise Exception(f"Error rejecting request: {str(e)}")
     
     @staticmethod
-    def get_all_approvals():
-        """Get all approval requests (pending, approved, rejected)"""
+    def get_all_approvals(status=None, request_type=None, page=None, fields=None):
+        """Get all approval requests (pending, approved, rejected)
+
+        When ``page`` ({'limit', 'cursor'}) is given, a single keyset page
+        ordered by (created_at, id) is returned instead of the full list.
+        ``fields`` limits each request to those keys.
+        """
         try:
-            approval_requests = ApprovalRequest.query.order_by(ApprovalRequest.created_at.desc()).all()
+            query = ApprovalRequest.query.options(
+                selectinload(ApprovalRequest.sales_order).selectinload(SalesOrder.showroom_product)
+            )
+            if status:
+                query = query.filter(ApprovalRequest.status == status)
+            if request_type:
+                query = query.filter(ApprovalRequest.request_type == request_type)
+
+            if page:
+                approval_requests, next_cursor = paginate_query(
+                    query, ApprovalRequest.created_at, ApprovalRequest.id, page['limit'], page['cursor']
+                )
+            else:
+                approval_requests = query.order_by(ApprovalRequest.created_at.desc()).all()
+            
+            # Payment totals of the nested sales orders, one query for the page
+            context = {}
+            if wants(fields, 'salesOrder'):
+                context['amount_paid'] = SalesOrder.amounts_paid(
+                    {request.sales_order_id for request in approval_requests}
+                )
             
             approvals = []
-            for request in approval_requests:
-                sales_order = SalesOrder.query.get(request.sales_order_id)
-                showroom_product = ShowroomProduct.query.get(sales_order.showroom_product_id) if sales_order else None
+            for request, approval_data in zip(
+                approval_requests, ApprovalRequest._serializer.dump_many(approval_requests, fields, context)
+            ):
+                sales_order = request.sales_order
+                showroom_product = sales_order.showroom_product if sales_order else None
                 
-                approval_data = request.to_dict()
                 if sales_order:
                     approval_data['orderNumber'] = sales_order.order_number
                     approval_data['customerName'] = sales_order.customer_name
                     approval_data['finalAmount'] = sales_order.final_amount
                     approval_data['productName'] = showroom_product.name if showroom_product else 'Unknown Product'
                 
-                approvals.append(approval_data)
+                approvals.append(project(approval_data, fields))
             
+            if page:
+                return build_page(approvals, next_cursor, page['limit'])
             return approvals
         except Exception as e:
             raise Exception(f"Error fetching all approvals: {str(e)}")
@@ -3,7 +3,10 @@ Dispatch Service Module
 Handles business logic for dispatch operations
 """
 from datetime import datetime
-from models import db, DispatchRequest, SalesOrder, ShowroomProduct, TransportJob, GatePass
+from models import db, DispatchRequest, SalesOrder, TransportJob, GatePass
+from utils.pagination import paginate_query, build_page
+from utils.loaders import dispatch_graph_options, gate_pass_graph_options, transport_job_graph_options
+from utils.rollup import Window, StatusRollup, day_range
 
 
 class DispatchService:
@@ -13,13 +16,15 @@ class DispatchService:
     def get_pending_dispatch_orders():
         """Get all orders pending dispatch processing"""
         try:
-            dispatch_requests = DispatchRequest.query.filter_by(status='pending').order_by(DispatchRequest.created_at.desc()).all()
+            dispatch_requests = DispatchRequest.query.filter_by(status='pending').options(
+                *dispatch_graph_options()
+            ).order_by(DispatchRequest.created_at.desc()).all()
             
             orders = []
             for request in dispatch_requests:
-                # Get related sales order
-                sales_order = SalesOrder.query.get(request.sales_order_id)
-                showroom_product = ShowroomProduct.query.get(request.showroom_product_id)
+                # Related sales order and product are already loaded
+                sales_order = request.sales_order
+                showroom_product = request.showroom_product
                 
                 orders.append({
                     'id': request.id,
@@ -35,7 +40,7 @@ class DispatchService:
                     'status': request.status,
                     'salePrice': showroom_product.sale_price if showroom_product else 0,
                     'finalAmount': sales_order.final_amount if sales_order else 0,
-                    'createdAt': request.created_at.isoformat(),
+                    'createdAt': request.created_at.isoformat() if request.created_at else None,
                     'dispatchNotes': request.dispatch_notes
                 })
             
@@ -44,18 +49,34 @@ class DispatchService:
             raise Exception(f"Error fetching pending dispatch orders: {str(e)}")
     
     @staticmethod
-    def get_all_dispatch_orders():
-        """Get all dispatch orders with status filtering"""
+    def get_all_dispatch_orders(status=None, delivery_type=None, page=None):
+        """Get all dispatch orders with status filtering
+
+        When ``page`` ({'limit', 'cursor'}) is given, a single keyset page
+        ordered by (created_at, id) is returned instead of the full list.
+        """
         try:
-            dispatch_requests = DispatchRequest.query.order_by(DispatchRequest.created_at.desc()).all()
+            # Related rows for the whole page load in one query per relationship
+            query = DispatchRequest.query.options(*dispatch_graph_options())
+            if status:
+                query = query.filter(DispatchRequest.status == status)
+            if delivery_type:
+                query = query.filter(DispatchRequest.delivery_type == delivery_type)
+
+            if page:
+                dispatch_requests, next_cursor = paginate_query(
+                    query, DispatchRequest.created_at, DispatchRequest.id, page['limit'], page['cursor']
+                )
+            else:
+                dispatch_requests = query.order_by(DispatchRequest.created_at.desc()).all()
 
             orders = []
             for request in dispatch_requests:
                 # Get related sales order and showroom product
-                sales_order = SalesOrder.query.get(request.sales_order_id)
-                showroom_product = ShowroomProduct.query.get(request.showroom_product_id)
+                sales_order = request.sales_order
+                showroom_product = request.showroom_product
                 # Get gate pass for vehicle information
-                gate_pass = GatePass.query.filter_by(dispatch_request_id=request.id).first()
+                gate_pass = request.gate_pass
 
                 # Get company name from sales order or transport job
                 company_name = '-'
@@ -63,7 +84,7 @@ class DispatchService:
                     company_name = sales_order.transporter_name
                 elif request.delivery_type == 'transport':
                     # Try to get from transport job
-                    transport_job = TransportJob.query.filter_by(dispatch_request_id=request.id).first()
+                    transport_job = request.transport_job
                     if transport_job and transport_job.transporter_name:
                         company_name = transport_job.transporter_name
 
@@ -82,7 +103,7 @@ class DispatchService:
                     'status': request.status,
                     'salePrice': showroom_product.sale_price if showroom_product else 0,
                     'finalAmount': sales_order.final_amount if sales_order else 0,
-                    'createdAt': request.created_at.isoformat(),
+                    'createdAt': request.created_at.isoformat() if request.created_at else None,
                     'updatedAt': request.updated_at.isoformat(),
                     'dispatchNotes': request.dispatch_notes,
                     'customerVehicle': gate_pass.vehicle_no if gate_pass and gate_pass.vehicle_no else None,
@@ -90,6 +111,8 @@ class DispatchService:
                     'companyName': company_name
                 })
 
+            if page:
+                return build_page(orders, next_cursor, page['limit'])
             return orders
         except Exception as e:
             raise Exception(f"Error fetching dispatch orders: {str(e)}")
@@ -296,14 +319,14 @@ class DispatchService:
         try:
             gate_passes = GatePass.query.filter(
                 GatePass.status.in_(['pending', 'verified'])
-            ).order_by(GatePass.issued_at.desc()).all()
+            ).options(*gate_pass_graph_options()).order_by(GatePass.issued_at.desc()).all()
             
             orders = []
             for gate_pass in gate_passes:
-                dispatch_request = DispatchRequest.query.get(gate_pass.dispatch_request_id)
+                dispatch_request = gate_pass.dispatch_request
                 if dispatch_request:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                    sales_order = dispatch_request.sales_order
+                    showroom_product = dispatch_request.showroom_product
                     
                     orders.append({
                         'gatePassId': gate_pass.id,
@@ -329,14 +352,14 @@ class DispatchService:
         try:
             transport_jobs = TransportJob.query.filter(
                 TransportJob.status.in_(['pending', 'assigned', 'in_transit'])
-            ).order_by(TransportJob.created_at.desc()).all()
+            ).options(*transport_job_graph_options()).order_by(TransportJob.created_at.desc()).all()
             
             orders = []
             for transport_job in transport_jobs:
-                dispatch_request = DispatchRequest.query.get(transport_job.dispatch_request_id)
+                dispatch_request = transport_job.dispatch_request
                 if dispatch_request:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                    sales_order = dispatch_request.sales_order
+                    showroom_product = dispatch_request.showroom_product
                     
                     orders.append({
                         'transportJobId': transport_job.id,
@@ -444,26 +467,26 @@ class DispatchService:
     def get_dispatch_summary():
         """Get dispatch department summary statistics"""
         try:
-            # Count orders by status
-            pending_orders = DispatchRequest.query.filter_by(status='pending').count()
-            customer_details_required = DispatchRequest.query.filter_by(status='customer_details_required').count()
-            ready_for_pickup = DispatchRequest.query.filter_by(status='ready_for_pickup').count()
-            in_transit = DispatchRequest.query.filter_by(status='in_transit').count()
-            completed_orders = DispatchRequest.query.filter_by(status='completed').count()
+            # One pass over the requests: status x delivery type totals plus today's windows
+            today_start, today_end = day_range()
+            rollup = StatusRollup(DispatchRequest.status, DispatchRequest.delivery_type, windows={
+                'created': Window(DispatchRequest.created_at, today_start, today_end),
+                'completedToday': Window(DispatchRequest.updated_at, today_start, today_end, statuses=('completed',))
+            }).run()
+            
+            pending_orders = rollup.count('pending')
+            customer_details_required = rollup.count('customer_details_required')
+            ready_for_pickup = rollup.count('ready_for_pickup')
+            in_transit = rollup.count('in_transit')
+            completed_orders = rollup.count('completed')
             
             # Count by delivery type
-            self_delivery = DispatchRequest.query.filter_by(delivery_type='self').count()
-            transport_delivery = DispatchRequest.query.filter_by(delivery_type='transport').count()
+            self_delivery = rollup.count(dimension='self')
+            transport_delivery = rollup.count(dimension='transport')
             
             # Today's dispatch activity
-            today = datetime.now().date()
-            today_dispatches = DispatchRequest.query.filter(
-                db.func.date(DispatchRequest.created_at) == today
-            ).count()
-            today_completed = DispatchRequest.query.filter(
-                db.func.date(DispatchRequest.updated_at) == today,
-                DispatchRequest.status == 'completed'
-            ).count()
+            today_dispatches = rollup.count(window='created')
+            today_completed = rollup.count('completed', window='completedToday')
             
             return {
                 'pendingOrders': pending_orders,
@@ -548,13 +571,13 @@ class DispatchService:
             dispatch_requests = DispatchRequest.query.filter(
                 DispatchRequest.status == 'entered_for_pickup',
                 DispatchRequest.delivery_type == 'self'
-            ).order_by(DispatchRequest.updated_at.desc()).all()
+            ).options(*dispatch_graph_options()).order_by(DispatchRequest.updated_at.desc()).all()
             
             notifications = []
             for dispatch_request in dispatch_requests:
-                sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
-                gate_pass = GatePass.query.filter_by(dispatch_request_id=dispatch_request.id).first()
+                sales_order = dispatch_request.sales_order
+                showroom_product = dispatch_request.showroom_product
+                gate_pass = dispatch_request.gate_pass
                 
                 notifications.append({
                     'id': dispatch_request.id,
@@ -0,0 +1,94 @@
+"""
+Export Service Module
+Builds row streams for CSV/Excel exports of logs and operational reports
+"""
+from models import (
+    db, GateEntryLog, GoingOutLog, SalesOrder, TransportJob, DispatchRequest, FinanceTransaction
+)
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportService:
+    """Service class for streaming exports"""
+
+    # dataset -> (sheet title, header row, column expressions, timestamp column, outer joins)
+    DATASETS = {
+        'gate-entry': (
+            'Gate Entries',
+            ['Timestamp', 'Name', 'Phone', 'Action', 'Method', 'Details', 'Status'],
+            [GateEntryLog.timestamp, GateEntryLog.user_name, GateEntryLog.user_phone,
+             GateEntryLog.action, GateEntryLog.method, GateEntryLog.details, GateEntryLog.status],
+            GateEntryLog.timestamp,
+            []
+        ),
+        'going-out': (
+            'Going Out',
+            ['Timestamp', 'Name', 'Phone', 'Reason', 'Details', 'Status', 'Return Time'],
+            [GoingOutLog.timestamp, GoingOutLog.user_name, GoingOutLog.user_phone, GoingOutLog.reason,
+             GoingOutLog.details, GoingOutLog.status, GoingOutLog.return_time],
+            GoingOutLog.timestamp,
+            []
+        ),
+        'sales-orders': (
+            'Sales Orders',
+            ['Order Number', 'Created At', 'Customer', 'Contact', 'Quantity', 'Unit Price', 'Total Amount',
+             'Discount', 'Transport Cost', 'Final Amount', 'Payment Method', 'Payment Status',
+             'Order Status', 'Sales Person'],
+            [SalesOrder.order_number, SalesOrder.created_at, SalesOrder.customer_name, SalesOrder.customer_contact,
+             SalesOrder.quantity, SalesOrder.unit_price, SalesOrder.total_amount, SalesOrder.discount_amount,
+             SalesOrder.transport_cost, SalesOrder.final_amount, SalesOrder.payment_method,
+             SalesOrder.payment_status, SalesOrder.order_status, SalesOrder.sales_person],
+            SalesOrder.created_at,
+            []
+        ),
+        'transport-jobs': (
+            'Transport Jobs',
+            ['Job ID', 'Created At', 'Order Number', 'Customer', 'Contact', 'Address', 'Quantity',
+             'Transporter', 'Vehicle No', 'Status', 'Updated At'],
+            [TransportJob.id, TransportJob.created_at, SalesOrder.order_number, DispatchRequest.party_name,
+             DispatchRequest.party_contact, DispatchRequest.party_address, DispatchRequest.quantity,
+             TransportJob.transporter_name, TransportJob.vehicle_no, TransportJob.status, TransportJob.updated_at],
+            TransportJob.created_at,
+            [
+                (DispatchRequest, TransportJob.dispatch_request_id == DispatchRequest.id),
+                (SalesOrder, DispatchRequest.sales_order_id == SalesOrder.id),
+            ]
+        ),
+        'finance-transactions': (
+            'Finance Transactions',
+            ['Transaction ID', 'Created At', 'Type', 'Amount', 'Description', 'Reference ID', 'Reference Type'],
+            [FinanceTransaction.id, FinanceTransaction.created_at, FinanceTransaction.transaction_type,
+             FinanceTransaction.amount, FinanceTransaction.description, FinanceTransaction.reference_id,
+             FinanceTransaction.reference_type],
+            FinanceTransaction.created_at,
+            []
+        ),
+    }
+
+    @staticmethod
+    def get_dataset_names():
+        """Get the names of all exportable datasets"""
+        return list(ExportService.DATASETS.keys())
+
+    @staticmethod
+    def get_export(dataset, start=None, end=None):
+        """Get (sheet title, header row, row iterator) for a dataset and date range
+
+        Rows are read in batches of EXPORT_BATCH_SIZE, oldest first, so the
+        caller can stream them without loading the whole result set.
+        """
+        if dataset not in ExportService.DATASETS:
+            raise ValueError(f'Unknown export dataset: {dataset}')
+
+        title, headers, columns, time_column, joins = ExportService.DATASETS[dataset]
+        query = db.session.query(*columns)
+        for model, condition in joins:
+            query = query.outerjoin(model, condition)
+        if start:
+            query = query.filter(time_column >= start)
+        if end:
+            query = query.filter(time_column < end)
+        query = query.order_by(time_column.asc())
+
+        return title, headers, query.yield_per(EXPORT_BATCH_SIZE)
@@ -3,14 +3,25 @@ Finance Service Module
 Handles business logic for finance operations
 """
 from datetime import datetime
-from models import db, PurchaseOrder, ProductionOrder, FinanceTransaction, ShowroomProduct, SalesOrder, SalesTransaction
-import json
+from models import db, PurchaseOrder, PurchaseOrderLine, ProductionOrder, FinanceTransaction, ShowroomProduct, SalesOrder, SalesTransaction
 import traceback
+from utils.cache import cached
+
+
+# Purchase order statuses whose line costs count as expenses
+EXPENSE_STATUSES = ('finance_approved', 'purchased', 'verified_in_store')
 
 
 class FinanceService:
     """Service class for finance operations"""
     
+    @staticmethod
+    def _purchase_cost_query():
+        """Query summing purchased quantity times unit cost over purchase order lines"""
+        return db.session.query(
+            db.func.coalesce(db.func.sum(PurchaseOrderLine.purchased_quantity * PurchaseOrderLine.unit_cost), 0.0)
+        )
+    
     @staticmethod
     def get_purchase_orders_for_approval():
         """Get purchase orders that need finance approval"""
@@ -30,11 +41,9 @@ class FinanceService:
             order.status = 'finance_approved'
             
             # Calculate total cost and create expense transaction
-            materials = json.loads(order.materials) if order.materials else []
-            total_cost = sum(
-                material.get('quantity', 0) * material.get('unit_cost', 0)
-                for material in materials
-            )
+            total_cost = FinanceService._purchase_cost_query().filter(
+                PurchaseOrderLine.purchase_order_id == order.id
+            ).scalar()
             
             # Create expense transaction
             expense_transaction = FinanceTransaction(
@@ -66,30 +75,24 @@ class FinanceService:
         }
     
     @staticmethod
+    @cached('finance.dashboard', tags=(
+        'showroom_product', 'purchase_order', 'purchase_order_line', 'finance_transaction'
+    ), unless=lambda result: 'error' in result)
     def get_dashboard_data():
         """Get financial summary for dashboard"""
         try:
             print("Getting dashboard data...")
             
             # Calculate total revenue from sold products
-            sold_products = ShowroomProduct.query.filter_by(showroom_status='sold').all()
-            total_revenue = sum(product.sale_price or 0 for product in sold_products)
+            total_revenue = db.session.query(
+                db.func.coalesce(db.func.sum(ShowroomProduct.sale_price), 0.0)
+            ).filter(ShowroomProduct.showroom_status == 'sold').scalar()
             print(f"Total revenue: {total_revenue}")
             
             # Calculate total expenses from approved purchase orders
-            approved_orders = PurchaseOrder.query.filter(
-                PurchaseOrder.status.in_(['finance_approved', 'purchased', 'verified_in_store'])
-            ).all()
-            
-            total_expenses = 0
-            for order in approved_orders:
-                try:
-                    materials = json.loads(order.materials) if order.materials else []
-                    order_cost = sum(material.get('quantity', 0) * material.get('unit_cost', 0) for material in materials if isinstance(material, dict))
-                    total_expenses += order_cost
-                except (json.JSONDecodeError, TypeError, AttributeError) as e:
-                    print(f"Error processing order materials for order {order.id}: {e}")
-                    continue
+            total_expenses = FinanceService._purchase_cost_query().join(
+                PurchaseOrder, PurchaseOrderLine.purchase_order_id == PurchaseOrder.id
+            ).filter(PurchaseOrder.status.in_(EXPENSE_STATUSES)).scalar()
             
             print(f"Total expenses: {total_expenses}")
             net_profit = total_revenue - total_expenses
@@ -1,9 +1,10 @@
 import os
-import pandas as pd
 from datetime import datetime, timedelta
-import json
 from typing import Dict, List, Optional
 import logging
+from openpyxl import Workbook, load_workbook
+
+from models import db, GateUser, GateEntryLog, GoingOutLog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -11,81 +12,43 @@ logger = logging.getLogger(__name__)
 
 class GateEntryService:
     def __init__(self):
+        # Legacy workbook location, read by the one-shot importer
         self.data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        # Excel exports go to their own folder so they never overwrite the import source
+        self.exports_dir = os.path.join(self.data_dir, 'exports')
         self.gate_logs_file = os.path.join(self.data_dir, 'gate_entry_logs.xlsx')
         self.going_out_logs_file = os.path.join(self.data_dir, 'going_out_logs.xlsx')
         self.users_file = os.path.join(self.data_dir, 'gate_users.xlsx')
 
-        # Ensure data directory exists
-        os.makedirs(self.data_dir, exist_ok=True)
-
-        # Initialize Excel files if they don't exist
-        self._initialize_files()
-
-    def _initialize_files(self):
-        """Initialize Excel files with proper headers if they don't exist"""
-        # Gate Entry Logs
-        if not os.path.exists(self.gate_logs_file):
-            df = pd.DataFrame(columns=[
-                'timestamp', 'user_name', 'user_phone', 'action',
-                'method', 'details', 'status'
-            ])
-            df.to_excel(self.gate_logs_file, index=False)
-
-        # Going Out Logs
-        if not os.path.exists(self.going_out_logs_file):
-            df = pd.DataFrame(columns=[
-                'timestamp', 'user_name', 'user_phone', 'reason',
-                'details', 'status', 'return_time'
-            ])
-            df.to_excel(self.going_out_logs_file, index=False)
-
-        # Users
-        if not os.path.exists(self.users_file):
-            df = pd.DataFrame(columns=[
-                'user_id', 'name', 'phone', 'registered_at',
-                'last_entry', 'last_exit', 'status', 'photo'
-            ])
-            df.to_excel(self.users_file, index=False)
-
     def register_user(self, name: str, phone: str, photo: str = None) -> Dict:
         """Register a new user for gate entry system"""
         try:
-            # Read existing users
-            df = pd.read_excel(self.users_file)
-
             # Check if user already exists
-            if phone in df['phone'].values:
+            if GateUser.query.filter_by(phone=phone).first():
                 return {
                     'success': False,
                     'message': 'User with this phone number already exists'
                 }
 
-            # Create new user entry
-            user_id = len(df) + 1
-            new_user = {
-                'user_id': user_id,
-                'name': name,
-                'phone': phone,
-                'registered_at': datetime.now(),
-                'last_entry': None,
-                'last_exit': None,
-                'status': 'active',
-                'photo': photo
-            }
-
-            # Add to dataframe
-            df = pd.concat([df, pd.DataFrame([new_user])], ignore_index=True)
-            df.to_excel(self.users_file, index=False)
+            user = GateUser(
+                name=name,
+                phone=phone,
+                registered_at=datetime.now(),
+                status='active',
+                photo=photo
+            )
+            db.session.add(user)
+            db.session.commit()
 
             logger.info(f"New user registered: {name} ({phone})")
             return {
                 'success': True,
                 'message': f'User {name} registered successfully',
-                'user_id': user_id
+                'user_id': user.id
             }
 
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Error registering user: {e}")
             return {
                 'success': False,
@@ -95,30 +58,8 @@ class GateEntryService:
     def get_users(self) -> List[Dict]:
         """Get all registered users"""
         try:
-            df = pd.read_excel(self.users_file)
-            users = df.to_dict('records')
-
-            # Convert timestamps to string format and handle NaN values
-            for user in users:
-                if pd.notna(user.get('registered_at')):
-                    user['registered_at'] = user['registered_at'].isoformat()
-                else:
-                    user['registered_at'] = None
-                if pd.notna(user.get('last_entry')):
-                    user['last_entry'] = user['last_entry'].isoformat()
-                else:
-                    user['last_entry'] = None
-                if pd.notna(user.get('last_exit')):
-                    user['last_exit'] = user['last_exit'].isoformat()
-                else:
-                    user['last_exit'] = None
-
-                # Handle NaN values in other fields
-                for key, value in user.items():
-                    if pd.isna(value):
-                        user[key] = None
-
-            return users
+            users = GateUser.query.order_by(GateUser.id.asc()).all()
+            return [user.to_dict() for user in users]
 
         except Exception as e:
             logger.error(f"Error getting users: {e}")
@@ -127,17 +68,16 @@ class GateEntryService:
     def delete_user(self, phone: str) -> Dict:
         """Delete a user from the system"""
         try:
-            df = pd.read_excel(self.users_file)
-
-            if phone not in df['phone'].values:
+            user = GateUser.query.filter_by(phone=phone).first()
+            if not user:
                 return {
                     'success': False,
                     'message': 'User not found'
                 }
 
-            # Remove user
-            df = df[df['phone'] != phone]
-            df.to_excel(self.users_file, index=False)
+            # Logs keep the denormalized name/phone, so history survives the delete
+            db.session.delete(user)
+            db.session.commit()
 
             logger.info(f"User deleted: {phone}")
             return {
@@ -146,6 +86,7 @@ class GateEntryService:
             }
 
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Error deleting user: {e}")
             return {
                 'success': False,
@@ -154,141 +95,87 @@ class GateEntryService:
 
     def manual_entry(self, user_phone: str, details: str = "") -> Dict:
         """Record manual entry for a user"""
-        try:
-            # Check if user exists
-            df_users = pd.read_excel(self.users_file)
-            user = df_users[df_users['phone'] == user_phone]
-
-            if user.empty:
-                return {
-                    'success': False,
-                    'message': 'User not found. Please register first.'
-                }
-
-            user_name = user.iloc[0]['name']
-
-            # Record entry in gate logs
-            entry_data = {
-                'timestamp': datetime.now(),
-                'user_name': user_name,
-                'user_phone': user_phone,
-                'action': 'entry',
-                'method': 'manual',
-                'details': details,
-                'status': 'completed'
-            }
-
-            # Update user's last entry
-            df_users.loc[df_users['phone'] == user_phone, 'last_entry'] = datetime.now()
-            df_users.to_excel(self.users_file, index=False)
-
-            # Add to gate logs
-            df_logs = pd.read_excel(self.gate_logs_file)
-            df_logs = pd.concat([df_logs, pd.DataFrame([entry_data])], ignore_index=True)
-            df_logs.to_excel(self.gate_logs_file, index=False)
-
-            logger.info(f"Manual entry recorded for {user_name}")
-            return {
-                'success': True,
-                'message': f'Entry recorded for {user_name}',
-                'user_name': user_name
-            }
-
-        except Exception as e:
-            logger.error(f"Error recording manual entry: {e}")
-            return {
-                'success': False,
-                'message': f'Error recording entry: {str(e)}'
-            }
+        return self._record_gate_event(user_phone, 'entry', details)
 
     def manual_exit(self, user_phone: str, details: str = "") -> Dict:
         """Record manual exit for a user"""
+        return self._record_gate_event(user_phone, 'exit', details)
+
+    def _record_gate_event(self, user_phone: str, action: str, details: str = "") -> Dict:
+        """Append a manual entry/exit row and update the user's last entry/exit time"""
+        label = 'Entry' if action == 'entry' else 'Exit'
         try:
             # Check if user exists
-            df_users = pd.read_excel(self.users_file)
-            user = df_users[df_users['phone'] == user_phone]
-
-            if user.empty:
+            user = GateUser.query.filter_by(phone=user_phone).first()
+            if not user:
                 return {
                     'success': False,
                     'message': 'User not found. Please register first.'
                 }
 
-            user_name = user.iloc[0]['name']
-
-            # Record exit in gate logs
-            exit_data = {
-                'timestamp': datetime.now(),
-                'user_name': user_name,
-                'user_phone': user_phone,
-                'action': 'exit',
-                'method': 'manual',
-                'details': details,
-                'status': 'completed'
-            }
-
-            # Update user's last exit
-            df_users.loc[df_users['phone'] == user_phone, 'last_exit'] = datetime.now()
-            df_users.to_excel(self.users_file, index=False)
-
-            # Add to gate logs
-            df_logs = pd.read_excel(self.gate_logs_file)
-            df_logs = pd.concat([df_logs, pd.DataFrame([exit_data])], ignore_index=True)
-            df_logs.to_excel(self.gate_logs_file, index=False)
-
-            logger.info(f"Manual exit recorded for {user_name}")
+            now = datetime.now()
+            db.session.add(GateEntryLog(
+                timestamp=now,
+                user_name=user.name,
+                user_phone=user_phone,
+                action=action,
+                method='manual',
+                details=details,
+                status='completed'
+            ))
+
+            if action == 'entry':
+                user.last_entry = now
+            else:
+                user.last_exit = now
+            db.session.commit()
+
+            logger.info(f"Manual {action} recorded for {user.name}")
             return {
                 'success': True,
-                'message': f'Exit recorded for {user_name}',
-                'user_name': user_name
+                'message': f'{label} recorded for {user.name}',
+                'user_name': user.name
             }
 
         except Exception as e:
-            logger.error(f"Error recording manual exit: {e}")
+            db.session.rollback()
+            logger.error(f"Error recording manual {action}: {e}")
             return {
                 'success': False,
-                'message': f'Error recording exit: {str(e)}'
+                'message': f'Error recording {action}: {str(e)}'
             }
 
     def going_out(self, user_phone: str, reason: str, details: str = "") -> Dict:
         """Record going out for a user"""
         try:
             # Check if user exists
-            df_users = pd.read_excel(self.users_file)
-            user = df_users[df_users['phone'] == user_phone]
-
-            if user.empty:
+            user = GateUser.query.filter_by(phone=user_phone).first()
+            if not user:
                 return {
                     'success': False,
                     'message': 'User not found. Please register first.'
                 }
 
-            user_name = user.iloc[0]['name']
-
-            # Record going out in logs
-            going_out_data = {
-                'timestamp': datetime.now(),
-                'user_name': user_name,
-                'user_phone': user_phone,
-                'reason': reason,
-                'details': details,
-                'status': 'out',
-                'return_time': None
-            }
-
-            # Add to going out logs
-            df_logs = pd.read_excel(self.going_out_logs_file)
-            df_logs = pd.concat([df_logs, pd.DataFrame([going_out_data])], ignore_index=True)
-            df_logs.to_excel(self.going_out_logs_file, index=False)
-
-            logger.info(f"Going out recorded for {user_name} - {reason}")
+            db.session.add(GoingOutLog(
+                timestamp=datetime.now(),
+                user_name=user.name,
+                user_phone=user_phone,
+                reason=reason,
+                details=details,
+                status='out',
+                return_time=None
+            ))
+            db.session.commit()
+
+            logger.info(f"Going out recorded for {user.name} - {reason}")
             return {
                 'success': True,
-                'message': f'Going out recorded for {user_name}',
-                'user_name': user_name
+                'message': f'Going out recorded for {user.name}',
+                'user_name': user.name
             }
 
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Error recording going out: {e}")
             return {
                 'success': False,
@@ -299,49 +186,43 @@ class GateEntryService:
         """Record coming back for a user"""
         try:
             # Check if user exists
-            df_users = pd.read_excel(self.users_file)
-            user = df_users[df_users['phone'] == user_phone]
-
-            if user.empty:
+            user = GateUser.query.filter_by(phone=user_phone).first()
+            if not user:
                 return {
                     'success': False,
                     'message': 'User not found. Please register first.'
                 }
 
-            user_name = user.iloc[0]['name']
-
-            # Find the latest going out record for this user
-            df_logs = pd.read_excel(self.going_out_logs_file)
-            user_logs = df_logs[df_logs['user_phone'] == user_phone]
+            # Latest going out record for this user (phone/timestamp index)
+            latest_log = GoingOutLog.query.filter_by(user_phone=user_phone).order_by(
+                GoingOutLog.timestamp.desc(), GoingOutLog.id.desc()
+            ).first()
 
-            if user_logs.empty:
+            if not latest_log:
                 return {
                     'success': False,
                     'message': 'No going out record found for this user'
                 }
 
-            # Get the latest going out record
-            latest_log = user_logs.iloc[-1]
-
-            if latest_log['status'] == 'returned':
+            if latest_log.status == 'returned':
                 return {
                     'success': False,
                     'message': 'User has already returned'
                 }
 
-            # Update the going out record with return time
-            df_logs.loc[df_logs.index[-1], 'return_time'] = datetime.now()
-            df_logs.loc[df_logs.index[-1], 'status'] = 'returned'
-            df_logs.to_excel(self.going_out_logs_file, index=False)
+            latest_log.return_time = datetime.now()
+            latest_log.status = 'returned'
+            db.session.commit()
 
-            logger.info(f"Coming back recorded for {user_name}")
+            logger.info(f"Coming back recorded for {user.name}")
             return {
                 'success': True,
-                'message': f'Welcome back, {user_name}',
-                'user_name': user_name
+                'message': f'Welcome back, {user.name}',
+                'user_name': user.name
             }
 
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Error recording coming back: {e}")
             return {
                 'success': False,
@@ -351,22 +232,10 @@ class GateEntryService:
     def get_gate_logs(self, limit: int = 100) -> List[Dict]:
         """Get gate entry logs"""
         try:
-            df = pd.read_excel(self.gate_logs_file)
-            logs = df.tail(limit).to_dict('records')
-
-            # Convert timestamps to string format and handle NaN values
-            for log in logs:
-                if pd.notna(log.get('timestamp')):
-                    log['timestamp'] = log['timestamp'].isoformat()
-                else:
-                    log['timestamp'] = None
-
-                # Handle NaN values in other fields
-                for key, value in log.items():
-                    if pd.isna(value):
-                        log[key] = None
-
-            return logs[::-1]  # Return in reverse chronological order
+            logs = GateEntryLog.query.order_by(
+                GateEntryLog.timestamp.desc(), GateEntryLog.id.desc()
+            ).limit(limit).all()
+            return [log.to_dict() for log in logs]  # Reverse chronological order
 
         except Exception as e:
             logger.error(f"Error getting gate logs: {e}")
@@ -375,26 +244,10 @@ class GateEntryService:
     def get_going_out_logs(self, limit: int = 100) -> List[Dict]:
         """Get going out logs"""
         try:
-            df = pd.read_excel(self.going_out_logs_file)
-            logs = df.tail(limit).to_dict('records')
-
-            # Convert timestamps to string format and handle NaN values
-            for log in logs:
-                if pd.notna(log.get('timestamp')):
-                    log['timestamp'] = log['timestamp'].isoformat()
-                else:
-                    log['timestamp'] = None
-                if pd.notna(log.get('return_time')):
-                    log['return_time'] = log['return_time'].isoformat()
-                else:
-                    log['return_time'] = None
-
-                # Handle NaN values in other fields
-                for key, value in log.items():
-                    if pd.isna(value):
-                        log[key] = None
-
-            return logs[::-1]  # Return in reverse chronological order
+            logs = GoingOutLog.query.order_by(
+                GoingOutLog.timestamp.desc(), GoingOutLog.id.desc()
+            ).limit(limit).all()
+            return [log.to_dict() for log in logs]  # Reverse chronological order
 
         except Exception as e:
             logger.error(f"Error getting going out logs: {e}")
@@ -403,23 +256,27 @@ class GateEntryService:
     def get_today_logs(self) -> Dict:
         """Get today's logs summary"""
         try:
-            today = datetime.now().date()
-
-            # Gate logs
-            df_gate = pd.read_excel(self.gate_logs_file)
-            df_gate['timestamp'] = pd.to_datetime(df_gate['timestamp'])
-            today_gate_logs = df_gate[df_gate['timestamp'].dt.date == today]
-
-            # Going out logs
-            df_going_out = pd.read_excel(self.going_out_logs_file)
-            df_going_out['timestamp'] = pd.to_datetime(df_going_out['timestamp'])
-            today_going_out_logs = df_going_out[df_going_out['timestamp'].dt.date == today]
+            start = datetime.combine(datetime.now().date(), datetime.min.time())
+            end = start + timedelta(days=1)
+
+            gate_counts = dict(
+                db.session.query(GateEntryLog.action, db.func.count(GateEntryLog.id))
+                .filter(GateEntryLog.timestamp >= start, GateEntryLog.timestamp < end)
+                .group_by(GateEntryLog.action)
+                .all()
+            )
+            going_out_counts = dict(
+                db.session.query(GoingOutLog.status, db.func.count(GoingOutLog.id))
+                .filter(GoingOutLog.timestamp >= start, GoingOutLog.timestamp < end)
+                .group_by(GoingOutLog.status)
+                .all()
+            )
 
             return {
-                'gate_entries': len(today_gate_logs[today_gate_logs['action'] == 'entry']),
-                'gate_exits': len(today_gate_logs[today_gate_logs['action'] == 'exit']),
-                'going_out': len(today_going_out_logs),
-                'returned': len(today_going_out_logs[today_going_out_logs['status'] == 'returned'])
+                'gate_entries': gate_counts.get('entry', 0),
+                'gate_exits': gate_counts.get('exit', 0),
+                'going_out': sum(going_out_counts.values()),
+                'returned': going_out_counts.get('returned', 0)
             }
 
         except Exception as e:
@@ -431,5 +288,153 @@ class GateEntryService:
                 'returned': 0
             }
 
+    def import_excel_files(self, data_dir: Optional[str] = None) -> Dict:
+        """One-shot import of the legacy gate_users/gate_entry_logs/going_out_logs workbooks.
+
+        Users are matched on phone so re-running never duplicates them. Log
+        workbooks are only imported into empty tables, since log rows have no
+        natural key to de-duplicate on.
+        """
+        data_dir = data_dir or self.data_dir
+        users_file = os.path.join(data_dir, 'gate_users.xlsx')
+        gate_logs_file = os.path.join(data_dir, 'gate_entry_logs.xlsx')
+        going_out_logs_file = os.path.join(data_dir, 'going_out_logs.xlsx')
+        imported = {'users': 0, 'gate_logs': 0, 'going_out_logs': 0}
+
+        try:
+            if os.path.exists(users_file):
+                existing_phones = {phone for (phone,) in db.session.query(GateUser.phone).all()}
+                for row in self._iter_workbook_rows(users_file):
+                    phone = self._cell_text(row.get('phone'))
+                    if not phone or phone in existing_phones:
+                        continue
+                    db.session.add(GateUser(
+                        name=row.get('name') or phone,
+                        phone=phone,
+                        registered_at=self._cell_datetime(row.get('registered_at')),
+                        last_entry=self._cell_datetime(row.get('last_entry')),
+                        last_exit=self._cell_datetime(row.get('last_exit')),
+                        status=row.get('status') or 'active',
+                        photo=row.get('photo')
+                    ))
+                    existing_phones.add(phone)
+                    imported['users'] += 1
+
+            if os.path.exists(gate_logs_file) and GateEntryLog.query.first() is None:
+                for row in self._iter_workbook_rows(gate_logs_file):
+                    db.session.add(GateEntryLog(
+                        timestamp=self._cell_datetime(row.get('timestamp')) or datetime.now(),
+                        user_name=row.get('user_name'),
+                        user_phone=self._cell_text(row.get('user_phone')),
+                        action=row.get('action') or 'entry',
+                        method=row.get('method') or 'manual',
+                        details=row.get('details'),
+                        status=row.get('status') or 'completed'
+                    ))
+                    imported['gate_logs'] += 1
+
+            if os.path.exists(going_out_logs_file) and GoingOutLog.query.first() is None:
+                for row in self._iter_workbook_rows(going_out_logs_file):
+                    db.session.add(GoingOutLog(
+                        timestamp=self._cell_datetime(row.get('timestamp')) or datetime.now(),
+                        user_name=row.get('user_name'),
+                        user_phone=self._cell_text(row.get('user_phone')),
+                        reason=row.get('reason'),
+                        details=row.get('details'),
+                        status=row.get('status') or 'out',
+                        return_time=self._cell_datetime(row.get('return_time'))
+                    ))
+                    imported['going_out_logs'] += 1
+
+            db.session.commit()
+            logger.info(f"Imported gate entry workbooks: {imported}")
+            return {
+                'success': True,
+                'message': 'Gate entry workbooks imported',
+                'imported': imported
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error importing gate entry workbooks: {e}")
+            return {
+                'success': False,
+                'message': f'Error importing workbooks: {str(e)}'
+            }
+
+    def export_excel_files(self, output_dir: Optional[str] = None) -> Dict:
+        """Export users and logs to workbooks in the legacy layout (on demand only, to data/exports by default)"""
+        output_dir = output_dir or self.exports_dir
+        exports = [
+            ('gate_users.xlsx', GateUser, GateUser.id.asc(),
+             ['user_id', 'name', 'phone', 'registered_at', 'last_entry', 'last_exit', 'status', 'photo']),
+            ('gate_entry_logs.xlsx', GateEntryLog, GateEntryLog.timestamp.asc(),
+             ['timestamp', 'user_name', 'user_phone', 'action', 'method', 'details', 'status']),
+            ('going_out_logs.xlsx', GoingOutLog, GoingOutLog.timestamp.asc(),
+             ['timestamp', 'user_name', 'user_phone', 'reason', 'details', 'status', 'return_time']),
+        ]
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            files = []
+            for filename, model, ordering, columns in exports:
+                # Write-only workbook streams rows instead of building the sheet in memory
+                wb = Workbook(write_only=True)
+                ws = wb.create_sheet()
+                ws.append(columns)
+                for record in model.query.order_by(ordering).yield_per(1000):
+                    row = record.to_dict()
+                    ws.append([row.get(column) for column in columns])
+                path = os.path.join(output_dir, filename)
+                wb.save(path)
+                files.append(path)
+
+            return {
+                'success': True,
+                'message': 'Gate entry workbooks exported',
+                'files': files
+            }
+
+        except Exception as e:
+            logger.error(f"Error exporting gate entry workbooks: {e}")
+            return {
+                'success': False,
+                'message': f'Error exporting workbooks: {str(e)}'
+            }
+
+    @staticmethod
+    def _iter_workbook_rows(path: str):
+        """Yield each data row of the first sheet as a {header: value} dict"""
+        wb = load_workbook(path, read_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            headers = [str(h) if h is not None else '' for h in next(rows, [])]
+            for values in rows:
+                if values is None or all(v is None for v in values):
+                    continue
+                yield dict(zip(headers, values))
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _cell_text(value) -> Optional[str]:
+        """Normalize a phone-like cell (numbers lose their trailing .0)"""
+        if value is None:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value).strip() or None
+
+    @staticmethod
+    def _cell_datetime(value) -> Optional[datetime]:
+        """Parse a workbook cell into a datetime"""
+        if value is None or value == '':
+            return None
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+
 # Global service instance
 gate_entry_service = GateEntryService()
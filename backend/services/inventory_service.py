@@ -2,9 +2,11 @@
 Inventory management business logic service
 """
 from datetime import datetime
-from models import db, StoreInventory, PurchaseOrder, ProductionOrder
+from models import db, StoreInventory, PurchaseOrder, PurchaseOrderLine, ProductionOrder
 from utils.validators import validate_required_fields
-import json
+
+# Purchase order statuses whose lines still wait on store stock
+OPEN_PURCHASE_STATUSES = ('pending_request', 'pending_store_check', 'insufficient_stock', 'partially_allocated')
 
 class InventoryService:
     """Service class for inventory operations"""
@@ -97,161 +99,233 @@ class InventoryService:
             raise Exception(f"Error deleting inventory item: {str(e)}")
     
     @staticmethod
-    def check_stock_availability(purchase_order_id):
-        """Check stock availability for a purchase order and allocate if possible"""
-        try:
-            order = PurchaseOrder.query.get_or_404(purchase_order_id)
-            
-            if not order.materials:
-                raise Exception('No materials specified in order')
+    def _lock_stock(material_ids):
+        """Lock inventory rows for update
 
-            materials = order.get_materials_list()
+        One SELECT ... FOR UPDATE over every material involved, in id order,
+        so concurrent allocations always take row locks in the same sequence
+        and cannot deadlock.
 
-            # Check stock availability
-            stock_check_results = []
-            all_available = True
-            shortages = []
+        Returns:
+            dict: {material_id: StoreInventory}
+        """
+        if not material_ids:
+            return {}
+        items = StoreInventory.query.filter(
+            StoreInventory.id.in_(material_ids)
+        ).order_by(StoreInventory.id).with_for_update().all()
+        return {item.id: item for item in items}
+    
+    @staticmethod
+    def _plan_allocation(order, stock):
+        """Work out an order's allocation against in-memory stock levels
 
-            for material in materials:
-                if not isinstance(material, dict) or 'name' not in material:
-                    continue
+        Allocates everything when every line is covered; otherwise allocates
+        what is on hand per line and leaves the rest as the shortage. The
+        quantities taken are deducted from ``stock`` so orders planned later
+        in a batch see what earlier ones used.
 
-                inventory_item = StoreInventory.query.filter_by(name=material['name']).first()
-                required_qty = material.get('quantity', 0)
-                available_qty = inventory_item.quantity if inventory_item else 0
+        Args:
+            order: PurchaseOrder with its lines loaded
+            stock: {material_id: available quantity}, updated in place
 
-                is_sufficient = available_qty >= required_qty
-                if not is_sufficient:
-                    all_available = False
-                    shortages.append({
-                        "name": material['name'], 
-                        "quantity": required_qty - available_qty
-                    })
+        Returns:
+            dict: Plan with 'lines' [(line, allocated, shortage)], 'shortages',
+                'allAvailable' and 'partial'
+        """
+        lines = [line for line in order.lines if line.purchased_quantity > 0]
+        shortages = []
+        for line in lines:
+            shortage = max(line.purchased_quantity - stock.get(line.material_id, 0), 0)
+            if shortage:
+                shortages.append({"name": line.material.name, "quantity": shortage})
 
-                stock_check_results.append({
-                    'material': material['name'],
-                    'required': required_qty,
-                    'available': available_qty,
-                    'sufficient': is_sufficient
-                })
+        planned = []
+        partial = False
+        for line in lines:
+            required_qty = line.purchased_quantity
+            allocated = min(required_qty, stock.get(line.material_id, 0))
+            if allocated > 0:
+                stock[line.material_id] -= allocated
+                if allocated < required_qty:
+                    partial = True
+            planned.append((line, allocated, required_qty - allocated))
 
-            if all_available:
-                # Allocate all materials
-                for material in materials:
-                    inventory_item = StoreInventory.query.filter_by(name=material['name']).first()
-                    if inventory_item:
-                        inventory_item.allocate(material.get('quantity', 0))
+        return {'lines': planned, 'shortages': shortages, 'allAvailable': not shortages, 'partial': partial}
+    
+    @staticmethod
+    def _apply_allocation(order, plan, production_order):
+        """Record a planned allocation on the order's lines and statuses"""
+        if plan['allAvailable']:
+            order.status = 'store_allocated'
+            if production_order:
+                production_order.status = 'materials_allocated'
+            return
 
-                order.status = 'store_allocated'
-                production_order = ProductionOrder.query.get(order.production_order_id)
-                if production_order:
-                    production_order.status = 'materials_allocated'
+        # Keep the original requirements of orders that never recorded them
+        if not any(line.required_quantity for line in order.lines):
+            for line, allocated, shortage in plan['lines']:
+                line.required_quantity = line.purchased_quantity
 
-                db.session.commit()
-                
+        # Only the shortage is left to purchase; Purchase prices it again
+        for line, allocated, shortage in plan['lines']:
+            line.purchased_quantity = shortage
+            line.unit_cost = 0.0
+
+        if plan['partial']:
+            order.status = 'partially_allocated'
+            if production_order:
+                production_order.status = 'partially_allocated'
+        else:
+            order.status = 'insufficient_stock'
+    
+    @staticmethod
+    def _allocate_orders(orders):
+        """Allocate stock to orders in the given sequence and flush once
+
+        Orders must already be locked by the caller. Returns one
+        (order, plan) pair per order that had open lines.
+        """
+        items = InventoryService._lock_stock({
+            line.material_id for order in orders for line in order.lines if line.purchased_quantity > 0
+        })
+        stock = {material_id: item.quantity for material_id, item in items.items()}
+        production_orders = {
+            production.id: production for production in ProductionOrder.query.filter(
+                ProductionOrder.id.in_({order.production_order_id for order in orders})
+            ).all()
+        } if orders else {}
+
+        results = []
+        for order in orders:
+            if not any(line.purchased_quantity > 0 for line in order.lines):
+                continue
+            plan = InventoryService._plan_allocation(order, stock)
+            InventoryService._apply_allocation(order, plan, production_orders.get(order.production_order_id))
+            results.append((order, plan))
+
+        now = datetime.utcnow()
+        for material_id, item in items.items():
+            if item.quantity != stock[material_id]:
+                item.quantity = stock[material_id]
+                item.updated_at = now
+        db.session.flush()
+        return results
+    
+    @staticmethod
+    def check_stock_availability(purchase_order_id):
+        """Check stock availability for a purchase order and allocate if possible"""
+        try:
+            order = PurchaseOrder.query.filter_by(id=purchase_order_id).with_for_update().first()
+            if not order:
+                raise Exception(f"Purchase order {purchase_order_id} not found")
+            
+            results = InventoryService._allocate_orders([order])
+            if not results:
+                raise Exception('No materials specified in order')
+            plan = results[0][1]
+            db.session.commit()
+
+            if plan['allAvailable']:
                 return {
                     "message": "All stock sufficient. Materials allocated to Assembly.",
                     "allAvailable": True,
                     "newStatus": order.status,
                     "purchaseOrder": order.to_dict()
                 }
-            else:
-                # Handle partial allocation
-                partial_allocated = False
+            
+            message = "Partial allocation done. Shortage sent to Purchase." if plan['partial'] else "Stock insufficient . Sent back to Purchase"
+            return {
+                "message": message,
+                "allAvailable": False,
+                "shortages": plan['shortages'],
+                "newStatus": order.status,
+                "purchaseOrder": order.to_dict()
+            }
 
-                for material in materials:
-                    inventory_item = StoreInventory.query.filter_by(name=material['name']).first()
-                    required_qty = material.get('quantity', 0)
-                    available_qty = inventory_item.quantity if inventory_item else 0
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Error checking stock: {str(e)}")
+    
+    @staticmethod
+    def allocate_pending_orders(limit=None):
+        """Run stock allocation for every order waiting on a store check
 
-                    if available_qty > 0:
-                        allocated = min(required_qty, available_qty)
-                        inventory_item.allocate(allocated)
-                        if allocated < required_qty:
-                            partial_allocated = True
+        Orders are ranked by how long they have waited (oldest first), so when
+        stock runs short the earliest requests are served before later ones.
+        All orders and the inventory rows they need are locked up front and
+        the whole batch commits as one transaction.
 
-                if shortages and partial_allocated:
-                    order.status = 'partially_allocated'
-                    order.set_materials_list(shortages)
-                    # Save original requirements if not already saved
-                    if not order.original_requirements:
-                        order.set_original_requirements(materials)
-                    
-                    production_order = ProductionOrder.query.get(order.production_order_id)
-                    if production_order:
-                        production_order.status = 'partially_allocated'
-                else:
-                    order.status = 'insufficient_stock'
-                    order.set_materials_list(shortages)
-                    # Save original requirements if not already saved
-                    if not order.original_requirements:
-                        order.set_original_requirements(materials)
+        Args:
+            limit: Optional maximum number of orders to process
 
-                db.session.commit()
-                
-                message = "Partial allocation done. Shortage sent to Purchase." if partial_allocated else "Stock insufficient . Sent back to Purchase"
-                
-                return {
-                    "message": message,
-                    "allAvailable": False,
-                    "shortages": shortages,
-                    "newStatus": order.status,
-                    "purchaseOrder": order.to_dict()
-                }
+        Returns:
+            dict: Counts per outcome and one result row per processed order
+        """
+        try:
+            query = PurchaseOrder.query.filter(
+                PurchaseOrder.status == 'pending_store_check'
+            ).order_by(PurchaseOrder.created_at.asc(), PurchaseOrder.id.asc())
+            if limit:
+                query = query.limit(limit)
+            orders = query.with_for_update().all()
+
+            results = InventoryService._allocate_orders(orders)
+
+            summary = {'store_allocated': 0, 'partially_allocated': 0, 'insufficient_stock': 0}
+            rows = []
+            for rank, (order, plan) in enumerate(results, start=1):
+                summary[order.status] += 1
+                rows.append({
+                    'rank': rank,
+                    'purchaseOrderId': order.id,
+                    'productionOrderId': order.production_order_id,
+                    'productName': order.product_name,
+                    'allAvailable': plan['allAvailable'],
+                    'newStatus': order.status,
+                    'shortages': plan['shortages']
+                })
+            db.session.commit()
+
+            return {
+                'message': f'Allocation run for {len(rows)} pending orders',
+                'processed': len(rows),
+                'allocated': summary['store_allocated'],
+                'partiallyAllocated': summary['partially_allocated'],
+                'insufficientStock': summary['insufficient_stock'],
+                'results': rows
+            }
 
         except Exception as e:
             db.session.rollback()
-            raise Exception(f"Error checking stock: {str(e)}")
+            raise Exception(f"Error allocating pending orders: {str(e)}")
     
     @staticmethod
     def process_purchase_verification(purchase_order_id):
         """Verify purchase and add materials to inventory, then allocate only original requirements"""
         try:
-            order = PurchaseOrder.query.get_or_404(purchase_order_id)
+            order = PurchaseOrder.query.filter_by(id=purchase_order_id).with_for_update().first()
+            if not order:
+                raise Exception(f"Purchase order {purchase_order_id} not found")
             
             if order.status != 'finance_approved':
                 raise Exception('Order must be finance approved first')
             
-            if not order.materials:
+            if not any(line.purchased_quantity for line in order.lines):
                 raise Exception('No materials specified in order')
             
-            # Get purchased materials (full quantities)
-            purchased_materials = order.get_materials_list()
-            
-            # Get original requirements (only what was actually needed)
-            original_requirements = order.get_original_requirements()
+            items = InventoryService._lock_stock({line.material_id for line in order.lines})
             
             # Step 1: Add ALL purchased materials to inventory
-            for material in purchased_materials:
-                if not isinstance(material, dict) or 'name' not in material:
-                    continue
-                
-                material_name = material['name']
-                material_qty = material.get('quantity', 0)
-                
-                inventory_item = StoreInventory.query.filter_by(name=material_name).first()
-                if inventory_item:
-                    inventory_item.add_stock(material_qty)
-                else:
-                    inventory_item = StoreInventory(
-                        name=material_name,
-                        quantity=material_qty,
-                        category=material.get('category', 'Raw Material')
-                    )
-                    db.session.add(inventory_item)
+            for line in order.lines:
+                if line.purchased_quantity:
+                    items[line.material_id].add_stock(line.purchased_quantity)
             
             # Step 2: Allocate only the original requirements for production
-            if original_requirements:
-                for requirement in original_requirements:
-                    if not isinstance(requirement, dict) or 'name' not in requirement:
-                        continue
-                    
-                    material_name = requirement['name']
-                    required_qty = requirement.get('quantity', 0)
-                    
-                    inventory_item = StoreInventory.query.filter_by(name=material_name).first()
-                    if inventory_item and inventory_item.quantity >= required_qty:
-                        inventory_item.allocate(required_qty)
+            for line in order.lines:
+                item = items[line.material_id]
+                if line.required_quantity and item.quantity >= line.required_quantity:
+                    item.allocate(line.required_quantity)
             
             # Mark order verified and materials allocated
             order.status = 'store_allocated'
@@ -272,6 +346,42 @@ class InventoryService:
             db.session.rollback()
             raise Exception(f"Error verifying purchase: {str(e)}")
     
+    @staticmethod
+    def get_shortage_report():
+        """Get per-material demand from open purchase orders against current stock
+
+        Demand is summed per material with one grouped query; only materials
+        whose demand exceeds stock are returned, largest shortage first.
+        """
+        try:
+            demand = db.func.sum(PurchaseOrderLine.purchased_quantity)
+            shortage = demand - StoreInventory.quantity
+            rows = db.session.query(
+                StoreInventory.id, StoreInventory.name, StoreInventory.category, StoreInventory.quantity,
+                demand.label('demand'), db.func.count(db.distinct(PurchaseOrderLine.purchase_order_id)).label('orders')
+            ).join(
+                PurchaseOrderLine, PurchaseOrderLine.material_id == StoreInventory.id
+            ).join(
+                PurchaseOrder, PurchaseOrderLine.purchase_order_id == PurchaseOrder.id
+            ).filter(
+                PurchaseOrder.status.in_(OPEN_PURCHASE_STATUSES),
+                PurchaseOrderLine.purchased_quantity > 0
+            ).group_by(
+                StoreInventory.id, StoreInventory.name, StoreInventory.category, StoreInventory.quantity
+            ).having(shortage > 0).order_by(shortage.desc(), StoreInventory.name).all()
+            
+            return [{
+                'materialId': row.id,
+                'name': row.name,
+                'category': row.category,
+                'inStock': row.quantity,
+                'demand': int(row.demand),
+                'shortage': int(row.demand) - row.quantity,
+                'openOrders': row.orders
+            } for row in rows]
+        except Exception as e:
+            raise Exception(f"Error building shortage report: {str(e)}")
+    
     @staticmethod
     def initialize_sample_data():
         """Initialize sample inventory data"""
@@ -2,16 +2,36 @@
 Notification Service Module
 Handles real-time notifications for various system events
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import json
+from flask import current_app, has_app_context
+from sqlalchemy import and_, func, literal, or_
+from models import db, Notification, StatusCounter
+from models.status_counter import TOTAL_STATUS
+from utils.changes import SessionHook
+from utils.rollup import apply_counter_deltas, rebuild_counters
+
+# Unread counts live in status_counter rows: (notification, unread, <department>)
+# per department and (notification, *, '') for all departments
+COUNTER_ENTITY = 'notification'
+UNREAD_STATUS = 'unread'
+DEFAULT_TTL_DAYS = 30
+PRUNE_INTERVAL = timedelta(hours=1)
+# Session.info flag: the transaction added notifications, prune once it commits
+PRUNE_KEY = 'notification_prune_due'
 
 class NotificationService:
-    """Service class for managing notifications"""
+    """Service class for managing notifications
+
+    Notifications are rows of the notification table, so every worker
+    process sees the same set. Unread counts per department are counter
+    rows changed in the same transaction as the notifications, so reading
+    them is a single-row lookup. Notifications older than
+    NOTIFICATION_TTL_DAYS are pruned after a transaction that added
+    notifications commits, at most once an hour per process.
+    """
     
-    # In-memory storage for notifications (in production, use Redis or database)
-    _notifications = []
-    _max_notifications = 100  # Keep only last 100 notifications
+    _last_pruned = None
     
     @classmethod
     def create_notification(cls, 
@@ -20,91 +40,203 @@ class NotificationService:
                           message: str,
                           data: Optional[Dict] = None,
                           department: Optional[str] = None,
-                          priority: str = 'normal') -> Dict:
-        """Create a new notification"""
-        
-        notification = {
-            'id': len(cls._notifications) + 1,
-            'type': notification_type,
-            'title': title,
-            'message': message,
-            'data': data or {},
-            'department': department,
-            'priority': priority,  # low, normal, high, urgent
-            'timestamp': datetime.utcnow().isoformat(),
-            'read': False
-        }
-        
-        # Add to notifications list
-        cls._notifications.append(notification)
-        
-        # Keep only the most recent notifications
-        if len(cls._notifications) > cls._max_notifications:
-            cls._notifications = cls._notifications[-cls._max_notifications:]
-        
-        return notification
+                          priority: str = 'normal',
+                          commit: bool = True) -> Dict:
+        """Create a new notification
+
+        Args:
+            commit: Commit right away; pass False to make the notification
+                part of the caller's transaction (committed or rolled back with it)
+        """
+        try:
+            notification = Notification(
+                type=notification_type,
+                title=title,
+                message=message,
+                department=department,
+                priority=priority  # low, normal, high, urgent
+            )
+            notification.set_data(data)
+            db.session.add(notification)
+            db.session.flush()
+            cls._adjust_unread({department: 1})
+            result = notification.to_dict()
+            _prune_on_commit._listen()
+            db.session.info[PRUNE_KEY] = True
+            
+            if commit:
+                db.session.commit()
+            return result
+        except Exception as e:
+            if commit:
+                db.session.rollback()
+            raise Exception(f"Error creating notification: {str(e)}")
     
     @classmethod
     def get_notifications(cls, 
                          department: Optional[str] = None,
                          unread_only: bool = False,
                          limit: int = 50) -> List[Dict]:
-        """Get notifications with optional filtering"""
-        
-        notifications = cls._notifications.copy()
-        
-        # Filter by department
+        """Get notifications with optional filtering, newest first"""
+        query = Notification.query
         if department:
-            notifications = [n for n in notifications if n.get('department') == department]
-        
-        # Filter by read status
+            query = query.filter(Notification.department == department)
         if unread_only:
-            notifications = [n for n in notifications if not n.get('read', False)]
-        
-        # Sort by timestamp (newest first)
-        notifications.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        # Apply limit
-        return notifications[:limit]
+            query = query.filter(Notification.read.is_(False))
+        notifications = query.order_by(
+            Notification.timestamp.desc(), Notification.id.desc()
+        ).limit(limit).all()
+        return [notification.to_dict() for notification in notifications]
     
     @classmethod
     def mark_as_read(cls, notification_id: int) -> bool:
-        """Mark a notification as read"""
-        
-        for notification in cls._notifications:
-            if notification['id'] == notification_id:
-                notification['read'] = True
-                return True
-        return False
+        """Mark a notification as read; False if it does not exist"""
+        if cls._mark_read(Notification.id == notification_id):
+            return True
+        return db.session.query(Notification.id).filter_by(id=notification_id).first() is not None
+    
+    @classmethod
+    def mark_many_as_read(cls, notification_ids: List[int]) -> int:
+        """Mark a batch of notifications as read; returns how many were unread"""
+        if not notification_ids:
+            return 0
+        return cls._mark_read(Notification.id.in_(set(notification_ids)))
     
     @classmethod
     def mark_all_as_read(cls, department: Optional[str] = None) -> int:
         """Mark all notifications as read, optionally filtered by department"""
-        
-        count = 0
-        for notification in cls._notifications:
-            if not notification.get('read', False):
-                if department is None or notification.get('department') == department:
-                    notification['read'] = True
-                    count += 1
-        return count
+        if department is None:
+            return cls._mark_read()
+        return cls._mark_read(Notification.department == department)
     
     @classmethod
     def get_unread_count(cls, department: Optional[str] = None) -> int:
-        """Get count of unread notifications"""
+        """Get count of unread notifications (one counter row lookup)"""
+        rows = cls._unread_counters(department)
+        if TOTAL_STATUS not in rows:
+            cls.rebuild_unread_counts()
+            rows = cls._unread_counters(department)
+        if department:
+            return int(rows.get(UNREAD_STATUS, 0))
+        return int(rows.get(TOTAL_STATUS, 0))
+    
+    @classmethod
+    def prune_expired(cls, ttl_days: Optional[int] = None) -> int:
+        """Delete notifications older than the TTL; returns how many were deleted
         
-        notifications = cls._notifications
+        Runs in a transaction of its own, so it can follow the commit of the
+        request's session (see _PruneOnCommit).
+        """
+        if ttl_days is None:
+            ttl_days = current_app.config.get('NOTIFICATION_TTL_DAYS', DEFAULT_TTL_DAYS) if has_app_context() else DEFAULT_TTL_DAYS
+        cutoff = datetime.utcnow() - timedelta(days=ttl_days)
+        table = Notification.__table__
+        try:
+            expired = Notification.timestamp < cutoff
+            deleted = 0
+            deltas = {}
+            with db.engine.begin() as conn:
+                # Delete unread ones per department so the counters drop by exactly what was removed
+                for department in cls._unread_departments(expired, connection=conn):
+                    count = conn.execute(table.delete().where(
+                        expired, Notification.read.is_(False), cls._department_filter(department)
+                    )).rowcount
+                    deltas[department] = -count
+                    deleted += count
+                deleted += conn.execute(table.delete().where(expired)).rowcount
+                cls._adjust_unread(deltas, connection=conn)
+            cls._last_pruned = datetime.utcnow()
+            return deleted
+        except Exception as e:
+            raise Exception(f"Error pruning notifications: {str(e)}")
+    
+    @classmethod
+    def rebuild_unread_counts(cls) -> None:
+        """Recount unread notifications per department into the counter rows
         
+        Runs in transactions of its own (utils.rollup.rebuild_counters), so
+        reads can trigger it without committing the request's session.
+        """
+        try:
+            rebuild_counters(COUNTER_ENTITY, Notification.__table__, db.select(
+                literal(UNREAD_STATUS), Notification.department, func.count(Notification.id), literal(0)
+            ).where(Notification.read.is_(False)).group_by(Notification.department))
+        except Exception as e:
+            raise Exception(f"Error rebuilding notification counts: {str(e)}")
+    
+    @classmethod
+    def _mark_read(cls, *filters) -> int:
+        """Mark matching unread notifications read, adjusting counters by the rows changed"""
+        try:
+            now = datetime.utcnow()
+            marked = 0
+            deltas = {}
+            for department in cls._unread_departments(*filters):
+                count = Notification.query.filter(
+                    Notification.read.is_(False), cls._department_filter(department), *filters
+                ).update({'read': True, 'read_at': now}, synchronize_session=False)
+                deltas[department] = -count
+                marked += count
+            cls._adjust_unread(deltas)
+            db.session.commit()
+            return marked
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Error marking notifications as read: {str(e)}")
+    
+    @staticmethod
+    def _unread_departments(*filters, connection=None) -> List[Optional[str]]:
+        statement = db.select(Notification.department).where(
+            Notification.read.is_(False), *filters
+        ).distinct()
+        return [department for (department,) in (connection or db.session).execute(statement)]
+    
+    @staticmethod
+    def _department_filter(department):
+        if department is None:
+            return Notification.department.is_(None)
+        return Notification.department == department
+    
+    @staticmethod
+    def _unread_counters(department: Optional[str]) -> Dict[str, int]:
+        conditions = [StatusCounter.status == TOTAL_STATUS]
         if department:
-            notifications = [n for n in notifications if n.get('department') == department]
-        
-        return len([n for n in notifications if not n.get('read', False)])
+            conditions.append(and_(StatusCounter.status == UNREAD_STATUS, StatusCounter.dimension == department))
+        return {
+            status: count for status, count in db.session.query(StatusCounter.status, StatusCounter.count).filter(
+                StatusCounter.entity == COUNTER_ENTITY, or_(*conditions)
+            ).all()
+        }
+    
+    @staticmethod
+    def _adjust_unread(deltas: Dict[Optional[str], int], connection=None) -> None:
+        """Apply {department: change} to the unread counters in the session's (or connection's) transaction"""
+        counter_deltas = {
+            (COUNTER_ENTITY, UNREAD_STATUS, department or ''): (change, 0)
+            for department, change in deltas.items() if change
+        }
+        if not counter_deltas:
+            return
+        counter_deltas[(COUNTER_ENTITY, TOTAL_STATUS, '')] = (sum(deltas.values()), 0)
+        apply_counter_deltas(connection or db.session.connection(), counter_deltas)
+    
+    @classmethod
+    def _prune_if_due(cls) -> None:
+        if cls._last_pruned is not None and datetime.utcnow() - cls._last_pruned < PRUNE_INTERVAL:
+            return
+        try:
+            cls.prune_expired()
+        except Exception:
+            # Pruning is housekeeping; the notification itself is already saved
+            cls._last_pruned = datetime.utcnow()
+            if has_app_context():
+                current_app.logger.exception("Notification pruning failed")
     
     # Specific notification types for transport/fleet management
     
     @classmethod
     def notify_driver_assigned(cls, driver_name: str, vehicle_number: str, 
-                              order_number: str, customer_name: str) -> Dict:
+                              order_number: str, customer_name: str, commit: bool = True) -> Dict:
         """Notify when a driver is assigned to a delivery"""
         
         return cls.create_notification(
@@ -119,12 +251,13 @@ class NotificationService:
                 'action': 'assigned'
             },
             department='transport',
-            priority='normal'
+            priority='normal',
+            commit=commit
         )
     
     @classmethod
     def notify_driver_available(cls, driver_name: str, vehicle_number: str, 
-                               order_number: str, delivery_status: str) -> Dict:
+                               order_number: str, delivery_status: str, commit: bool = True) -> Dict:
         """Notify when a driver becomes available after delivery completion"""
         
         status_messages = {
@@ -147,13 +280,14 @@ class NotificationService:
                 'action': 'available'
             },
             department='transport',
-            priority='normal'
+            priority='normal',
+            commit=commit
         )
     
     @classmethod
     def notify_delivery_status_change(cls, order_number: str, old_status: str, 
                                     new_status: str, driver_name: str, 
-                                    vehicle_number: str) -> Dict:
+                                    vehicle_number: str, commit: bool = True) -> Dict:
         """Notify when delivery status changes"""
         
         priority = 'high' if new_status in ['delivered', 'failed'] else 'normal'
@@ -170,13 +304,14 @@ class NotificationService:
                 'vehicleNumber': vehicle_number
             },
             department='transport',
-            priority=priority
+            priority=priority,
+            commit=commit
         )
     
     @classmethod
     def notify_vehicle_status_change(cls, vehicle_number: str, driver_name: str,
                                    old_status: str, new_status: str, 
-                                   context: str = '') -> Dict:
+                                   context: str = '', commit: bool = True) -> Dict:
         """Notify when vehicle status changes"""
         
         context_msg = f" ({context})" if context else ""
@@ -193,5 +328,27 @@ class NotificationService:
                 'context': context
             },
             department='fleet',
-            priority='normal'
-        )
\ No newline at end of file
+            priority='normal',
+            commit=commit
+        )
+
+
+class _PruneOnCommit(SessionHook):
+    """Runs the due prune once a transaction that added notifications commits
+
+    Transport updates add their notifications to the caller's transaction
+    (commit=False); the prune follows that commit rather than the
+    notification call.
+    """
+
+    session_events = ('after_commit', 'after_rollback')
+
+    def _after_commit(self, session):
+        if session.info.pop(PRUNE_KEY, False) and has_app_context():
+            NotificationService._prune_if_due()
+
+    def _after_rollback(self, session):
+        session.info.pop(PRUNE_KEY, None)
+
+
+_prune_on_commit = _PruneOnCommit()
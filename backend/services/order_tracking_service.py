@@ -1,70 +1,87 @@
 """
 Order tracking and status management service
 """
-import json
 from datetime import datetime, timedelta
-from models import db, ProductionOrder, PurchaseOrder, AssemblyOrder, ShowroomProduct
+from models import db, ProductionOrder, PurchaseOrder, AssemblyOrder, ShowroomProduct, SalesOrder, DispatchRequest, StageEstimate
+from utils.pagination import paginate_query, build_page
+from utils.cache import cached
+from utils.changes import chunks
+from utils.search import order_search
+from utils.status_log import status_log
+from utils.estimates import stage_estimator, current_stages, STAGE_NAMES, STAGE_INDEX
+
+SEARCH_PAGE_SIZE = 50
+
+# Department shown for each status_event entity
+ENTITY_DEPARTMENTS = {
+    'production_order': 'Production',
+    'purchase_order': 'Purchase',
+    'assembly_order': 'Assembly',
+    'showroom_product': 'Showroom',
+    'sales_order': 'Sales',
+    'sales_payment': 'Finance',
+    'dispatch_request': 'Dispatch',
+    'transport_job': 'Transport',
+    'gate_pass': 'Watchman',
+}
+# Purchase order statuses that belong to the store's allocation step
+STORE_STATUSES = {'pending_store_check', 'store_allocated', 'partially_allocated', 'insufficient_stock'}
+# Purchase order statuses after approval, while the store checks and allocates materials
+STORE_CHECK_STATUSES = {'finance_approved', 'pending_store_check', 'partially_allocated', 'insufficient_stock'}
 
 class OrderTrackingService:
     """Service class for comprehensive order tracking and status management"""
     
     @staticmethod
-    def get_current_order_log():
-        """Get comprehensive order log showing current status across all departments"""
+    @cached('orders.current_log', tags=(
+        'production_order', 'purchase_order', 'purchase_order_line', 'store_inventory',
+        'assembly_order', 'showroom_product', 'sales_order', 'dispatch_request', 'transport_job',
+        'status_event', 'stage_estimate'
+    ))
+    def get_current_order_log(category=None, status=None, page=None):
+        """Get comprehensive order log showing current status across all departments
+        
+        When ``page`` ({'limit', 'cursor'}) is given, a single keyset page
+        ordered by (created_at, id) is returned instead of the full log.
+        Pages carry no ``summary``: it counts every order matching the
+        filters, which is the full load a page avoids (and a summary of the
+        page alone would read as one of the whole log). Clients showing the
+        totals request the unpaginated log.
+        """
         try:
             # Get all production orders - showroom no longer tracks sold status
-            orders = db.session.query(ProductionOrder).order_by(
-                ProductionOrder.created_at.desc()
-            ).all()
+            query = db.session.query(ProductionOrder)
+            if category:
+                query = query.filter(ProductionOrder.category == category)
+            if status:
+                query = query.filter(ProductionOrder.status == status)
+            
+            if page:
+                orders, next_cursor = paginate_query(
+                    query, ProductionOrder.created_at, ProductionOrder.id, page['limit'], page['cursor']
+                )
+            else:
+                orders = query.order_by(ProductionOrder.created_at.desc()).all()
+            
+            # Load related purchase/assembly/showroom rows in one query per table
+            purchase_orders, assembly_orders, showroom_products = \
+                OrderTrackingService._load_related_records([order.id for order in orders])
+            lookup, logged_stages = OrderTrackingService._load_estimates([order.id for order in orders])
             
             order_log = []
             
             for order in orders:
-                # Get related data
-                purchase_order = PurchaseOrder.query.filter_by(production_order_id=order.id).first()
-                assembly_order = AssemblyOrder.query.filter_by(production_order_id=order.id).first()
-                showroom_product = ShowroomProduct.query.filter_by(production_order_id=order.id).first()
-                
-                # Determine current status and department
-                status_info = OrderTrackingService._determine_order_status(
-                    order, purchase_order, assembly_order, showroom_product
-                )
+                purchase_order = purchase_orders.get(order.id)
+                assembly_order = assembly_orders.get(order.id)
+                showroom_product = showroom_products.get(order.id)
                 
-                # Calculate estimated completion
-                estimated_completion = OrderTrackingService._calculate_estimated_completion(
-                    status_info['progress_percentage']
-                )
-                
-                # Get materials list
-                materials_list = []
-                if purchase_order and purchase_order.materials:
-                    try:
-                        materials_list = json.loads(purchase_order.materials) if isinstance(purchase_order.materials, str) else purchase_order.materials
-                    except:
-                        materials_list = []
-                
-                order_log.append({
-                    'id': order.id,
-                    'productName': order.product_name,
-                    'category': order.category,
-                    'quantity': order.quantity,
-                    'currentStatus': status_info['current_status'],
-                    'currentDepartment': status_info['current_department'],
-                    'statusColor': status_info['status_color'],
-                    'progressPercentage': status_info['progress_percentage'],
-                    'createdAt': order.created_at.isoformat(),
-                    'createdBy': order.created_by,
-                    'estimatedCompletion': estimated_completion,
-                    'materials': materials_list,
-                    'orderValue': len(materials_list) * 15 * order.quantity,  # Estimated value
-                    'priority': OrderTrackingService._determine_priority(status_info['progress_percentage']),
-                    
-                    # Additional status details
-                    'purchaseStatus': purchase_order.status if purchase_order else None,
-                    'assemblyStatus': assembly_order.status if assembly_order else None,
-                    'assemblyProgress': assembly_order.progress if assembly_order else 0,
-                    'showroomStatus': showroom_product.showroom_status if showroom_product else None,
-                })
+                order_log.append(OrderTrackingService._build_order_log_entry(
+                    order, purchase_order, assembly_order, showroom_product,
+                    lookup=lookup, logged_stage=logged_stages.get(order.id)
+                ))
+            
+            if page:
+                return build_page(order_log, next_cursor, page['limit'], key='orders')
             
             # Calculate summary statistics
             summary = OrderTrackingService._calculate_summary_stats(order_log)
@@ -78,6 +95,105 @@ class OrderTrackingService:
         except Exception as e:
             raise Exception(f"Error generating order log: {str(e)}")
     
+    @staticmethod
+    def _load_related_records(order_ids):
+        """Batch-load purchase, assembly and showroom rows keyed by production order id.
+        
+        Keeps the lowest id per production order, matching the previous
+        ``filter_by(production_order_id=...).first()`` lookups.
+        
+        Args:
+            order_ids: Production order ids to load related rows for
+            
+        Returns:
+            tuple: (purchase_orders, assembly_orders, showroom_products) dicts
+        """
+        related = []
+        for model in (PurchaseOrder, AssemblyOrder, ShowroomProduct):
+            by_order = {}
+            # A production order's rows all fall in one chunk, so the lowest id still wins
+            for chunk in chunks(set(order_ids)):
+                rows = model.query.filter(
+                    model.production_order_id.in_(chunk)
+                ).order_by(model.id.asc()).all()
+                for row in rows:
+                    by_order.setdefault(row.production_order_id, row)
+            related.append(by_order)
+        return tuple(related)
+    
+    @staticmethod
+    def _load_estimates(order_ids):
+        """Get the learned stage estimates and each order's stage according to the status log
+        
+        Returns:
+            tuple: (StageLookup or None when nothing was learned yet,
+                    {order id: (stage or None once delivered, entered at)})
+        """
+        if not stage_estimator.enabled():
+            return None, {}
+        lookup = stage_estimator.lookup()
+        if not lookup:
+            return None, {}
+        logged_stages = current_stages(order_ids) if status_log.enabled() else {}
+        return lookup, logged_stages
+    
+    @staticmethod
+    def _build_order_log_entry(order, purchase_order, assembly_order, showroom_product, lookup=None, logged_stage=None):
+        """Build a single order log row from an order and its related records
+        
+        ``logged_stage`` is the (stage, entered at) the status log places the
+        order in; it wins unless the records show the order further along.
+        """
+        # Determine current status and department
+        status_info = OrderTrackingService._determine_order_status(
+            order, purchase_order, assembly_order, showroom_product
+        )
+        stage = OrderTrackingService._current_stage(purchase_order, assembly_order, showroom_product)
+        entered_at = None
+        if logged_stage and (logged_stage[0] is None or STAGE_INDEX[logged_stage[0]] >= STAGE_INDEX[stage]):
+            stage, entered_at = logged_stage
+        
+        # Estimate completion from learned stage durations, or from progress without history
+        estimate = OrderTrackingService._estimate_completion(order.category, stage, entered_at, lookup)
+        if stage is None:
+            # Delivered: nothing left to estimate
+            estimated_completion, priority = None, 'Low'
+        elif estimate:
+            estimated_completion, priority = estimate
+        else:
+            estimated_completion = OrderTrackingService._calculate_estimated_completion(
+                status_info['progress_percentage']
+            )
+            priority = OrderTrackingService._determine_priority(status_info['progress_percentage'])
+        
+        # Get materials list
+        materials_list = purchase_order.get_materials_list() if purchase_order else []
+        
+        return {
+            'id': order.id,
+            'productName': order.product_name,
+            'category': order.category,
+            'quantity': order.quantity,
+            'currentStatus': status_info['current_status'],
+            'currentDepartment': status_info['current_department'],
+            'statusColor': status_info['status_color'],
+            'progressPercentage': status_info['progress_percentage'],
+            'createdAt': order.created_at.isoformat(),
+            'createdBy': order.created_by,
+            'estimatedCompletion': estimated_completion,
+            'estimateSource': 'history' if estimate else ('progress' if stage else None),
+            'currentStage': stage,
+            'materials': materials_list,
+            'orderValue': len(materials_list) * 15 * order.quantity,  # Estimated value
+            'priority': priority,
+            
+            # Additional status details
+            'purchaseStatus': purchase_order.status if purchase_order else None,
+            'assemblyStatus': assembly_order.status if assembly_order else None,
+            'assemblyProgress': assembly_order.progress if assembly_order else 0,
+            'showroomStatus': showroom_product.showroom_status if showroom_product else None,
+        }
+    
     @staticmethod
     def get_order_detailed_status(order_id):
         """Get detailed status information for a specific order"""
@@ -87,22 +203,130 @@ class OrderTrackingService:
             assembly_order = AssemblyOrder.query.filter_by(production_order_id=order.id).first()
             showroom_product = ShowroomProduct.query.filter_by(production_order_id=order.id).first()
             
-            # Build timeline
-            timeline = OrderTrackingService._build_order_timeline(
-                order, purchase_order, assembly_order, showroom_product
-            )
+            # Build timeline from the status log; infer it from timestamps when nothing was logged
+            events = status_log.history(production_order_id=order.id) if status_log.enabled() else []
+            if events:
+                timeline = OrderTrackingService._build_event_timeline(events)
+            else:
+                timeline = OrderTrackingService._build_order_timeline(
+                    order, purchase_order, assembly_order, showroom_product
+                )
             
             return {
                 'order': order.to_dict(),
                 'purchaseOrder': purchase_order.to_dict() if purchase_order else None,
                 'assemblyOrder': assembly_order.to_dict() if assembly_order else None,
                 'showroomProduct': showroom_product.to_dict() if showroom_product else None,
-                'timeline': timeline
+                'timeline': timeline,
+                'currentStage': timeline[-1] if events else None
             }
             
         except Exception as e:
             raise Exception(f"Error getting order details: {str(e)}")
     
+    @staticmethod
+    def get_order_timeline(production_order_id=None, sales_order_id=None):
+        """Get the status history of a production or sales order across departments
+        
+        A sales order's timeline includes the production chain of its product.
+        Reads one status_event range per order id.
+        
+        Raises:
+            ValueError: If the order is unknown or no id is given
+        """
+        if sales_order_id is not None:
+            sales_order = SalesOrder.query.get(sales_order_id)
+            if not sales_order:
+                raise ValueError('Sales order not found')
+            showroom_product = ShowroomProduct.query.get(sales_order.showroom_product_id)
+            production_order_id = showroom_product.production_order_id if showroom_product else None
+        elif production_order_id is None:
+            raise ValueError('A production or sales order id is required')
+        
+        try:
+            events = status_log.history(production_order_id=production_order_id, sales_order_id=sales_order_id)
+            timeline = OrderTrackingService._build_event_timeline(events)
+            return {
+                'productionOrderId': production_order_id,
+                'salesOrderId': sales_order_id,
+                'timeline': timeline,
+                'currentStage': timeline[-1] if timeline else None
+            }
+        except Exception as e:
+            raise Exception(f"Error getting order timeline: {str(e)}")
+    
+    @staticmethod
+    def get_stage_analytics(entity, since=None, from_status=None, to_status=None):
+        """Get time spent per status for an entity, and optionally a from → to cycle time
+        
+        Raises:
+            ValueError: If the entity is not logged or only one of from/to is given
+        """
+        if entity not in ENTITY_DEPARTMENTS:
+            raise ValueError(f"Unknown entity. Must be one of: {sorted(ENTITY_DEPARTMENTS)}")
+        if bool(from_status) != bool(to_status):
+            raise ValueError('from and to statuses must be given together')
+        try:
+            result = {
+                'entity': entity,
+                'since': since.isoformat() if since else None,
+                'stages': status_log.stage_durations(entity, since)
+            }
+            if from_status:
+                result['cycleTime'] = {
+                    'from': from_status,
+                    'to': to_status,
+                    **status_log.cycle_times(entity, from_status, to_status, since)
+                }
+            return result
+        except Exception as e:
+            raise Exception(f"Error computing stage analytics: {str(e)}")
+    
+    @staticmethod
+    def get_completion_estimates(category=None):
+        """Get the learned duration of each order chain stage, per product category"""
+        try:
+            query = StageEstimate.query
+            if category:
+                query = query.filter(StageEstimate.category == category)
+            estimates = query.order_by(StageEstimate.category.asc(), StageEstimate.stage.asc()).all()
+            refreshed_at = max((item.refreshed_at for item in estimates if item.refreshed_at), default=None)
+            return {
+                'stages': list(STAGE_NAMES),
+                'estimates': [item.to_dict() for item in estimates],
+                'refreshedAt': refreshed_at.isoformat() if refreshed_at else None
+            }
+        except Exception as e:
+            raise Exception(f"Error getting completion estimates: {str(e)}")
+    
+    @staticmethod
+    def refresh_completion_estimates(since=None):
+        """Relearn stage durations from the status log (batch job)"""
+        try:
+            return stage_estimator.refresh(since)
+        except Exception as e:
+            raise Exception(f"Error refreshing completion estimates: {str(e)}")
+    
+    @staticmethod
+    def _build_event_timeline(events):
+        """Build timeline entries from status events, oldest first"""
+        timeline = []
+        for index, item in enumerate(events):
+            department = ENTITY_DEPARTMENTS.get(item.entity, item.entity)
+            if item.entity == 'purchase_order' and item.status in STORE_STATUSES:
+                department = 'Store'
+            timeline.append({
+                'stage': f"{department}: {item.status}",
+                'status': 'active' if index == len(events) - 1 else 'completed',
+                'date': item.occurred_at.isoformat(),
+                'department': department,
+                'details': item.status,
+                'previousStatus': item.previous_status,
+                'entity': item.entity,
+                'entityId': item.entity_id
+            })
+        return timeline
+    
     @staticmethod
     def _determine_order_status(order, purchase_order, assembly_order, showroom_product):
         """Determine the current status, department, and progress of an order"""
@@ -209,6 +433,55 @@ class OrderTrackingService:
             'progress_percentage': progress_percentage
         }
     
+    @staticmethod
+    def _current_stage(purchase_order, assembly_order, showroom_product):
+        """Map an order's records to its utils.estimates stage
+        
+        Without status events the dispatch side is not loaded, so a sold
+        product counts as in dispatch.
+        """
+        if showroom_product:
+            if showroom_product.showroom_status == 'sold':
+                return 'dispatch'
+            if showroom_product.showroom_status in ('available', 'reserved'):
+                return 'awaiting_sale'
+            return 'showroom_review'
+        if assembly_order:
+            return 'showroom_review' if assembly_order.status in ('completed', 'sent_to_showroom') else 'assembly'
+        if purchase_order:
+            if purchase_order.status in ('store_allocated', 'verified_in_store'):
+                return 'assembly'
+            if purchase_order.status in STORE_CHECK_STATUSES:
+                return 'store_check'
+        return 'purchase_approval'
+    
+    @staticmethod
+    def _estimate_completion(category, stage, entered_at, lookup):
+        """Estimate completion and priority from learned stage durations
+        
+        The ETA is the rest of the current stage plus the median of every later
+        stage. Priority reflects how long the order has been in its stage:
+        High past the stage's p90, Medium past its median.
+        
+        Returns:
+            tuple: (ISO completion date, priority), or None without estimates for the stage
+        """
+        if lookup is None or stage is None:
+            return None
+        now = datetime.utcnow()
+        elapsed = max((now - entered_at).total_seconds(), 0.0) if entered_at else 0.0
+        remaining = lookup.remaining_seconds(category, stage, elapsed)
+        if remaining is None:
+            return None
+        median, p90 = lookup.stage(category, stage)
+        if elapsed > p90:
+            priority = 'High'
+        elif elapsed > median:
+            priority = 'Medium'
+        else:
+            priority = 'Low'
+        return (now + timedelta(seconds=remaining)).isoformat(), priority
+    
     @staticmethod
     def _calculate_estimated_completion(progress_percentage):
         """Calculate estimated completion date based on progress"""
@@ -228,27 +501,28 @@ class OrderTrackingService:
     
     @staticmethod
     def _calculate_summary_stats(order_log):
-        """Calculate summary statistics for orders"""
-        if not order_log:
-            return {
-                'inPurchase': 0,
-                'inFinance': 0,
-                'inStore': 0,
-                'inAssembly': 0,
-                'inShowroom': 0,
-                'totalValue': 0,
-                'avgProgress': 0
-            }
-        
-        return {
-            'inPurchase': len([o for o in order_log if o['currentDepartment'] == 'Purchase']),
-            'inFinance': len([o for o in order_log if o['currentDepartment'] == 'Finance']),
-            'inStore': len([o for o in order_log if o['currentDepartment'] == 'Store']),
-            'inAssembly': len([o for o in order_log if o['currentDepartment'] == 'Assembly']),
-            'inShowroom': len([o for o in order_log if o['currentDepartment'] == 'Showroom']),
-            'totalValue': sum(o['orderValue'] for o in order_log),
-            'avgProgress': sum(o['progressPercentage'] for o in order_log) / len(order_log)
+        """Calculate summary statistics for orders in a single pass"""
+        department_keys = {
+            'Purchase': 'inPurchase',
+            'Finance': 'inFinance',
+            'Store': 'inStore',
+            'Assembly': 'inAssembly',
+            'Showroom': 'inShowroom',
         }
+        summary = {key: 0 for key in department_keys.values()}
+        total_value = 0
+        total_progress = 0
+        
+        for entry in order_log:
+            key = department_keys.get(entry['currentDepartment'])
+            if key:
+                summary[key] += 1
+            total_value += entry['orderValue']
+            total_progress += entry['progressPercentage']
+        
+        summary['totalValue'] = total_value
+        summary['avgProgress'] = total_progress / len(order_log) if order_log else 0
+        return summary
     
     @staticmethod
     def _build_order_timeline(order, purchase_order, assembly_order, showroom_product):
@@ -292,106 +566,23 @@ class OrderTrackingService:
         return timeline
     
     @staticmethod
-    def get_order_status_tracking(query: str | None = None):
+    def get_order_status_tracking(query: str | None = None, limit: int | None = None, cursor: str | None = None):
         """Get real-time order status tracking for the status bar component.
-        If query provided, filter to related production and sales orders.
+        If query provided, return the matching production and sales orders
+        (best matches first, ``limit`` per page) plus the orders linked to them.
         """
         try:
-            from models import SalesOrder, DispatchRequest
-            
-            # Get production orders (last 30 days)
-            production_orders = db.session.query(ProductionOrder).filter(
-                ProductionOrder.created_at >= datetime.utcnow() - timedelta(days=30)
-            ).order_by(ProductionOrder.created_at.desc()).all()
-            
-            # Get sales orders (last 30 days)
-            sales_orders = db.session.query(SalesOrder).filter(
-                SalesOrder.created_at >= datetime.utcnow() - timedelta(days=30)
-            ).order_by(SalesOrder.created_at.desc()).all()
+            since = datetime.utcnow() - timedelta(days=30)
             
-            production_tracking = []
-            sales_tracking = []
-            
-            # Process Production Orders (Production → Purchase → Store → Assembly → Showroom)
-            for order in production_orders:
-                purchase_order = PurchaseOrder.query.filter_by(production_order_id=order.id).first()
-                assembly_order = AssemblyOrder.query.filter_by(production_order_id=order.id).first()
-                showroom_product = ShowroomProduct.query.filter_by(production_order_id=order.id).first()
-                
-                # Determine production order status (up to showroom)
-                current_info = OrderTrackingService._determine_current_department_and_status(
-                    order, purchase_order, assembly_order, showroom_product
-                )
-                
-                # Do not skip showroom stage; it must appear under Production Orders
-                
-                # Skip production orders that have been fully delivered (edge case if encoded)
-                if current_info.get('status') == 'delivered':
-                    continue
-
-                production_tracking.append({
-                    'id': f"PO-{order.id}",
-                    'orderNumber': f"PO-{order.id:04d}",
-                    'productName': order.product_name,
-                    'quantity': order.quantity,
-                    'currentDepartment': current_info['current_department'],
-                    'status': current_info['status'],
-                    'progress': current_info.get('progress'),
-                    'updatedAt': current_info.get('updated_at', order.created_at.isoformat()),
-                    'createdAt': order.created_at.isoformat(),
-                    'type': 'production'
-                })
-            
-            # Process Sales Orders (Customer Order → Payment → Dispatch → Delivery)
-            for sales_order in sales_orders:
-                try:
-                    showroom_product = ShowroomProduct.query.get(sales_order.showroom_product_id)
-                    dispatch_request = DispatchRequest.query.filter_by(sales_order_id=sales_order.id).first()
-                    
-                    # Enforce business rule: Sales tracking starts only after product reaches showroom
-                    # Skip sales orders whose product hasn't reached showroom availability
-                    if not showroom_product:
-                        continue
-                    showroom_status = getattr(showroom_product, 'showroom_status', None)
-                    if showroom_status not in ['available', 'sold']:
-                        # Until showroom availability, treat order as production-only
-                        continue
-
-                    # Determine sales order status
-                    current_info = OrderTrackingService._determine_current_department_and_status(
-                        order=None,
-                        purchase_order=None,
-                        assembly_order=None,
-                        showroom_product=showroom_product,
-                        sales_order=sales_order,
-                        dispatch_order=dispatch_request
-                    )
-                    
-                    # Skip delivered orders from status tracker as requested
-                    if current_info['status'] == 'delivered':
-                        continue
-                    
-                    sales_tracking.append({
-                        'id': f"SO-{sales_order.id}",
-                        'orderNumber': sales_order.order_number,
-                        'productName': showroom_product.name if showroom_product else 'Unknown Product',
-                        'quantity': sales_order.quantity,
-                        'currentDepartment': current_info['current_department'],
-                        'status': current_info['status'],
-                        'customerName': sales_order.customer_name,
-                        'finalAmount': sales_order.final_amount,
-                        'productionOrderId': getattr(showroom_product, 'production_order_id', None),
-                        'updatedAt': current_info.get('updated_at', sales_order.updated_at.isoformat()),
-                        'createdAt': sales_order.created_at.isoformat(),
-                        'type': 'sales'
-                    })
-                    
-                except Exception as e:
-                    print(f"Error processing sales order {sales_order.id}: {e}")
-                    continue
-            
-            # If no query, return all recent
             if not query or not str(query).strip():
+                production_orders = db.session.query(ProductionOrder).filter(
+                    ProductionOrder.created_at >= since
+                ).order_by(ProductionOrder.created_at.desc()).all()
+                sales_orders = db.session.query(SalesOrder).filter(
+                    SalesOrder.created_at >= since
+                ).order_by(SalesOrder.created_at.desc()).all()
+                production_tracking = OrderTrackingService._production_entries(production_orders)
+                sales_tracking = OrderTrackingService._sales_entries(sales_orders)
                 return {
                     'productionOrders': production_tracking,
                     'salesOrders': sales_tracking,
@@ -400,64 +591,186 @@ class OrderTrackingService:
                         'totalSalesOrders': len(sales_tracking)
                     }
                 }
-
-            # Normalize query
-            q = str(query).strip().lower()
-
-            def matches_order(o: dict) -> bool:
-                try:
-                    return (
-                        (o.get('orderNumber') or '').lower().find(q) != -1 or
-                        (o.get('productName') or '').lower().find(q) != -1 or
-                        (o.get('customerName') or '').lower().find(q) != -1 or
-                        (o.get('currentDepartment') or '').lower().find(q) != -1 or
-                        (o.get('status') or '').lower().find(q) != -1 or
-                        (str(o.get('id') or '')).lower().find(q) != -1
-                    )
-                except Exception:
-                    return False
-
-            # First pass: find directly matching items
-            matching_production = [o for o in production_tracking if matches_order(o)]
-            matching_sales = [o for o in sales_tracking if matches_order(o)]
-
-            # Collect related items: link via production id
-            related_production_ids = set()
-            for so in matching_sales:
-                if so.get('productionOrderId'):
-                    related_production_ids.add(so['productionOrderId'])
-
-            # From matching production, find linked sales by production id
-            for po in matching_production:
-                try:
-                    po_id_num = int(str(po['orderNumber']).replace('PO-', '')) if str(po['orderNumber']).startswith('PO-') else None
-                except Exception:
-                    po_id_num = None
-                if po_id_num:
-                    related_production_ids.add(po_id_num)
-
-            related_sales = [so for so in sales_tracking if so.get('productionOrderId') in related_production_ids]
-            related_production = [po for po in production_tracking if (
-                po.get('orderNumber') and po['orderNumber'].startswith('PO-') and
-                int(po['orderNumber'].split('PO-')[-1]) in related_production_ids
-            )]
-
-            # Union: direct matches + related
-            final_production = {id(po): po for po in matching_production + related_production}
-            final_sales = {id(so): so for so in matching_sales + related_sales}
-
+            
+            limit = limit or SEARCH_PAGE_SIZE
+            if not order_search.enabled():
+                return OrderTrackingService._filter_status_tracking(str(query), since)
+            
+            hits, next_cursor = order_search.search(query, since=since, limit=limit, cursor=cursor)
+            production_ids = [doc.ref_id for doc, _ in hits if doc.kind == 'production']
+            sales_ids = [doc.ref_id for doc, _ in hits if doc.kind == 'sales']
+            
+            # Related orders: the production order behind a matched sale and the sales of a matched production order
+            related_production_ids = set(production_ids) | {
+                doc.production_order_id for doc, _ in hits if doc.kind == 'sales' and doc.production_order_id
+            }
+            related_sales_ids = [sales_id for (sales_id,) in db.session.query(SalesOrder.id).join(
+                ShowroomProduct, SalesOrder.showroom_product_id == ShowroomProduct.id
+            ).filter(
+                ShowroomProduct.production_order_id.in_(related_production_ids),
+                SalesOrder.created_at >= since
+            ).order_by(SalesOrder.created_at.desc())] if related_production_ids else []
+            
+            production_orders = OrderTrackingService._load_in_order(
+                ProductionOrder, production_ids + sorted(related_production_ids - set(production_ids), reverse=True),
+                since
+            )
+            sales_orders = OrderTrackingService._load_in_order(
+                SalesOrder, sales_ids + [i for i in related_sales_ids if i not in set(sales_ids)], since
+            )
+            production_tracking = OrderTrackingService._production_entries(production_orders)
+            sales_tracking = OrderTrackingService._sales_entries(sales_orders)
+            
             return {
-                'productionOrders': list(final_production.values()),
-                'salesOrders': list(final_sales.values()),
+                'productionOrders': production_tracking,
+                'salesOrders': sales_tracking,
                 'summary': {
-                    'totalProductionOrders': len(final_production),
-                    'totalSalesOrders': len(final_sales)
-                }
+                    'totalProductionOrders': len(production_tracking),
+                    'totalSalesOrders': len(sales_tracking)
+                },
+                'limit': limit,
+                'nextCursor': next_cursor,
+                'hasMore': next_cursor is not None
             }
             
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Error getting order status tracking: {str(e)}")
     
+    @staticmethod
+    def _load_in_order(model, ids, since):
+        """Load rows created since ``since`` by id, keeping the order of ``ids``"""
+        if not ids:
+            return []
+        rows = {row.id: row for row in model.query.filter(model.id.in_(ids), model.created_at >= since).all()}
+        return [rows[i] for i in ids if i in rows]
+    
+    @staticmethod
+    def _production_entries(production_orders):
+        """Build status bar entries for production orders (Production → Purchase → Store → Assembly → Showroom)"""
+        purchase_orders, assembly_orders, showroom_products = \
+            OrderTrackingService._load_related_records([order.id for order in production_orders])
+        
+        entries = []
+        for order in production_orders:
+            current_info = OrderTrackingService._determine_current_department_and_status(
+                order, purchase_orders.get(order.id), assembly_orders.get(order.id), showroom_products.get(order.id)
+            )
+            
+            # Skip production orders that have been fully delivered (edge case if encoded)
+            if current_info.get('status') == 'delivered':
+                continue
+            
+            entries.append({
+                'id': f"PO-{order.id}",
+                'orderNumber': f"PO-{order.id:04d}",
+                'productName': order.product_name,
+                'quantity': order.quantity,
+                'currentDepartment': current_info['current_department'],
+                'status': current_info['status'],
+                'progress': current_info.get('progress'),
+                'updatedAt': current_info.get('updated_at', order.created_at.isoformat()),
+                'createdAt': order.created_at.isoformat(),
+                'type': 'production'
+            })
+        return entries
+    
+    @staticmethod
+    def _sales_entries(sales_orders):
+        """Build status bar entries for sales orders (Customer Order → Payment → Dispatch → Delivery)"""
+        product_ids = {order.showroom_product_id for order in sales_orders}
+        showroom_products = {
+            product.id: product for product in ShowroomProduct.query.filter(ShowroomProduct.id.in_(product_ids)).all()
+        } if product_ids else {}
+        
+        # Lowest id per sales order, matching the previous filter_by(...).first() lookup
+        dispatch_requests = {}
+        if sales_orders:
+            for dispatch_request in DispatchRequest.query.filter(
+                DispatchRequest.sales_order_id.in_([order.id for order in sales_orders])
+            ).order_by(DispatchRequest.id.asc()).all():
+                dispatch_requests.setdefault(dispatch_request.sales_order_id, dispatch_request)
+        
+        entries = []
+        for sales_order in sales_orders:
+            try:
+                showroom_product = showroom_products.get(sales_order.showroom_product_id)
+                
+                # Enforce business rule: Sales tracking starts only after product reaches showroom
+                if not showroom_product:
+                    continue
+                if getattr(showroom_product, 'showroom_status', None) not in ['available', 'sold']:
+                    # Until showroom availability, treat order as production-only
+                    continue
+                
+                current_info = OrderTrackingService._determine_current_department_and_status(
+                    order=None,
+                    purchase_order=None,
+                    assembly_order=None,
+                    showroom_product=showroom_product,
+                    sales_order=sales_order,
+                    dispatch_order=dispatch_requests.get(sales_order.id)
+                )
+                
+                # Skip delivered orders from status tracker as requested
+                if current_info['status'] == 'delivered':
+                    continue
+                
+                entries.append({
+                    'id': f"SO-{sales_order.id}",
+                    'orderNumber': sales_order.order_number,
+                    'productName': showroom_product.name,
+                    'quantity': sales_order.quantity,
+                    'currentDepartment': current_info['current_department'],
+                    'status': current_info['status'],
+                    'customerName': sales_order.customer_name,
+                    'finalAmount': sales_order.final_amount,
+                    'productionOrderId': getattr(showroom_product, 'production_order_id', None),
+                    'updatedAt': current_info.get('updated_at', sales_order.updated_at.isoformat()),
+                    'createdAt': sales_order.created_at.isoformat(),
+                    'type': 'sales'
+                })
+                
+            except Exception as e:
+                print(f"Error processing sales order {sales_order.id}: {e}")
+                continue
+        return entries
+    
+    @staticmethod
+    def _filter_status_tracking(query, since):
+        """Unindexed search over recent orders, used when order search is disabled"""
+        q = query.strip().lower()
+        production_tracking = OrderTrackingService._production_entries(
+            ProductionOrder.query.filter(ProductionOrder.created_at >= since).order_by(ProductionOrder.created_at.desc()).all()
+        )
+        sales_tracking = OrderTrackingService._sales_entries(
+            SalesOrder.query.filter(SalesOrder.created_at >= since).order_by(SalesOrder.created_at.desc()).all()
+        )
+        
+        def matches_order(o: dict) -> bool:
+            return any(
+                q in str(o.get(field) or '').lower()
+                for field in ('orderNumber', 'productName', 'customerName', 'currentDepartment', 'status', 'id')
+            )
+        
+        matching_production = [o for o in production_tracking if matches_order(o)]
+        matching_sales = [o for o in sales_tracking if matches_order(o)]
+        matched_sales_ids = {so['id'] for so in matching_sales}
+        related_ids = {so['productionOrderId'] for so in matching_sales if so.get('productionOrderId')}
+        related_ids.update(int(po['id'].split('-')[-1]) for po in matching_production)
+        
+        final_production = [po for po in production_tracking if int(po['id'].split('-')[-1]) in related_ids]
+        final_sales = [so for so in sales_tracking if so['id'] in matched_sales_ids or so.get('productionOrderId') in related_ids]
+        return {
+            'productionOrders': final_production,
+            'salesOrders': final_sales,
+            'summary': {
+                'totalProductionOrders': len(final_production),
+                'totalSalesOrders': len(final_sales)
+            }
+        }
+    
     @staticmethod
     def _determine_current_department_and_status(order, purchase_order, assembly_order, showroom_product, sales_order=None, dispatch_order=None):
         """Determine current department and status for status tracking"""
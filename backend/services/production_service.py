@@ -1,7 +1,6 @@
 """
 Production order business logic service
 """
-import json
 from models import db, ProductionOrder, PurchaseOrder, AssemblyOrder
 from utils.validators import validate_required_fields
 
@@ -40,10 +39,11 @@ class ProductionService:
             purchase_order = PurchaseOrder(
                 production_order_id=production_order.id,
                 product_name=data['productName'],
-                quantity=data['quantity'],
-                materials=json.dumps(data['materials']),
-                original_requirements=json.dumps(data['materials'])  # Save original requirements
+                quantity=data['quantity']
             )
+            # Save original requirements alongside the materials to purchase
+            purchase_order.set_original_requirements(data['materials'])
+            purchase_order.set_materials_list(data['materials'])
             
             # Create assembly order
             assembly_order = AssemblyOrder(
@@ -4,10 +4,17 @@ Handles business logic for sales operations
 """
 from datetime import datetime
 import uuid
-from models import db, SalesOrder, Customer, SalesTransaction, ShowroomProduct, FinanceTransaction, DispatchRequest, AssemblyOrder, TransportJob , GatePass
+from models import db, SalesOrder, Customer, SalesTransaction, ShowroomProduct, ShowroomStock, FinanceTransaction, DispatchRequest, TransportJob , GatePass
 from models.sales import TransportApprovalRequest
 from services.showroom_service import ShowroomService
+from services.showroom_stock_service import ShowroomStockService
 from services.approval_service import ApprovalService
+from utils.pagination import paginate_query, build_page
+from utils.rollup import Window, StatusRollup, day_range
+from utils.cache import cached
+from utils.changes import chunks
+from models.serialization import wants
+from sqlalchemy.orm import selectinload
 
 
 class SalesService:
@@ -15,41 +22,30 @@ class SalesService:
     
     @staticmethod
     def get_available_showroom_products():
-        """Get products with showroom_status == 'available'"""
-        available_products = ShowroomProduct.query.filter_by(
-            showroom_status='available'
+        """Get products with showroom_status == 'available' and stock left to sell"""
+        rows = db.session.query(ShowroomProduct, ShowroomStock).outerjoin(
+            ShowroomStock, ShowroomStock.showroom_product_id == ShowroomProduct.id
+        ).filter(
+            ShowroomProduct.showroom_status == 'available',
+            db.or_(ShowroomStock.id.is_(None), ShowroomStock.available_quantity > 0)
         ).order_by(ShowroomProduct.created_at.desc()).all()
         
+        # Products without a ledger (add_showroom_stock backfills them) are counted
+        # from their orders here; the first stock change saves the ledger
+        missing = [product for product, stock in rows if stock is None]
+        if missing:
+            computed = ShowroomStockService.build_ledgers(missing)
+            rows = [(product, stock or computed[product.id]) for product, stock in rows]
+        
         products = []
-        for product in available_products:
-            # Determine original quantity from assembly order by production_order_id
-            original_qty = 1
-            if product.production_order_id:
-                assembly_order = AssemblyOrder.query.filter_by(
-                    production_order_id=product.production_order_id
-                ).first()
-                if assembly_order:
-                    original_qty = assembly_order.quantity or 1
-
-            # Calculate already sold quantity for this showroom product
-            sold_qty = db.session.query(db.func.coalesce(db.func.sum(SalesOrder.quantity), 0)).\
-                filter(SalesOrder.showroom_product_id == product.id).scalar() or 0
-
-            remaining_qty = max(int(original_qty) - int(sold_qty), 0)
-
-            # If none remaining, update status and skip
-            if remaining_qty <= 0:
-                product.showroom_status = 'sold'
-                if not product.sold_date:
-                    product.sold_date = datetime.utcnow()
-                db.session.commit()
+        for product, stock in rows:
+            if stock.available_quantity <= 0:
                 continue
-
             products.append({
                 'id': product.id,
                 'name': product.name,
                 'category': product.category,
-                'quantity': remaining_qty,
+                'quantity': stock.available_quantity,
                 'salePrice': product.sale_price,
                 'costPrice': product.cost_price,
                 'displayedAt': product.created_at.isoformat(),
@@ -59,8 +55,15 @@ class SalesService:
         return products
     
     @staticmethod
-    def get_sales_orders(status=None, sales_person=None):
-        """Get sales orders with optional filtering"""
+    def get_sales_orders(status=None, sales_person=None, page=None, fields=None):
+        """Get sales orders with optional filtering
+
+        When ``page`` ({'limit', 'cursor'}) is given, a single keyset page
+        ordered by (created_at, id) is returned instead of the full list.
+        ``fields`` (see models.serialization.parse_fields) limits each order
+        to those keys; payment totals, the showroom product and the dispatch
+        check are each loaded once for the page, and skipped when not asked for.
+        """
         query = SalesOrder.query
         
         if status:
@@ -69,22 +72,35 @@ class SalesService:
         if sales_person:
             query = query.filter_by(sales_person=sales_person)
         
-        orders = query.order_by(SalesOrder.created_at.desc()).all()
-        
-        # Enhance orders with after sales status
-        enhanced_orders = []
-        for order in orders:
-            order_dict = order.to_dict()
-            
-            # Check if order has been sent to dispatch
-            dispatch_request = DispatchRequest.query.filter_by(sales_order_id=order.id).first()
-            if dispatch_request:
-                order_dict['afterSalesStatus'] = 'sent_to_dispatch'
-            else:
-                order_dict['afterSalesStatus'] = None
-                
-            enhanced_orders.append(order_dict)
+        if wants(fields, 'showroomProduct'):
+            query = query.options(selectinload(SalesOrder.showroom_product))
         
+        if page:
+            orders, next_cursor = paginate_query(
+                query, SalesOrder.created_at, SalesOrder.id, page['limit'], page['cursor']
+            )
+        else:
+            orders = query.order_by(SalesOrder.created_at.desc()).all()
+        
+        order_ids = [order.id for order in orders]
+        context = {}
+        if wants(fields, 'amountPaid', 'balanceAmount'):
+            context['amount_paid'] = SalesOrder.amounts_paid(order_ids)
+        
+        enhanced_orders = SalesOrder._serializer.dump_many(orders, fields, context)
+        
+        # Enhance orders with after sales status (whether the order has been sent to dispatch)
+        if wants(fields, 'afterSalesStatus'):
+            dispatched = set()
+            for chunk in chunks(order_ids):
+                dispatched.update(row.sales_order_id for row in db.session.query(DispatchRequest.sales_order_id).filter(
+                    DispatchRequest.sales_order_id.in_(chunk)
+                ).distinct())
+            for order_dict, order_id in zip(enhanced_orders, order_ids):
+                order_dict['afterSalesStatus'] = 'sent_to_dispatch' if order_id in dispatched else None
+        
+        if page:
+            return build_page(enhanced_orders, next_cursor, page['limit'])
         return enhanced_orders
     
     @staticmethod
@@ -103,34 +119,27 @@ class SalesService:
         if not showroom_product:
             raise ValueError('Showroom product not found')
         
-        if showroom_product.showroom_status != 'available':
-            raise ValueError('Product is not available for sale')
-        
-        # Compute remaining quantity available for sale
-        original_qty = 1
-        if showroom_product.production_order_id:
-            assembly_order = AssemblyOrder.query.filter_by(
-                production_order_id=showroom_product.production_order_id
-            ).first()
-            if assembly_order:
-                original_qty = assembly_order.quantity or 1
-        sold_qty = db.session.query(db.func.coalesce(db.func.sum(SalesOrder.quantity), 0)).\
-            filter(SalesOrder.showroom_product_id == showroom_product.id).scalar() or 0
-        remaining_qty = max(int(original_qty) - int(sold_qty), 0)
-        
-        # Requested quantity must be within remaining
+        # Requested quantity must be at least 1
         quantity = int(data.get('quantity', 1))
         if quantity <= 0:
             raise ValueError('Quantity must be at least 1')
-        if quantity > remaining_qty:
-            raise ValueError('Requested quantity exceeds available quantity')
+        
+        # Lock the product's stock row before checking availability so concurrent
+        # checkouts cannot both take the last units
+        try:
+            ShowroomStockService.lock_ledger(showroom_product.id)
+            if showroom_product.showroom_status != 'available':
+                raise ValueError('Product is not available for sale')
+            ShowroomStockService.reserve(showroom_product.id, quantity)
+        except ValueError:
+            db.session.rollback()
+            raise
         
         # Generate readable order number: SO-<CustInit>-<ProdInit>-<YYYYMMDD>-<4HEX>
         cust_name = (data.get('customerName') or '').strip()
         cust_init = ''.join([part[0] for part in cust_name.split()[:2]]).upper() or 'CU'
-        # Fetch product name for initials
-        prod = ShowroomProduct.query.get(data['showroomProductId'])
-        prod_name = (prod.name if prod else 'PROD').strip()
+        # Product name for initials
+        prod_name = (showroom_product.name or 'PROD').strip()
         prod_init = ''.join([part[0] for part in prod_name.split()[:2]]).upper() or 'PR'
         order_number = f"SO-{cust_init}-{prod_init}-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:4].upper()}"
         
@@ -188,12 +197,6 @@ class SalesService:
             )
             db.session.add(transport_approval)
         
-        # Mark sold only if fully exhausted
-        remaining_after = remaining_qty - quantity
-        if remaining_after <= 0:
-            showroom_product.showroom_status = 'sold'
-            showroom_product.sold_date = datetime.utcnow()
-        
         # Create finance transaction for revenue
         revenue_transaction = FinanceTransaction(
             transaction_type='revenue',
@@ -232,7 +235,8 @@ class SalesService:
         if 'customerAddress' in data:
             sales_order.customer_address = data['customerAddress']
         if 'orderStatus' in data:
-            sales_order.order_status = data['orderStatus']
+            # Cancellation, delivery and returns move the order's units in the stock ledger
+            ShowroomStockService.apply_order_status(sales_order, data['orderStatus'])
         if 'paymentStatus' in data:
             sales_order.payment_status = data['paymentStatus']
         if 'notes' in data:
@@ -299,6 +303,9 @@ class SalesService:
             total_amount = (unit_price * quantity) + transport_cost
             final_amount = total_amount - discount_amount
             
+            # Reserve or release the quantity difference
+            ShowroomStockService.change_order_quantity(sales_order, quantity)
+            
             # Update all amount fields
             sales_order.unit_price = unit_price
             sales_order.quantity = quantity
@@ -471,21 +478,22 @@ class SalesService:
         return customer.to_dict()
     
     @staticmethod
+    @cached('sales.summary', tags=('sales_order',))
     def get_sales_summary():
         """Get sales summary statistics"""
-        total_orders = SalesOrder.query.count()
-        total_revenue = db.session.query(db.func.sum(SalesOrder.final_amount)).scalar() or 0
-        pending_orders = SalesOrder.query.filter_by(order_status='pending').count()
-        completed_orders = SalesOrder.query.filter_by(order_status='delivered').count()
-        
-        # Today's sales
-        today = datetime.now().date()
-        today_orders = SalesOrder.query.filter(
-            db.func.date(SalesOrder.created_at) == today
-        ).count()
-        today_revenue = db.session.query(db.func.sum(SalesOrder.final_amount)).filter(
-            db.func.date(SalesOrder.created_at) == today
-        ).scalar() or 0
+        # One pass over the orders: totals by status plus today's orders and revenue
+        rollup = StatusRollup(
+            SalesOrder.order_status,
+            windows={'today': Window(SalesOrder.created_at, *day_range())},
+            sums={'revenue': SalesOrder.final_amount}
+        ).run()
+        
+        total_orders = rollup.count()
+        total_revenue = rollup.sum('revenue')
+        pending_orders = rollup.count('pending')
+        completed_orders = rollup.count('delivered')
+        today_orders = rollup.count(window='today')
+        today_revenue = rollup.sum('revenue', window='today')
         
         return {
             'totalOrders': total_orders,
@@ -3,7 +3,7 @@ Showroom Service Module
 Handles business logic for showroom operations
 """
 from datetime import datetime
-from models import db, ShowroomProduct, AssemblyOrder, FinanceTransaction, SalesOrder
+from models import db, ShowroomProduct, ShowroomStock, AssemblyOrder, FinanceTransaction, SalesOrder
 import json
 
 
@@ -143,6 +143,15 @@ class ShowroomService:
         )
 
         db.session.add(showroom_product)
+        db.session.flush()
+
+        # Open the stock ledger with the assembled quantity
+        original_quantity = assembly_order.quantity or 1
+        db.session.add(ShowroomStock(
+            showroom_product_id=showroom_product.id,
+            original_quantity=original_quantity,
+            available_quantity=original_quantity
+        ))
         db.session.commit()
 
         # Return in expected format
@@ -0,0 +1,177 @@
+"""
+Showroom Stock Service Module
+Maintains the per-product stock ledger (original, reserved, sold, available)
+"""
+from datetime import datetime
+from models import db, ShowroomProduct, ShowroomStock, SalesOrder, AssemblyOrder
+
+# Sales order statuses whose quantity counts as sold; released statuses hold no stock.
+# Every other status (pending, confirmed, in_dispatch, ...) keeps its quantity reserved.
+SOLD_STATUSES = ('delivered',)
+RELEASED_STATUSES = ('cancelled', 'returned')
+
+
+class ShowroomStockService:
+    """Service class for showroom stock ledger operations
+
+    Ledger methods lock the product's ledger row (SELECT ... FOR UPDATE) and
+    leave committing to the caller, so the stock change is part of the same
+    transaction as the order change that caused it.
+    """
+
+    @staticmethod
+    def stock_bucket(order_status):
+        """Get the ledger bucket ('reserved', 'sold' or None) for an order status"""
+        if order_status in SOLD_STATUSES:
+            return 'sold'
+        if order_status in RELEASED_STATUSES:
+            return None
+        return 'reserved'
+
+    @staticmethod
+    def build_ledgers(products):
+        """Compute ledgers for products that have none, from existing orders, without saving them
+
+        Original quantity comes from the product's assembly order; reserved and
+        sold quantities are summed from its sales orders. Uses one query for
+        assembly orders and one grouped query for order quantities.
+        """
+        products = [p for p in products if p.id is not None]
+        if not products:
+            return {}
+
+        production_ids = {p.production_order_id for p in products if p.production_order_id}
+        original_by_production = {}
+        if production_ids:
+            for assembly_order in AssemblyOrder.query.filter(
+                AssemblyOrder.production_order_id.in_(production_ids)
+            ).order_by(AssemblyOrder.id).all():
+                original_by_production.setdefault(assembly_order.production_order_id, assembly_order.quantity or 1)
+
+        totals = {}
+        for product_id, order_status, quantity in db.session.query(
+            SalesOrder.showroom_product_id, SalesOrder.order_status,
+            db.func.coalesce(db.func.sum(SalesOrder.quantity), 0)
+        ).filter(
+            SalesOrder.showroom_product_id.in_([p.id for p in products])
+        ).group_by(SalesOrder.showroom_product_id, SalesOrder.order_status).all():
+            bucket = ShowroomStockService.stock_bucket(order_status)
+            if bucket:
+                product_totals = totals.setdefault(product_id, {'reserved': 0, 'sold': 0})
+                product_totals[bucket] += int(quantity)
+
+        ledgers = {}
+        for product in products:
+            original = int(original_by_production.get(product.production_order_id, 1))
+            product_totals = totals.get(product.id, {'reserved': 0, 'sold': 0})
+            ledgers[product.id] = ShowroomStock(
+                showroom_product_id=product.id,
+                original_quantity=original,
+                reserved_quantity=product_totals['reserved'],
+                sold_quantity=product_totals['sold'],
+                available_quantity=max(original - product_totals['reserved'] - product_totals['sold'], 0)
+            )
+        return ledgers
+
+    @staticmethod
+    def create_ledgers(products):
+        """Create ledger rows for products that have none (see build_ledgers), leaving the commit to the caller"""
+        ledgers = ShowroomStockService.build_ledgers(products)
+        for product in products:
+            ledger = ledgers.get(product.id)
+            if ledger is not None:
+                db.session.add(ledger)
+                ShowroomStockService._sync_product_status(product, ledger)
+        db.session.flush()
+        return ledgers
+
+    @staticmethod
+    def lock_ledger(showroom_product_id):
+        """Get a product's ledger row locked for update, creating it if missing"""
+        ledger = ShowroomStock.query.filter_by(
+            showroom_product_id=showroom_product_id
+        ).with_for_update().first()
+        if ledger:
+            return ledger
+
+        product = ShowroomProduct.query.get(showroom_product_id)
+        if not product:
+            raise ValueError('Showroom product not found')
+        ShowroomStockService.create_ledgers([product])
+        return ShowroomStock.query.filter_by(
+            showroom_product_id=showroom_product_id
+        ).with_for_update().first()
+
+    @staticmethod
+    def move(showroom_product_id, quantity, from_bucket, to_bucket):
+        """Move units between ledger buckets ('reserved', 'sold' or None for available)
+
+        Raises:
+            ValueError: If the move would take more units than are available
+        """
+        quantity = int(quantity or 0)
+        ledger = ShowroomStockService.lock_ledger(showroom_product_id)
+        if quantity == 0 or from_bucket == to_bucket:
+            return ledger
+
+        if to_bucket and from_bucket is None and quantity > ledger.available_quantity:
+            raise ValueError('Requested quantity exceeds available quantity')
+
+        if from_bucket == 'reserved':
+            ledger.reserved_quantity = max(ledger.reserved_quantity - quantity, 0)
+        elif from_bucket == 'sold':
+            ledger.sold_quantity = max(ledger.sold_quantity - quantity, 0)
+        if to_bucket == 'reserved':
+            ledger.reserved_quantity += quantity
+        elif to_bucket == 'sold':
+            ledger.sold_quantity += quantity
+
+        ledger.available_quantity = max(
+            ledger.original_quantity - ledger.reserved_quantity - ledger.sold_quantity, 0
+        )
+        ledger.updated_at = datetime.utcnow()
+        ShowroomStockService._sync_product_status(ledger.showroom_product, ledger)
+        return ledger
+
+    @staticmethod
+    def reserve(showroom_product_id, quantity):
+        """Reserve units for a new sales order"""
+        return ShowroomStockService.move(showroom_product_id, quantity, None, 'reserved')
+
+    @staticmethod
+    def apply_order_status(sales_order, new_status):
+        """Set a sales order's status and move its quantity to the matching bucket
+
+        Delivery turns the reservation into a sale, cancellation releases it,
+        and cancelling or returning a delivered order puts the units back on sale.
+        """
+        from_bucket = ShowroomStockService.stock_bucket(sales_order.order_status)
+        to_bucket = ShowroomStockService.stock_bucket(new_status)
+        if from_bucket != to_bucket:
+            ShowroomStockService.move(sales_order.showroom_product_id, sales_order.quantity, from_bucket, to_bucket)
+        sales_order.order_status = new_status
+
+    @staticmethod
+    def change_order_quantity(sales_order, new_quantity):
+        """Adjust the ledger for a change in an order's quantity (order not yet updated)"""
+        bucket = ShowroomStockService.stock_bucket(sales_order.order_status)
+        delta = int(new_quantity) - int(sales_order.quantity or 0)
+        if bucket is None or delta == 0:
+            return
+        if delta > 0:
+            ShowroomStockService.move(sales_order.showroom_product_id, delta, None, bucket)
+        else:
+            ShowroomStockService.move(sales_order.showroom_product_id, -delta, bucket, None)
+
+    @staticmethod
+    def _sync_product_status(product, ledger):
+        """Keep the product's showroom_status in step with its available quantity"""
+        if product is None or product.showroom_status not in ('available', 'sold'):
+            return
+        if ledger.available_quantity <= 0:
+            if product.showroom_status != 'sold':
+                product.showroom_status = 'sold'
+                product.sold_date = product.sold_date or datetime.utcnow()
+        elif product.showroom_status == 'sold':
+            product.showroom_status = 'available'
+            product.sold_date = None
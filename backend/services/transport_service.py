@@ -2,12 +2,23 @@
 Transport Service Module
 Handles business logic for transport operations (company delivery orders)
 """
+import time
 from datetime import datetime, timedelta
 from models import db, TransportJob, DispatchRequest, SalesOrder, ShowroomProduct, Vehicle
 from models.sales import TransportApprovalRequest, SalesTransaction
 from models.showroom import GatePass
 from models.transport import PartLoadDetail
 from services.notification_service import NotificationService
+from services.showroom_stock_service import ShowroomStockService
+from models.serialization import wants, project
+from utils.pagination import paginate_query, build_page
+from utils.loaders import dispatch_graph_options, transport_job_graph_options
+from utils.rollup import Window, StatusRollup, day_range
+from utils.cache import cached
+from utils.fleet import PlanJob, PlanVehicle, plan_loads, parse_capacity, area_key
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 
 
 class TransportService:
@@ -56,7 +67,7 @@ class TransportService:
             completed_dispatches = DispatchRequest.query.filter(
                 DispatchRequest.original_delivery_type == 'part load',
                 DispatchRequest.status == 'completed'
-            ).all()
+            ).options(*dispatch_graph_options()).all()
             
             # Also check verified gate passes
             from models.showroom import GatePass
@@ -68,7 +79,7 @@ class TransportService:
             verified_dispatches = DispatchRequest.query.filter(
                 DispatchRequest.original_delivery_type == 'part load',
                 DispatchRequest.id.in_(verified_dispatch_ids)
-            ).all()
+            ).options(*dispatch_graph_options()).all()
             
             # Combine all completed dispatches
             all_dispatches = {d.id: d for d in completed_dispatches}
@@ -78,12 +89,10 @@ class TransportService:
             # Try to match by ID or order number
             for dispatch in all_dispatches.values():
                 if (str(dispatch.id) == str(order_identifier) or 
-                    (dispatch.sales_order_id and 
-                     SalesOrder.query.get(dispatch.sales_order_id) and
-                     SalesOrder.query.get(dispatch.sales_order_id).order_number == str(order_identifier))):
+                    (dispatch.sales_order and
+                     dispatch.sales_order.order_number == str(order_identifier))):
                     dispatch_request = dispatch
-                    if dispatch_request.sales_order_id:
-                        sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
+                    sales_order = dispatch_request.sales_order
                     break
         
         # Final validation
@@ -154,7 +163,7 @@ class TransportService:
             completed_dispatches = DispatchRequest.query.filter(
                 DispatchRequest.original_delivery_type == 'part load',
                 DispatchRequest.status == 'completed'
-            ).all()
+            ).options(*dispatch_graph_options()).all()
 
             # 2. Verified by security (gate pass)
             verified_dispatch_ids = (
@@ -165,35 +174,36 @@ class TransportService:
             verified_dispatches = DispatchRequest.query.filter(
                 DispatchRequest.original_delivery_type == 'part load',
                 DispatchRequest.id.in_(verified_dispatch_ids)
-            ).all()
+            ).options(*dispatch_graph_options()).all()
 
             # Combine and deduplicate
             all_dispatches = {d.id: d for d in completed_dispatches}
             for d in verified_dispatches:
                 all_dispatches[d.id] = d
 
+            # Part load details for all orders in one query (first row per sales order)
+            sales_order_ids = {d.sales_order_id for d in all_dispatches.values() if d.sales_order_id}
+            part_load_details = {}
+            if sales_order_ids:
+                for detail in PartLoadDetail.query.filter(
+                    PartLoadDetail.sales_order_id.in_(sales_order_ids)
+                ).order_by(PartLoadDetail.id).all():
+                    part_load_details.setdefault(detail.sales_order_id, detail)
+
             orders = []
             for request in all_dispatches.values():
-                # Get sales order if available
-                sales_order = None
-                if request.sales_order_id:
-                    sales_order = SalesOrder.query.get(request.sales_order_id)
-
-                # Get showroom product if available
-                showroom_product = None
-                if hasattr(request, 'showroom_product_id') and request.showroom_product_id:
-                    showroom_product = ShowroomProduct.query.get(request.showroom_product_id)
+                # Related sales order, product, transport job and gate pass are already loaded
+                sales_order = request.sales_order
+                showroom_product = request.showroom_product
 
                 # Get part load details if exists
-                part_load_detail = None
-                if sales_order:
-                    part_load_detail = PartLoadDetail.query.filter_by(sales_order_id=sales_order.id).first()
+                part_load_detail = part_load_details.get(sales_order.id) if sales_order else None
 
                 # Find the transport job for this dispatch request
-                transport_job = TransportJob.query.filter_by(dispatch_request_id=request.id).first()
+                transport_job = request.transport_job
 
                 # Get gate pass for driver details
-                gate_pass = GatePass.query.filter_by(dispatch_request_id=request.id).first()
+                gate_pass = request.gate_pass
                 
                 order_data = {
                     'id': request.id,  # Add this for compatibility
@@ -296,17 +306,27 @@ class TransportService:
             raise Exception(f"Error updating part load delivery details: {str(e)}")
 
     @staticmethod
-    def get_pending_transport_approvals():
-        """Get all pending transport approval requests"""
+    def get_pending_transport_approvals(fields=None):
+        """Get all pending transport approval requests, optionally limited to ``fields``"""
         try:
-            approval_requests = TransportApprovalRequest.query.filter_by(status='pending').order_by(TransportApprovalRequest.created_at.desc()).all()
+            approval_requests = TransportApprovalRequest.query.filter_by(status='pending').options(
+                selectinload(TransportApprovalRequest.sales_order).selectinload(SalesOrder.showroom_product)
+            ).order_by(TransportApprovalRequest.created_at.desc()).all()
+            
+            # Payment totals of the nested sales orders, one query for the list
+            context = {}
+            if wants(fields, 'salesOrder'):
+                context['amount_paid'] = SalesOrder.amounts_paid(
+                    {request.sales_order_id for request in approval_requests}
+                )
             
             approvals = []
-            for request in approval_requests:
-                sales_order = SalesOrder.query.get(request.sales_order_id)
-                showroom_product = ShowroomProduct.query.get(sales_order.showroom_product_id) if sales_order else None
+            for request, approval_data in zip(
+                approval_requests, TransportApprovalRequest._serializer.dump_many(approval_requests, fields, context)
+            ):
+                sales_order = request.sales_order
+                showroom_product = sales_order.showroom_product if sales_order else None
                 
-                approval_data = request.to_dict()
                 if sales_order:
                     approval_data['orderNumber'] = sales_order.order_number
                     approval_data['customerName'] = sales_order.customer_name
@@ -323,7 +343,7 @@ class TransportService:
                 if showroom_product:
                     approval_data['productName'] = showroom_product.name
                     
-                approvals.append(approval_data)
+                approvals.append(project(approval_data, fields))
             
             return approvals
         except Exception as e:
@@ -403,14 +423,21 @@ class TransportService:
     def get_rejected_transport_approvals():
         """Get all rejected transport approval requests for sales review"""
         try:
-            approval_requests = TransportApprovalRequest.query.filter_by(status='rejected').order_by(TransportApprovalRequest.updated_at.desc()).all()
+            approval_requests = TransportApprovalRequest.query.filter_by(status='rejected').options(
+                selectinload(TransportApprovalRequest.sales_order).selectinload(SalesOrder.showroom_product)
+            ).order_by(TransportApprovalRequest.updated_at.desc()).all()
+            
+            context = {'amount_paid': SalesOrder.amounts_paid(
+                {request.sales_order_id for request in approval_requests}
+            )}
             
             approvals = []
-            for request in approval_requests:
-                sales_order = SalesOrder.query.get(request.sales_order_id)
-                showroom_product = ShowroomProduct.query.get(sales_order.showroom_product_id) if sales_order else None
+            for request, approval_data in zip(
+                approval_requests, TransportApprovalRequest._serializer.dump_many(approval_requests, None, context)
+            ):
+                sales_order = request.sales_order
+                showroom_product = sales_order.showroom_product if sales_order else None
                 
-                approval_data = request.to_dict()
                 if sales_order:
                     approval_data['orderNumber'] = sales_order.order_number
                     approval_data['customerName'] = sales_order.customer_name
@@ -434,11 +461,13 @@ class TransportService:
         """Get part load orders from dispatch that need driver details to be filled by transport"""
         try:
             # Get transport jobs for part load orders that are pending and need driver details
-            transport_jobs = TransportJob.query.filter_by(status='pending').all()
+            transport_jobs = TransportJob.query.filter_by(status='pending').options(
+                *transport_job_graph_options()
+            ).all()
             
             part_load_orders = []
             for job in transport_jobs:
-                dispatch_request = DispatchRequest.query.get(job.dispatch_request_id)
+                dispatch_request = job.dispatch_request
                 if not dispatch_request:
                     continue
                     
@@ -446,9 +475,9 @@ class TransportService:
                 if dispatch_request.original_delivery_type != 'part load':
                     continue
                     
-                # Get related sales order and product info
-                sales_order = SalesOrder.query.get(dispatch_request.sales_order_id) if dispatch_request.sales_order_id else None
-                showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id) if dispatch_request.showroom_product_id else None
+                # Related sales order and product info are already loaded
+                sales_order = dispatch_request.sales_order
+                showroom_product = dispatch_request.showroom_product
                 
                 part_load_orders.append({
                     'transportJobId': job.id,
@@ -628,24 +657,19 @@ class TransportService:
     def get_pending_transport_jobs():
         """Get all transport jobs pending assignment"""
         try:
-            transport_jobs = TransportJob.query.filter_by(status='pending').order_by(TransportJob.created_at.desc()).all()
+            transport_jobs = TransportJob.query.filter_by(status='pending').options(
+                *transport_job_graph_options()
+            ).order_by(TransportJob.created_at.desc()).all()
             
             jobs = []
             for job in transport_jobs:
-                # Get related dispatch request
-                dispatch_request = DispatchRequest.query.get(job.dispatch_request_id)
+                dispatch_request = job.dispatch_request
                 if not dispatch_request:
                     continue
                 
-                # Get sales order if available
-                sales_order = None
-                if dispatch_request.sales_order_id:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                
-                # Get showroom product if available
-                showroom_product = None
-                if dispatch_request.showroom_product_id:
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                # Related sales order and showroom product are already loaded
+                sales_order = dispatch_request.sales_order
+                showroom_product = dispatch_request.showroom_product
                 
                 jobs.append({
                     'transportJobId': job.id,
@@ -672,27 +696,35 @@ class TransportService:
             raise Exception(f"Error fetching pending transport jobs: {str(e)}")
     
     @staticmethod
-    def get_all_transport_jobs():
-        """Get all transport jobs with all statuses"""
+    def get_all_transport_jobs(status=None, transporter_name=None, page=None):
+        """Get all transport jobs with all statuses
+
+        When ``page`` ({'limit', 'cursor'}) is given, a single keyset page
+        ordered by (created_at, id) is returned instead of the full list.
+        """
         try:
-            transport_jobs = TransportJob.query.order_by(TransportJob.created_at.desc()).all()
+            query = TransportJob.query.options(*transport_job_graph_options())
+            if status:
+                query = query.filter(TransportJob.status == status)
+            if transporter_name:
+                query = query.filter(TransportJob.transporter_name == transporter_name)
+
+            if page:
+                transport_jobs, next_cursor = paginate_query(
+                    query, TransportJob.created_at, TransportJob.id, page['limit'], page['cursor']
+                )
+            else:
+                transport_jobs = query.order_by(TransportJob.created_at.desc()).all()
             
             jobs = []
             for job in transport_jobs:
-                # Get related dispatch request
-                dispatch_request = DispatchRequest.query.get(job.dispatch_request_id)
+                dispatch_request = job.dispatch_request
                 if not dispatch_request:
                     continue
                 
-                # Get sales order if available
-                sales_order = None
-                if dispatch_request.sales_order_id:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                
-                # Get showroom product if available
-                showroom_product = None
-                if dispatch_request.showroom_product_id:
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                # Related sales order and showroom product are already loaded
+                sales_order = dispatch_request.sales_order
+                showroom_product = dispatch_request.showroom_product
                 
                 jobs.append({
                     'transportJobId': job.id,
@@ -716,6 +748,8 @@ class TransportService:
                     'originalDeliveryType': getattr(dispatch_request, 'original_delivery_type', None) or ''
                 })
             
+            if page:
+                return build_page(jobs, next_cursor, page['limit'])
             return jobs
         except Exception as e:
             raise Exception(f"Error fetching transport jobs: {str(e)}")
@@ -771,7 +805,8 @@ class TransportService:
                         driver_name=fleet_vehicle.driver_name,
                         old_status=old_status,
                         new_status='assigned',
-                        context='Assigned to delivery'
+                        context='Assigned to delivery',
+                        commit=False
                     )
             
             # Update transport job
@@ -789,9 +824,7 @@ class TransportService:
                     dispatch_request.dispatch_notes += f" (Vehicle: {transport_job.vehicle_no})"
                 dispatch_request.updated_at = datetime.utcnow()
             
-            db.session.commit()
-            
-            # Create notification for driver assignment
+            # Create notification for driver assignment, saved with the assignment
             if fleet_vehicle and dispatch_request:
                 # Get order number for notification
                 sales_order = None
@@ -804,9 +837,12 @@ class TransportService:
                     driver_name=fleet_vehicle.driver_name,
                     vehicle_number=fleet_vehicle.vehicle_number,
                     order_number=order_number,
-                    customer_name=dispatch_request.party_name
+                    customer_name=dispatch_request.party_name,
+                    commit=False
                 )
             
+            db.session.commit()
+            
             return {
                 'status': 'success',
                 'message': f'Transport job assigned to {transport_job.transporter_name}',
@@ -818,6 +854,152 @@ class TransportService:
             db.session.rollback()
             raise Exception(f"Error assigning transporter: {str(e)}")
     
+    @staticmethod
+    def plan_vehicle_assignments(dry_run=True):
+        """Plan all pending transport jobs onto available fleet vehicles
+
+        Jobs are packed by quantity into vehicles by parsed capacity, one
+        destination area per vehicle (see utils.fleet). With ``dry_run`` the
+        plan is only returned. Otherwise the pending jobs and available vehicles
+        are locked, planned and every assignment is committed in one transaction.
+
+        Returns:
+            dict: Loads per vehicle, unassigned jobs with reasons, skipped
+                vehicles and a summary
+        """
+        try:
+            started = time.perf_counter()
+            job_query = db.session.query(TransportJob, DispatchRequest, SalesOrder.order_number).join(
+                DispatchRequest, TransportJob.dispatch_request_id == DispatchRequest.id
+            ).outerjoin(
+                SalesOrder, DispatchRequest.sales_order_id == SalesOrder.id
+            ).filter(
+                TransportJob.status == 'pending',
+                # Part load orders go to outside transporters with their own driver details
+                or_(DispatchRequest.original_delivery_type.is_(None), DispatchRequest.original_delivery_type != 'part load')
+            ).order_by(TransportJob.id)
+            vehicle_query = Vehicle.query.filter_by(status='available').order_by(Vehicle.id)
+            if not dry_run:
+                job_query = job_query.with_for_update(of=TransportJob)
+                vehicle_query = vehicle_query.with_for_update()
+            rows = job_query.all()
+            vehicles = {vehicle.id: vehicle for vehicle in vehicle_query.all()}
+            
+            unit_weight = current_app.config.get('FLEET_UNIT_WEIGHT_KG', 1.0)
+            plan_vehicles, skipped_vehicles = [], []
+            for vehicle in vehicles.values():
+                capacity = parse_capacity(vehicle.capacity, unit_weight)
+                if capacity:
+                    plan_vehicles.append(PlanVehicle(vehicle.id, capacity))
+                else:
+                    skipped_vehicles.append({
+                        'vehicleId': vehicle.id,
+                        'vehicleNumber': vehicle.vehicle_number,
+                        'capacity': vehicle.capacity,
+                        'reason': 'unreadable_capacity'
+                    })
+            
+            jobs = {job.id: (job, dispatch_request, order_number) for job, dispatch_request, order_number in rows}
+            plan = plan_loads(
+                [PlanJob(job.id, dispatch_request.quantity or 0, area_key(dispatch_request.party_address))
+                 for job, dispatch_request, _ in jobs.values()],
+                plan_vehicles
+            )
+            planning_ms = round((time.perf_counter() - started) * 1000, 2)
+            
+            def job_entry(plan_job):
+                _, dispatch_request, order_number = jobs[plan_job.id]
+                return {
+                    'transportJobId': plan_job.id,
+                    'dispatchId': dispatch_request.id,
+                    'orderNumber': order_number or f'DR-{dispatch_request.id}',
+                    'customerName': dispatch_request.party_name,
+                    'quantity': plan_job.quantity,
+                    'area': plan_job.area
+                }
+            
+            loads = []
+            for load in plan.loads:
+                vehicle = vehicles[load.vehicle.id]
+                loads.append({
+                    'vehicleId': vehicle.id,
+                    'vehicleNumber': vehicle.vehicle_number,
+                    'driverName': vehicle.driver_name,
+                    'capacity': load.vehicle.capacity,
+                    'usedCapacity': load.used,
+                    'remainingCapacity': load.remaining,
+                    'area': load.area,
+                    'jobs': [job_entry(plan_job) for plan_job in load.jobs]
+                })
+            unassigned = [
+                {**job_entry(PlanJob(job.id, dispatch_request.quantity or 0, area_key(dispatch_request.party_address))),
+                 'reason': plan.unassigned[job.id]}
+                for job, dispatch_request, _ in jobs.values() if job.id in plan.unassigned
+            ]
+            
+            if not dry_run:
+                now = datetime.utcnow()
+                for load in plan.loads:
+                    vehicle = vehicles[load.vehicle.id]
+                    vehicle.status = 'assigned'
+                    vehicle.updated_at = now
+                    NotificationService.notify_vehicle_status_change(
+                        vehicle_number=vehicle.vehicle_number,
+                        driver_name=vehicle.driver_name,
+                        old_status='available',
+                        new_status='assigned',
+                        context=f'Assigned to {len(load.jobs)} deliveries',
+                        commit=False
+                    )
+                    order_numbers, customers = [], []
+                    for plan_job in load.jobs:
+                        transport_job, dispatch_request, order_number = jobs[plan_job.id]
+                        transport_job.transporter_name = vehicle.driver_name or vehicle.vehicle_number
+                        transport_job.vehicle_no = vehicle.vehicle_number
+                        transport_job.status = 'assigned'
+                        transport_job.updated_at = now
+                        dispatch_request.status = 'assigned_transport'
+                        dispatch_request.dispatch_notes = \
+                            f"Assigned to {transport_job.transporter_name} (Vehicle: {vehicle.vehicle_number})"
+                        dispatch_request.updated_at = now
+                        order_numbers.append(order_number or f'DR-{dispatch_request.id}')
+                        customers.append(dispatch_request.party_name)
+                    # One driver notification per load rather than per delivery
+                    NotificationService.notify_driver_assigned(
+                        driver_name=vehicle.driver_name,
+                        vehicle_number=vehicle.vehicle_number,
+                        order_number=TransportService._summarize_names(order_numbers),
+                        customer_name=TransportService._summarize_names(customers),
+                        commit=False
+                    )
+                db.session.commit()
+            
+            return {
+                'dryRun': bool(dry_run),
+                'loads': loads,
+                'unassigned': unassigned,
+                'skippedVehicles': skipped_vehicles,
+                'summary': {
+                    'pendingJobs': len(jobs),
+                    'assignedJobs': plan.assigned_jobs,
+                    'unassignedJobs': len(unassigned),
+                    'availableVehicles': len(vehicles),
+                    'vehiclesUsed': len(plan.loads),
+                    'utilization': plan.utilization(),
+                    'planningMs': planning_ms
+                }
+            }
+        
+        except Exception as e:
+            db.session.rollback()
+            raise Exception(f"Error planning vehicle assignments: {str(e)}")
+    
+    @staticmethod
+    def _summarize_names(names, shown=3):
+        """Join the first few names, e.g. 'SO-1, SO-2, SO-3 +4 more'"""
+        text = ', '.join(names[:shown])
+        return f"{text} +{len(names) - shown} more" if len(names) > shown else text
+    
     @staticmethod
     def update_delivery_status(transport_job_id, status_data):
         """Update delivery status of transport job"""
@@ -875,6 +1057,14 @@ class TransportService:
                     elif new_status == 'in_transit':
                         new_vehicle_status = 'assigned'
                     
+                    # A consolidated load stays assigned until its last delivery is done
+                    if new_vehicle_status != 'assigned' and TransportJob.query.filter(
+                        TransportJob.vehicle_no == transport_job.vehicle_no,
+                        TransportJob.id != transport_job.id,
+                        TransportJob.status.in_(['assigned', 'in_transit'])
+                    ).count():
+                        new_vehicle_status = old_vehicle_status
+                    
                     # Update vehicle status if it changed
                     if old_vehicle_status != new_vehicle_status:
                         fleet_vehicle.status = new_vehicle_status
@@ -887,7 +1077,8 @@ class TransportService:
                             driver_name=fleet_vehicle.driver_name,
                             old_status=old_vehicle_status,
                             new_status=new_vehicle_status,
-                            context=context
+                            context=context,
+                            commit=False
                         )
             
             # Update dispatch request status based on transport status
@@ -899,7 +1090,7 @@ class TransportService:
                     if dispatch_request.sales_order_id:
                         sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
                         if sales_order:
-                            sales_order.order_status = 'delivered'
+                            ShowroomStockService.apply_order_status(sales_order, 'delivered')
                             sales_order.updated_at = datetime.utcnow()
                 elif new_status == 'in_transit':
                     dispatch_request.status = 'in_transit'
@@ -922,9 +1113,7 @@ class TransportService:
                 
                 dispatch_request.updated_at = datetime.utcnow()
             
-            db.session.commit()
-            
-            # Create notifications after successful database commit
+            # Create notifications in the same transaction as the status change
             if dispatch_request:
                 # Get order number for notifications
                 sales_order = None
@@ -940,7 +1129,8 @@ class TransportService:
                         old_status=current_status,
                         new_status=new_status,
                         driver_name=fleet_vehicle.driver_name,
-                        vehicle_number=fleet_vehicle.vehicle_number
+                        vehicle_number=fleet_vehicle.vehicle_number,
+                        commit=False
                     )
                 
                 # Notify when driver becomes available
@@ -949,9 +1139,12 @@ class TransportService:
                         driver_name=fleet_vehicle.driver_name,
                         vehicle_number=fleet_vehicle.vehicle_number,
                         order_number=order_number,
-                        delivery_status=new_status
+                        delivery_status=new_status,
+                        commit=False
                     )
             
+            db.session.commit()
+            
             return {
                 'status': 'success',
                 'message': f'Delivery status updated to {new_status}',
@@ -967,23 +1160,19 @@ class TransportService:
     def get_in_transit_deliveries():
         """Get all deliveries currently in transit"""
         try:
-            transport_jobs = TransportJob.query.filter_by(status='in_transit').order_by(TransportJob.updated_at.desc()).all()
+            transport_jobs = TransportJob.query.filter_by(status='in_transit').options(
+                *transport_job_graph_options()
+            ).order_by(TransportJob.updated_at.desc()).all()
             
             deliveries = []
             for job in transport_jobs:
-                dispatch_request = DispatchRequest.query.get(job.dispatch_request_id)
+                dispatch_request = job.dispatch_request
                 if not dispatch_request:
                     continue
                 
-                # Get sales order if available
-                sales_order = None
-                if dispatch_request.sales_order_id:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                
-                # Get showroom product if available
-                showroom_product = None
-                if dispatch_request.showroom_product_id:
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                # Related sales order and showroom product are already loaded
+                sales_order = dispatch_request.sales_order
+                showroom_product = dispatch_request.showroom_product
                 
                 # Calculate days in transit
                 days_in_transit = (datetime.utcnow() - job.updated_at).days
@@ -1011,31 +1200,23 @@ class TransportService:
     def get_transport_summary():
         """Get transport department summary statistics"""
         try:
-            # Count jobs by status
-            pending_jobs = TransportJob.query.filter_by(status='pending').count()
-            assigned_jobs = TransportJob.query.filter_by(status='assigned').count()
-            in_transit_jobs = TransportJob.query.filter_by(status='in_transit').count()
-            delivered_jobs = TransportJob.query.filter_by(status='delivered').count()
-            cancelled_jobs = TransportJob.query.filter_by(status='cancelled').count()
-            failed_jobs = TransportJob.query.filter_by(status='failed').count()
-            
-            # Today's activity
-            today = datetime.now().date()
-            today_assigned = TransportJob.query.filter(
-                db.func.date(TransportJob.updated_at) == today,
-                TransportJob.status == 'assigned'
-            ).count()
-            today_delivered = TransportJob.query.filter(
-                db.func.date(TransportJob.updated_at) == today,
-                TransportJob.status == 'delivered'
-            ).count()
-            
-            # Overdue deliveries (in transit for more than 3 days)
+            # One pass over the jobs: totals by status plus today's and overdue windows
             three_days_ago = datetime.utcnow() - timedelta(days=3)
-            overdue_deliveries = TransportJob.query.filter(
-                TransportJob.status == 'in_transit',
-                TransportJob.updated_at < three_days_ago
-            ).count()
+            rollup = StatusRollup(TransportJob.status, windows={
+                'today': Window(TransportJob.updated_at, *day_range(), statuses=('assigned', 'delivered')),
+                # In transit for more than 3 days
+                'overdue': Window(TransportJob.updated_at, end=three_days_ago, statuses=('in_transit',))
+            }).run()
+            
+            pending_jobs = rollup.count('pending')
+            assigned_jobs = rollup.count('assigned')
+            in_transit_jobs = rollup.count('in_transit')
+            delivered_jobs = rollup.count('delivered')
+            cancelled_jobs = rollup.count('cancelled')
+            failed_jobs = rollup.count('failed')
+            today_assigned = rollup.count('assigned', window='today')
+            today_delivered = rollup.count('delivered', window='today')
+            overdue_deliveries = rollup.count('in_transit', window='overdue')
             
             return {
                 'pendingJobs': pending_jobs,
@@ -1053,6 +1234,7 @@ class TransportService:
             raise Exception(f"Error getting transport summary: {str(e)}")
     
     @staticmethod
+    @cached('transport.transporter_performance', tags=('transport_job',))
     def get_transporter_performance():
         """Get performance statistics for transporters"""
         try:
@@ -1102,29 +1284,29 @@ class TransportService:
             
             search_term = search_term.strip()
             
-            # Search transport jobs by transporter or vehicle
-            transport_jobs = TransportJob.query.filter(
+            # Search transport jobs by transporter, vehicle, customer or order number
+            transport_jobs = TransportJob.query.join(
+                DispatchRequest, TransportJob.dispatch_request_id == DispatchRequest.id
+            ).outerjoin(
+                SalesOrder, DispatchRequest.sales_order_id == SalesOrder.id
+            ).filter(
                 db.or_(
                     TransportJob.transporter_name.ilike(f'%{search_term}%'),
-                    TransportJob.vehicle_no.ilike(f'%{search_term}%')
+                    TransportJob.vehicle_no.ilike(f'%{search_term}%'),
+                    DispatchRequest.party_name.ilike(f'%{search_term}%'),
+                    SalesOrder.order_number.ilike(f'%{search_term}%')
                 )
-            ).order_by(TransportJob.created_at.desc()).all()
+            ).options(*transport_job_graph_options()).order_by(TransportJob.created_at.desc()).all()
             
             results = []
             for job in transport_jobs:
-                dispatch_request = DispatchRequest.query.get(job.dispatch_request_id)
+                dispatch_request = job.dispatch_request
                 if not dispatch_request:
                     continue
                 
-                # Get sales order if available
-                sales_order = None
-                if dispatch_request.sales_order_id:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                
-                # Get showroom product if available
-                showroom_product = None
-                if dispatch_request.showroom_product_id:
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                # Related sales order and showroom product are already loaded
+                sales_order = dispatch_request.sales_order
+                showroom_product = dispatch_request.showroom_product
                 
                 # Check if search term matches any relevant field
                 if (search_term.lower() in dispatch_request.party_name.lower()) or \
@@ -1399,22 +1581,24 @@ class TransportService:
             old_status = vehicle.status
             vehicle.status = 'available'
             vehicle.updated_at = datetime.utcnow()
-            db.session.commit()
 
             NotificationService.notify_vehicle_status_change(
                 vehicle_number=vehicle.vehicle_number,
                 driver_name=vehicle.driver_name,
                 old_status=old_status,
                 new_status='available',
-                context='Driver marked as reached'
+                context='Driver marked as reached',
+                commit=False
             )
 
             NotificationService.notify_driver_available(
                 driver_name=vehicle.driver_name,
                 vehicle_number=vehicle.vehicle_number,
                 order_number='-',
-                delivery_status='reached'
+                delivery_status='reached',
+                commit=False
             )
+            db.session.commit()
 
             return {
                 'status': 'success',
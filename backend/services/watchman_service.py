@@ -3,7 +3,11 @@ Watchman Service Module
 Handles business logic for watchman operations (gate security for self-pickup orders)
 """
 from datetime import datetime
-from models import db, GatePass, DispatchRequest, SalesOrder, ShowroomProduct, TransportJob
+from models import db, GatePass, DispatchRequest, SalesOrder
+from services.showroom_stock_service import ShowroomStockService
+from utils.pagination import paginate_query, build_page
+from utils.loaders import gate_pass_graph_options
+from utils.rollup import Window, StatusRollup, day_range
 
 
 class WatchmanService:
@@ -14,15 +18,17 @@ class WatchmanService:
         """Get all pending customer pickups waiting for verification"""
         try:
             # Include both 'pending' and 'entered_for_pickup' statuses
-            gate_passes = GatePass.query.filter(GatePass.status.in_(['pending', 'entered_for_pickup'])).order_by(GatePass.issued_at.desc()).all()
+            gate_passes = GatePass.query.filter(GatePass.status.in_(['pending', 'entered_for_pickup'])).options(
+                *gate_pass_graph_options()
+            ).order_by(GatePass.issued_at.desc()).all()
 
             pickups = []
             for gate_pass in gate_passes:
-                # Get related dispatch request and order details
-                dispatch_request = DispatchRequest.query.get(gate_pass.dispatch_request_id)
+                # Related dispatch request and order details are already loaded
+                dispatch_request = gate_pass.dispatch_request
                 if dispatch_request:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                    sales_order = dispatch_request.sales_order
+                    showroom_product = dispatch_request.showroom_product
 
                     # Get company name from sales order or transport job
                     company_name = '-'
@@ -30,7 +36,7 @@ class WatchmanService:
                         company_name = sales_order.transporter_name
                     elif dispatch_request.delivery_type == 'transport':
                         # Try to get from transport job
-                        transport_job = TransportJob.query.filter_by(dispatch_request_id=dispatch_request.id).first()
+                        transport_job = dispatch_request.transport_job
                         if transport_job and transport_job.transporter_name:
                             company_name = transport_job.transporter_name
 
@@ -60,18 +66,31 @@ class WatchmanService:
             raise Exception(f"Error fetching pending pickups: {str(e)}")
     
     @staticmethod
-    def get_all_gate_passes():
-        """Get all gate passes (completed and pending)"""
+    def get_all_gate_passes(status=None, page=None):
+        """Get all gate passes (completed and pending)
+
+        When ``page`` ({'limit', 'cursor'}) is given, a single keyset page
+        ordered by (issued_at, id) is returned instead of the full list.
+        """
         try:
-            gate_passes = GatePass.query.order_by(GatePass.issued_at.desc()).all()
+            query = GatePass.query.options(*gate_pass_graph_options())
+            if status:
+                query = query.filter(GatePass.status == status)
+
+            if page:
+                gate_passes, next_cursor = paginate_query(
+                    query, GatePass.issued_at, GatePass.id, page['limit'], page['cursor']
+                )
+            else:
+                gate_passes = query.order_by(GatePass.issued_at.desc()).all()
             
             passes = []
             for gate_pass in gate_passes:
-                # Get related dispatch request and order details
-                dispatch_request = DispatchRequest.query.get(gate_pass.dispatch_request_id)
+                # Related dispatch request and order details are already loaded
+                dispatch_request = gate_pass.dispatch_request
                 if dispatch_request:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                    sales_order = dispatch_request.sales_order
+                    showroom_product = dispatch_request.showroom_product
                     
                     passes.append({
                         'gatePassId': gate_pass.id,
@@ -93,6 +112,8 @@ class WatchmanService:
                         'originalDeliveryType': getattr(dispatch_request, 'original_delivery_type', None) or ''
                     })
             
+            if page:
+                return build_page(passes, next_cursor, page['limit'])
             return passes
         except Exception as e:
             raise Exception(f"Error fetching gate passes: {str(e)}")
@@ -110,7 +131,7 @@ class WatchmanService:
                 raise ValueError('Gate pass has already been processed')
 
             # Get dispatch request for additional validation
-            dispatch_request = DispatchRequest.query.get(gate_pass.dispatch_request_id)
+            dispatch_request = gate_pass.dispatch_request
             if not dispatch_request:
                 raise ValueError('Related dispatch request not found')
 
@@ -162,9 +183,9 @@ class WatchmanService:
 
                 # Update sales order status to delivered
                 if dispatch_request.sales_order_id:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
+                    sales_order = dispatch_request.sales_order
                     if sales_order:
-                        sales_order.order_status = 'delivered'
+                        ShowroomStockService.apply_order_status(sales_order, 'delivered')
                         sales_order.updated_at = datetime.utcnow()
 
                 db.session.commit()
@@ -196,7 +217,7 @@ class WatchmanService:
             gate_pass.verified_at = datetime.utcnow()  # Use verified_at to track when it was processed
             
             # Update dispatch request with rejection
-            dispatch_request = DispatchRequest.query.get(gate_pass.dispatch_request_id)
+            dispatch_request = gate_pass.dispatch_request
             if dispatch_request:
                 dispatch_request.status = 'pickup_rejected'
                 dispatch_request.dispatch_notes = f"Pickup rejected by watchman: {rejection_reason}"
@@ -219,34 +240,26 @@ class WatchmanService:
     def get_daily_summary():
         """Get daily summary of watchman activities"""
         try:
-            today = datetime.now().date()
-
-            # Count gate passes by status for today
-            today_pending = GatePass.query.filter(
-                db.func.date(GatePass.issued_at) == today,
-                GatePass.status == 'pending'
-            ).count()
-
-            today_verified = GatePass.query.filter(
-                db.func.date(GatePass.verified_at) == today,
-                GatePass.status == 'verified'
-            ).count()
-
-            today_entered = GatePass.query.filter(
-                db.func.date(GatePass.verified_at) == today,
-                GatePass.status == 'entered_for_pickup'
-            ).count()
+            # One pass over the gate passes: totals by status plus today's issued/verified windows
+            today_start, today_end = day_range()
+            rollup = StatusRollup(GatePass.status, windows={
+                'issuedToday': Window(GatePass.issued_at, today_start, today_end, statuses=('pending',)),
+                'verifiedToday': Window(
+                    GatePass.verified_at, today_start, today_end,
+                    statuses=('verified', 'entered_for_pickup', 'rejected')
+                )
+            }).run()
 
-            today_rejected = GatePass.query.filter(
-                db.func.date(GatePass.verified_at) == today,
-                GatePass.status == 'rejected'
-            ).count()
+            today_pending = rollup.count('pending', window='issuedToday')
+            today_verified = rollup.count('verified', window='verifiedToday')
+            today_entered = rollup.count('entered_for_pickup', window='verifiedToday')
+            today_rejected = rollup.count('rejected', window='verifiedToday')
 
             # Total gate passes ever
-            total_pending = GatePass.query.filter_by(status='pending').count()
-            total_verified = GatePass.query.filter_by(status='verified').count()
-            total_entered = GatePass.query.filter_by(status='entered_for_pickup').count()
-            total_rejected = GatePass.query.filter_by(status='rejected').count()
+            total_pending = rollup.count('pending')
+            total_verified = rollup.count('verified')
+            total_entered = rollup.count('entered_for_pickup')
+            total_rejected = rollup.count('rejected')
 
             return {
                 'todayPending': today_pending,
@@ -266,19 +279,25 @@ class WatchmanService:
     def search_gate_pass(search_term):
         """Search gate passes by customer name, order number, or vehicle number"""
         try:
-            gate_passes = GatePass.query.filter(
+            gate_passes = GatePass.query.outerjoin(
+                DispatchRequest, GatePass.dispatch_request_id == DispatchRequest.id
+            ).outerjoin(
+                SalesOrder, DispatchRequest.sales_order_id == SalesOrder.id
+            ).filter(
                 db.or_(
                     GatePass.party_name.ilike(f'%{search_term}%'),
-                    GatePass.vehicle_no.ilike(f'%{search_term}%')
+                    GatePass.vehicle_no.ilike(f'%{search_term}%'),
+                    SalesOrder.order_number.ilike(f'%{search_term}%'),
+                    SalesOrder.customer_name.ilike(f'%{search_term}%')
                 )
-            ).order_by(GatePass.issued_at.desc()).all()
+            ).options(*gate_pass_graph_options()).order_by(GatePass.issued_at.desc()).all()
             
             results = []
             for gate_pass in gate_passes:
-                dispatch_request = DispatchRequest.query.get(gate_pass.dispatch_request_id)
+                dispatch_request = gate_pass.dispatch_request
                 if dispatch_request:
-                    sales_order = SalesOrder.query.get(dispatch_request.sales_order_id)
-                    showroom_product = ShowroomProduct.query.get(dispatch_request.showroom_product_id)
+                    sales_order = dispatch_request.sales_order
+                    showroom_product = dispatch_request.showroom_product
                     
                     # Also search by order number
                     if sales_order and search_term.upper() in sales_order.order_number.upper():
@@ -293,7 +312,9 @@ class WatchmanService:
                             'verifiedAt': gate_pass.verified_at.isoformat() if gate_pass.verified_at else None
                         })
                     elif search_term.lower() in gate_pass.party_name.lower() or \
-                         (gate_pass.vehicle_no and search_term.upper() in gate_pass.vehicle_no.upper()):
+                         (gate_pass.vehicle_no and search_term.upper() in gate_pass.vehicle_no.upper()) or \
+                         (sales_order and sales_order.customer_name and
+                          search_term.lower() in sales_order.customer_name.lower()):
                         results.append({
                             'gatePassId': gate_pass.id,
                             'orderNumber': sales_order.order_number if sales_order else f'SO-{dispatch_request.sales_order_id}',
@@ -0,0 +1,337 @@
+"""
+Synthetic data generator - fills every table with a seeded, reproducible
+order history at a configurable scale, for benchmarks and load tests.
+
+Rows are generated and inserted in batches, so memory stays flat however many
+sales orders are requested. The same scale and seed always produce the same
+rows, whatever the batch size.
+
+Usage:
+    python synthetic_data.py --database-url postgresql+psycopg2://... --scale 1000000
+    python synthetic_data.py --scale 20000                # in-memory SQLite, prints row counts
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from app import create_app
+from models import (
+    db, User, UserStatus, ProductionOrder, PurchaseOrder, PurchaseOrderLine, StoreInventory, AssemblyOrder,
+    ShowroomProduct, ShowroomStock, SalesOrder, Customer, SalesTransaction, ApprovalRequest, FinanceTransaction,
+    DispatchRequest, GatePass, TransportJob, Vehicle, PartLoadDetail, GateUser, GateEntryLog, GoingOutLog,
+    Notification, StatusEvent
+)
+from models.sales import TransportApprovalRequest
+
+DEFAULT_SCALE = 5000
+DEFAULT_SEED = 42
+DEFAULT_BATCH_SIZE = 10000
+MATERIALS = 60
+CUSTOMERS = 997
+SALES_PEOPLE = 25
+TRANSPORTERS = 12
+VEHICLES = 40
+GATE_USERS = 50
+START = datetime(2024, 1, 1)
+DEPARTMENTS = ['production', 'purchase', 'store', 'assembly', 'showroom', 'sales', 'finance',
+               'dispatch', 'transport', 'watchman']
+# Every seeded user logs in with this password; hashed once (salted, so it differs between processes)
+PASSWORD = 'password'
+PASSWORD_HASH = generate_password_hash(PASSWORD)
+
+# Insert order, parents before children
+MODELS = (
+    User, StoreInventory, Customer, Vehicle, GateUser,
+    ProductionOrder, PurchaseOrder, PurchaseOrderLine, AssemblyOrder, ShowroomProduct, ShowroomStock,
+    SalesOrder, TransportApprovalRequest, SalesTransaction, ApprovalRequest, FinanceTransaction,
+    DispatchRequest, GatePass, TransportJob, PartLoadDetail,
+    GateEntryLog, GoingOutLog, Notification, StatusEvent,
+)
+
+
+def _event(entity, entity_id, status, at, production_order_id=None, sales_order_id=None):
+    # The history known for seeded rows is their current status, as after the status_event backfill
+    return {'entity': entity, 'entity_id': entity_id, 'status': status, 'production_order_id': production_order_id,
+            'sales_order_id': sales_order_id, 'occurred_at': at}
+
+def generate_dataset(scale=DEFAULT_SCALE, seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Generate a synthetic order history of ``scale`` sales orders in batches
+
+    Every order gets a product chain (production, purchase and assembly order,
+    showroom product and stock), most get a dispatch request with a gate pass
+    or transport job, and a share get approvals and finance transactions.
+    Statuses and dates are spread so status filters are selective. Users,
+    materials, customers, vehicles, gate staff with their entry logs,
+    notifications and one status_event per status column come alongside.
+
+    Args:
+        scale: Number of sales orders
+        seed: Random seed, so runs are comparable
+        batch_size: Products or sales orders per batch
+
+    Yields:
+        dict: {model: [row mappings]} for one batch, parents before children
+    """
+    rng = random.Random(seed)
+    products = max(scale // 2, 1)
+    batch_size = max(batch_size, 1)
+
+    def when(index, total):
+        return START + timedelta(minutes=index * 525600 // max(total, 1) + rng.randint(0, 59))
+
+    def new_batch():
+        return {model: [] for model in MODELS}
+
+    rows = new_batch()
+    for i, department in enumerate(DEPARTMENTS, start=1):
+        rows[User].append({
+            'id': i, 'full_name': f'{department.title()} User', 'email': f'{department}@example.com',
+            'username': department, 'password_hash': PASSWORD_HASH, 'department': department,
+            'status': UserStatus.APPROVED,
+        })
+    for material_id in range(1, MATERIALS + 1):
+        rows[StoreInventory].append({
+            'id': material_id, 'name': f'Material {material_id}', 'quantity': rng.randint(0, 500),
+            'category': rng.choice(['Raw Material', 'Component']),
+        })
+    for i in range(1, CUSTOMERS + 1):
+        rows[Customer].append({
+            'id': i, 'name': f'Customer {i % CUSTOMERS}', 'contact': f'8{i:09d}',
+            'address': f'{i} Main Road, {rng.choice(["Pune", "Mumbai", "Nashik", "Nagpur"])}',
+            'customer_type': rng.choice(['retail', 'retail', 'wholesale', 'corporate']),
+        })
+    for i in range(1, VEHICLES + 1):
+        rows[Vehicle].append({
+            'id': i, 'vehicle_number': f'MH12SD{i:04d}', 'vehicle_type': rng.choice(['truck', 'van', 'pickup']),
+            'driver_name': f'Driver {i}', 'capacity': rng.choice(['500 kg', '1000 kg', '1.5 ton', '2 ton']),
+            'status': rng.choice(['available', 'available', 'assigned', 'maintenance']),
+        })
+    for i in range(1, GATE_USERS + 1):
+        rows[GateUser].append({'id': i, 'name': f'Staff {i}', 'phone': f'7{i:09d}', 'registered_at': START})
+    yield rows
+
+    for first in range(1, products + 1, batch_size):
+        rows = new_batch()
+        for i in range(first, min(first + batch_size, products + 1)):
+            created = when(i, products)
+            name = f'Product {i}'
+            production_status = rng.choice(
+                ['pending_materials', 'materials_requested', 'in_assembly', 'completed', 'completed']
+            )
+            rows[ProductionOrder].append({
+                'id': i, 'product_name': name, 'category': rng.choice(['Chair', 'Table', 'Sofa', 'Bed']),
+                'quantity': rng.randint(1, 20), 'created_at': created, 'status': production_status,
+            })
+            purchase_status = rng.choice(['pending_request', 'pending_store_check', 'finance_approved',
+                                          'store_allocated', 'verified_in_store'] + ['completed'] * 15)
+            rows[PurchaseOrder].append({
+                'id': i, 'production_order_id': i, 'product_name': name, 'quantity': 1, 'created_at': created,
+                # Most of the history is closed; open work queues stay a small share
+                'status': purchase_status,
+            })
+            for material_id in rng.sample(range(1, MATERIALS + 1), 3):
+                required = rng.randint(1, 40)
+                rows[PurchaseOrderLine].append({
+                    'purchase_order_id': i, 'material_id': material_id, 'required_quantity': required,
+                    'purchased_quantity': rng.choice([0, required, required // 2]),
+                    'unit_cost': rng.randint(5, 500) / 1.0,
+                })
+            assembly_status = rng.choice(['pending', 'in_progress', 'completed', 'completed'])
+            rows[AssemblyOrder].append({
+                'id': i, 'production_order_id': i, 'product_name': name, 'quantity': 10, 'created_at': created,
+                'status': assembly_status,
+            })
+            showroom_status = rng.choice(['available', 'available', 'sold', 'reserved'])
+            rows[ShowroomProduct].append({
+                'id': i, 'name': name, 'category': 'Furniture', 'production_order_id': i,
+                'cost_price': 1000.0, 'sale_price': 1500.0, 'created_at': created, 'showroom_status': showroom_status,
+            })
+            rows[ShowroomStock].append({
+                'id': i, 'showroom_product_id': i, 'original_quantity': 10,
+                'reserved_quantity': 0, 'sold_quantity': 0, 'available_quantity': 10,
+            })
+            rows[StatusEvent].extend([
+                _event('production_order', i, production_status, created, i),
+                _event('purchase_order', i, purchase_status, created, i),
+                _event('assembly_order', i, assembly_status, created, i),
+                _event('showroom_product', i, showroom_status, created, i),
+            ])
+        yield rows
+
+    dispatch_id = gate_pass_id = transport_job_id = approval_id = notification_id = 0
+    for first in range(1, scale + 1, batch_size):
+        rows = new_batch()
+        for i in range(first, min(first + batch_size, scale + 1)):
+            created = when(i, scale)
+            order_status = rng.choice(['pending', 'confirmed', 'confirmed', 'in_dispatch', 'delivered',
+                                       'delivered', 'delivered', 'cancelled', 'pending_transport_approval'])
+            payment_status = rng.choice(['pending', 'completed', 'completed'])
+            delivery = rng.choice(['self delivery', 'company delivery', 'part load', 'free delivery'])
+            product_id = rng.randint(1, products)
+            rows[SalesOrder].append({
+                'id': i, 'order_number': f'SO-{i:07d}', 'customer_name': f'Customer {i % CUSTOMERS}',
+                'customer_contact': f'9{i:09d}', 'showroom_product_id': product_id, 'quantity': 1,
+                'unit_price': 1500.0, 'total_amount': 1500.0, 'final_amount': 1500.0,
+                'payment_method': 'cash', 'payment_status': payment_status,
+                'order_status': order_status, 'sales_person': f'Sales {i % SALES_PEOPLE}', 'Delivery_type': delivery,
+                'created_at': created, 'updated_at': created,
+            })
+            rows[SalesTransaction].append({
+                'id': i, 'sales_order_id': i, 'transaction_type': 'payment', 'amount': 1500.0,
+                'payment_method': 'cash', 'created_at': created,
+            })
+            rows[FinanceTransaction].append({
+                'id': i, 'transaction_type': rng.choice(['revenue', 'revenue', 'expense']), 'amount': 1500.0,
+                'description': f'Order SO-{i:07d}', 'reference_id': i, 'reference_type': 'product_sale',
+                'created_at': created,
+            })
+            rows[StatusEvent].extend([
+                _event('sales_order', i, order_status, created, product_id, i),
+                _event('sales_payment', i, payment_status, created, product_id, i),
+            ])
+            if rng.random() < 0.1:
+                approval_id += 1
+                rows[ApprovalRequest].append({
+                    'id': approval_id, 'sales_order_id': i, 'request_type': 'coupon_applied',
+                    'requested_by': f'Sales {i % SALES_PEOPLE}', 'request_details': 'Coupon', 'created_at': created,
+                    'updated_at': created, 'status': rng.choice(['pending', 'approved', 'approved', 'rejected']),
+                })
+            if delivery in ('company delivery', 'part load'):
+                rows[TransportApprovalRequest].append({
+                    'id': i, 'sales_order_id': i, 'delivery_type': delivery, 'created_at': created,
+                    'updated_at': created, 'status': rng.choice(['pending', 'approved', 'approved', 'rejected']),
+                })
+            if delivery == 'part load':
+                rows[PartLoadDetail].append({'id': i, 'sales_order_id': i, 'payment_type': 'paid', 'created_at': created})
+            if order_status in ('pending', 'cancelled', 'pending_transport_approval'):
+                continue
+
+            dispatch_id += 1
+            self_pickup = delivery == 'self delivery'
+            dispatch_status = 'completed' if order_status == 'delivered' else rng.choice(
+                ['pending', 'ready_for_pickup', 'assigned_transport', 'in_transit'])
+            rows[DispatchRequest].append({
+                'id': dispatch_id, 'sales_order_id': i, 'showroom_product_id': product_id,
+                'party_name': f'Customer {i % CUSTOMERS}', 'quantity': 1, 'created_at': created, 'updated_at': created,
+                'delivery_type': 'self' if self_pickup else 'transport', 'status': dispatch_status,
+            })
+            rows[StatusEvent].append(_event('dispatch_request', dispatch_id, dispatch_status, created, product_id, i))
+            if self_pickup:
+                gate_pass_id += 1
+                gate_pass_status = 'released' if order_status == 'delivered' else rng.choice(['pending', 'verified'])
+                rows[GatePass].append({
+                    'id': gate_pass_id, 'dispatch_request_id': dispatch_id, 'party_name': f'Customer {i % CUSTOMERS}',
+                    'issued_at': created, 'status': gate_pass_status,
+                })
+                rows[StatusEvent].append(_event('gate_pass', gate_pass_id, gate_pass_status, created, product_id, i))
+            else:
+                transport_job_id += 1
+                transport_status = 'delivered' if order_status == 'delivered' else \
+                    rng.choice(['pending', 'assigned', 'in_transit'])
+                rows[TransportJob].append({
+                    'id': transport_job_id, 'dispatch_request_id': dispatch_id, 'created_at': created,
+                    'updated_at': created, 'transporter_name': f'Transporter {i % TRANSPORTERS}',
+                    'status': transport_status,
+                })
+                rows[StatusEvent].append(
+                    _event('transport_job', transport_job_id, transport_status, created, product_id, i)
+                )
+                if transport_status != 'pending':
+                    notification_id += 1
+                    rows[Notification].append({
+                        'id': notification_id, 'type': 'delivery_status', 'title': f'Delivery {transport_status}',
+                        'message': f'Order SO-{i:07d} is {transport_status}', 'department': 'sales',
+                        'read': rng.random() < 0.8, 'timestamp': created,
+                    })
+
+            # Gate traffic grows with order volume: one staff movement per dispatched order
+            phone = f'7{rng.randint(1, GATE_USERS):09d}'
+            action = rng.choice(['entry', 'exit'])
+            rows[GateEntryLog].append({'timestamp': created, 'user_name': 'Staff', 'user_phone': phone,
+                                       'action': action, 'method': 'manual'})
+            if action == 'exit' and rng.random() < 0.2:
+                rows[GoingOutLog].append({
+                    'timestamp': created, 'user_name': 'Staff', 'user_phone': phone,
+                    'reason': rng.choice(['work', 'personal']), 'status': 'returned',
+                    'return_time': created + timedelta(minutes=rng.randint(10, 120)),
+                })
+        yield rows
+
+def seed_dataset(scale=DEFAULT_SCALE, seed=DEFAULT_SEED, analyze=True, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert the synthetic order history (requires an app context)
+
+    Each batch is inserted with one executemany per table and committed on its own. Bulk inserts bypass
+    the commit hooks, so derived tables (search documents, status counters,
+    stage estimates) are left for their rebuild/refresh methods.
+
+    Args:
+        scale: Number of sales orders
+        seed: Random seed, so runs are comparable
+        analyze: Collect planner statistics after seeding. Without them
+            SQLite assumes every table is large, so any scan it plans means
+            no index fits the query.
+        batch_size: Products or sales orders per batch
+
+    Returns:
+        dict: {table name: rows inserted}
+    """
+    counts = {model.__table__.name: 0 for model in MODELS}
+    for rows in generate_dataset(scale, seed, batch_size):
+        for model, mappings in rows.items():
+            if mappings:
+                db.session.execute(model.__table__.insert(), mappings)
+                counts[model.__table__.name] += len(mappings)
+        db.session.commit()
+
+    if db.engine.dialect.name == 'postgresql':
+        # Ids were given explicitly, so move each sequence past them for rows the app inserts later
+        with db.engine.begin() as conn:
+            for model in MODELS:
+                table = model.__table__.name
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM \"{table}\"), 0) + 1, false)"
+                )
+
+    if analyze and db.engine.dialect.name in ('sqlite', 'postgresql'):
+        # Planner statistics, so plans match a populated production database
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('ANALYZE')
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill a database with a synthetic order history')
+    parser.add_argument('--scale', type=int, default=DEFAULT_SCALE, help='number of sales orders')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='random seed for the dataset')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='orders per insert batch')
+    parser.add_argument('--database-url', help='empty database to fill (default: in-memory SQLite)')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    if args.database_url:
+        app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        counts = seed_dataset(args.scale, args.seed, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        db.session.remove()
+        if not args.database_url:
+            db.drop_all()
+
+    total = sum(counts.values())
+    print(f"{total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s) - {args.scale} sales orders")
+    for table, count in counts.items():
+        print(f"  {count:>10}  {table}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
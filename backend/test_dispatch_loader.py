@@ -0,0 +1,100 @@
+"""
+Dispatch graph loader test - verifies dispatch, transport and watchman lists use a constant number of queries
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from app import create_app
+from models import db, ShowroomProduct, SalesOrder, DispatchRequest, GatePass, TransportJob
+from services.dispatch_service import DispatchService
+from services.transport_service import TransportService
+from services.watchman_service import WatchmanService
+
+def seed_orders(start, count):
+    """Create sales orders with a dispatch request, gate pass and transport job each"""
+    for i in range(start, start + count):
+        product = ShowroomProduct(name=f'Product {i}', category='Furniture', sale_price=100.0)
+        db.session.add(product)
+        db.session.flush()
+        order = SalesOrder(
+            order_number=f'SO-{i:04d}', customer_name=f'Customer {i}', showroom_product_id=product.id,
+            unit_price=100.0, total_amount=100.0, final_amount=100.0, payment_method='cash',
+            sales_person='tester'
+        )
+        db.session.add(order)
+        db.session.flush()
+        dispatch = DispatchRequest(
+            sales_order_id=order.id, showroom_product_id=product.id, party_name=f'Customer {i}',
+            quantity=1, delivery_type='transport'
+        )
+        db.session.add(dispatch)
+        db.session.flush()
+        db.session.add(GatePass(dispatch_request_id=dispatch.id, party_name=dispatch.party_name,
+                                vehicle_no=f'MH-{i:02d}', driver_name=f'Driver {i}'))
+        db.session.add(TransportJob(dispatch_request_id=dispatch.id, transporter_name=f'Carrier {i}'))
+    db.session.commit()
+    db.session.remove()
+
+def count_queries(func, *args):
+    """Run a service call and return (result, number of statements issued)"""
+    statements = []
+    listener = lambda *listener_args: statements.append(listener_args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        result = func(*args)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    db.session.remove()
+    return result, len(statements)
+
+def test_constant_query_lists():
+    """Test list endpoints issue the same number of queries for 2 and 8 orders"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        calls = [
+            (DispatchService.get_all_dispatch_orders,),
+            (DispatchService.get_transport_orders,),
+            (DispatchService.get_watchman_orders,),
+            (TransportService.get_all_transport_jobs,),
+            (TransportService.get_pending_transport_jobs,),
+            (WatchmanService.get_all_gate_passes,),
+        ]
+
+        print("Seeding 2 orders...")
+        seed_orders(1, 2)
+        small = [count_queries(*call) for call in calls]
+
+        print("Seeding 6 more orders...")
+        seed_orders(3, 6)
+        large = [count_queries(*call) for call in calls]
+
+        for call, (small_result, small_count), (large_result, large_count) in zip(calls, small, large):
+            assert len(small_result) == 2 and len(large_result) == 8, call[0].__name__
+            assert small_count == large_count, f'{call[0].__name__}: {small_count} vs {large_count} queries'
+            assert large_count <= 6, f'{call[0].__name__}: {large_count} queries'
+        print("✓ Query counts independent of row count")
+
+        orders = {order['orderNumber']: order for order in DispatchService.get_all_dispatch_orders()}
+        assert orders['SO-0005']['productName'] == 'Product 5'
+        assert orders['SO-0005']['customerVehicle'] == 'MH-05'
+        assert orders['SO-0005']['companyName'] == 'Carrier 5'
+
+        passes = WatchmanService.search_gate_pass('SO-0003')
+        assert [p['orderNumber'] for p in passes] == ['SO-0003']
+        # The sales order's customer matches even when the gate pass names someone else
+        GatePass.query.filter_by(vehicle_no='MH-02').update({'party_name': 'Walk-in'})
+        passes = WatchmanService.search_gate_pass('Customer 2')
+        assert [p['orderNumber'] for p in passes] == ['SO-0002']
+        jobs = TransportService.search_transport_jobs('Customer 4')
+        assert [j['orderNumber'] for j in jobs] == ['SO-0004']
+        print("✓ Related fields and searches resolved through relationships")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_constant_query_lists()
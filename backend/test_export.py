@@ -0,0 +1,60 @@
+"""
+Streaming export test - verifies CSV/Excel downloads and date filtering
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import csv
+import io
+from datetime import datetime
+from openpyxl import load_workbook
+from app import create_app
+from models import db, GateEntryLog, FinanceTransaction
+
+def test_streaming_exports():
+    """Test gate entry and finance exports in both formats"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        print("Seeding gate logs and finance transactions...")
+        for day in (1, 2, 3):
+            db.session.add(GateEntryLog(
+                timestamp=datetime(2025, 3, day, 9, 30), user_name=f'User {day}',
+                user_phone=f'90000000{day:02d}', action='entry', method='manual', status='completed'
+            ))
+            db.session.add(FinanceTransaction(
+                transaction_type='revenue', amount=100.0 * day, description=f'Sale {day}',
+                created_at=datetime(2025, 3, day, 12, 0)
+            ))
+        db.session.commit()
+
+        client = app.test_client()
+
+        response = client.get('/api/gate-entry/export?from=2025-03-02&to=2025-03-03&format=csv')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        assert rows[0][:3] == ['Timestamp', 'Name', 'Phone']
+        assert [row[1] for row in rows[1:]] == ['User 2', 'User 3']
+        print("✓ Gate entry CSV export filtered by date")
+
+        response = client.get('/api/exports/finance-transactions?format=xlsx')
+        assert response.status_code == 200
+        wb = load_workbook(io.BytesIO(response.get_data()), read_only=True)
+        values = list(wb.active.iter_rows(values_only=True))
+        wb.close()
+        assert values[0][0] == 'Transaction ID'
+        assert [row[3] for row in values[1:]] == [100.0, 200.0, 300.0]
+        print("✓ Finance Excel export working")
+
+        assert client.get('/api/exports/unknown').status_code == 400
+        assert client.get('/api/exports/sales-orders?format=pdf').status_code == 400
+        assert client.get('/api/gate-entry/export?from=2025-13-01').status_code == 400
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_streaming_exports()
@@ -0,0 +1,75 @@
+"""
+Gate entry storage test - verifies the DB-backed service and the Excel import/export
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from app import create_app
+from models import db, GateUser, GateEntryLog, GoingOutLog
+from services.gate_entry_service import GateEntryService
+
+def test_gate_entry_service():
+    """Test the gate entry flows and a workbook export/import round trip"""
+    app = create_app('testing')
+    service = GateEntryService()
+    with app.app_context():
+        db.create_all()
+
+        print("Registering users and recording gate events...")
+        assert service.register_user('Asha', '9000000001')['success']
+        assert not service.register_user('Asha again', '9000000001')['success']
+        assert service.register_user('Ravi', '9000000002')['success']
+
+        assert service.manual_entry('9000000001', 'morning shift')['success']
+        assert service.manual_exit('9000000001')['success']
+        assert not service.manual_entry('0000000000')['success']
+
+        # Returning must close the caller's own record, not the last row in the log
+        assert service.going_out('9000000001', 'work', 'bank')['success']
+        assert service.going_out('9000000002', 'personal')['success']
+        assert service.coming_back('9000000001')['success']
+        assert not service.coming_back('9000000001')['success']
+
+        going_out = {log['user_phone']: log for log in service.get_going_out_logs()}
+        assert going_out['9000000001']['status'] == 'returned'
+        assert going_out['9000000002']['status'] == 'out'
+
+        logs = service.get_gate_logs(limit=10)
+        assert [log['action'] for log in logs] == ['exit', 'entry']
+        assert service.get_today_logs() == {'gate_entries': 1, 'gate_exits': 1, 'going_out': 2, 'returned': 1}
+        print("✓ Gate entry flows working")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            exported = service.export_excel_files(tmp_dir)
+            assert exported['success'], exported['message']
+
+            # Re-import into empty tables
+            GateEntryLog.query.delete()
+            GoingOutLog.query.delete()
+            GateUser.query.filter_by(phone='9000000002').delete()
+            db.session.commit()
+
+            result = service.import_excel_files(tmp_dir)
+            assert result['success'], result['message']
+            assert result['imported'] == {'users': 1, 'gate_logs': 2, 'going_out_logs': 2}
+            assert GateUser.query.count() == 2
+            assert GoingOutLog.query.filter_by(status='returned').count() == 1
+
+            # Second run is a no-op
+            assert service.import_excel_files(tmp_dir)['imported'] == {'users': 0, 'gate_logs': 0, 'going_out_logs': 0}
+
+            # Without a directory the export leaves the legacy import workbooks alone
+            service.data_dir, service.exports_dir = tmp_dir, os.path.join(tmp_dir, 'exports')
+            legacy = os.path.getmtime(os.path.join(tmp_dir, 'gate_users.xlsx'))
+            exported = service.export_excel_files()
+            assert all(os.path.dirname(path) == service.exports_dir for path in exported['files'])
+            assert os.path.getmtime(os.path.join(tmp_dir, 'gate_users.xlsx')) == legacy
+        print("✓ Workbook export/import round trip working")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_gate_entry_service()
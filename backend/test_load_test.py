@@ -0,0 +1,71 @@
+"""
+Load test harness test - verifies the synthetic data generator and a short traffic replay
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from app import create_app
+from models import db, SalesOrder, StatusEvent, GateEntryLog, StageEstimate
+from synthetic_data import generate_dataset, seed_dataset, MODELS
+from load_test import build_schedule, run_load, prepare, MIXES
+
+def flatten(batches):
+    """Rows per model over all batches"""
+    rows = {model: [] for model in MODELS}
+    for batch in batches:
+        for model, mappings in batch.items():
+            rows[model].extend(mappings)
+    return rows
+
+def test_synthetic_data():
+    """Test the generated history is reproducible and independent of the batch size"""
+    small_batches = flatten(generate_dataset(scale=60, seed=7, batch_size=7))
+    one_batch = flatten(generate_dataset(scale=60, seed=7, batch_size=1000))
+    assert small_batches == one_batch
+    assert len(one_batch[SalesOrder]) == 60
+    assert flatten(generate_dataset(scale=60, seed=8)) != one_batch
+    print("✓ Generator is seeded and batch size independent")
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        counts = seed_dataset(scale=60, seed=7, analyze=False, batch_size=7)
+        assert counts['sales_order'] == SalesOrder.query.count() == 60
+        assert counts['status_event'] == StatusEvent.query.count() > 0
+        assert counts['gate_entry_log'] == GateEntryLog.query.count() > 0
+        assert all(counts[model.__table__.name] for model in MODELS), counts
+        print("✓ Every table seeded")
+        db.session.remove()
+        db.drop_all()
+
+def test_load_replay():
+    """Test a traffic mix replays without server errors and reports percentiles"""
+    with pytest.raises(ValueError):
+        build_schedule('weekend', 10, 100)
+    schedule = build_schedule('office_day', 120, scale=200)
+    assert schedule == build_schedule('office_day', 120, scale=200)
+    assert {item.endpoint.split(' ')[0] for item in schedule} >= {'GET', 'POST'}
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        prepare(scale=200)
+        assert StageEstimate.query.count() > 0
+        db.session.remove()
+
+    for mix in MIXES:
+        report = run_load(app, build_schedule(mix, 120, scale=200))
+        assert report['total']['count'] == 120 and report['total']['errors'] == 0, report['endpoints']
+        for stats in report['endpoints'].values():
+            assert stats['p50Ms'] <= stats['p95Ms'] <= stats['p99Ms']
+    print(f"✓ {len(MIXES)} traffic mixes replayed without server errors")
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_synthetic_data()
+    test_load_replay()
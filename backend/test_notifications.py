@@ -0,0 +1,107 @@
+"""
+Notification store test - verifies persistence, unread counters, bulk mark-read and pruning
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app
+from models import db, Notification, Vehicle, DispatchRequest, TransportJob
+from services.notification_service import NotificationService
+from services.transport_service import TransportService
+
+def count_selects(func):
+    """Run func and return (result, SELECT count)"""
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        result = func()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return result, len([s for s in statements if s.lstrip().upper().startswith('SELECT')])
+
+def test_notifications():
+    """Test notifications are stored with stable ids and counted per department"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        first = NotificationService.notify_driver_assigned('Ravi', 'MH12', 'SO-1', 'Acme')
+        NotificationService.notify_vehicle_status_change('MH12', 'Ravi', 'available', 'assigned')
+        for i in range(3):
+            NotificationService.create_notification('info', 'Info', f'Message {i}', department='transport')
+        ids = [n['id'] for n in NotificationService.get_notifications(limit=10)]
+        assert len(ids) == len(set(ids)) == 5
+        assert NotificationService.get_notifications(department='fleet')[0]['data']['vehicleNumber'] == 'MH12'
+        print("✓ Notifications persisted with unique ids")
+
+        # First read builds the counters; later reads are a single lookup kept current by writes
+        assert NotificationService.get_unread_count() == 5
+        NotificationService.create_notification('info', 'Info', 'Late', department='transport')
+        count, selects = count_selects(lambda: NotificationService.get_unread_count('transport'))
+        assert (count, selects) == (5, 1)
+        assert NotificationService.get_unread_count('fleet') == 1
+        print("✓ Unread counts read from counters in one query")
+
+        assert NotificationService.mark_as_read(first['id']) is True
+        assert NotificationService.mark_as_read(first['id']) is True
+        assert NotificationService.mark_as_read(99999) is False
+        transport_ids = [n['id'] for n in NotificationService.get_notifications(department='transport', unread_only=True)]
+        assert NotificationService.mark_many_as_read(transport_ids[:2] + [first['id']]) == 2
+        assert NotificationService.get_unread_count('transport') == 2
+        assert NotificationService.mark_all_as_read('fleet') == 1
+        assert NotificationService.get_unread_count() == 2
+        print("✓ Single, bulk and department mark-read keep counters exact")
+
+        # Uncommitted notifications roll back with the caller's transaction
+        NotificationService.create_notification('info', 'Info', 'Discarded', department='transport', commit=False)
+        db.session.rollback()
+        assert NotificationService.get_unread_count('transport') == 2
+
+        old = datetime.utcnow() - timedelta(days=45)
+        Notification.query.filter(Notification.id.in_(transport_ids[2:4])).update(
+            {'timestamp': old}, synchronize_session=False
+        )
+        db.session.commit()
+        assert NotificationService.prune_expired(ttl_days=30) == 2
+        assert NotificationService.get_unread_count() == 0
+        assert len(NotificationService.get_notifications(limit=50)) == 4
+
+        NotificationService.rebuild_unread_counts()
+        assert NotificationService.get_unread_count() == 0
+        print("✓ Expired notifications pruned and counters match a recount")
+
+        # Transport updates add notifications to their own transaction; the prune follows its commit
+        vehicle = Vehicle(vehicle_number='MH14', vehicle_type='truck', driver_name='Ravi', status='assigned')
+        dispatch = DispatchRequest(sales_order_id=1, showroom_product_id=1, party_name='Acme', quantity=1,
+                                   delivery_type='transport')
+        db.session.add_all([vehicle, dispatch])
+        db.session.flush()
+        job = TransportJob(dispatch_request_id=dispatch.id, status='assigned', vehicle_no='MH14')
+        db.session.add(job)
+        db.session.commit()
+        stale = NotificationService.create_notification('info', 'Info', 'Stale', department='transport')
+        Notification.query.filter_by(id=stale['id']).update({'timestamp': old}, synchronize_session=False)
+        db.session.commit()
+        NotificationService._last_pruned = None
+        TransportService.update_delivery_status(job.id, {'status': 'in_transit'})
+        assert Notification.query.get(stale['id']) is None
+        assert NotificationService._last_pruned is not None
+        assert Notification.query.filter_by(type='delivery_status_change').count() == 1
+        assert NotificationService.get_unread_count('transport') == 1
+        print("✓ Delivery updates prune expired notifications after they commit")
+
+        client = app.test_client()
+        NotificationService.create_notification('info', 'Info', 'Api', department='dispatch')
+        assert client.get('/api/notifications/unread-count?department=dispatch').get_json()['unreadCount'] == 1
+        assert client.post('/api/notifications/read', json={'department': 'dispatch'}).get_json() == {'marked': 1}
+        assert client.post('/api/notifications/read', json={'ids': 'x'}).status_code == 400
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_notifications()
@@ -0,0 +1,90 @@
+"""
+Order log test - verifies the current order log is built from batched queries
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from app import create_app
+from models import db, ProductionOrder, PurchaseOrder, AssemblyOrder, ShowroomProduct
+from services.order_tracking_service import OrderTrackingService
+from utils.changes import CHUNK_SIZE
+
+def test_current_order_log():
+    """Test order log output and query count"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        print("Seeding production orders...")
+        for i in range(10):
+            order = ProductionOrder(product_name=f"Product {i}", category="Furniture", quantity=2, created_by="tester")
+            db.session.add(order)
+            db.session.flush()
+            if i % 2 == 0:
+                purchase_order = PurchaseOrder(
+                    production_order_id=order.id, product_name=order.product_name, quantity=2,
+                    status='pending_finance_approval'
+                )
+                purchase_order.set_materials_list([{'name': 'Wood', 'quantity': 4}])
+                db.session.add(purchase_order)
+            if i % 3 == 0:
+                db.session.add(AssemblyOrder(
+                    production_order_id=order.id, product_name=order.product_name, quantity=2,
+                    status='in_progress', progress=50
+                ))
+            if i == 9:
+                db.session.add(ShowroomProduct(
+                    name=order.product_name, category="Furniture", production_order_id=order.id
+                ))
+        db.session.commit()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            result = OrderTrackingService.get_current_order_log()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        print(f"✓ Order log built with {len(statements)} queries")
+        # Production, purchase (plus one for its material lines), assembly, showroom,
+        # and the (still empty) stage estimates, which are then kept in memory
+        assert len(statements) == 6
+
+        assert result['totalOrders'] == 10
+        summary = result['summary']
+        # 0, 3, 6 in assembly; 9 in showroom; 2, 4, 8 awaiting finance; the rest untouched
+        assert summary['inAssembly'] == 3
+        assert summary['inShowroom'] == 1
+        assert summary['inFinance'] == 3
+        assert summary['inPurchase'] == 3
+        assert summary['totalValue'] == sum(o['orderValue'] for o in result['orders'])
+
+        by_name = {o['productName']: o for o in result['orders']}
+        assert by_name['Product 0']['assemblyProgress'] == 50
+        assert by_name['Product 0']['purchaseStatus'] == 'pending_finance_approval'
+        assert by_name['Product 0']['orderValue'] == 30
+        assert by_name['Product 9']['showroomStatus'] == 'available'
+        print("✓ Order log summary matches per-order status")
+
+        # Id lists past the bind limit are loaded in chunks with the same result
+        ids = [o['id'] for o in result['orders']]
+        padded = ids + list(range(100000, 100000 + 2 * CHUNK_SIZE))
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            chunked = OrderTrackingService._load_related_records(padded)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        # Three chunks per model, plus the material lines of the purchase orders found
+        assert len(statements) == 3 * 3 + 1
+        assert chunked == OrderTrackingService._load_related_records(ids)
+        print("✓ Related records loaded in chunks")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_current_order_log()
@@ -0,0 +1,100 @@
+"""
+Order search test - verifies indexed status tracking search, ranking, pagination and commit-time updates
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import db, ProductionOrder, ShowroomProduct, SalesOrder, DispatchRequest, TransportJob, OrderSearchDocument
+from services.order_tracking_service import OrderTrackingService
+from utils.search import InvertedIndex, order_search
+
+def seed():
+    """Two production orders with showroom products and three sales orders"""
+    for name in ('Steel Almirah', 'Office Chair'):
+        db.session.add(ProductionOrder(product_name=name, category='furniture', quantity=1, status='completed'))
+    db.session.flush()
+    for order_id, name in ((1, 'Steel Almirah'), (2, 'Office Chair')):
+        db.session.add(ShowroomProduct(name=name, category='furniture', production_order_id=order_id))
+    db.session.flush()
+    for number, customer, product_id in (('SO-100', 'Ramesh Traders', 1), ('SO-101', 'Maharam Stores', 2),
+                                         ('SO-102', 'Acme Ramps', 2)):
+        db.session.add(SalesOrder(
+            order_number=number, customer_name=customer, showroom_product_id=product_id, unit_price=10.0,
+            total_amount=10.0, final_amount=10.0, payment_method='cash', sales_person='tester'
+        ))
+    db.session.commit()
+
+def sales_numbers(result):
+    return [o['orderNumber'] for o in result['salesOrders']]
+
+def test_order_search():
+    """Test status tracking search reads the maintained search documents"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed()
+        assert OrderSearchDocument.query.count() == 5
+        print("✓ Search documents written on commit")
+
+        result = OrderTrackingService.get_order_status_tracking('ramesh')
+        assert sales_numbers(result) == ['SO-100']
+        assert [o['orderNumber'] for o in result['productionOrders']] == ['PO-0001']
+        assert result['hasMore'] is False
+        # Word prefix ranks above a mid-word substring
+        result = OrderTrackingService.get_order_status_tracking('ram')
+        assert sales_numbers(result)[:2] in (['SO-102', 'SO-100'], ['SO-100', 'SO-102'])
+        assert sales_numbers(result)[2] == 'SO-101'
+        # Exact order number ranks first
+        assert sales_numbers(OrderTrackingService.get_order_status_tracking('so-101'))[0] == 'SO-101'
+        assert OrderTrackingService.get_order_status_tracking('nothing here')['salesOrders'] == []
+        print("✓ Substring and prefix matches ranked")
+
+        # Changes to a dispatch's transport job are searchable after commit only
+        db.session.add(DispatchRequest(sales_order_id=2, showroom_product_id=2, party_name='Maharam Stores',
+                                       quantity=1, delivery_type='transport'))
+        db.session.flush()
+        db.session.add(TransportJob(dispatch_request_id=1, transporter_name='Speedy Logistics', vehicle_no='MH12AB1234'))
+        db.session.rollback()
+        assert OrderTrackingService.get_order_status_tracking('speedy')['salesOrders'] == []
+
+        db.session.add(DispatchRequest(sales_order_id=2, showroom_product_id=2, party_name='Maharam Stores',
+                                       quantity=1, delivery_type='transport'))
+        db.session.commit()
+        db.session.add(TransportJob(dispatch_request_id=1, transporter_name='Speedy Logistics', vehicle_no='MH12AB1234'))
+        db.session.commit()
+        assert sales_numbers(OrderTrackingService.get_order_status_tracking('speedy'))[0] == 'SO-101'
+        assert sales_numbers(OrderTrackingService.get_order_status_tracking('12ab9')) == []
+        result = OrderTrackingService.get_order_status_tracking('mh12ab')
+        # Orders of the same production order come along as related
+        assert sales_numbers(result) == ['SO-101', 'SO-102']
+        TransportJob.query.first().vehicle_no = 'KA01XY9999'
+        db.session.commit()
+        assert OrderTrackingService.get_order_status_tracking('mh12ab')['salesOrders'] == []
+        print("✓ Transporter and vehicle changes indexed on commit, rollbacks ignored")
+
+        # Keyset pagination over the ranked hits
+        client = app.test_client()
+        first = client.get('/api/orders/status-tracking?q=ra&limit=2').get_json()
+        assert first['hasMore'] is True
+        second = client.get(f"/api/orders/status-tracking?q=ra&limit=2&cursor={first['nextCursor']}").get_json()
+        assert second['hasMore'] is False and second['nextCursor'] is None
+        assert client.get('/api/orders/status-tracking?q=ra&cursor=bad').status_code == 400
+        assert client.get('/api/orders/status-tracking').get_json()['summary']['totalSalesOrders'] == 3
+        print("✓ Ranked results paginate with a cursor")
+
+        # The in-process index agrees with a rebuild
+        assert order_search.rebuild() == 5
+        assert sales_numbers(OrderTrackingService.get_order_status_tracking('speedy'))[0] == 'SO-101'
+        index = InvertedIndex()
+        index.build([(1, 'steel almirah'), (2, 'office chair')])
+        assert index.candidates('almi') == {1} and index.candidates('ch') == {2}
+        index.apply({2: 'office table'}, [1])
+        assert index.candidates('almi') == set() and index.candidates('tabl') == {2}
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_order_search()
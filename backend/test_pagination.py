@@ -0,0 +1,85 @@
+"""
+Keyset pagination test - walks the dispatch list page by page via the API
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from app import create_app
+from models import db, DispatchRequest
+
+def test_dispatch_keyset_pagination():
+    """Test cursor pages cover every row exactly once, newest first"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        print("Seeding dispatch requests...")
+        base_time = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(7):
+            db.session.add(DispatchRequest(
+                sales_order_id=i + 1,
+                showroom_product_id=1,
+                party_name=f"Party {i}",
+                quantity=1,
+                delivery_type='self' if i % 2 == 0 else 'transport',
+                # Pairs of rows share a timestamp so the id tie-breaker is exercised
+                created_at=base_time + timedelta(minutes=i // 2),
+                updated_at=base_time
+            ))
+        db.session.commit()
+
+        client = app.test_client()
+
+        # Legacy callers without page params still get the full array
+        response = client.get('/api/dispatch/all')
+        assert response.status_code == 200
+        assert isinstance(response.get_json(), list)
+        assert len(response.get_json()) == 7
+
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/dispatch/all?limit=3' + (f'&cursor={cursor}' if cursor else '')
+            page = client.get(url).get_json()
+            assert page['count'] <= 3
+            seen.extend(order['id'] for order in page['items'])
+            cursor = page['nextCursor']
+            if not page['hasMore']:
+                break
+        print(f"✓ Walked {len(seen)} rows across pages")
+        assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+        # Rows without created_at come last and the cursor can point at one
+        DispatchRequest.query.filter(DispatchRequest.id.in_([2, 5])).update(
+            {'created_at': None}, synchronize_session=False
+        )
+        db.session.commit()
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/dispatch/all?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            page = client.get(url).get_json()
+            seen.extend(order['id'] for order in page['items'])
+            cursor = page['nextCursor']
+            if not page['hasMore']:
+                break
+        assert seen == [7, 6, 4, 3, 1, 5, 2]
+        print("✓ Rows without a timestamp paged after the rest")
+
+        # Server-side filtering applies before the page is cut
+        page = client.get('/api/dispatch/all?limit=10&delivery_type=transport').get_json()
+        assert [order['id'] for order in page['items']] == [6, 4, 2]
+        assert page['hasMore'] is False
+
+        # Bad page parameters are client errors
+        assert client.get('/api/dispatch/all?limit=0').status_code == 400
+        assert client.get('/api/dispatch/all?cursor=not-a-cursor').status_code == 400
+        print("✓ Filters and validation working")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_dispatch_keyset_pagination()
@@ -0,0 +1,95 @@
+"""
+Purchase order line test - verifies line items drive stock checks, expenses and shortages
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import db, PurchaseOrder, PurchaseOrderLine, StoreInventory
+from services.finance_service import FinanceService
+from services.inventory_service import InventoryService
+from services.production_service import ProductionService
+from services.purchase_service import PurchaseService
+
+def create_order(materials):
+    """Create a production order and return its purchase order id"""
+    result = ProductionService.create_production_order({
+        'productName': 'Oak Table', 'category': 'Furniture', 'quantity': 1,
+        'createdBy': 'tester', 'materials': materials
+    })
+    return result['purchaseOrder']['id']
+
+def test_purchase_order_lines():
+    """Test the purchase flow on normalized material lines"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        db.session.add(StoreInventory(name='Oak Plank', quantity=10))
+        db.session.add(StoreInventory(name='Screws', quantity=100))
+        db.session.commit()
+
+        print("Creating orders with known and new materials...")
+        first = create_order([{'name': 'Oak Plank', 'quantity': 6}, {'name': 'Screws', 'quantity': 40}])
+        second = create_order([{'name': 'Oak Plank', 'quantity': 8}, {'name': 'Varnish', 'quantity': 2},
+                               {'name': 'Varnish', 'quantity': 1}])
+        assert PurchaseOrderLine.query.count() == 4
+        varnish = StoreInventory.query.filter_by(name='Varnish').one()
+        assert varnish.quantity == 0
+        order = PurchaseService.get_purchase_order_by_id(second)
+        assert order['materials'] == [
+            {'name': 'Oak Plank', 'quantity': 8, 'unit_cost': 0.0},
+            {'name': 'Varnish', 'quantity': 3, 'unit_cost': 0.0}
+        ]
+        assert order['originalRequirements'] == [{'name': 'Oak Plank', 'quantity': 8}, {'name': 'Varnish', 'quantity': 3}]
+        print("✓ Materials resolved to inventory rows and merged by name")
+
+        shortages = {row['name']: row for row in InventoryService.get_shortage_report()}
+        assert set(shortages) == {'Oak Plank', 'Varnish'}
+        assert shortages['Oak Plank']['demand'] == 14 and shortages['Oak Plank']['shortage'] == 4
+        assert shortages['Oak Plank']['openOrders'] == 2
+        print("✓ Shortage report aggregates open demand per material")
+
+        result = InventoryService.check_stock_availability(first)
+        assert result['allAvailable'] is True
+        assert StoreInventory.query.filter_by(name='Oak Plank').one().quantity == 4
+
+        result = InventoryService.check_stock_availability(second)
+        assert result['newStatus'] == 'partially_allocated'
+        assert sorted(result['shortages'], key=lambda s: s['name']) == [
+            {'name': 'Oak Plank', 'quantity': 4}, {'name': 'Varnish', 'quantity': 3}
+        ]
+        order = result['purchaseOrder']
+        assert order['materials'] == [
+            {'name': 'Oak Plank', 'quantity': 4, 'unit_cost': 0.0},
+            {'name': 'Varnish', 'quantity': 3, 'unit_cost': 0.0}
+        ]
+        assert order['originalRequirements'] == [{'name': 'Oak Plank', 'quantity': 8}, {'name': 'Varnish', 'quantity': 3}]
+        print("✓ Partial allocation leaves only the shortage to purchase")
+
+        PurchaseService.update_purchase_order(second, {'materials': [
+            {'name': 'Oak Plank', 'quantity': 5, 'unit_cost': 120.0},
+            {'name': 'Varnish', 'quantity': 3, 'unit_cost': 50.0}
+        ]})
+        PurchaseService.request_finance_approval(second)
+        FinanceService.approve_purchase_order(second)
+        expense = FinanceService.get_transactions(transaction_type='expense')[0]
+        assert expense['amount'] == 5 * 120.0 + 3 * 50.0
+        assert FinanceService.get_dashboard_data()['totalExpenses'] == 750.0
+        print("✓ Expenses summed from line costs")
+
+        InventoryService.process_purchase_verification(second)
+        # Purchased 5 planks onto 0 left, then the original 8 needed cannot be met;
+        # 3 varnish arrive and the 3 required are allocated
+        assert StoreInventory.query.filter_by(name='Oak Plank').one().quantity == 5
+        assert StoreInventory.query.filter_by(name='Varnish').one().quantity == 0
+        assert PurchaseOrder.query.get(second).status == 'store_allocated'
+        assert InventoryService.get_shortage_report() == []
+        print("✓ Verification stocks purchases and allocates requirements")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_purchase_order_lines()
@@ -0,0 +1,41 @@
+"""
+Query plan test - service entry points must not full-scan large tables
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import db
+from benchmark_query_plans import run_benchmark, ENTRY_POINTS
+
+def test_query_plans_use_indexes():
+    """Test every benchmarked entry point is served by indexes"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        # Without planner statistics SQLite assumes every table is large,
+        # so a planned scan means no index fits the query
+        report = run_benchmark(scale=300, repeat=1, analyze=False)
+        assert len(report['entryPoints']) == len(ENTRY_POINTS)
+        assert report['regressions'] == [], report['regressions']
+        print(f"✓ {len(ENTRY_POINTS)} entry points planned without full scans")
+
+        db.session.remove()
+        db.drop_all()
+
+        # Dropping the gate pass foreign key index must be caught
+        db.create_all()
+        db.session.execute(db.text('DROP INDEX ix_gate_pass_dispatch_request_id'))
+        db.session.commit()
+        entry_points = [e for e in ENTRY_POINTS if e[0] == 'watchman.get_all_gate_passes(page)']
+        report = run_benchmark(scale=300, repeat=1, entry_points=entry_points, analyze=False)
+        assert {r['table'] for r in report['regressions']} == {'gate_pass'}
+        print("✓ Missing index reported as a full scan")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_query_plans_use_indexes()
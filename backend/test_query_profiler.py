@@ -0,0 +1,83 @@
+"""
+Query profiler test - verifies per-request query headers and N+1 flagging
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from flask import jsonify
+from app import create_app, enable_sql_profiler
+from models import db, DispatchRequest
+from utils.profiler import fingerprint_statement
+
+def test_query_profiler():
+    """Test profiler headers, debug summary and repeated statement detection"""
+    app = create_app('testing')
+    app.config['SQL_PROFILER_REPEAT_THRESHOLD'] = 3
+    enable_sql_profiler(app)
+
+    @app.route('/api/test/n-plus-one')
+    def n_plus_one():
+        # One query per row, the pattern the profiler should flag
+        ids = [row.id for row in DispatchRequest.query.all()]
+        names = [DispatchRequest.query.get(dispatch_id).party_name for dispatch_id in ids]
+        return jsonify(names)
+
+    with app.app_context():
+        db.create_all()
+
+        print("Seeding dispatch requests...")
+        for i in range(5):
+            db.session.add(DispatchRequest(
+                sales_order_id=i + 1, showroom_product_id=1, party_name=f"Party {i}",
+                quantity=1, delivery_type='self'
+            ))
+        db.session.commit()
+        db.session.remove()
+
+        client = app.test_client()
+
+        response = client.get('/api/test/n-plus-one')
+        assert response.status_code == 200
+        assert response.headers['X-Query-Count'] == '6'
+        assert float(response.headers['X-Query-Time-Ms']) >= 0
+        assert response.headers['X-Query-Repeated'] == '5'
+        print("✓ Query count and repeat headers set")
+
+        response = client.get('/api/health')
+        assert response.headers['X-Query-Count'] == '0'
+        assert 'X-Query-Repeated' not in response.headers
+
+        summary = client.get('/api/debug/profile').get_json()
+        assert summary['flaggedEndpoints'] == ['n_plus_one']
+        endpoint = summary['endpoints'][0]
+        assert endpoint['endpoint'] == 'n_plus_one'
+        assert endpoint['queries'] == 6
+        assert endpoint['repeatedStatements'][0]['maxCount'] == 5
+        print("✓ Debug summary flags the N+1 endpoint")
+
+        assert client.delete('/api/debug/profile').status_code == 200
+        assert client.get('/api/debug/profile').get_json()['endpoints'] == []
+
+        assert fingerprint_statement("SELECT * FROM t WHERE id = 5 AND name = 'x''y'") == \
+            "SELECT * FROM t WHERE id = ? AND name = ?"
+        assert fingerprint_statement("SELECT * FROM t WHERE id IN (?, ?, ?)") == \
+            fingerprint_statement("SELECT * FROM t WHERE id IN (%(id_1_1)s)")
+
+        db.session.remove()
+        db.drop_all()
+
+def test_profiler_disabled_by_default():
+    """Test the profiler adds nothing unless enabled"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        assert 'X-Query-Count' not in client.get('/api/health').headers
+        assert client.get('/api/debug/profile').status_code == 404
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_query_profiler()
+    test_profiler_disabled_by_default()
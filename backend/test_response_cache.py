@@ -0,0 +1,100 @@
+"""
+Response cache test - verifies hits, commit-time invalidation, LRU bounds and stats
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from app import create_app
+from models import db, SalesOrder, TransportJob
+from services.sales_service import SalesService
+from services.transport_service import TransportService
+from utils.cache import CacheBackend, LocalCacheBackend, response_cache
+
+def add_order(number, amount):
+    db.session.add(SalesOrder(
+        order_number=number, customer_name='Customer', showroom_product_id=1, unit_price=amount,
+        total_amount=amount, final_amount=amount, payment_method='cash', sales_person='tester'
+    ))
+
+def count_queries(func):
+    """Run func and return (result, statement count)"""
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        result = func()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return result, len(statements)
+
+def test_response_cache():
+    """Test cached summaries are served until a committed write to their tables"""
+    class ReadOnlyBackend(CacheBackend):
+        def get(self, key):
+            return None
+    try:
+        ReadOnlyBackend()
+        assert False, 'an incomplete backend should not be constructible'
+    except TypeError:
+        pass
+
+    app = create_app('testing')
+    response_cache.init_app(app, LocalCacheBackend(max_entries=2))
+    with app.app_context():
+        db.create_all()
+        response_cache.clear()
+        add_order('SO-1', 100.0)
+        db.session.commit()
+
+        first, queries = count_queries(SalesService.get_sales_summary)
+        assert first['totalOrders'] == 1 and queries > 0
+        second, queries = count_queries(SalesService.get_sales_summary)
+        assert second == first and queries == 0
+        print("✓ Repeated reads served from the cache")
+
+        # Rolled back writes do not invalidate; uncommitted ones bypass the cache
+        add_order('SO-2', 50.0)
+        assert SalesService.get_sales_summary()['totalOrders'] == 2
+        db.session.rollback()
+        _, queries = count_queries(SalesService.get_sales_summary)
+        assert queries == 0
+
+        add_order('SO-3', 25.0)
+        db.session.commit()
+        summary, queries = count_queries(SalesService.get_sales_summary)
+        assert summary['totalOrders'] == 2 and summary['totalRevenue'] == 125.0 and queries > 0
+        print("✓ Committed writes invalidate tagged entries")
+
+        # Writes to other tables leave the entry alone; bulk updates invalidate
+        db.session.add(TransportJob(dispatch_request_id=1, transporter_name='Fast'))
+        db.session.commit()
+        _, queries = count_queries(SalesService.get_sales_summary)
+        assert queries == 0
+        SalesOrder.query.update({'order_status': 'delivered'}, synchronize_session=False)
+        db.session.commit()
+        assert SalesService.get_sales_summary()['completedOrders'] == 2
+
+        # Mutating a returned value does not corrupt the cached copy
+        summary = SalesService.get_sales_summary()
+        summary['totalOrders'] = -1
+        assert SalesService.get_sales_summary()['totalOrders'] == 2
+        print("✓ Unrelated writes keep entries; bulk updates invalidate")
+
+        # Bounded: a third entry evicts the least recently used one
+        TransportService.get_transporter_performance()
+        SalesService.get_sales_summary()
+        response_cache.cached('test.echo', tags=('sales_order',))(lambda value: value)('x')
+        stats = app.test_client().get('/api/health/cache').get_json()
+        assert stats['entries'] == 2 and stats['evictions'] == 1
+        assert stats['names']['sales.summary']['hits'] >= 4
+        assert stats['names']['sales.summary']['stale'] >= 2
+        assert 0 < stats['hitRate'] < 1
+        print("✓ LRU bound enforced and hit/miss stats reported")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_response_cache()
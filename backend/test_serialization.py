@@ -0,0 +1,139 @@
+"""
+Serialization test - verifies compiled model serializers, ?fields= projection and the orjson provider
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from app import create_app
+from models import db, SalesOrder, SalesTransaction, AssemblyOrder, ProductionOrder, PartLoadDetail
+from models.serialization import camelize, parse_fields
+from services.sales_service import SalesService
+from synthetic_data import seed_dataset
+from utils.json_provider import OrjsonJSONProvider
+
+SALES_ORDER_KEYS = {
+    'id', 'orderNumber', 'customerName', 'customerContact', 'customerEmail', 'customerAddress',
+    'showroomProductId', 'quantity', 'unitPrice', 'totalAmount', 'discountAmount', 'transportCost',
+    'finalAmount', 'amountPaid', 'balanceAmount', 'paymentMethod', 'paymentStatus', 'orderStatus',
+    'salesPerson', 'deliveryType', 'notes', 'couponCode', 'financeBypass', 'bypassReason', 'bypassedAt',
+    'createdAt', 'updatedAt', 'showroomProduct'
+}
+
+def count_queries(fn):
+    """Run fn and return (result, statements executed)"""
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        return fn(), statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+def test_model_serializers():
+    """Test compiled to_dict keeps the hand written payloads and projects fields"""
+    assert camelize('showroom_product_id') == 'showroomProductId' and camelize('id') == 'id'
+    assert parse_fields(None) is None and parse_fields(' id, orderNumber ,') == {'id', 'orderNumber'}
+    try:
+        parse_fields(',')
+        assert False, 'empty fields should be rejected'
+    except ValueError:
+        pass
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed_dataset(scale=60, seed=7, analyze=False)
+
+        paid_order = db.session.query(SalesTransaction.sales_order_id).filter_by(transaction_type='payment').first()[0]
+        order = SalesOrder.query.get(paid_order)
+        data = order.to_dict()
+        assert set(data) == SALES_ORDER_KEYS
+        paid = sum(t.amount for t in order.transactions if t.transaction_type == 'payment')
+        assert data['amountPaid'] == paid and data['balanceAmount'] == max(order.final_amount - paid, 0.0)
+        assert data['deliveryType'] == order.Delivery_type and data['createdAt'] == order.created_at.isoformat()
+        assert data['showroomProduct'] == order.showroom_product.to_dict()
+        assert order.to_dict(fields={'orderNumber', 'amountPaid'}) == {
+            'id': order.id, 'orderNumber': order.order_number, 'amountPaid': paid
+        }
+        print("✓ Sales order payload unchanged, projection keeps only the asked fields")
+
+        production_order = ProductionOrder.query.first()
+        assert production_order.to_dict()['createdAt'].endswith('IST')
+        assembly_order = AssemblyOrder.query.first()
+        assembly_order.progress = None
+        assert assembly_order.to_dict()['progress'] == 0
+        part_load = PartLoadDetail.query.first()
+        assert 'createdAt' not in part_load.to_dict() and 'lrNo' in part_load.to_dict()
+        print("✓ Per-model conversions and exclusions kept")
+
+        db.session.remove()
+        db.drop_all()
+
+def test_projected_lists():
+    """Test list endpoints batch their per-row lookups and honour ?fields="""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed_dataset(scale=120, seed=7, analyze=False)
+        page = {'limit': 50, 'cursor': None}
+
+        full, statements = count_queries(lambda: SalesService.get_sales_orders(page=page))
+        assert full['count'] == 50 and set(full['items'][0]) == SALES_ORDER_KEYS | {'afterSalesStatus'}
+        # Orders, their showroom products, payment totals and dispatch check
+        assert len(statements) == 4
+        order = SalesOrder.query.get(full['items'][0]['id'])
+        expected = order.to_dict()
+        expected['afterSalesStatus'] = 'sent_to_dispatch' if order.dispatch_requests else None
+        assert full['items'][0] == expected
+
+        projected, statements = count_queries(
+            lambda: SalesService.get_sales_orders(page=page, fields=frozenset({'orderNumber', 'finalAmount'}))
+        )
+        assert len(statements) == 1
+        assert projected['items'][0] == {key: expected[key] for key in ('id', 'orderNumber', 'finalAmount')}
+        print("✓ Sales page in 4 queries, projected page in 1")
+
+        client = app.test_client()
+        response = client.get('/api/sales/orders?limit=10&fields=orderNumber,orderStatus')
+        assert response.status_code == 200
+        assert all(set(o) == {'id', 'orderNumber', 'orderStatus'} for o in response.get_json()['items'])
+        assert client.get('/api/sales/orders?fields=,').status_code == 400
+        approvals = client.get('/api/approval/all?limit=10&fields=status').get_json()
+        assert all(set(a) <= {'id', 'status'} for a in approvals['items'])
+        pending = client.get('/api/transport/approvals/pending?fields=status,orderNumber').get_json()
+        assert pending and all(set(a) == {'id', 'status', 'orderNumber'} for a in pending)
+        print("✓ ?fields= projects sales, approval and transport approval lists")
+
+        db.session.remove()
+        db.drop_all()
+
+def test_json_provider():
+    """Test orjson responses decode to the same values as the default provider's"""
+    app = create_app('testing')
+    assert isinstance(app.json, OrjsonJSONProvider)
+    default = DefaultJSONProvider(app)
+    payload = {
+        'b': [1, 2.5, None, True], 'a': 'café', 'when': datetime(2025, 1, 31, 17, 30),
+        'amount': Decimal('10.50'), 'ref': uuid.UUID(int=1)
+    }
+    with app.test_request_context():
+        response = app.json.response(payload)
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.get_data()) == json.loads(default.response(payload).get_data())
+        assert app.json.dumps({'b': 1, 'a': 2}) == '{"a":2,"b":1}'
+        # Beyond 64 bits falls back to the standard library encoder
+        assert app.json.loads(app.json.dumps({'big': 2 ** 70})) == {'big': 2 ** 70}
+        assert app.json.dumps({'a': 1}, indent=2) == default.dumps({'a': 1}, indent=2)
+    print("✓ orjson provider output matches the default provider")
+
+if __name__ == '__main__':
+    test_model_serializers()
+    test_projected_lists()
+    test_json_provider()
@@ -0,0 +1,144 @@
+"""
+Stage estimate test - verifies stage durations are learned from the status log and drive order ETAs
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from app import create_app
+from models import db, ProductionOrder, PurchaseOrder, ShowroomProduct, StatusEvent, StageEstimate, DispatchRequest, TransportJob
+from services.order_tracking_service import OrderTrackingService
+from utils.cache import response_cache, LocalCacheBackend
+from utils.estimates import StageLookup, stage_estimator, STAGE_NAMES, MIN_SAMPLES
+from backtest_stage_estimates import seed_history, run_backtest
+
+HOUR = 3600
+
+def test_stage_lookup():
+    """Test remaining time sums the later stages and sparse categories fall back"""
+    rows = [('*', name, 100, HOUR, 2 * HOUR) for name in STAGE_NAMES]
+    rows.append(('Machinery', 'assembly', 50, 10 * HOUR, 20 * HOUR))
+    rows.append(('Toys', 'assembly', MIN_SAMPLES - 1, 99 * HOUR, 99 * HOUR))
+    lookup = StageLookup(rows)
+    assert lookup.remaining_seconds('Machinery', 'assembly') == (10 + 4) * HOUR
+    assert lookup.remaining_seconds('Machinery', 'assembly', elapsed=4 * HOUR) == (6 + 4) * HOUR
+    assert lookup.remaining_seconds('Toys', 'assembly') == lookup.remaining_seconds('Unknown', 'assembly') == 5 * HOUR
+    assert lookup.remaining_seconds(None, 'transit', elapsed=5 * HOUR) == 0
+    assert StageLookup(rows[1:]).remaining_seconds('Machinery', 'assembly') == (10 + 4) * HOUR
+    assert StageLookup(rows[1:]).remaining_seconds('Machinery', 'purchase_approval') is None
+    assert not StageLookup([])
+    print("✓ ETA lookups sum the medians of the remaining stages")
+
+def test_stage_estimates():
+    """Test estimates are refreshed from the log and used by the order log"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed_history(orders=300)
+
+        report = OrderTrackingService.refresh_completion_estimates()
+        assert report['orders'] == 300 and report['durations'] == 300 * len(STAGE_NAMES)
+        estimate = StageEstimate.query.filter_by(category='*', stage='assembly').first()
+        assert estimate.sample_count == 300
+        # Seeded with a 72h median for Furniture, scaled 0.6 and 1.8 for the other categories
+        assert 40 * HOUR < estimate.median_seconds < 100 * HOUR < estimate.p90_seconds
+        machinery = StageEstimate.query.filter_by(category='Machinery', stage='assembly').first()
+        assert machinery.median_seconds > estimate.median_seconds
+        print("✓ Stage durations learned per category")
+
+        backtest = run_backtest()
+        assert backtest['error']['count'] > 0 and backtest['unpredicted'] == 0
+        assert backtest['error']['maeHours'] < backtest['progressBaselineError']['maeHours']
+        print(f"✓ Backtest MAE {backtest['error']['maeHours']}h vs "
+              f"{backtest['progressBaselineError']['maeHours']}h progress based")
+
+        fresh = ProductionOrder(product_name='Desk', category='Machinery', quantity=1)
+        stuck = ProductionOrder(product_name='Lathe', category='Machinery', quantity=1)
+        db.session.add_all([fresh, stuck])
+        db.session.flush()
+        db.session.add(PurchaseOrder(production_order_id=fresh.id, product_name='Desk', quantity=1,
+                                     status='store_allocated'))
+        db.session.add(PurchaseOrder(production_order_id=stuck.id, product_name='Lathe', quantity=1,
+                                     status='store_allocated'))
+        db.session.commit()
+        # The lathe's materials were allocated a month ago
+        StatusEvent.query.filter_by(production_order_id=stuck.id).update(
+            {'occurred_at': datetime.utcnow() - timedelta(days=30)}
+        )
+        db.session.commit()
+
+        orders = {o['id']: o for o in OrderTrackingService.get_current_order_log(category='Machinery')['orders']}
+        expected = datetime.utcnow() + timedelta(seconds=stage_estimator.lookup().remaining_seconds('Machinery', 'assembly'))
+        eta = datetime.fromisoformat(orders[fresh.id]['estimatedCompletion'])
+        assert orders[fresh.id]['currentStage'] == 'assembly' and orders[fresh.id]['estimateSource'] == 'history'
+        assert abs((eta - expected).total_seconds()) < 60
+        assert orders[fresh.id]['priority'] == 'Low' and orders[stuck.id]['priority'] == 'High'
+        assert datetime.fromisoformat(orders[stuck.id]['estimatedCompletion']) < eta
+        print("✓ Order ETAs and priorities read from the learned stages")
+
+        now = datetime.utcnow()
+        shipped, delivered, sold = (ProductionOrder(product_name=name, category='Machinery', quantity=1)
+                                    for name in ('Press', 'Drill', 'Saw'))
+        db.session.add_all([shipped, delivered, sold])
+        db.session.flush()
+        for order in (shipped, delivered, sold):
+            db.session.add(ShowroomProduct(name=order.product_name, category='Machinery',
+                                           production_order_id=order.id, showroom_status='sold'))
+        # Dispatch side of the chain, as the status log records it
+        for order, entity, status, days_ago in (
+            (shipped, 'showroom_product', 'available', 10), (shipped, 'dispatch_request', 'pending', 3),
+            (shipped, 'transport_job', 'in_transit', 2), (shipped, 'showroom_product', 'sold', 1),
+            (delivered, 'dispatch_request', 'pending', 3), (delivered, 'transport_job', 'delivered', 1),
+        ):
+            db.session.add(StatusEvent(entity=entity, entity_id=order.id, status=status,
+                                       production_order_id=order.id, occurred_at=now - timedelta(days=days_ago)))
+        db.session.commit()
+
+        orders = {o['id']: o for o in OrderTrackingService.get_current_order_log(category='Machinery')['orders']}
+        # Two days into transit: entered with the transport job, not the later showroom event
+        transit = stage_estimator.lookup().remaining_seconds('Machinery', 'transit', elapsed=2 * 24 * HOUR)
+        eta = datetime.fromisoformat(orders[shipped.id]['estimatedCompletion'])
+        assert orders[shipped.id]['currentStage'] == 'transit'
+        assert abs((eta - (datetime.utcnow() + timedelta(seconds=transit))).total_seconds()) < 60
+        assert orders[delivered.id]['currentStage'] is None and orders[delivered.id]['estimatedCompletion'] is None
+        assert orders[sold.id]['currentStage'] == 'dispatch'
+        print("✓ Sold orders placed in dispatch or transit, delivered ones left without an ETA")
+
+        # A cached log is invalidated when a delivery is logged
+        backend = LocalCacheBackend()
+        response_cache.init_app(app, backend)
+        response_cache.clear()
+        product = ShowroomProduct.query.filter_by(production_order_id=sold.id).first()
+        dispatch = DispatchRequest(sales_order_id=1, showroom_product_id=product.id, party_name='Acme', quantity=1,
+                                   delivery_type='transport')
+        db.session.add(dispatch)
+        db.session.flush()
+        job = TransportJob(dispatch_request_id=dispatch.id, status='in_transit')
+        db.session.add(job)
+        db.session.commit()
+        current = lambda: OrderTrackingService.get_current_order_log(category='Machinery')['orders']
+        assert {o['id']: o for o in current()}[sold.id]['currentStage'] == 'transit'
+        assert {o['id']: o for o in current()}[sold.id]['currentStage'] == 'transit'
+        assert response_cache.stats()['hits'] == 1
+        logged = backend.get_versions(['status_event'])['status_event']
+        job.status = 'delivered'
+        db.session.commit()
+        assert backend.get_versions(['status_event'])['status_event'] == logged + 1
+        delivered_now = {o['id']: o for o in current()}[sold.id]
+        assert delivered_now['currentStage'] is None and delivered_now['estimatedCompletion'] is None
+        del app.extensions['response_cache']
+        print("✓ Cached order log invalidated by a delivery")
+
+        client = app.test_client()
+        listed = client.get('/api/orders/analytics/estimates?category=Machinery').get_json()
+        assert len(listed['estimates']) == len(STAGE_NAMES) and listed['refreshedAt']
+        assert client.post('/api/orders/analytics/estimates/refresh', json={'since': 'soon'}).status_code == 400
+        assert client.post('/api/orders/analytics/estimates/refresh').status_code == 200
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_stage_lookup()
+    test_stage_estimates()
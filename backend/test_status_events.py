@@ -0,0 +1,99 @@
+"""
+Status events test - verifies commit-time publishing, topic filters and stream resume
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+from itertools import islice
+from app import create_app
+from models import db, DispatchRequest, TransportJob
+from utils.events import EventBroker, LocalEventBroker, status_events, stream_events
+
+def test_status_events():
+    """Test committed status changes reach subscribers of their topics only"""
+    app = create_app('testing')
+    # Off by default; enable as a deployment with threaded workers would
+    status_events.init_app(app)
+    app.config['STATUS_EVENTS_STREAM_SECONDS'] = 0.2
+    app.config['STATUS_EVENTS_KEEPALIVE_SECONDS'] = 0.05
+    client = app.test_client()
+    with app.app_context():
+        db.create_all()
+
+        dispatch = DispatchRequest(sales_order_id=7, showroom_product_id=1, party_name='Party',
+                                   quantity=1, delivery_type='transport')
+        db.session.add(dispatch)
+        db.session.commit()
+        job = TransportJob(dispatch_request_id=dispatch.id)
+        db.session.add(job)
+        db.session.commit()
+
+        events = client.get('/api/events?after=0').get_json()['events']
+        assert [(e['data']['entity'], e['data']['status']) for e in events] == [
+            ('dispatch_request', 'pending'), ('transport_job', 'pending')
+        ]
+        assert events[0]['data']['salesOrderId'] == 7
+        print("✓ Inserts publish their initial status")
+
+        dispatch.status = 'in_transit'
+        db.session.flush()
+        db.session.rollback()
+        assert client.get('/api/events?after=2').get_json()['events'] == []
+        print("✓ Rolled back changes are not published")
+
+        dispatch = DispatchRequest.query.get(dispatch.id)
+        dispatch.status = 'in_transit'
+        TransportJob.query.get(job.id).status = 'assigned'
+        db.session.commit()
+
+        dispatch_events = client.get('/api/events?after=2&topics=dispatch').get_json()
+        assert [e['data']['entity'] for e in dispatch_events['events']] == ['dispatch_request', 'transport_job']
+        assert dispatch_events['events'][0]['data']['previousStatus'] == 'pending'
+        transport_events = client.get('/api/events?after=2&topics=transport').get_json()
+        assert [e['data']['status'] for e in transport_events['events']] == ['assigned']
+        assert client.get('/api/events?after=2&topics=sales').get_json() == {'events': [], 'lastEventId': 4}
+        assert client.get('/api/events?topics=nope').status_code == 400
+        print("✓ Subscribers only get their department's topics")
+
+        # Resume after event 3 (header wins over the query parameter)
+        response = client.get('/api/events/stream?topics=transport&lastEventId=0',
+                              headers={'Last-Event-ID': '3'})
+        assert response.mimetype == 'text/event-stream'
+        messages = [m for m in response.get_data(as_text=True).split('\n\n') if m.startswith('id:')]
+        assert len(messages) == 1
+        assert messages[0].startswith('id: 4\nevent: status\n')
+        assert json.loads(messages[0].split('data: ', 1)[1])['data']['status'] == 'assigned'
+        print("✓ Stream resumes from Last-Event-ID")
+
+        # Clients behind the retained history are told to resync
+        broker = LocalEventBroker(history=2)
+        for status in ('a', 'b', 'c'):
+            broker.publish('status', ['dispatch'], {'status': status})
+        assert [e['type'] for e in broker.since(0)] == ['resync', 'status', 'status']
+        assert [e['id'] for e in broker.since(1)] == [2, 3]
+        # Ids from before a restart are ahead of the broker's
+        restarted = LocalEventBroker()
+        restarted.publish('status', ['dispatch'], {'status': 'a'})
+        resync = restarted.since(500)
+        assert [(e['type'], e['id'], e['data']) for e in resync] == [('resync', 1, {'reason': 'broker_restarted'})]
+        assert restarted.since(1) == []
+        messages = list(islice(stream_events(restarted, 500, lifetime=5, keepalive=0.01), 3))
+        assert messages[1].startswith('id: 1\nevent: resync\n') and messages[2] == ': keepalive\n\n'
+        print("✓ Expired history and restarts produce a resync event")
+
+        class PublishOnlyBroker(EventBroker):
+            def publish(self, event_type, topics, data):
+                return data
+        try:
+            PublishOnlyBroker()
+            assert False, 'an incomplete broker should not be constructible'
+        except TypeError:
+            pass
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_status_events()
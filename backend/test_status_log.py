@@ -0,0 +1,111 @@
+"""
+Status log test - verifies status_event rows, order timelines and stage analytics
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app
+from models import (
+    db, ProductionOrder, PurchaseOrder, ShowroomProduct, SalesOrder, DispatchRequest, TransportJob, StatusEvent
+)
+from services.order_tracking_service import OrderTrackingService
+from utils.status_log import status_log
+
+def count_selects(func):
+    """Run func and return (result, SELECT count)"""
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        result = func()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return result, len([s for s in statements if s.lstrip().upper().startswith('SELECT')])
+
+def add_sale(number):
+    sale = SalesOrder(order_number=number, customer_name='Customer', showroom_product_id=1, unit_price=10.0,
+                      total_amount=10.0, final_amount=10.0, payment_method='cash', sales_person='tester')
+    db.session.add(sale)
+    db.session.flush()
+    db.session.add(DispatchRequest(sales_order_id=sale.id, showroom_product_id=1, party_name='Party',
+                                   quantity=1, delivery_type='transport'))
+    db.session.commit()
+    return sale.id
+
+def test_status_log():
+    """Test status changes along the order chain are logged and replayed"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        order = ProductionOrder(product_name='Chair', category='furniture', quantity=1)
+        db.session.add(order)
+        db.session.flush()
+        db.session.add(PurchaseOrder(production_order_id=order.id, product_name='Chair', quantity=1))
+        db.session.commit()
+        purchase = PurchaseOrder.query.first()
+        purchase.status = 'store_allocated'
+        order.status = 'in_assembly'
+        db.session.commit()
+        order.status = 'discarded'
+        db.session.rollback()
+        db.session.add(ShowroomProduct(name='Chair', category='furniture', production_order_id=order.id))
+        db.session.commit()
+
+        first_sale = add_sale('SO-1')
+        second_sale = add_sale('SO-2')
+        db.session.add(TransportJob(dispatch_request_id=1))
+        db.session.commit()
+        job = TransportJob.query.first()
+        job.status = 'assigned'
+        DispatchRequest.query.get(1).status = 'assigned_transport'
+        db.session.commit()
+
+        events = [(e.entity, e.status, e.previous_status) for e in status_log.history('production_order', order.id)]
+        assert events == [('production_order', 'pending_materials', None),
+                          ('production_order', 'in_assembly', 'pending_materials')]
+        transport = status_log.history('transport_job', job.id)[-1]
+        # Resolved through the dispatch request and the showroom product
+        assert (transport.sales_order_id, transport.production_order_id) == (first_sale, order.id)
+        assert StatusEvent.query.filter_by(status='discarded').count() == 0
+        print("✓ Status changes logged with their order, rollbacks discarded")
+
+        timeline, selects = count_selects(lambda: status_log.history(production_order_id=order.id))
+        assert selects == 1 and len(timeline) == 14
+        details = app.test_client().get(f'/api/orders/{order.id}/details').get_json()
+        assert [entry['department'] for entry in details['timeline'][:3]] == ['Production', 'Purchase', 'Store']
+        assert details['currentStage']['department'] == 'Dispatch'
+
+        sale_timeline = OrderTrackingService.get_order_timeline(sales_order_id=second_sale)['timeline']
+        assert {entry['entityId'] for entry in sale_timeline if entry['entity'] == 'dispatch_request'} == {2}
+        assert not [entry for entry in sale_timeline if entry['entity'] == 'transport_job']
+        assert sale_timeline[0]['department'] == 'Production'
+        assert app.test_client().get('/api/orders/sales/999/timeline').status_code == 404
+        print("✓ Timelines read from one index range per order")
+
+        # Three orders spend 1h, 2h and 6h in pending_materials before assembly
+        start = datetime(2025, 1, 1)
+        for index, hours in enumerate((1, 2, 6), start=10):
+            db.session.add(StatusEvent(entity='production_order', entity_id=index, status='pending_materials',
+                                       occurred_at=start))
+            db.session.add(StatusEvent(entity='production_order', entity_id=index, status='in_assembly',
+                                       previous_status='pending_materials', occurred_at=start + timedelta(hours=hours)))
+        db.session.commit()
+        stats = OrderTrackingService.get_stage_analytics(
+            'production_order', since=start, from_status='pending_materials', to_status='in_assembly'
+        )
+        assert stats['stages']['pending_materials']['count'] == 4
+        assert stats['cycleTime']['count'] == 4 and stats['cycleTime']['p50Hours'] == 1.0
+        assert stats['cycleTime']['maxHours'] == 6.0
+        response = app.test_client().get('/api/orders/analytics/stages?entity=nothing')
+        assert response.status_code == 400
+        print("✓ Stage durations and cycle times computed from the log")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_status_log()
@@ -0,0 +1,156 @@
+"""
+Status rollup test - verifies summary counts, single-query rollups and status counters
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, literal, literal_column
+from app import create_app
+from models import db, DispatchRequest, TransportJob, GatePass, SalesOrder, StatusCounter
+from services.dispatch_service import DispatchService
+from services.sales_service import SalesService
+from services.transport_service import TransportService
+from services.watchman_service import WatchmanService
+from utils.rollup import status_counters, rebuild_counters
+
+SUMMARIES = [
+    DispatchService.get_dispatch_summary,
+    SalesService.get_sales_summary,
+    TransportService.get_transport_summary,
+    WatchmanService.get_daily_summary,
+]
+
+def seed():
+    """Create a mix of today's and older rows across statuses"""
+    now = datetime.now()
+    old = now - timedelta(days=10)
+    dispatches = [
+        ('pending', 'self', now, now), ('pending', 'transport', old, old),
+        ('in_transit', 'transport', old, old), ('completed', 'self', old, now),
+        ('completed', 'transport', old, old), ('customer_details_required', 'self', now, now),
+    ]
+    for i, (status, delivery_type, created_at, updated_at) in enumerate(dispatches):
+        db.session.add(DispatchRequest(
+            sales_order_id=i + 1, showroom_product_id=1, party_name=f'Party {i}', quantity=1,
+            status=status, delivery_type=delivery_type, created_at=created_at, updated_at=updated_at
+        ))
+    for i, (status, amount, created_at) in enumerate([
+        ('pending', 100.0, now), ('pending', 50.0, old), ('delivered', 300.0, old), ('confirmed', 25.5, now)
+    ]):
+        db.session.add(SalesOrder(
+            order_number=f'SO-{i}', customer_name='Customer', showroom_product_id=1, unit_price=amount,
+            total_amount=amount, final_amount=amount, payment_method='cash', sales_person='tester',
+            order_status=status, created_at=created_at
+        ))
+    for status, updated_at in [('pending', now), ('assigned', now), ('assigned', old),
+                               ('in_transit', old), ('in_transit', now), ('delivered', now)]:
+        db.session.add(TransportJob(dispatch_request_id=1, status=status, updated_at=updated_at))
+    for status, issued_at, verified_at in [('pending', now, None), ('pending', old, None),
+                                           ('verified', old, now), ('rejected', old, old),
+                                           ('entered_for_pickup', old, now)]:
+        db.session.add(GatePass(dispatch_request_id=1, party_name='Party', status=status,
+                                issued_at=issued_at, verified_at=verified_at))
+    db.session.commit()
+
+def run_counted(func):
+    """Run a summary and return (result, SELECT count)"""
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        result = func()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return result, len([s for s in statements if s.lstrip().upper().startswith('SELECT')])
+
+def test_status_rollup():
+    """Test summaries come from one grouped query and counters track status changes"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed()
+
+        expected = {
+            'get_dispatch_summary': {
+                'pendingOrders': 2, 'customerDetailsRequired': 1, 'readyForPickup': 0, 'inTransit': 1,
+                'completedOrders': 2, 'selfDelivery': 3, 'transportDelivery': 3,
+                'todayDispatches': 2, 'todayCompleted': 1
+            },
+            'get_sales_summary': {
+                'totalOrders': 4, 'totalRevenue': 475.5, 'pendingOrders': 2, 'completedOrders': 1,
+                'todayOrders': 2, 'todayRevenue': 125.5
+            },
+            'get_transport_summary': {
+                'pendingJobs': 1, 'assignedJobs': 2, 'inTransitJobs': 2, 'deliveredJobs': 1,
+                'cancelledJobs': 0, 'failedJobs': 0, 'todayAssigned': 1, 'todayDelivered': 1,
+                'overdueDeliveries': 1, 'totalActive': 5
+            },
+            'get_daily_summary': {
+                'todayPending': 1, 'todayVerified': 1, 'todayEntered': 1, 'todayRejected': 0,
+                'totalPending': 2, 'totalVerified': 1, 'totalEntered': 1, 'totalRejected': 1,
+                'todayTotal': 3
+            },
+        }
+        for summary in SUMMARIES:
+            result, selects = run_counted(summary)
+            assert result == expected[summary.__name__], (summary.__name__, result)
+            assert selects == 1, (summary.__name__, selects)
+        print("✓ Summaries unchanged and each read in a single query")
+
+        status_counters.init_app(app)
+        for summary in SUMMARIES:
+            assert summary() == expected[summary.__name__]
+        assert StatusCounter.query.filter_by(entity='sales_order', status='*').first().count == 4
+
+        # Transitions, inserts and deletes through the ORM update the counters
+        dispatch = DispatchRequest.query.filter_by(status='in_transit').first()
+        dispatch.status = 'completed'
+        order = SalesOrder.query.filter_by(order_number='SO-1').first()
+        order.order_status = 'delivered'
+        order.final_amount = 80.0
+        db.session.add(SalesOrder(
+            order_number='SO-9', customer_name='Customer', showroom_product_id=1, unit_price=10.0,
+            total_amount=10.0, final_amount=10.0, payment_method='cash', sales_person='tester'
+        ))
+        db.session.delete(TransportJob.query.filter_by(status='pending').first())
+        db.session.commit()
+
+        counted = {}
+        for summary in SUMMARIES:
+            counted[summary.__name__], selects = run_counted(summary)
+            # Counter rows plus the rows inside today's windows
+            assert selects == 2, (summary.__name__, selects)
+        assert counted['get_dispatch_summary']['inTransit'] == 0
+        assert counted['get_dispatch_summary']['completedOrders'] == 3
+        assert counted['get_sales_summary']['pendingOrders'] == 2
+        assert counted['get_sales_summary']['completedOrders'] == 2
+        assert counted['get_sales_summary']['totalRevenue'] == 515.5
+        assert counted['get_transport_summary']['pendingJobs'] == 0
+        print("✓ Counters follow status changes, inserts and deletes")
+
+        # A recount of built counters keeps the total row; a failed one leaves them to the next read
+        status_counters.rebuild(SalesOrder)
+        assert SalesService.get_sales_summary() == counted['get_sales_summary']
+        broken = db.select(SalesOrder.order_status, literal_column('no_such_column'), func.count(), literal(0))
+        try:
+            rebuild_counters('sales_order', SalesOrder.__table__, broken.group_by(SalesOrder.order_status))
+            assert False, 'recount should fail'
+        except Exception:
+            pass
+        assert StatusCounter.query.filter_by(entity='sales_order').count() == 0
+        assert SalesService.get_sales_summary() == counted['get_sales_summary']
+        print("✓ Recounts replace counters in place and a failed one is retried on read")
+
+        # Counter-backed results match a fresh grouped rollup
+        del app.extensions['status_counters']
+        for summary in SUMMARIES:
+            assert summary() == counted[summary.__name__], summary.__name__
+        print("✓ Counter totals agree with a full recount")
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_status_rollup()
@@ -0,0 +1,82 @@
+"""
+Stock allocation test - verifies batch allocation order, outcomes and query count
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app
+from models import db, ProductionOrder, PurchaseOrder, StoreInventory
+
+def seed_order(name, materials, created_at):
+    """Create a production order with a purchase order pending a store check"""
+    production = ProductionOrder(product_name=name, category='Furniture', quantity=1, created_by='tester')
+    db.session.add(production)
+    db.session.flush()
+    order = PurchaseOrder(production_order_id=production.id, product_name=name, quantity=1,
+                          status='pending_store_check', created_at=created_at)
+    order.set_original_requirements(materials)
+    order.set_materials_list(materials)
+    db.session.add(order)
+    db.session.flush()
+    return order.id
+
+def test_batch_allocation():
+    """Test pending orders are allocated oldest first in one pass"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+
+        db.session.add(StoreInventory(name='Steel Tube', quantity=10))
+        db.session.add(StoreInventory(name='Bolts', quantity=50))
+        db.session.commit()
+
+        start = datetime(2025, 5, 1)
+        # Created out of order: ranking must follow created_at, not id
+        newest = seed_order('Bench', [{'name': 'Steel Tube', 'quantity': 4}], start + timedelta(days=2))
+        oldest = seed_order('Rack', [{'name': 'Steel Tube', 'quantity': 6}, {'name': 'Bolts', 'quantity': 20}], start)
+        middle = seed_order('Stool', [{'name': 'Steel Tube', 'quantity': 6}, {'name': 'Bolts', 'quantity': 10}],
+                            start + timedelta(days=1))
+        db.session.commit()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = app.test_client().post('/api/store/orders/allocate-pending')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert response.status_code == 200
+        result = response.get_json()
+
+        assert [row['purchaseOrderId'] for row in result['results']] == [oldest, middle, newest]
+        assert [row['newStatus'] for row in result['results']] == [
+            'store_allocated', 'partially_allocated', 'insufficient_stock'
+        ]
+        assert result['allocated'] == 1 and result['partiallyAllocated'] == 1 and result['insufficientStock'] == 1
+        assert result['results'][1]['shortages'] == [{'name': 'Steel Tube', 'quantity': 2}]
+        print("✓ Oldest order served first; later orders get what is left")
+
+        stock = {item.name: item.quantity for item in StoreInventory.query.all()}
+        assert stock == {'Steel Tube': 0, 'Bolts': 20}
+        middle_order = PurchaseOrder.query.get(middle)
+        assert middle_order.get_materials_list() == [{'name': 'Steel Tube', 'quantity': 2, 'unit_cost': 0.0}]
+        assert ProductionOrder.query.get(middle_order.production_order_id).status == 'partially_allocated'
+        print("✓ Stock deducted once and shortages left to purchase")
+
+        # Orders, their lines, locked inventory, production orders, then the writes
+        selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+        assert len(selects) == 4
+        print(f"✓ Batch of 3 orders read with {len(selects)} queries")
+
+        response = app.test_client().post('/api/store/orders/allocate-pending')
+        assert response.get_json()['processed'] == 0
+        assert app.test_client().post('/api/store/orders/allocate-pending', json={'limit': 0}).status_code == 400
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == "__main__":
+    test_batch_allocation()
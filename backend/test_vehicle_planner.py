@@ -0,0 +1,94 @@
+"""
+Vehicle planner test - verifies capacity parsing, area packing, dry runs and the committed plan
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from models import db, DispatchRequest, TransportJob, Vehicle, Notification
+from services.transport_service import TransportService
+from utils.fleet import PlanJob, PlanVehicle, plan_loads, parse_capacity, area_key, UNASSIGNED_TOO_LARGE
+from benchmark_vehicle_planner import run_benchmark
+
+def add_job(job_id, quantity, address, delivery_type=None):
+    db.session.add(DispatchRequest(
+        id=job_id, sales_order_id=job_id, showroom_product_id=1, party_name=f'Party {job_id}',
+        party_address=address, quantity=quantity, delivery_type='transport', original_delivery_type=delivery_type
+    ))
+    db.session.add(TransportJob(id=job_id, dispatch_request_id=job_id))
+
+def test_vehicle_planner():
+    """Test pending jobs are packed onto vehicles by capacity and area"""
+    assert parse_capacity('1500 kg') == 1500 and parse_capacity('1500') == 1500
+    assert parse_capacity('1.5 ton') == 1500 and parse_capacity('2T', unit_weight_kg=50) == 40
+    assert parse_capacity('1,500 kg') == 1500 and parse_capacity('10,000') == 10000
+    assert parse_capacity('1,00,000 kg') == 100000 and parse_capacity('1,5 ton') == 1500
+    assert parse_capacity('40 units') == 40 and parse_capacity('40 pcs', unit_weight_kg=50) == 40
+    assert parse_capacity('large') is None and parse_capacity('10 cubic ft') is None and parse_capacity(None) is None
+    assert area_key('12 MG Road, Camp, Pune 411001') == 'pin-411'
+    assert area_key('12 MG Road, Pune') == area_key('7 FC Road,  PUNE ') == 'pune'
+    assert area_key(None) == 'unknown'
+    print("✓ Capacities and destination areas parsed")
+
+    plan = plan_loads(
+        [PlanJob(1, 6, 'a'), PlanJob(2, 4, 'a'), PlanJob(3, 5, 'a'), PlanJob(4, 3, 'b'), PlanJob(5, 30, 'b')],
+        [PlanVehicle(1, 10), PlanVehicle(2, 5), PlanVehicle(3, 20)]
+    )
+    loads = {load.vehicle.id: (load.area, sorted(job.id for job in load.jobs)) for load in plan.loads}
+    # Area 'a' (15 units) fits the 20-unit vehicle; 'b' gets the smallest one that holds its 3 units
+    assert loads == {3: ('a', [1, 2, 3]), 2: ('b', [4])}
+    assert plan.unassigned == {5: UNASSIGNED_TOO_LARGE}
+    print("✓ Jobs packed per area into best-fitting vehicles")
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        add_job(1, 4, 'Shop 1, Pune')
+        add_job(2, 3, 'Shop 2, Pune')
+        add_job(3, 5, 'Shop 3, Nashik')
+        add_job(4, 2, 'Shop 4, Pune', delivery_type='part load')
+        db.session.add(Vehicle(vehicle_number='MH12AA0001', vehicle_type='truck', driver_name='Ravi', capacity='8 kg'))
+        db.session.add(Vehicle(vehicle_number='MH12AA0002', vehicle_type='van', driver_name='Amit', capacity='5'))
+        db.session.add(Vehicle(vehicle_number='MH12AA0003', vehicle_type='van', driver_name='Sunil', capacity='big'))
+        db.session.commit()
+
+        preview = TransportService.plan_vehicle_assignments(dry_run=True)
+        assert preview['summary']['pendingJobs'] == 3 and preview['summary']['assignedJobs'] == 3
+        assert {(load['vehicleNumber'], load['area'], tuple(j['transportJobId'] for j in load['jobs']))
+                for load in preview['loads']} == {('MH12AA0001', 'pune', (1, 2)), ('MH12AA0002', 'nashik', (3,))}
+        assert [v['vehicleNumber'] for v in preview['skippedVehicles']] == ['MH12AA0003']
+        assert TransportJob.query.filter_by(status='pending').count() == 4
+        print("✓ Dry run previews the plan without writing")
+
+        client = app.test_client()
+        response = client.post('/api/transport/plan-assignments', json={'dryRun': False})
+        assert response.status_code == 200 and response.get_json()['dryRun'] is False
+        job = TransportJob.query.get(1)
+        assert (job.status, job.vehicle_no, job.transporter_name) == ('assigned', 'MH12AA0001', 'Ravi')
+        assert DispatchRequest.query.get(2).status == 'assigned_transport'
+        assert TransportJob.query.get(4).status == 'pending'
+        assert Vehicle.query.filter_by(vehicle_number='MH12AA0001').first().status == 'assigned'
+        assert Notification.query.filter_by(type='driver_assigned').count() == 2
+        assert client.post('/api/transport/plan-assignments', json={'dryRun': 'no'}).status_code == 400
+        print("✓ Plan committed in one transaction")
+
+        # The consolidated vehicle stays assigned until its last delivery is done
+        TransportService.update_delivery_status(1, {'status': 'delivered'})
+        assert Vehicle.query.filter_by(vehicle_number='MH12AA0001').first().status == 'assigned'
+        TransportService.update_delivery_status(2, {'status': 'delivered'})
+        assert Vehicle.query.filter_by(vehicle_number='MH12AA0001').first().status == 'returning'
+        print("✓ Shared vehicle released after its last delivery")
+
+        db.session.remove()
+        db.drop_all()
+
+        db.create_all()
+        report = run_benchmark(jobs=200, vehicles=20, repeat=1)
+        assert report['assignedJobs'] == report['committed']['assignedJobs'] > 0
+        assert report['preview']['assignedJobs'] == report['committed']['assignedJobs']
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    test_vehicle_planner()
@@ -5,6 +5,11 @@ Utility functions package initialization
 from .validators import validate_required_fields, validate_email, validate_phone
 from .helpers import calculate_order_value, format_currency, get_status_color
 from .database import init_sample_data, backup_database
+from .pagination import get_page_params, paginate_query, build_page, encode_cursor, decode_cursor
+from .loaders import (
+    dispatch_graph_options, gate_pass_graph_options, transport_job_graph_options, load_dispatch_graph
+)
+from .rollup import Window, StatusRollup, day_range, status_counters
 
 __all__ = [
     'validate_required_fields',
@@ -14,5 +19,18 @@ __all__ = [
     'format_currency',
     'get_status_color',
     'init_sample_data',
-    'backup_database'
+    'backup_database',
+    'get_page_params',
+    'paginate_query',
+    'build_page',
+    'encode_cursor',
+    'decode_cursor',
+    'dispatch_graph_options',
+    'gate_pass_graph_options',
+    'transport_job_graph_options',
+    'load_dispatch_graph',
+    'Window',
+    'StatusRollup',
+    'day_range',
+    'status_counters'
 ]
\ No newline at end of file
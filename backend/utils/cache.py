@@ -0,0 +1,320 @@
+"""
+Write-invalidated response cache for read-heavy service calls
+
+Cached service methods declare the tables they read as tags. Committed
+ORM writes to a table bump that tag's version (collected on flush, applied in
+after_commit, dropped on rollback), and a cached value is only served while
+the versions it was computed under are current. Versions are read before
+computing, so a write that commits during the computation marks the result
+stale instead of hiding behind it.
+
+Backends:
+    LocalCacheBackend: in-process LRU bounded by entry count. Tag versions
+        are per process, so only suitable for a single worker.
+    RedisCacheBackend: shared by all workers; versions are Redis counters
+        and memory is bounded by the server's maxmemory/LRU policy.
+
+Every entry also expires after RESPONSE_CACHE_TTL_SECONDS, which bounds
+staleness from writes the hooks cannot see (raw SQL, bulk inserts, other
+processes on the local backend) and from "today" windows rolling over.
+"""
+import copy
+import hashlib
+import json
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Iterable, Optional
+from flask import Flask, current_app, has_app_context
+from werkzeug.utils import import_string
+from models import db
+from utils.changes import SessionHook
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 60
+SESSION_KEY = 'response_cache_tags'
+
+
+class CacheBackend(ABC):
+    """Storage for cache entries and tag versions"""
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Get an entry, or None when absent or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an entry, expiring after ``ttl`` seconds"""
+
+    @abstractmethod
+    def get_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Get the current version of each tag (0 when never bumped)"""
+
+    @abstractmethod
+    def bump(self, tags: Iterable[str]) -> None:
+        """Increment the versions of tags, invalidating entries computed under them"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry"""
+
+    def info(self) -> Dict[str, Any]:
+        """Backend details for the stats endpoint"""
+        return {'backend': type(self).__name__}
+
+
+class LocalCacheBackend(CacheBackend):
+    """In-process LRU backend bounded by entry count"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            # Callers may mutate what they get back
+            return copy.deepcopy(value)
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_versions(self, tags):
+        with self._lock:
+            return {tag: self._versions.get(tag, 0) for tag in tags}
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        with self._lock:
+            return {
+                'backend': type(self).__name__,
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'evictions': self.evictions
+            }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Redis backend shared by all workers
+
+    Configure the Redis server with ``maxmemory`` and an ``allkeys-lru``
+    policy to bound memory; entries carry the TTL as a Redis expiry.
+    """
+
+    def __init__(self, url: Optional[str] = None, prefix: str = 'response-cache:'):
+        import redis  # optional dependency, only needed for this backend
+        if url is None and has_app_context():
+            url = current_app.config.get('RESPONSE_CACHE_REDIS_URL')
+        self.client = redis.Redis.from_url(url or 'redis://localhost:6379/0')
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.client.get(self.prefix + 'entry:' + key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + 'entry:' + key, pickle.dumps(value), ex=int(ttl) if ttl else None)
+
+    def get_versions(self, tags):
+        tags = list(tags)
+        values = self.client.mget([self.prefix + 'tag:' + tag for tag in tags]) if tags else []
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    def bump(self, tags):
+        pipeline = self.client.pipeline()
+        for tag in tags:
+            pipeline.incr(self.prefix + 'tag:' + tag)
+        pipeline.execute()
+
+    def clear(self):
+        keys = list(self.client.scan_iter(self.prefix + 'entry:*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ResponseCache(SessionHook):
+    """
+    Caches service method results keyed by name and arguments
+
+    Use ``@response_cache.cached(name, tags=(...))`` on a service method.
+    The cache is bypassed entirely (no lookups, no stats) until init_app has
+    attached a backend to the current application.
+    """
+
+    session_events = ('after_flush', 'after_bulk_update', 'after_bulk_delete', 'after_commit', 'after_rollback')
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def init_app(self, app: Flask, backend: Optional[CacheBackend] = None) -> None:
+        """Attach a backend to an application and start invalidating on commit"""
+        if backend is None:
+            backend_class = import_string(app.config.get('RESPONSE_CACHE_BACKEND') or 'utils.cache.LocalCacheBackend')
+            if backend_class is LocalCacheBackend:
+                backend = LocalCacheBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+            else:
+                with app.app_context():
+                    backend = backend_class()
+        app.extensions['response_cache'] = {
+            'cache': self,
+            'backend': backend,
+            'ttl': app.config.get('RESPONSE_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+        }
+        self._listen()
+
+    @staticmethod
+    def _extension() -> Optional[Dict[str, Any]]:
+        if not has_app_context():
+            return None
+        return current_app.extensions.get('response_cache')
+
+    def cached(self, name: str, tags: Iterable[str], unless=None):
+        """
+        Decorate a function so its result is cached until a tagged table changes
+
+        Args:
+            name: Cache namespace (usually the endpoint or method name)
+            tags: Table names the result is computed from
+            unless: Optional predicate; results it accepts are not cached
+        """
+        tags = tuple(sorted(set(tags)))
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                extension = self._extension()
+                if extension is None or self._has_pending_writes(tags):
+                    return func(*args, **kwargs)
+                backend = extension['backend']
+
+                key = self._key(name, args, kwargs)
+                versions = backend.get_versions(tags)
+                entry = backend.get(key)
+                if entry is not None and entry[0] == versions:
+                    self._count(name, 'hits')
+                    return entry[1]
+                self._count(name, 'stale' if entry is not None else 'misses')
+
+                value = func(*args, **kwargs)
+                if unless is None or not unless(value):
+                    backend.set(key, (versions, value), extension['ttl'])
+                return value
+            wrapper.cache_name = name
+            wrapper.cache_tags = tags
+            return wrapper
+        return decorator
+
+    def _has_pending_writes(self, tags) -> bool:
+        """Whether this session has uncommitted changes, which a cached value would not show"""
+        session = db.session()
+        if session.new or session.deleted or any(session.is_modified(obj) for obj in session.dirty):
+            return True
+        return bool(self._pending(session).intersection(tags))
+
+    @staticmethod
+    def _key(name: str, args, kwargs) -> str:
+        raw = json.dumps([args, kwargs], sort_keys=True, default=str)
+        return f"{name}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    def _count(self, name: str, outcome: str) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, {'hits': 0, 'misses': 0, 'stale': 0})
+            stats[outcome] += 1
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        """Invalidate every entry computed from any of the tags"""
+        extension = self._extension()
+        if extension is not None:
+            extension['backend'].bump(set(tags))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the statistics"""
+        extension = self._extension()
+        if extension is not None:
+            extension['backend'].clear()
+        with self._stats_lock:
+            self._stats.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counts per cached name plus backend details"""
+        extension = self._extension()
+        with self._stats_lock:
+            names = {name: dict(stats) for name, stats in self._stats.items()}
+        totals = {outcome: sum(stats[outcome] for stats in names.values()) for outcome in ('hits', 'misses', 'stale')}
+        lookups = sum(totals.values())
+        totals['hitRate'] = round(totals['hits'] / lookups, 4) if lookups else 0.0
+        return {
+            'enabled': extension is not None,
+            **(extension['backend'].info() if extension else {}),
+            **totals,
+            'names': names
+        }
+
+    def mark_changed(self, session, tags: Iterable[str]) -> None:
+        """
+        Invalidate tags when the session commits, for writes the ORM hooks do
+        not see (Core inserts on the session's connection)
+        """
+        if self._extension() is not None:
+            self._pending(session).update(tags)
+
+    def _pending(self, session) -> set:
+        return session.info.setdefault(SESSION_KEY, set())
+
+    def _after_flush(self, session, flush_context) -> None:
+        if self._extension() is None:
+            return
+        changed = list(session.new) + list(session.deleted) + [
+            obj for obj in session.dirty if session.is_modified(obj)
+        ]
+        self._pending(session).update(type(obj).__table__.name for obj in changed)
+
+    def _after_bulk(self, context) -> None:
+        if self._extension() is None:
+            return
+        self._pending(context.session).add(context.mapper.local_table.name)
+
+    _after_bulk_update = _after_bulk_delete = _after_bulk
+
+    def _after_commit(self, session) -> None:
+        tags = session.info.pop(SESSION_KEY, None)
+        if tags:
+            self.invalidate(tags)
+
+    @staticmethod
+    def _after_rollback(session) -> None:
+        session.info.pop(SESSION_KEY, None)
+
+
+response_cache = ResponseCache()
+cached = response_cache.cached
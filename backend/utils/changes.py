@@ -0,0 +1,93 @@
+"""
+Session change capture shared by the commit-time hooks
+
+The status counters, status events, status log, order search and response
+cache all watch ORM flushes and act when the transaction commits. What they
+have in common lives here:
+    - SessionHook registers a hook's Session listeners once per process
+    - track_previous loads an attribute's old value on assignment, so the
+      flush can tell what a status changed from
+    - status_changes lists the (previous, new) status of every row a flush
+      inserted or updated
+    - chunks splits id sets for IN (...) queries, keeping them under the
+      database's bound parameter limit
+"""
+import threading
+from collections import namedtuple
+from typing import Callable, Iterable, Iterator, List, Sequence
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+CHUNK_SIZE = 500
+
+StatusChange = namedtuple('StatusChange', ['obj', 'attr', 'previous', 'status'])
+
+
+def chunks(values: Iterable, size: int = CHUNK_SIZE) -> Iterator[List]:
+    """Split values into sorted lists of at most ``size`` items"""
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _noop_set(target, value, oldvalue, initiator):
+    return value
+
+def track_previous(attribute) -> None:
+    """Load an attribute's previous value on assignment so its flush-time history has it"""
+    event.listen(attribute, 'set', _noop_set, active_history=True)
+
+def status_changes(session: Session, attrs_for: Callable[[object], Sequence[str]]) -> Iterator[StatusChange]:
+    """
+    Status values written by a flush (call from an after_flush hook)
+
+    Inserted rows report their value with previous None; column defaults were
+    applied by the INSERT, so the value itself is read. Updated rows report
+    only the attributes whose value actually changed.
+
+    Args:
+        session: Flushing session
+        attrs_for: obj -> names of its tracked status attributes (empty when untracked)
+    """
+    new = set(session.new)
+    for obj in list(new) + list(session.dirty):
+        for attr in attrs_for(obj):
+            if obj in new:
+                yield StatusChange(obj, attr, None, getattr(obj, attr))
+                continue
+            history = sa_inspect(obj).attrs[attr].history
+            if not history.added:
+                continue
+            previous = history.deleted[0] if history.deleted else None
+            status = history.added[0]
+            if previous != status:
+                yield StatusChange(obj, attr, previous, status)
+
+
+class SessionHook:
+    """
+    Base of a hook on every ORM session
+
+    ``_listen()`` attaches the method named ``_<event>`` for each of
+    ``session_events`` to Session and starts tracking the previous value of
+    ``previous_values()``. It runs once per process and hook class, however
+    many applications are created.
+    """
+
+    session_events: Sequence[str] = ()
+    _listening = False
+    _listen_lock = threading.Lock()
+
+    def previous_values(self) -> Iterable:
+        """Attributes whose previous value the hook reads at flush time"""
+        return ()
+
+    def _listen(self) -> None:
+        cls = type(self)
+        with SessionHook._listen_lock:
+            if cls._listening:
+                return
+            for name in self.session_events:
+                event.listen(Session, name, getattr(self, f'_{name}'))
+            for attribute in self.previous_values():
+                track_previous(attribute)
+            cls._listening = True
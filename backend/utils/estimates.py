@@ -0,0 +1,376 @@
+"""
+Completion-time estimates learned from the status_event log
+
+The order chain is split into stages, each running from one milestone to the
+next. A milestone is the first time an order's records reached one of a set of
+statuses, so with the log one query away:
+    - a batch job (StageEstimator.refresh) turns every order's milestones into
+      per-stage durations with pandas and stores the median and p90 per
+      (product category, stage) in the compact stage_estimate table
+    - at request time an order's remaining time is the rest of its current
+      stage plus the medians of the stages after it, read from an in-process
+      copy of that table with precomputed suffix sums, so one dict lookup
+
+Categories with fewer than MIN_SAMPLES durations for a stage use the estimate
+over all categories. backtest() replays the same computation with a training
+cutoff and reports the error against orders delivered after it.
+"""
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import select
+from models import db, StatusEvent, ProductionOrder, StageEstimate
+from models.stage_estimate import ALL_CATEGORIES
+from utils.changes import chunks
+
+MIN_SAMPLES = 5
+DEFAULT_TTL_SECONDS = 300
+
+# milestone: [(entity, statuses reaching it, or None for the record's first event)]
+MILESTONES = {
+    'purchase_requested': [('purchase_order', None)],
+    'purchase_approved': [('purchase_order', {
+        'finance_approved', 'pending_store_check', 'store_allocated', 'partially_allocated',
+        'insufficient_stock', 'verified_in_store'
+    })],
+    'materials_ready': [('purchase_order', {'store_allocated', 'verified_in_store'})],
+    'assembled': [('assembly_order', {'completed', 'sent_to_showroom'})],
+    'on_display': [('showroom_product', {'available'})],
+    'dispatch_requested': [('dispatch_request', None)],
+    'in_transit': [('transport_job', {'in_transit'}), ('dispatch_request', {'in_transit'})],
+    'delivered': [('transport_job', {'delivered'}), ('dispatch_request', {'completed'})],
+}
+
+Stage = namedtuple('Stage', ['name', 'start', 'end'])
+STAGES = (
+    Stage('purchase_approval', 'purchase_requested', 'purchase_approved'),
+    Stage('store_check', 'purchase_approved', 'materials_ready'),
+    Stage('assembly', 'materials_ready', 'assembled'),
+    Stage('showroom_review', 'assembled', 'on_display'),
+    Stage('awaiting_sale', 'on_display', 'dispatch_requested'),
+    Stage('dispatch', 'dispatch_requested', 'in_transit'),
+    Stage('transit', 'in_transit', 'delivered'),
+)
+STAGE_NAMES = tuple(stage.name for stage in STAGES)
+STAGE_INDEX = {name: index for index, name in enumerate(STAGE_NAMES)}
+# Milestone: stage it starts (None for delivered, which ends the chain)
+MILESTONE_STAGES = {name: None for name in MILESTONES}
+MILESTONE_STAGES.update({stage.start: stage.name for stage in STAGES})
+
+# Progress shown when each stage starts, for comparing against the progress based estimate
+# (OrderTrackingService._calculate_estimated_completion: max(1, (100 - progress) // 10) days)
+STAGE_PROGRESS = {
+    'purchase_approval': 10, 'store_check': 18, 'assembly': 35, 'showroom_review': 80, 'awaiting_sale': 95,
+    'dispatch': 95, 'transit': 95,
+}
+
+EVENT_COLUMNS = ['production_order_id', 'category', 'entity', 'status', 'occurred_at']
+
+
+def load_events(since: Optional[datetime] = None, until: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Status events that belong to a production order, with the order's category
+
+    Returns:
+        DataFrame: production_order_id, category, entity, status, occurred_at
+    """
+    statement = select(
+        StatusEvent.production_order_id, ProductionOrder.category, StatusEvent.entity,
+        StatusEvent.status, StatusEvent.occurred_at
+    ).join(ProductionOrder, ProductionOrder.id == StatusEvent.production_order_id)
+    if since is not None:
+        statement = statement.where(StatusEvent.occurred_at >= since)
+    if until is not None:
+        statement = statement.where(StatusEvent.occurred_at < until)
+    events = pd.DataFrame.from_records(db.session.execute(statement).all(), columns=EVENT_COLUMNS)
+    events['occurred_at'] = pd.to_datetime(events['occurred_at'])
+    return events
+
+def milestone_times(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    First time each order reached each milestone
+
+    Returns:
+        DataFrame indexed by production_order_id: category and one datetime
+        column per milestone (NaT when not reached)
+    """
+    entities = events['entity'].to_numpy()
+    reached = {'category': events.groupby('production_order_id')['category'].first()}
+    for name, conditions in MILESTONES.items():
+        mask = np.zeros(len(events), dtype=bool)
+        for entity, statuses in conditions:
+            matches = entities == entity
+            if statuses is not None:
+                matches &= events['status'].isin(statuses).to_numpy()
+            mask |= matches
+        reached[name] = events.loc[mask].groupby('production_order_id')['occurred_at'].min()
+    return pd.DataFrame(reached)
+
+def stage_durations(milestones: pd.DataFrame) -> pd.DataFrame:
+    """
+    Seconds each order spent in each stage it completed
+
+    Zero-length spans are skipped: they come from backfilled rows (one event
+    per record, at its creation) rather than from observed transitions.
+
+    Returns:
+        DataFrame: production_order_id, category, stage, seconds
+    """
+    frames = []
+    for stage in STAGES:
+        seconds = (milestones[stage.end] - milestones[stage.start]).dt.total_seconds()
+        frames.append(pd.DataFrame({
+            'production_order_id': milestones.index,
+            'category': milestones['category'].to_numpy(),
+            'stage': stage.name,
+            'seconds': seconds.to_numpy(),
+        }))
+    durations = pd.concat(frames, ignore_index=True)
+    return durations[durations['seconds'] > 0].reset_index(drop=True)
+
+def summarize(durations: pd.DataFrame) -> pd.DataFrame:
+    """
+    Median and p90 duration per (category, stage), plus per stage over all categories
+
+    Returns:
+        DataFrame: category, stage, sample_count, median_seconds, p90_seconds
+    """
+    overall = durations.assign(category=ALL_CATEGORIES)
+    grouped = pd.concat([durations, overall], ignore_index=True).groupby(['category', 'stage'])['seconds']
+    summary = grouped.agg(
+        sample_count='count',
+        median_seconds='median',
+        p90_seconds=lambda values: np.percentile(values.to_numpy(), 90),
+    )
+    return summary.reset_index()
+
+
+def reached_milestones(entity: str, status: Optional[str]) -> List[str]:
+    """Milestones an event of ``entity`` moving to ``status`` reaches, in chain order"""
+    return [
+        name for name, conditions in MILESTONES.items()
+        if any(entity == condition and (statuses is None or status in statuses) for condition, statuses in conditions)
+    ]
+
+def current_stages(order_ids: Iterable[int]) -> Dict[int, Tuple[Optional[str], datetime]]:
+    """
+    Stage each order is in according to its status events, and when it entered it
+
+    An order is in the stage that starts at the furthest milestone it reached,
+    since the first time it reached that milestone. Dispatch and transport
+    events count, so sold orders are placed in dispatch or transit.
+
+    Returns:
+        dict: {order id: (stage, entered at)}, stage None once delivered;
+        orders without events are left out
+    """
+    positions = {name: index for index, name in enumerate(MILESTONES)}
+    furthest = {}
+    for chunk in chunks(set(order_ids)):
+        rows = db.session.execute(select(
+            StatusEvent.production_order_id, StatusEvent.entity, StatusEvent.status, StatusEvent.occurred_at
+        ).where(StatusEvent.production_order_id.in_(chunk)).order_by(StatusEvent.id)).all()
+        for order_id, entity, status, occurred_at in rows:
+            for name in reached_milestones(entity, status):
+                # Events are in write order, so the first one past the furthest milestone wins
+                if order_id not in furthest or positions[name] > positions[furthest[order_id][0]]:
+                    furthest[order_id] = (name, occurred_at)
+    return {order_id: (MILESTONE_STAGES[name], occurred_at) for order_id, (name, occurred_at) in furthest.items()}
+
+
+class StageLookup:
+    """In-memory copy of stage_estimate answering ETA lookups in O(1)"""
+
+    def __init__(self, rows: Iterable[Tuple[str, str, int, float, float]]):
+        rows = list(rows)
+        known = {}
+        for category, stage, sample_count, median, p90 in rows:
+            known[(category, stage)] = (sample_count, median, p90)
+
+        self.categories = {category for category, *_ in rows} | {ALL_CATEGORIES}
+        # (category, stage): (median, p90), falling back to all categories when sparse
+        self.stages: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        # (category, stage index): summed medians of that stage and every later one
+        self.remaining: Dict[Tuple[str, int], Optional[float]] = {}
+        for category in self.categories:
+            for name in STAGE_NAMES:
+                entry = known.get((category, name))
+                if entry is None or entry[0] < MIN_SAMPLES:
+                    entry = known.get((ALL_CATEGORIES, name))
+                if entry is not None:
+                    self.stages[(category, name)] = entry[1:]
+            total = 0.0
+            for index in range(len(STAGES) - 1, -1, -1):
+                entry = self.stages.get((category, STAGE_NAMES[index]))
+                total = total + entry[0] if entry is not None and total is not None else None
+                self.remaining[(category, index)] = total
+
+    def __bool__(self) -> bool:
+        return bool(self.stages)
+
+    def stage(self, category: Optional[str], stage: str) -> Optional[Tuple[float, float]]:
+        """(median, p90) seconds of a stage for a category, or None when never observed"""
+        if category not in self.categories:
+            category = ALL_CATEGORIES
+        return self.stages.get((category, stage))
+
+    def remaining_seconds(self, category: Optional[str], stage: str, elapsed: float = 0) -> Optional[float]:
+        """
+        Expected seconds until delivery for an order that spent ``elapsed`` seconds in ``stage``
+
+        Returns None when the current stage or a later one has no estimate.
+        """
+        if category not in self.categories:
+            category = ALL_CATEGORIES
+        index = STAGE_INDEX[stage]
+        current = self.stages.get((category, stage))
+        later = self.remaining.get((category, index + 1), 0.0)
+        if current is None or later is None:
+            return None
+        return max(current[0] - elapsed, 0.0) + later
+
+
+class StageEstimator:
+    """Refreshes stage_estimate from the status log and serves ETA lookups"""
+
+    def init_app(self, app: Flask) -> None:
+        """Serve learned estimates for an application"""
+        app.extensions['stage_estimates'] = {
+            'estimator': self,
+            'ttl': app.config.get('STAGE_ESTIMATES_TTL_SECONDS', DEFAULT_TTL_SECONDS),
+            'lookup': None,
+            'loaded_at': 0.0,
+        }
+
+    @staticmethod
+    def enabled() -> bool:
+        """Whether learned estimates are used for the current application"""
+        return has_app_context() and 'stage_estimates' in current_app.extensions
+
+    @staticmethod
+    def lookup() -> StageLookup:
+        """Current estimates, reloaded from stage_estimate once the copy is older than the TTL"""
+        state = current_app.extensions['stage_estimates']
+        if state['lookup'] is None or time.monotonic() - state['loaded_at'] > state['ttl']:
+            rows = db.session.query(
+                StageEstimate.category, StageEstimate.stage, StageEstimate.sample_count,
+                StageEstimate.median_seconds, StageEstimate.p90_seconds
+            ).all()
+            state['lookup'] = StageLookup(rows)
+            state['loaded_at'] = time.monotonic()
+        return state['lookup']
+
+    def refresh(self, since: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Recompute stage_estimate from the status log
+
+        Args:
+            since: Only learn from events after this time
+
+        Returns:
+            dict: Orders and durations used, rows written and the refresh time
+        """
+        try:
+            milestones = milestone_times(load_events(since))
+            durations = stage_durations(milestones)
+            summary = summarize(durations)
+            refreshed_at = datetime.utcnow()
+
+            existing = {(item.category, item.stage): item for item in StageEstimate.query.all()}
+            for row in summary.itertuples(index=False):
+                item = existing.pop((row.category, row.stage), None)
+                if item is None:
+                    item = StageEstimate(category=row.category, stage=row.stage)
+                    db.session.add(item)
+                item.sample_count = int(row.sample_count)
+                item.median_seconds = float(row.median_seconds)
+                item.p90_seconds = float(row.p90_seconds)
+                item.refreshed_at = refreshed_at
+            # Stages no longer observed since ``since``
+            for item in existing.values():
+                db.session.delete(item)
+            db.session.commit()
+            if self.enabled():
+                current_app.extensions['stage_estimates']['lookup'] = None
+
+            return {
+                'orders': len(milestones),
+                'durations': len(durations),
+                'estimates': len(summary),
+                'refreshedAt': refreshed_at.isoformat()
+            }
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def backtest(events: pd.DataFrame, cutoff: datetime) -> Dict[str, Any]:
+    """
+    Learn from events before ``cutoff`` and predict orders delivered after it
+
+    Every stage an evaluated order entered is a prediction point: the
+    estimate of the time left until delivery, made when the stage started,
+    against the time it actually took.
+
+    Args:
+        events: Frame from load_events()
+        cutoff: Training/evaluation split
+
+    Returns:
+        dict: Sample counts, absolute error (hours) overall and per stage, and
+            the error of the progress based estimate on the same points
+    """
+    cutoff = pd.Timestamp(cutoff)
+    training = events[events['occurred_at'] < cutoff]
+    summary = summarize(stage_durations(milestone_times(training)))
+    lookup = StageLookup(summary[['category', 'stage', 'sample_count', 'median_seconds', 'p90_seconds']]
+                         .itertuples(index=False, name=None))
+
+    milestones = milestone_times(events)
+    delivered = milestones[milestones['delivered'] >= cutoff]
+    points = []
+    for stage in STAGES:
+        started = delivered[delivered[stage.start].notna()]
+        points.append(pd.DataFrame({
+            'category': started['category'].to_numpy(),
+            'stage': stage.name,
+            'actual': (started['delivered'] - started[stage.start]).dt.total_seconds().to_numpy(),
+        }))
+    points = pd.concat(points, ignore_index=True)
+    predictions = {key: lookup.remaining_seconds(*key) for key in set(zip(points['category'], points['stage']))}
+    points['predicted'] = [predictions[key] for key in zip(points['category'], points['stage'])]
+    predicted = points.dropna(subset=['predicted'])
+    errors = (predicted['predicted'] - predicted['actual']) / 3600
+    progress = predicted['stage'].map(STAGE_PROGRESS).to_numpy()
+    baseline = np.maximum(1, (100 - progress) // 10) * 24 - predicted['actual'] / 3600
+
+    def describe(values):
+        absolute = np.abs(values.to_numpy())
+        if not len(absolute):
+            return {'count': 0, 'maeHours': None, 'p50Hours': None, 'p90Hours': None, 'biasHours': None}
+        return {
+            'count': int(len(absolute)),
+            'maeHours': round(float(absolute.mean()), 2),
+            'p50Hours': round(float(np.percentile(absolute, 50)), 2),
+            'p90Hours': round(float(np.percentile(absolute, 90)), 2),
+            'biasHours': round(float(values.mean()), 2),
+        }
+
+    return {
+        'cutoff': cutoff.isoformat(),
+        'trainingOrders': int(training['production_order_id'].nunique()),
+        'deliveredOrders': len(delivered),
+        'predictionPoints': len(points),
+        'unpredicted': int(len(points) - len(predicted)),
+        'error': describe(errors),
+        'progressBaselineError': describe(baseline),
+        'stages': {name: describe(errors[predicted['stage'] == name]) for name in STAGE_NAMES
+                   if (predicted['stage'] == name).any()},
+    }
+
+
+stage_estimator = StageEstimator()
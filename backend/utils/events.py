@@ -0,0 +1,285 @@
+"""
+Status change events for server-push dashboards
+
+Status changes of the tracked models (sales and production orders, dispatch
+requests, transport jobs, gate passes and approvals) are collected during
+flush and published to a broker only once the transaction commits, so
+clients never see a change that was rolled back. Each event carries the
+department topics it concerns and a monotonically increasing id, which
+clients send back (Last-Event-ID) to resume after a reconnect.
+
+The default LocalEventBroker keeps a bounded in-process history and only
+reaches clients served by the same process. A broker backed by an external
+pub/sub (e.g. Redis streams) can be plugged in with STATUS_EVENTS_BROKER, as
+long as it implements EventBroker's publish/since/wait.
+
+Events are off by default (STATUS_EVENTS=true to enable). Each open stream
+occupies a worker for up to STATUS_EVENTS_STREAM_SECONDS, which starves the
+API under gunicorn's default sync workers, so enabling them needs:
+
+- a threaded or async worker class (gthread with enough threads, or gevent)
+- with more than one worker process, a shared broker; with the local broker a
+  stream misses every commit made in another process
+"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from flask import Flask, current_app, has_app_context
+from werkzeug.utils import import_string
+from models import SalesOrder, ProductionOrder, DispatchRequest, TransportJob, GatePass, ApprovalRequest
+from models.sales import TransportApprovalRequest
+from utils.changes import SessionHook, status_changes
+
+DEFAULT_HISTORY = 1000
+DEFAULT_KEEPALIVE_SECONDS = 15
+DEFAULT_STREAM_SECONDS = 300
+RETRY_MILLISECONDS = 3000
+SESSION_KEY = 'status_events'
+
+
+class EventBroker(ABC):
+    """
+    Interface of a status event broker
+
+    Events are dicts with ``id``, ``type``, ``topics``, ``data`` and
+    ``timestamp``; ids increase with publish order.
+    """
+
+    @abstractmethod
+    def publish(self, event_type: str, topics: Iterable[str], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Publish an event and return it with its id assigned"""
+
+    @abstractmethod
+    def since(self, last_id: int, topics: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get the events after ``last_id`` on any of ``topics`` (default: all)
+
+        When ``last_id`` is older than the retained history, or newer than
+        the broker's last event (the broker restarted), the result starts
+        with a ``resync`` event: the client missed events and should refetch.
+        """
+
+    @abstractmethod
+    def wait(self, last_id: int, topics: Optional[Iterable[str]] = None, timeout: float = 15.0) -> List[Dict[str, Any]]:
+        """Like since(), but block up to ``timeout`` seconds until there is something to return"""
+
+    @abstractmethod
+    def last_id(self) -> int:
+        """Get the id of the newest event (0 when none was published)"""
+
+
+class LocalEventBroker(EventBroker):
+    """In-process broker with a bounded history, shared by the threads of one process"""
+
+    def __init__(self, history: int = DEFAULT_HISTORY):
+        self._events = deque(maxlen=history)
+        self._next_id = 1
+        self._condition = threading.Condition()
+
+    def publish(self, event_type, topics, data):
+        with self._condition:
+            item = {
+                'id': self._next_id,
+                'type': event_type,
+                'topics': sorted(set(topics)),
+                'data': data,
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            self._next_id += 1
+            self._events.append(item)
+            self._condition.notify_all()
+        return item
+
+    def since(self, last_id, topics=None):
+        with self._condition:
+            return self._since(last_id, topics)
+
+    def wait(self, last_id, topics=None, timeout=15.0):
+        with self._condition:
+            events = self._since(last_id, topics)
+            if not events:
+                # Each wake-up re-reads from last_id; events on other topics just loop
+                self._condition.wait_for(lambda: bool(self._since(last_id, topics)), timeout)
+                events = self._since(last_id, topics)
+            return events
+
+    def last_id(self):
+        with self._condition:
+            return self._next_id - 1
+
+    def _since(self, last_id, topics):
+        wanted = set(topics) if topics else None
+        events = []
+        oldest = self._events[0]['id'] if self._events else self._next_id
+        reason = None
+        if last_id < oldest - 1:
+            reason = 'history_expired'
+        elif last_id > self._next_id - 1:
+            # Ids restart with the process; the client's id is from before the restart
+            reason = 'broker_restarted'
+        if reason:
+            events.append({
+                'id': oldest - 1 if reason == 'history_expired' else self._next_id - 1,
+                'type': 'resync', 'topics': sorted(wanted or []),
+                'data': {'reason': reason}, 'timestamp': datetime.utcnow().isoformat()
+            })
+        for item in self._events:
+            if item['id'] > last_id and (wanted is None or wanted.intersection(item['topics'])):
+                events.append(item)
+        return events
+
+
+class StatusEvents(SessionHook):
+    """
+    Publishes committed status changes of tracked models to a broker
+
+    Changes are collected in ``session.info`` on flush and published on
+    commit; a rollback discards them.
+    """
+
+    session_events = ('after_flush', 'after_commit', 'after_rollback')
+
+    def __init__(self):
+        self.tracked: Dict[type, Dict[str, Any]] = {}
+
+    def track(self, model, topics, status_attr='status', references=()) -> None:
+        """
+        Register a model whose status changes are published
+
+        Args:
+            model: Model class
+            topics: Department topics the model's events go to
+            status_attr: Attribute holding the status
+            references: Attribute names included in the event (e.g. sales_order_id)
+        """
+        self.tracked[model] = {'topics': tuple(topics), 'status': status_attr, 'references': tuple(references)}
+
+    def topics(self) -> set:
+        """Get every topic published by a tracked model"""
+        return {topic for spec in self.tracked.values() for topic in spec['topics']}
+
+    def init_app(self, app: Flask, broker: Optional[EventBroker] = None) -> None:
+        """Attach a broker to an application and start capturing status changes"""
+        if broker is None:
+            broker_class = import_string(app.config.get('STATUS_EVENTS_BROKER') or 'utils.events.LocalEventBroker')
+            broker = broker_class()
+        app.extensions['status_events'] = {'publisher': self, 'broker': broker}
+        self._listen()
+
+    @staticmethod
+    def broker() -> Optional[EventBroker]:
+        """Get the current application's broker, or None when events are disabled"""
+        if not has_app_context():
+            return None
+        extension = current_app.extensions.get('status_events')
+        return extension['broker'] if extension else None
+
+    def previous_values(self):
+        return [getattr(model, spec['status']) for model, spec in self.tracked.items()]
+
+    def _status_attrs(self, obj):
+        spec = self.tracked.get(type(obj))
+        return (spec['status'],) if spec else ()
+
+    def _after_flush(self, session, flush_context) -> None:
+        if self.broker() is None:
+            return
+        pending = session.info.setdefault(SESSION_KEY, [])
+        for obj, _, previous, status in status_changes(session, self._status_attrs):
+            spec = self.tracked[type(obj)]
+            # Read everything now: committed objects are expired
+            data = {
+                'entity': type(obj).__table__.name,
+                'id': obj.id,
+                'status': status,
+                'previousStatus': previous,
+            }
+            for name in spec['references']:
+                data[_camel(name)] = getattr(obj, name)
+            pending.append((spec['topics'], data))
+
+    def _after_commit(self, session) -> None:
+        pending = session.info.pop(SESSION_KEY, None)
+        broker = self.broker()
+        if not pending or broker is None:
+            return
+        for topics, data in pending:
+            broker.publish('status', topics, data)
+
+    @staticmethod
+    def _after_rollback(session) -> None:
+        session.info.pop(SESSION_KEY, None)
+
+
+def parse_topics(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated topic list (None or empty means all topics)
+
+    Raises:
+        ValueError: If a topic is not published by any tracked model
+    """
+    topics = [topic.strip() for topic in (value or '').split(',') if topic.strip()]
+    unknown = set(topics) - status_events.topics()
+    if unknown:
+        raise ValueError(f"Unknown topics: {', '.join(sorted(unknown))}")
+    return topics or None
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Parse a Last-Event-ID value; None when absent"""
+    if value in (None, ''):
+        return None
+    try:
+        last_id = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('Last-Event-ID must be an integer')
+    if last_id < 0:
+        raise ValueError('Last-Event-ID must not be negative')
+    return last_id
+
+def format_sse(item: Dict[str, Any]) -> str:
+    """Format an event as a server-sent events message"""
+    payload = json.dumps({key: item[key] for key in ('id', 'type', 'topics', 'data', 'timestamp')})
+    return f"id: {item['id']}\nevent: {item['type']}\ndata: {payload}\n\n"
+
+def stream_events(broker: EventBroker, last_id: int, topics: Optional[List[str]] = None,
+                  keepalive: float = DEFAULT_KEEPALIVE_SECONDS, lifetime: float = DEFAULT_STREAM_SECONDS):
+    """
+    Yield server-sent events after ``last_id`` until ``lifetime`` runs out
+
+    Comment lines are sent every ``keepalive`` seconds without events so
+    proxies keep the connection open. Ending the stream frees the worker;
+    EventSource reconnects on its own and resumes with Last-Event-ID.
+    """
+    yield f"retry: {RETRY_MILLISECONDS}\n\n"
+    deadline = time.monotonic() + lifetime
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        events = broker.wait(last_id, topics, timeout=min(keepalive, remaining))
+        if not events:
+            yield ": keepalive\n\n"
+            continue
+        for item in events:
+            # A resync after a restart moves the client back to the broker's ids
+            last_id = item['id'] if item['type'] == 'resync' else max(last_id, item['id'])
+            yield format_sse(item)
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split('_')
+    return head + ''.join(part.title() for part in rest)
+
+
+status_events = StatusEvents()
+status_events.track(SalesOrder, ('sales', 'orders'), 'order_status', references=('order_number',))
+status_events.track(ProductionOrder, ('production', 'orders'))
+status_events.track(DispatchRequest, ('dispatch', 'orders'), references=('sales_order_id', 'delivery_type'))
+status_events.track(TransportJob, ('transport', 'dispatch'), references=('dispatch_request_id',))
+status_events.track(GatePass, ('watchman', 'dispatch'), references=('dispatch_request_id',))
+status_events.track(ApprovalRequest, ('approval', 'sales'), references=('sales_order_id',))
+status_events.track(TransportApprovalRequest, ('transport', 'approval'), references=('sales_order_id',))
@@ -0,0 +1,178 @@
+"""
+Capacity-aware vehicle load planning for pending transport jobs
+
+Vehicle.capacity is free text entered by transport staff ("1500 kg",
+"2 ton", "40 units", or a bare number that the fleet form stores as kg).
+parse_capacity turns it into the same units as DispatchRequest.quantity, using
+the weight of one unit for weight capacities.
+
+plan_loads consolidates jobs into vehicle loads in one pass:
+    1. Jobs are grouped by destination area (see area_key) and the groups
+       are planned largest first.
+    2. Within an area jobs are packed first-fit decreasing. Jobs go into the
+       area's open loads, and a new vehicle is opened only when none has
+       room left.
+    3. A new load takes the smallest free vehicle that holds everything left
+       in the area, or the largest free vehicle when none does.
+Vehicles only carry jobs of one area. Jobs larger than every free vehicle,
+or left over once the fleet is used up, are returned as unassigned.
+"""
+import bisect
+import re
+from collections import namedtuple, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+PlanJob = namedtuple('PlanJob', ['id', 'quantity', 'area'])
+PlanVehicle = namedtuple('PlanVehicle', ['id', 'capacity'])
+
+UNASSIGNED_TOO_LARGE = 'exceeds_vehicle_capacity'
+UNASSIGNED_NO_VEHICLE = 'no_vehicle_available'
+
+# Unit -> (kind, factor); weights are converted to kg
+CAPACITY_UNITS = {
+    'kg': ('weight', 1), 'kgs': ('weight', 1), 'kilo': ('weight', 1), 'kilos': ('weight', 1),
+    'kilogram': ('weight', 1), 'kilograms': ('weight', 1),
+    't': ('weight', 1000), 'ton': ('weight', 1000), 'tons': ('weight', 1000),
+    'tonne': ('weight', 1000), 'tonnes': ('weight', 1000), 'mt': ('weight', 1000),
+    'unit': ('count', 1), 'units': ('count', 1), 'pc': ('count', 1), 'pcs': ('count', 1),
+    'piece': ('count', 1), 'pieces': ('count', 1), 'nos': ('count', 1), 'no': ('count', 1),
+    'item': ('count', 1), 'items': ('count', 1),
+}
+_CAPACITY_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*([a-z]*)')
+# Digit grouping ("10,000", "1,00,000"); any other comma is a decimal comma
+_GROUPED_NUMBER = re.compile(r'\d+(?:,\d{2,3})*,\d{3}(?!\d)')
+_PIN_CODE = re.compile(r'\b(\d{6})\b')
+
+
+def parse_capacity(capacity: Optional[str], unit_weight_kg: float = 1.0) -> Optional[int]:
+    """
+    Parse a free-text vehicle capacity into quantity units
+
+    Args:
+        capacity: Capacity as stored on the vehicle
+        unit_weight_kg: Weight of one quantity unit, for weight capacities
+
+    Returns:
+        int: Capacity in units, or None when it cannot be read
+    """
+    if capacity is None:
+        return None
+    text = _GROUPED_NUMBER.sub(lambda grouped: grouped.group().replace(',', ''), str(capacity).lower())
+    match = _CAPACITY_PATTERN.search(text)
+    if not match:
+        return None
+    amount = float(match.group(1).replace(',', '.'))
+    # A bare number is what the fleet form stores (in kg)
+    kind, factor = CAPACITY_UNITS.get(match.group(2) or 'kg', (None, None))
+    if kind is None:
+        return None
+    if kind == 'weight':
+        if unit_weight_kg <= 0:
+            return None
+        return int(amount * factor / unit_weight_kg)
+    return int(amount * factor)
+
+def area_key(address: Optional[str]) -> str:
+    """
+    Destination area of a delivery address
+
+    A PIN code groups by its first three digits (the sorting district);
+    otherwise the last non-numeric comma-separated part (usually the city).
+    """
+    if not address:
+        return 'unknown'
+    pin = _PIN_CODE.search(address)
+    if pin:
+        return f"pin-{pin.group(1)[:3]}"
+    for part in reversed(address.split(',')):
+        part = ' '.join(part.lower().split())
+        if part and not part.replace(' ', '').isdigit():
+            return part
+    return 'unknown'
+
+
+class Load:
+    """Jobs packed into one vehicle"""
+
+    __slots__ = ('vehicle', 'area', 'jobs', 'used')
+
+    def __init__(self, vehicle: PlanVehicle, area: str):
+        self.vehicle = vehicle
+        self.area = area
+        self.jobs: List[PlanJob] = []
+        self.used = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.vehicle.capacity - self.used
+
+    def add(self, job: PlanJob) -> None:
+        self.jobs.append(job)
+        self.used += job.quantity
+
+
+class LoadPlan:
+    """Result of plan_loads"""
+
+    def __init__(self):
+        self.loads: List[Load] = []
+        self.unassigned: Dict[int, str] = {}
+
+    @property
+    def assigned_jobs(self) -> int:
+        return sum(len(load.jobs) for load in self.loads)
+
+    def utilization(self) -> float:
+        """Share of the capacity of used vehicles that is loaded"""
+        capacity = sum(load.vehicle.capacity for load in self.loads)
+        return round(sum(load.used for load in self.loads) / capacity, 4) if capacity else 0.0
+
+
+def plan_loads(jobs: Iterable[PlanJob], vehicles: Iterable[PlanVehicle]) -> LoadPlan:
+    """
+    Pack jobs into vehicles by destination area
+
+    Args:
+        jobs: Jobs to plan (quantity in units)
+        vehicles: Free vehicles with a parsed capacity
+
+    Returns:
+        LoadPlan: Loads per vehicle and the reason each unplanned job was left
+    """
+    plan = LoadPlan()
+    # Free vehicles sorted by capacity for best-fit lookups
+    free = sorted((v for v in vehicles if v.capacity and v.capacity > 0), key=lambda v: (v.capacity, v.id))
+    capacities = [v.capacity for v in free]
+
+    by_area: Dict[str, List[PlanJob]] = defaultdict(list)
+    for job in jobs:
+        by_area[job.area].append(job)
+    areas = sorted(by_area.items(), key=lambda item: (-sum(j.quantity for j in item[1]), item[0]))
+
+    for area, area_jobs in areas:
+        area_jobs.sort(key=lambda j: (-j.quantity, j.id))
+        left = sum(j.quantity for j in area_jobs)
+        open_loads: List[Load] = []
+        for job in area_jobs:
+            load = next((l for l in open_loads if l.remaining >= job.quantity), None)
+            if load is None:
+                if not free:
+                    plan.unassigned[job.id] = UNASSIGNED_NO_VEHICLE
+                    left -= job.quantity
+                    continue
+                if job.quantity > capacities[-1]:
+                    plan.unassigned[job.id] = UNASSIGNED_TOO_LARGE
+                    left -= job.quantity
+                    continue
+                # Smallest vehicle holding the rest of the area, else the largest one
+                index = bisect.bisect_left(capacities, left)
+                if index == len(capacities):
+                    index -= 1
+                vehicle = free.pop(index)
+                capacities.pop(index)
+                load = Load(vehicle, area)
+                open_loads.append(load)
+                plan.loads.append(load)
+            load.add(job)
+            left -= job.quantity
+    return plan
@@ -0,0 +1,63 @@
+"""
+orjson backed JSON provider
+
+Drop-in replacement for Flask's DefaultJSONProvider (FAST_JSON=false to
+disable) that encodes responses with orjson, several times faster than the
+standard library encoder on large list payloads. Output matches the default
+provider's: keys sorted, datetimes as HTTP dates, Decimal and other types via
+Flask's default hook, indented in debug. Non-ASCII text is written as UTF-8
+rather than \\u escapes.
+
+orjson is optional; without it, or for anything orjson cannot encode (integers
+beyond 64 bits), the standard library encoder is used.
+"""
+from typing import Any, Union
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson when it is installed"""
+
+    def _options(self, indent: bool = False) -> int:
+        # Datetimes go through Flask's default hook so they stay HTTP dates
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _encode(self, obj: Any, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options(indent))
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON; stdlib keyword arguments fall back to the default provider"""
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj).decode()
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserialize data as JSON"""
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Serialize the arguments as JSON and return an application/json response"""
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, indent)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,109 @@
+"""
+Batched eager-loading helpers for the dispatch relationship graph
+
+A dispatch request links a sales order, a showroom product, its gate passes
+and its transport jobs. Listing code that walks those relationships row by
+row issues one query per row; the options built here load each relationship
+for the whole result set at once, so a page costs a constant number of
+queries however many rows it has.
+"""
+from typing import Iterable, List
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
+from models import DispatchRequest, GatePass, SalesOrder, TransportJob
+
+# strategy name -> (top-level loader function, chained Load method name)
+LOAD_STRATEGIES = {
+    'selectin': (selectinload, 'selectinload'),
+    'joined': (joinedload, 'joinedload'),
+    'subquery': (subqueryload, 'subqueryload'),
+}
+DEFAULT_STRATEGY = 'selectin'
+
+def _loaders(strategy: str):
+    if strategy not in LOAD_STRATEGIES:
+        raise ValueError(f'strategy must be one of: {", ".join(LOAD_STRATEGIES)}')
+    return LOAD_STRATEGIES[strategy]
+
+def _dispatch_attributes(include_product_of_order: bool) -> list:
+    attributes = [
+        [DispatchRequest.sales_order],
+        [DispatchRequest.showroom_product],
+        [DispatchRequest.gate_passes],
+        [DispatchRequest.transport_jobs],
+    ]
+    if include_product_of_order:
+        attributes.append([DispatchRequest.sales_order, SalesOrder.showroom_product])
+    return attributes
+
+def _build_options(prefix: list, strategy: str, include_product_of_order: bool) -> list:
+    loader, method = _loaders(strategy)
+    options = []
+    for path in _dispatch_attributes(include_product_of_order):
+        path = prefix + path
+        option = loader(path[0])
+        for attribute in path[1:]:
+            option = getattr(option, method)(attribute)
+        options.append(option)
+    return options
+
+def dispatch_graph_options(strategy: str = DEFAULT_STRATEGY, include_product_of_order: bool = False) -> list:
+    """
+    Loader options for DispatchRequest queries
+
+    Loads the sales order, showroom product, gate passes and transport jobs
+    of every returned dispatch request.
+
+    Args:
+        strategy: 'selectin' (one IN query per relationship), 'joined' or 'subquery'
+        include_product_of_order: Also load each sales order's showroom product
+
+    Returns:
+        list: Options for ``query.options(*options)``
+
+    Raises:
+        ValueError: If the strategy is unknown
+    """
+    return _build_options([], strategy, include_product_of_order)
+
+def gate_pass_graph_options(strategy: str = DEFAULT_STRATEGY, include_product_of_order: bool = False) -> list:
+    """
+    Loader options for GatePass queries
+
+    Loads each gate pass's dispatch request together with that request's
+    full graph (see ``dispatch_graph_options``).
+    """
+    return _build_options([GatePass.dispatch_request], strategy, include_product_of_order)
+
+def transport_job_graph_options(strategy: str = DEFAULT_STRATEGY, include_product_of_order: bool = False) -> list:
+    """
+    Loader options for TransportJob queries
+
+    Loads each transport job's dispatch request together with that request's
+    full graph (see ``dispatch_graph_options``).
+    """
+    return _build_options([TransportJob.dispatch_request], strategy, include_product_of_order)
+
+def load_dispatch_graph(dispatch_requests: Iterable[DispatchRequest], strategy: str = DEFAULT_STRATEGY,
+                        include_product_of_order: bool = False) -> List[DispatchRequest]:
+    """
+    Eager-load the graph for dispatch requests that were already fetched
+
+    Re-selects the requests by id with ``dispatch_graph_options``; the
+    session's identity map hands back the same objects, now with their
+    relationships populated.
+
+    Args:
+        dispatch_requests: Loaded DispatchRequest instances
+        strategy: Loading strategy (see ``dispatch_graph_options``)
+        include_product_of_order: Also load each sales order's showroom product
+
+    Returns:
+        list: The same dispatch requests, in the same order
+    """
+    dispatch_requests = list(dispatch_requests)
+    ids = [request.id for request in dispatch_requests]
+    if ids:
+        DispatchRequest.query.filter(DispatchRequest.id.in_(ids)).options(
+            *dispatch_graph_options(strategy, include_product_of_order)
+        ).all()
+    return dispatch_requests
@@ -0,0 +1,142 @@
+"""
+Keyset (cursor) pagination utility functions
+"""
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+def encode_cursor(timestamp: Optional[datetime], record_id: int) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor token
+
+    Args:
+        timestamp: Timestamp column value of the last row (None is encoded as empty)
+        record_id: Primary key of the last row
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    raw = f"{timestamp.isoformat() if timestamp is not None else ''}|{record_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(token: str) -> Tuple[Optional[datetime], int]:
+    """
+    Decode a cursor token produced by encode_cursor
+
+    Args:
+        token: Cursor token from a previous page
+
+    Returns:
+        tuple: (timestamp or None, record_id)
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+        timestamp, record_id = raw.rsplit('|', 1)
+        return (datetime.fromisoformat(timestamp) if timestamp else None), int(record_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Invalid pagination cursor')
+
+def get_page_params(args: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Read page parameters from request query arguments
+
+    Pagination is opt-in: callers that pass neither ``limit`` nor ``cursor``
+    get None back and keep receiving the full list.
+
+    Args:
+        args: Request query arguments (e.g. ``request.args``)
+
+    Returns:
+        dict: {'limit': int, 'cursor': str or None}, or None when not paginating
+
+    Raises:
+        ValueError: If limit is not a positive integer or the cursor is malformed
+    """
+    limit = args.get('limit')
+    cursor = args.get('cursor') or None
+    if limit is None and cursor is None:
+        return None
+
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    if cursor:
+        decode_cursor(cursor)
+
+    return {'limit': min(limit, MAX_PAGE_SIZE), 'cursor': cursor}
+
+def paginate_query(query, time_column, id_column, limit: int, cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a query ordered newest first by (time_column, id_column)
+
+    Rows whose (nullable) time column is NULL come after all the others,
+    newest id first; their cursors carry no timestamp. They are read by a
+    second query (``column IS NULL``) only on the page where the dated rows
+    run out, so both queries keep using the column's index.
+
+    Args:
+        query: SQLAlchemy query with filters already applied
+        time_column: Timestamp column to sort by (e.g. Model.created_at)
+        id_column: Primary key column used as tie-breaker
+        limit: Maximum number of rows to return
+        cursor: Cursor token from the previous page
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    last_time, last_id = decode_cursor(cursor) if cursor else (None, None)
+    rows = []
+    if not cursor or last_time is not None:
+        dated = query.filter(time_column.isnot(None)) if time_column.nullable else query
+        if cursor:
+            dated = dated.filter(or_(
+                time_column < last_time,
+                and_(time_column == last_time, id_column < last_id)
+            ))
+        rows = dated.order_by(time_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    if time_column.nullable and len(rows) <= limit:
+        undated = query.filter(time_column.is_(None))
+        if cursor and last_time is None:
+            undated = undated.filter(id_column < last_id)
+        rows += undated.order_by(id_column.desc()).limit(limit + 1 - len(rows)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+
+    return rows, next_cursor
+
+def build_page(items: List[Any], next_cursor: Optional[str], limit: int, key: str = 'items') -> Dict[str, Any]:
+    """
+    Build the JSON envelope returned by paginated list endpoints
+
+    Args:
+        items: Serialized rows for this page
+        next_cursor: Cursor for the next page, or None
+        limit: Page size that was applied
+        key: Name of the list field in the envelope
+
+    Returns:
+        dict: Page envelope
+    """
+    return {
+        key: items,
+        'count': len(items),
+        'limit': limit,
+        'nextCursor': next_cursor,
+        'hasMore': next_cursor is not None
+    }
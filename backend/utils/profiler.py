@@ -0,0 +1,173 @@
+"""
+Request-scoped SQL query profiler
+
+Counts the statements each request sends to the database, their total time
+and how often the same statement shape repeats, which is the signature of an
+N+1 query pattern (one query per row of a previous result).
+"""
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_REPEAT_THRESHOLD = 5
+MAX_STATEMENT_LENGTH = 300
+MAX_FLAGGED_PER_ENDPOINT = 20
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_NAMED_PARAM = re.compile(r'%\(\w+\)s|:\w+|\$\d+|%s')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def fingerprint_statement(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape
+
+    Literals and bind parameters become ``?`` and IN lists collapse to
+    ``(?)``, so the same query issued for different rows has one fingerprint.
+
+    Args:
+        statement: SQL text as sent to the DBAPI cursor
+
+    Returns:
+        str: Normalized statement
+    """
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NAMED_PARAM.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryProfiler:
+    """
+    Collects per-request query statistics and per-endpoint summaries
+
+    Engine events are only recorded while a profiled request is active, so
+    CLI scripts and background work on the same engine are not counted.
+    """
+
+    _listening = False
+    _listen_lock = threading.Lock()
+
+    def __init__(self, app: Optional[Flask] = None):
+        self.repeat_threshold = DEFAULT_REPEAT_THRESHOLD
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """Install the request hooks on an application"""
+        self.repeat_threshold = app.config.get('SQL_PROFILER_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+        app.extensions['sql_profiler'] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        self._listen()
+
+    @classmethod
+    def _listen(cls) -> None:
+        # Engines are created lazily per app, so listen on the Engine class once
+        with cls._listen_lock:
+            if cls._listening:
+                return
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            cls._listening = True
+
+    def _start_request(self) -> None:
+        # Reading the profile should not show up in it
+        if request.blueprint == 'debug':
+            return
+        g.sql_profile = {'count': 0, 'seconds': 0.0, 'fingerprints': Counter()}
+
+    def _finish_request(self, response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+
+        repeated = [
+            (shape, count) for shape, count in profile['fingerprints'].most_common()
+            if count > self.repeat_threshold
+        ]
+        response.headers['X-Query-Count'] = str(profile['count'])
+        response.headers['X-Query-Time-Ms'] = f"{profile['seconds'] * 1000:.2f}"
+        if repeated:
+            response.headers['X-Query-Repeated'] = str(repeated[0][1])
+
+        self._record(request.endpoint or request.path, profile, repeated)
+        return response
+
+    def _record(self, endpoint: str, profile: Dict[str, Any], repeated: list) -> None:
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'maxQueries': 0, 'dbTimeMs': 0.0, 'repeated': {}
+            })
+            stats['requests'] += 1
+            stats['queries'] += profile['count']
+            stats['maxQueries'] = max(stats['maxQueries'], profile['count'])
+            stats['dbTimeMs'] += profile['seconds'] * 1000
+            for shape, count in repeated:
+                shape = shape[:MAX_STATEMENT_LENGTH]
+                entry = stats['repeated'].get(shape)
+                if entry is None:
+                    if len(stats['repeated']) >= MAX_FLAGGED_PER_ENDPOINT:
+                        continue
+                    entry = stats['repeated'][shape] = {'statement': shape, 'maxCount': 0, 'requests': 0}
+                entry['maxCount'] = max(entry['maxCount'], count)
+                entry['requests'] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Get per-endpoint totals, worst offenders first"""
+        with self._lock:
+            endpoints = []
+            for endpoint, stats in self._endpoints.items():
+                repeated = sorted(stats['repeated'].values(), key=lambda r: r['maxCount'], reverse=True)
+                endpoints.append({
+                    'endpoint': endpoint,
+                    'requests': stats['requests'],
+                    'queries': stats['queries'],
+                    'avgQueries': round(stats['queries'] / stats['requests'], 2),
+                    'maxQueries': stats['maxQueries'],
+                    'dbTimeMs': round(stats['dbTimeMs'], 2),
+                    'avgDbTimeMs': round(stats['dbTimeMs'] / stats['requests'], 2),
+                    'flagged': bool(repeated),
+                    'repeatedStatements': [dict(r) for r in repeated],
+                })
+        endpoints.sort(key=lambda e: (e['flagged'], e['maxQueries']), reverse=True)
+        return {
+            'repeatThreshold': self.repeat_threshold,
+            'flaggedEndpoints': [e['endpoint'] for e in endpoints if e['flagged']],
+            'endpoints': endpoints
+        }
+
+    def reset(self) -> None:
+        """Discard collected endpoint statistics"""
+        with self._lock:
+            self._endpoints.clear()
+
+
+def _current_profile() -> Optional[Dict[str, Any]]:
+    if not has_request_context():
+        return None
+    return g.get('sql_profile')
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile() is not None:
+        conn.info.setdefault('sql_profile_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    starts = conn.info.get('sql_profile_start')
+    if profile is None or not starts:
+        return
+    profile['count'] += 1
+    profile['seconds'] += time.perf_counter() - starts.pop()
+    profile['fingerprints'][fingerprint_statement(statement)] += 1
+
+sql_profiler = QueryProfiler()
@@ -0,0 +1,467 @@
+"""
+Status rollups for department summary endpoints
+
+A rollup counts a table's rows per status (optionally split by a second
+column such as delivery type) together with the rows inside each requested
+time window, in one GROUP BY query. Windows are half-open ranges on the raw
+column (``start <= column < end``), never ``DATE(column)``, so an index on the
+column stays usable.
+
+With STATUS_COUNTERS enabled, per-status totals of the tracked tables are
+also kept in the status_counter table, updated in the same flush as every
+status change. Rollups then read totals from the counters and only query the
+table for the (indexed, narrow) time windows.
+"""
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Optional, Tuple
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import and_, case, func, inspect as sa_inspect, literal, or_, text
+from sqlalchemy.exc import IntegrityError
+from models import db, StatusCounter, TransportJob, GatePass, SalesOrder, DispatchRequest
+from models.status_counter import TOTAL_STATUS
+from utils.changes import SessionHook
+
+Window = namedtuple('Window', ['column', 'start', 'end', 'statuses'], defaults=(None, None, None))
+Window.__doc__ = """
+Time window of a rollup: rows with ``start <= column < end``
+
+Either bound may be None for an open range. ``statuses`` optionally limits
+the window to those statuses, which lets the database seek a (status, column)
+index when the window is queried on its own.
+"""
+
+def day_range(day=None) -> Tuple[datetime, datetime]:
+    """
+    Get the half-open datetime range covering a calendar day
+
+    Args:
+        day: Date to cover (default: today, local time)
+
+    Returns:
+        tuple: (start, end) with end the following midnight
+    """
+    start = datetime.combine(day or datetime.now().date(), time.min)
+    return start, start + timedelta(days=1)
+
+def _window_condition(window: Window):
+    conditions = []
+    if window.statuses is not None:
+        conditions.append(window.statuses)
+    if window.start is not None:
+        conditions.append(window.column >= window.start)
+    if window.end is not None:
+        conditions.append(window.column < window.end)
+    return and_(*conditions) if conditions else None
+
+
+class RollupResult:
+    """Counts (and sums) keyed by (status, dimension) with per-window subsets"""
+
+    def __init__(self):
+        self._rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def _row(self, status, dimension):
+        return self._rows.setdefault((status or '', dimension or ''), {'count': 0, 'sums': {}, 'windows': {}})
+
+    def _select(self, status, dimension):
+        statuses = (status,) if isinstance(status, str) else status
+        for (row_status, row_dimension), row in self._rows.items():
+            if statuses is not None and row_status not in statuses:
+                continue
+            if dimension is not None and row_dimension != dimension:
+                continue
+            yield row
+
+    def count(self, status=None, window=None, dimension=None) -> int:
+        """
+        Count rows, optionally limited to status(es), a window and a dimension value
+
+        Args:
+            status: Status or iterable of statuses (default: all)
+            window: Window name (default: all time)
+            dimension: Dimension value (default: all)
+        """
+        total = 0
+        for row in self._select(status, dimension):
+            total += row['windows'].get(window, {}).get('count', 0) if window else row['count']
+        return int(total)
+
+    def sum(self, name, status=None, window=None, dimension=None) -> float:
+        """Sum a rollup's named amount over the matching rows"""
+        total = 0
+        for row in self._select(status, dimension):
+            source = row['windows'].get(window, {}) if window else row
+            total += source.get('sums', {}).get(name) or 0
+        return total
+
+    def by_status(self) -> Dict[str, int]:
+        """Get the all-time count per status"""
+        counts: Dict[str, int] = {}
+        for (status, _), row in self._rows.items():
+            counts[status] = counts.get(status, 0) + int(row['count'])
+        return counts
+
+
+class StatusRollup:
+    """
+    Status x window rollup of one table
+
+    Args:
+        status_column: Column holding the status (e.g. ``TransportJob.status``)
+        dimension_column: Optional second grouping column
+        windows: {name: Window} time windows to count within
+        sums: {name: column} amounts to total alongside the counts
+    """
+
+    def __init__(self, status_column, dimension_column=None, windows=None, sums=None):
+        self.status_column = status_column
+        self.dimension_column = dimension_column
+        self.windows: Dict[str, Window] = {}
+        for name, window in (windows or {}).items():
+            statuses = window.statuses
+            if statuses is not None:
+                statuses = status_column.in_(tuple(statuses))
+            self.windows[name] = window._replace(statuses=statuses)
+        self.sums: Dict[str, Any] = dict(sums or {})
+
+    def run(self) -> RollupResult:
+        """Run the rollup, using status counters for totals when they are enabled"""
+        totals = status_counters.totals(self)
+        if totals is None:
+            return self._run_grouped()
+
+        result = RollupResult()
+        for (status, dimension), (count, amount) in totals.items():
+            row = result._row(status, dimension)
+            row['count'] = count
+            for name in self.sums:
+                row['sums'][name] = amount
+        if self.windows:
+            self._add_windows(result)
+        return result
+
+    def _group_columns(self):
+        columns = [self.status_column]
+        if self.dimension_column is not None:
+            columns.append(self.dimension_column)
+        return columns
+
+    def _window_aggregates(self, windows):
+        aggregates = []
+        for name, window in windows.items():
+            condition = _window_condition(window)
+            aggregates.append(func.sum(case((condition, 1), else_=0)) if condition is not None else func.count())
+            for column in self.sums.values():
+                aggregates.append(func.sum(case((condition, column), else_=0)) if condition is not None else func.sum(column))
+        return aggregates
+
+    def _fill_windows(self, windows, values):
+        values = list(values)
+        for name in windows:
+            window_row = {'count': values.pop(0) or 0, 'sums': {}}
+            for sum_name in self.sums:
+                window_row['sums'][sum_name] = values.pop(0) or 0
+            yield name, window_row
+
+    def _run_grouped(self) -> RollupResult:
+        """All totals and windows in a single GROUP BY over the table"""
+        group_columns = self._group_columns()
+        query = db.session.query(
+            *group_columns,
+            func.count(),
+            *[func.sum(column) for column in self.sums.values()],
+            *self._window_aggregates(self.windows)
+        ).group_by(*group_columns)
+
+        result = RollupResult()
+        for values in query.all():
+            values = list(values)
+            status = values.pop(0)
+            dimension = values.pop(0) if self.dimension_column is not None else None
+            row = result._row(status, dimension)
+            row['count'] = values.pop(0)
+            for name in self.sums:
+                row['sums'][name] = values.pop(0) or 0
+            row['windows'] = dict(self._fill_windows(self.windows, values))
+        return result
+
+    def _add_windows(self, result):
+        """Count only the rows inside the windows, with a sargable range filter"""
+        conditions = [_window_condition(window) for window in self.windows.values()]
+        group_columns = self._group_columns()
+        query = db.session.query(*group_columns, *self._window_aggregates(self.windows))
+        if all(condition is not None for condition in conditions):
+            query = query.filter(or_(*conditions))
+        for values in query.group_by(*group_columns).all():
+            values = list(values)
+            status = values.pop(0)
+            dimension = values.pop(0) if self.dimension_column is not None else None
+            result._row(status, dimension)['windows'] = dict(self._fill_windows(self.windows, values))
+
+
+class StatusCounters(SessionHook):
+    """
+    Incremental per-status counters for tracked models
+
+    A before_flush hook turns inserts, deletes and status (or dimension or
+    amount) changes of tracked rows into +/- deltas applied with
+    ``UPDATE ... SET count = count + :delta`` in the same transaction, so
+    concurrent writers never lose updates. Bulk writes that bypass the ORM
+    (bulk_insert_mappings, Query.update) are not seen; call rebuild() after
+    them. Counters for a table are built from a GROUP BY on first read.
+    """
+
+    session_events = ('before_flush',)
+
+    def __init__(self):
+        self.tracked: Dict[type, Dict[str, Optional[str]]] = {}
+
+    def track(self, model, status_attr='status', dimension_attr=None, sum_attr=None) -> None:
+        """Register a model whose status counts should be maintained"""
+        self.tracked[model] = {'status': status_attr, 'dimension': dimension_attr, 'sum': sum_attr}
+
+    def init_app(self, app: Flask) -> None:
+        """Enable counter maintenance and counter-backed rollups for an application"""
+        app.extensions['status_counters'] = self
+        self._listen()
+
+    def enabled(self) -> bool:
+        """Whether counters are enabled for the current application"""
+        return has_app_context() and current_app.extensions.get('status_counters') is self
+
+    def previous_values(self):
+        # The previous value gives the bucket a row leaves
+        return [getattr(model, attr) for model, attrs in self.tracked.items() for attr in filter(None, attrs.values())]
+
+    @staticmethod
+    def entity(model) -> str:
+        """Counter entity name of a model (its table name)"""
+        return model.__table__.name
+
+    def _model_for(self, rollup: StatusRollup):
+        """Get the tracked model a rollup can be served for, or None"""
+        for model, attrs in self.tracked.items():
+            if rollup.status_column is not getattr(model, attrs['status']):
+                continue
+            dimension = getattr(model, attrs['dimension']) if attrs['dimension'] else None
+            if rollup.dimension_column is not dimension:
+                continue
+            summed = getattr(model, attrs['sum']) if attrs['sum'] else None
+            if any(column is not summed for column in rollup.sums.values()):
+                continue
+            return model
+        return None
+
+    def totals(self, rollup: StatusRollup) -> Optional[Dict[Tuple[str, str], Tuple[int, float]]]:
+        """
+        Get counter totals for a rollup
+
+        Returns:
+            dict: {(status, dimension): (count, amount)}, or None when counters
+                are disabled or do not cover the rollup
+        """
+        if not self.enabled():
+            return None
+        model = self._model_for(rollup)
+        if model is None:
+            return None
+
+        rows = StatusCounter.query.filter_by(entity=self.entity(model)).all()
+        if not any(row.status == TOTAL_STATUS for row in rows):
+            self.rebuild(model)
+            rows = StatusCounter.query.filter_by(entity=self.entity(model)).all()
+        return {
+            (row.status, row.dimension): (row.count, row.amount or 0)
+            for row in rows if row.status != TOTAL_STATUS and row.count
+        }
+
+    def rebuild(self, model) -> None:
+        """Recount a tracked model's counters from its table (see rebuild_counters)"""
+        attrs = self.tracked[model]
+        status = getattr(model, attrs['status'])
+        dimension = getattr(model, attrs['dimension']) if attrs['dimension'] else literal('')
+        amount = func.sum(getattr(model, attrs['sum'])) if attrs['sum'] else literal(0)
+        group_columns = [status, dimension] if attrs['dimension'] else [status]
+        rebuild_counters(
+            self.entity(model), model.__table__,
+            db.select(status, dimension, func.count(), amount).group_by(*group_columns)
+        )
+
+    def rebuild_all(self) -> None:
+        """Recount every tracked model"""
+        for model in self.tracked:
+            self.rebuild(model)
+
+    def _key(self, obj, attrs, committed):
+        values = []
+        for name in ('status', 'dimension', 'sum'):
+            attr = attrs[name]
+            if not attr:
+                values.append('' if name != 'sum' else 0)
+                continue
+            value = _previous_value(obj, attr) if committed else _current_value(obj, attr)
+            values.append(value if name == 'sum' else (value or ''))
+        return values[0], values[1], values[2] or 0
+
+    def _before_flush(self, session, flush_context, instances) -> None:
+        if not self.enabled():
+            return
+
+        deltas: Dict[Tuple[str, str, str], list] = {}
+
+        def add(entity, status, dimension, count, amount):
+            delta = deltas.setdefault((entity, status, dimension), [0, 0])
+            delta[0] += count
+            delta[1] += amount
+
+        for obj in session.new:
+            attrs = self.tracked.get(type(obj))
+            if attrs:
+                status, dimension, amount = self._key(obj, attrs, committed=False)
+                add(self.entity(type(obj)), status, dimension, 1, amount)
+                add(self.entity(type(obj)), TOTAL_STATUS, '', 1, amount)
+        for obj in session.deleted:
+            attrs = self.tracked.get(type(obj))
+            if attrs:
+                status, dimension, amount = self._key(obj, attrs, committed=True)
+                add(self.entity(type(obj)), status, dimension, -1, -amount)
+                add(self.entity(type(obj)), TOTAL_STATUS, '', -1, -amount)
+        for obj in session.dirty:
+            attrs = self.tracked.get(type(obj))
+            if not attrs or not session.is_modified(obj):
+                continue
+            before = self._key(obj, attrs, committed=True)
+            after = self._key(obj, attrs, committed=False)
+            if before == after:
+                continue
+            entity = self.entity(type(obj))
+            add(entity, before[0], before[1], -1, -before[2])
+            add(entity, after[0], after[1], 1, after[2])
+            add(entity, TOTAL_STATUS, '', 0, after[2] - before[2])
+
+        if deltas:
+            apply_counter_deltas(session.connection(), deltas)
+
+
+def rebuild_counters(entity: str, counted, statement) -> None:
+    """
+    Replace an entity's counter rows with a fresh count, in transactions of their own
+
+    A recount must not miss rows written while it runs, so:
+        - the total ('*') row is created and committed first; from then on
+          every flush applies its deltas and locks that row until it commits
+        - the recount locks the total row too, so it waits for those writers
+          and later ones wait for it, applying their deltas on top of the new
+          counts; on PostgreSQL it also takes a SHARE lock on the counted
+          table, waiting out writes that started before the total row existed
+    A failed recount removes the entity's rows, so the next read retries.
+
+    Args:
+        entity: Counter entity
+        counted: Table the counts are read from
+        statement: SELECT of (status, dimension, count, amount) rows
+    """
+    table = StatusCounter.__table__
+    is_total = and_(table.c.entity == entity, table.c.status == TOTAL_STATUS, table.c.dimension == '')
+    try:
+        with db.engine.begin() as conn:
+            if conn.execute(db.select(table.c.id).where(is_total)).first() is None:
+                conn.execute(table.insert().values(
+                    entity=entity, status=TOTAL_STATUS, dimension='', count=0, amount=0, updated_at=datetime.utcnow()
+                ))
+    except IntegrityError:
+        # Created by a concurrent recount, which holds it until done
+        pass
+
+    try:
+        with db.engine.begin() as conn:
+            now = datetime.utcnow()
+            conn.execute(table.update().where(is_total).values(updated_at=now))
+            if conn.dialect.name == 'postgresql':
+                conn.execute(text(f'LOCK TABLE {counted.name} IN SHARE MODE'))
+            counts: Dict[Tuple[str, str], list] = {}
+            for status, dimension, count, amount in conn.execute(statement).all():
+                row = counts.setdefault((status or '', dimension or ''), [0, 0])
+                row[0] += count
+                row[1] += amount or 0
+            conn.execute(table.delete().where(and_(table.c.entity == entity, table.c.status != TOTAL_STATUS)))
+            if counts:
+                conn.execute(table.insert(), [
+                    {'entity': entity, 'status': status, 'dimension': dimension,
+                     'count': count, 'amount': amount, 'updated_at': now}
+                    for (status, dimension), (count, amount) in counts.items()
+                ])
+            conn.execute(table.update().where(is_total).values(
+                count=sum(count for count, _ in counts.values()),
+                amount=sum(amount for _, amount in counts.values()),
+                updated_at=now
+            ))
+    except Exception:
+        with db.engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.entity == entity))
+        raise
+
+
+def apply_counter_deltas(conn, deltas) -> None:
+    """
+    Add count/amount deltas to status_counter rows
+
+    Rows of an entity are only touched once its total ('*') row exists, i.e.
+    once a recount started (rebuild_counters); until then the first read
+    starts one.
+
+    Args:
+        conn: Connection of the transaction the deltas belong to
+        deltas: {(entity, status, dimension): (count, amount)}
+    """
+    table = StatusCounter.__table__
+    now = datetime.utcnow()
+    initialized = set()
+    for entity in sorted({key[0] for key in deltas}):
+        count, amount = deltas.get((entity, TOTAL_STATUS, ''), (0, 0))
+        result = conn.execute(table.update().where(and_(
+            table.c.entity == entity, table.c.status == TOTAL_STATUS
+        )).values(count=table.c.count + count, amount=table.c.amount + amount, updated_at=now))
+        if result.rowcount:
+            initialized.add(entity)
+
+    # Sorted keys: concurrent flushes lock counter rows in the same order
+    for (entity, status, dimension), (count, amount) in sorted(deltas.items()):
+        if entity not in initialized or status == TOTAL_STATUS or (not count and not amount):
+            continue
+        result = conn.execute(table.update().where(and_(
+            table.c.entity == entity, table.c.status == status, table.c.dimension == dimension
+        )).values(count=table.c.count + count, amount=table.c.amount + amount, updated_at=now))
+        if not result.rowcount:
+            conn.execute(table.insert().values(
+                entity=entity, status=status, dimension=dimension, count=count, amount=amount, updated_at=now
+            ))
+
+
+def _column_default(obj, attr):
+    column = sa_inspect(type(obj)).columns[attr]
+    if column.default is not None and column.default.is_scalar:
+        return column.default.arg
+    return None
+
+def _current_value(obj, attr):
+    value = getattr(obj, attr)
+    if value is None and sa_inspect(obj).pending:
+        value = _column_default(obj, attr)
+    return value
+
+def _previous_value(obj, attr):
+    history = sa_inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, attr)
+
+
+status_counters = StatusCounters()
+status_counters.track(TransportJob)
+status_counters.track(GatePass)
+status_counters.track(SalesOrder, 'order_status', sum_attr='final_amount')
+status_counters.track(DispatchRequest, dimension_attr='delivery_type')
@@ -0,0 +1,420 @@
+"""
+Indexed order search for the status tracking bar
+
+Every production and sales order has a row in order_search_document holding
+its lower-cased search text: order number, customer, party, product,
+transporter, vehicle numbers and driver. The rows are refreshed in the same
+transaction as any change to the searched columns of the orders or of the
+rows that text comes from.
+
+Searching is a substring match over that table, narrowed by an index:
+    postgresql: pg_trgm GIN index on search_text (LIKE '%q%' uses it)
+    mysql:      FULLTEXT index with the ngram parser (MATCH ... AGAINST)
+    other (SQLite tests): an in-process inverted index of 1-3 character
+                grams that yields the candidate document ids
+
+Results are ranked exact order number > word prefix > substring, newest
+first within a rank, and paginated with a keyset cursor on that order.
+"""
+import base64
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import and_, case, inspect, or_, select, text
+from models import (
+    db, OrderSearchDocument, ProductionOrder, SalesOrder, ShowroomProduct,
+    DispatchRequest, TransportJob, GatePass
+)
+from utils.changes import SessionHook, chunks
+
+SESSION_KEY = 'order_search_keys'
+INDEX_DELTAS_KEY = 'order_search_index_deltas'
+GRAM_SIZES = (1, 2, 3)
+
+# Model: (key kind, attribute holding that key, searched attributes). Only
+# changes to these columns refresh documents; statuses are not searchable, so
+# the frequent status updates never touch the index.
+SEARCHED_ATTRIBUTES = {
+    ProductionOrder: ('production', 'id', ('product_name', 'category')),
+    SalesOrder: ('sales', 'id', ('order_number', 'customer_name', 'showroom_product_id')),
+    ShowroomProduct: ('product', 'id', ('name', 'production_order_id')),
+    DispatchRequest: ('sales', 'sales_order_id', ('party_name',)),
+    TransportJob: ('dispatch', 'dispatch_request_id', ('transporter_name', 'vehicle_no')),
+    GatePass: ('dispatch', 'dispatch_request_id', ('vehicle_no', 'driver_name')),
+}
+
+RANK_EXACT = 3
+RANK_PREFIX = 2
+RANK_SUBSTRING = 1
+
+
+def normalize(value: Optional[str]) -> str:
+    """Lower-case and collapse whitespace, the form search text is stored in"""
+    return ' '.join(str(value or '').lower().split())
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def encode_rank_cursor(rank: int, created_at: datetime, document_id: int) -> str:
+    """Encode the sort key of the last search hit on a page"""
+    raw = f"{rank}|{created_at.isoformat() if created_at else ''}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_rank_cursor(token: str) -> Tuple[int, Optional[datetime], int]:
+    """
+    Decode a cursor produced by encode_rank_cursor
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+        rank, created_at, document_id = raw.split('|')
+        return int(rank), datetime.fromisoformat(created_at) if created_at else None, int(document_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Invalid pagination cursor')
+
+
+class InvertedIndex:
+    """In-process gram -> document id postings over order_search_document"""
+
+    def __init__(self):
+        self.built = False
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._grams: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def grams(value: str) -> Set[str]:
+        """Every 1-3 character substring of a text"""
+        return {value[i:i + n] for n in GRAM_SIZES for i in range(len(value) - n + 1)}
+
+    def build(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """Index (document id, search text) rows, replacing the current contents"""
+        with self._lock:
+            self._postings.clear()
+            self._grams.clear()
+            for document_id, search_text in rows:
+                self._add(document_id, search_text)
+            self.built = True
+
+    def apply(self, upserts: Dict[int, str], removed: Iterable[int]) -> None:
+        """Apply committed document changes"""
+        with self._lock:
+            for document_id in list(removed) + list(upserts):
+                self._remove(document_id)
+            for document_id, search_text in upserts.items():
+                self._add(document_id, search_text)
+
+    def candidates(self, query: str) -> Set[int]:
+        """Ids of documents that may contain ``query``; callers verify the match"""
+        with self._lock:
+            if len(query) <= max(GRAM_SIZES):
+                return set(self._postings.get(query, ()))
+            size = max(GRAM_SIZES)
+            postings = sorted(
+                (self._postings.get(query[i:i + size], set()) for i in range(len(query) - size + 1)),
+                key=len
+            )
+            result = set(postings[0])
+            for posting in postings[1:]:
+                result &= posting
+                if not result:
+                    break
+            return result
+
+    def _add(self, document_id: int, search_text: str) -> None:
+        grams = self.grams(search_text)
+        self._grams[document_id] = grams
+        for gram in grams:
+            self._postings[gram].add(document_id)
+
+    def _remove(self, document_id: int) -> None:
+        for gram in self._grams.pop(document_id, ()):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(document_id)
+                if not posting:
+                    del self._postings[gram]
+
+
+class OrderSearch(SessionHook):
+    """Maintains order_search_document rows and runs ranked searches over them"""
+
+    session_events = ('after_flush', 'before_commit', 'after_commit', 'after_rollback')
+
+    def init_app(self, app: Flask) -> None:
+        """Start maintaining search documents for an application"""
+        app.extensions['order_search'] = {'index': InvertedIndex()}
+        self._listen()
+
+    @staticmethod
+    def _extension() -> Optional[Dict[str, Any]]:
+        if not has_app_context():
+            return None
+        return current_app.extensions.get('order_search')
+
+    def enabled(self) -> bool:
+        """Whether documents are maintained for the current application"""
+        return self._extension() is not None
+
+    # Searching
+
+    def search(self, query: str, since: Optional[datetime] = None, limit: int = 50,
+               cursor: Optional[str] = None) -> Tuple[List[Tuple[OrderSearchDocument, int]], Optional[str]]:
+        """
+        Find orders whose search text contains ``query``
+
+        Args:
+            query: Search term (case-insensitive substring)
+            since: Only orders created at or after this time
+            limit: Page size
+            cursor: Cursor from the previous page
+
+        Returns:
+            tuple: ([(document, rank)], next_cursor)
+        """
+        q = normalize(query)
+        if not q:
+            return [], None
+
+        doc = OrderSearchDocument
+        rank = case(
+            (doc.order_number == q, RANK_EXACT),
+            (or_(doc.search_text.like(f"{_escape_like(q)}%", escape='\\'),
+                 doc.search_text.like(f"% {_escape_like(q)}%", escape='\\')), RANK_PREFIX),
+            else_=RANK_SUBSTRING
+        )
+        statement = db.session.query(doc, rank.label('rank')).filter(
+            doc.search_text.like(f"%{_escape_like(q)}%", escape='\\')
+        )
+
+        narrowed = self._narrow(statement, q)
+        if narrowed is None:
+            return [], None
+        statement = narrowed
+        if since is not None:
+            statement = statement.filter(doc.created_at >= since)
+        if cursor:
+            last_rank, last_created, last_id = decode_rank_cursor(cursor)
+            statement = statement.filter(or_(
+                rank < last_rank,
+                and_(rank == last_rank, doc.created_at < last_created),
+                and_(rank == last_rank, doc.created_at == last_created, doc.id < last_id)
+            ))
+
+        rows = statement.order_by(rank.desc(), doc.created_at.desc(), doc.id.desc()).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_doc, last_rank = rows[-1]
+            next_cursor = encode_rank_cursor(last_rank, last_doc.created_at, last_doc.id)
+        return [(row[0], row[1]) for row in rows], next_cursor
+
+    def _narrow(self, statement, q: str):
+        """Add the dialect's index-backed candidate filter; None when nothing can match"""
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            # The LIKE filter itself is served by the pg_trgm GIN index
+            return statement
+        if dialect == 'mysql':
+            if len(q) < 2:
+                return statement
+            return statement.filter(text(
+                'MATCH (order_search_document.search_text) AGAINST (:fts IN BOOLEAN MODE)'
+            ).bindparams(fts='"' + q.replace('"', ' ') + '"'))
+
+        index = self._index()
+        ids = index.candidates(q)
+        if not ids:
+            return None
+        return statement.filter(OrderSearchDocument.id.in_(ids))
+
+    def _index(self) -> InvertedIndex:
+        extension = self._extension()
+        if extension is None:
+            # Not initialised for this app: a throwaway index still answers correctly
+            extension = {'index': InvertedIndex()}
+        index = extension['index']
+        if not index.built:
+            index.build(db.session.query(OrderSearchDocument.id, OrderSearchDocument.search_text).all())
+        return index
+
+    # Maintenance
+
+    def _after_flush(self, session, flush_context) -> None:
+        if self._extension() is None:
+            return
+        keys = session.info.setdefault(SESSION_KEY, defaultdict(set))
+        for obj in list(session.new) + list(session.deleted) + list(session.dirty):
+            spec = SEARCHED_ATTRIBUTES.get(type(obj))
+            if spec is None:
+                continue
+            kind, reference, attributes = spec
+            state = inspect(obj)
+            if obj in session.dirty and not any(
+                state.attrs[name].history.has_changes() for name in attributes + (reference,)
+            ):
+                # Status and other unsearched columns leave the document as is
+                continue
+            history = state.attrs[reference].history
+            keys[kind].update(value for value in (getattr(obj, reference),) + tuple(history.deleted or ()))
+
+    def _before_commit(self, session) -> None:
+        if self._extension() is None:
+            return
+        # Flush first so changes made since the last flush are collected too
+        session.flush()
+        keys = session.info.pop(SESSION_KEY, None)
+        if keys:
+            deltas = self.refresh(session.connection(), keys)
+            pending = session.info.setdefault(INDEX_DELTAS_KEY, {'upserts': {}, 'removed': set()})
+            pending['upserts'].update(deltas['upserts'])
+            pending['removed'].update(deltas['removed'])
+
+    def _after_commit(self, session) -> None:
+        pending = session.info.pop(INDEX_DELTAS_KEY, None)
+        extension = self._extension()
+        if pending and extension is not None and extension['index'].built:
+            extension['index'].apply(pending['upserts'], pending['removed'])
+
+    @staticmethod
+    def _after_rollback(session) -> None:
+        session.info.pop(SESSION_KEY, None)
+        session.info.pop(INDEX_DELTAS_KEY, None)
+
+    def refresh(self, conn, keys: Dict[str, Set[int]]) -> Dict[str, Any]:
+        """
+        Rebuild the documents affected by changed rows
+
+        Args:
+            conn: Connection of the transaction making the changes
+            keys: {'production'|'sales'|'product'|'dispatch': ids}
+
+        Returns:
+            dict: {'upserts': {document id: text}, 'removed': document ids}
+        """
+        sales_ids = {i for i in keys.get('sales', ()) if i is not None}
+        product_ids = {i for i in keys.get('product', ()) if i is not None}
+        dispatch_ids = {i for i in keys.get('dispatch', ()) if i is not None}
+        for chunk in chunks(product_ids):
+            sales_ids.update(conn.execute(
+                select(SalesOrder.id).where(SalesOrder.showroom_product_id.in_(chunk))
+            ).scalars())
+        for chunk in chunks(dispatch_ids):
+            sales_ids.update(conn.execute(
+                select(DispatchRequest.sales_order_id).where(DispatchRequest.id.in_(chunk))
+            ).scalars())
+
+        documents = {}
+        documents.update(self._production_documents(conn, {i for i in keys.get('production', ()) if i is not None}))
+        documents.update(self._sales_documents(conn, sales_ids))
+        return self._write(conn, documents)
+
+    def rebuild(self) -> int:
+        """Rebuild every document from the order tables and commit; returns the document count"""
+        conn = db.session.connection()
+        conn.execute(OrderSearchDocument.__table__.delete())
+        production_ids = set(conn.execute(select(ProductionOrder.id)).scalars())
+        sales_ids = set(conn.execute(select(SalesOrder.id)).scalars())
+        documents = {}
+        documents.update(self._production_documents(conn, production_ids))
+        documents.update(self._sales_documents(conn, sales_ids))
+        deltas = self._write(conn, documents)
+        db.session.commit()
+        extension = self._extension()
+        if extension is not None:
+            # The table now holds exactly these documents
+            extension['index'].build(deltas['upserts'].items())
+        return len(deltas['upserts'])
+
+    @staticmethod
+    def _production_documents(conn, production_ids: Set[int]) -> Dict[Tuple[str, int], Optional[Dict[str, Any]]]:
+        documents = {('production', i): None for i in production_ids}
+        for chunk in chunks(production_ids):
+            for row in conn.execute(select(
+                ProductionOrder.id, ProductionOrder.product_name, ProductionOrder.category, ProductionOrder.created_at
+            ).where(ProductionOrder.id.in_(chunk))):
+                number = f"po-{row.id:04d}"
+                documents[('production', row.id)] = {
+                    'production_order_id': row.id,
+                    'order_number': number,
+                    'search_text': normalize(' '.join(
+                        str(part) for part in (number, row.product_name, row.category) if part
+                    )),
+                    'created_at': row.created_at
+                }
+        return documents
+
+    @staticmethod
+    def _sales_documents(conn, sales_ids: Set[int]) -> Dict[Tuple[str, int], Optional[Dict[str, Any]]]:
+        documents = {('sales', i): None for i in sales_ids}
+        parts: Dict[int, List[str]] = defaultdict(list)
+        for chunk in chunks(sales_ids):
+            rows = conn.execute(select(
+                SalesOrder.id, SalesOrder.order_number, SalesOrder.customer_name, SalesOrder.created_at,
+                ShowroomProduct.name, ShowroomProduct.production_order_id, DispatchRequest.party_name,
+                TransportJob.transporter_name, TransportJob.vehicle_no,
+                GatePass.vehicle_no.label('gate_vehicle_no'), GatePass.driver_name
+            ).select_from(SalesOrder).outerjoin(
+                ShowroomProduct, SalesOrder.showroom_product_id == ShowroomProduct.id
+            ).outerjoin(
+                DispatchRequest, DispatchRequest.sales_order_id == SalesOrder.id
+            ).outerjoin(
+                TransportJob, TransportJob.dispatch_request_id == DispatchRequest.id
+            ).outerjoin(
+                GatePass, GatePass.dispatch_request_id == DispatchRequest.id
+            ).where(SalesOrder.id.in_(chunk)))
+            for row in rows:
+                document = documents.get(('sales', row.id))
+                if document is None:
+                    document = documents[('sales', row.id)] = {
+                        'production_order_id': row.production_order_id,
+                        'order_number': normalize(row.order_number),
+                        'search_text': '',
+                        'created_at': row.created_at
+                    }
+                    parts[row.id].extend([f"so-{row.id}", row.order_number, row.customer_name, row.name])
+                parts[row.id].extend([
+                    row.party_name, row.transporter_name, row.vehicle_no, row.gate_vehicle_no, row.driver_name
+                ])
+        for sales_id, values in parts.items():
+            unique = list(dict.fromkeys(normalize(value) for value in values if value))
+            documents[('sales', sales_id)]['search_text'] = ' '.join(value for value in unique if value)
+        return documents
+
+    @staticmethod
+    def _write(conn, documents: Dict[Tuple[str, int], Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Upsert or delete documents; returns the in-process index deltas"""
+        table = OrderSearchDocument.__table__
+        existing = {}
+        by_kind = defaultdict(set)
+        for kind, ref_id in documents:
+            by_kind[kind].add(ref_id)
+        for kind, ref_ids in by_kind.items():
+            for chunk in chunks(ref_ids):
+                for document_id, ref_id in conn.execute(
+                    select(table.c.id, table.c.ref_id).where(and_(table.c.kind == kind, table.c.ref_id.in_(chunk)))
+                ):
+                    existing[(kind, ref_id)] = document_id
+
+        upserts, removed = {}, set()
+        for (kind, ref_id), document in documents.items():
+            document_id = existing.get((kind, ref_id))
+            if document is None:
+                if document_id is not None:
+                    conn.execute(table.delete().where(table.c.id == document_id))
+                    removed.add(document_id)
+                continue
+            if document_id is None:
+                result = conn.execute(table.insert().values(kind=kind, ref_id=ref_id, **document))
+                document_id = result.inserted_primary_key[0]
+            else:
+                conn.execute(table.update().where(table.c.id == document_id).values(**document))
+            upserts[document_id] = document['search_text']
+        return {'upserts': upserts, 'removed': removed}
+
+
+order_search = OrderSearch()
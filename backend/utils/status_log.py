@@ -0,0 +1,295 @@
+"""
+Append-only status transition log for the order chain
+
+Every status change of a tracked record (production -> purchase/store ->
+assembly -> showroom -> sales/finance -> dispatch -> transport/watchman) is
+collected on flush and written to status_event in the same transaction, just
+before it commits. A rollback discards the collected events with the changes.
+
+Each event is stamped with the production and sales order it belongs to.
+Records that only reference their parent (transport jobs, gate passes,
+dispatch requests, showroom products) are resolved in one query per parent
+table at write time. So:
+    - the history of one record is a range of (entity, entity_id, occurred_at)
+    - the history of an order across departments is a range of
+      (production_order_id, occurred_at) or (sales_order_id, occurred_at)
+    - "where is this order now" is the newest event of that range
+"""
+import math
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import and_, func, select
+from models import (
+    db, StatusEvent, ProductionOrder, PurchaseOrder, AssemblyOrder, ShowroomProduct, SalesOrder,
+    DispatchRequest, TransportJob, GatePass
+)
+from utils.cache import response_cache
+from utils.changes import SessionHook, chunks, status_changes
+
+SESSION_KEY = 'status_log_events'
+
+# references: {'production'|'sales'|'product'|'dispatch': attribute holding that id}
+TrackedStatus = namedtuple('TrackedStatus', ['entity', 'status_attr', 'references'])
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values; None when empty"""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+def summarize_hours(durations: List[float]) -> Dict[str, Any]:
+    """Count, mean and percentiles of durations given in seconds, reported in hours"""
+    durations = sorted(durations)
+    hours = lambda value: round(value / 3600, 2) if value is not None else None
+    return {
+        'count': len(durations),
+        'avgHours': hours(sum(durations) / len(durations)) if durations else None,
+        'p50Hours': hours(percentile(durations, 0.5)),
+        'p90Hours': hours(percentile(durations, 0.9)),
+        'maxHours': hours(durations[-1]) if durations else None
+    }
+
+
+class StatusLog(SessionHook):
+    """Writes status_event rows for the status changes of tracked models"""
+
+    session_events = ('after_flush', 'before_commit', 'after_rollback')
+
+    def __init__(self):
+        self.tracked: Dict[type, List[TrackedStatus]] = {}
+
+    def track(self, model, status_attr='status', entity=None, **references) -> None:
+        """
+        Register a status column whose changes are logged
+
+        Args:
+            model: Model class
+            status_attr: Attribute holding the status
+            entity: Entity name in the log (default: the table name)
+            **references: production/sales/product/dispatch=attribute name
+                holding that id on the model
+        """
+        self.tracked.setdefault(model, []).append(
+            TrackedStatus(entity or model.__table__.name, status_attr, references)
+        )
+
+    def init_app(self, app: Flask) -> None:
+        """Start logging status changes for an application"""
+        app.extensions['status_log'] = self
+        self._listen()
+
+    @staticmethod
+    def enabled() -> bool:
+        """Whether status changes are logged for the current application"""
+        return has_app_context() and 'status_log' in current_app.extensions
+
+    def previous_values(self):
+        return [getattr(model, spec.status_attr) for model, specs in self.tracked.items() for spec in specs]
+
+    def _specs(self, obj) -> Dict[str, TrackedStatus]:
+        return {spec.status_attr: spec for spec in self.tracked.get(type(obj), ())}
+
+    def _after_flush(self, session, flush_context) -> None:
+        if not self.enabled():
+            return
+        pending = session.info.setdefault(SESSION_KEY, [])
+        now = datetime.utcnow()
+        for change in status_changes(session, self._specs):
+            spec = self._specs(change.obj)[change.attr]
+            item = {
+                'entity': spec.entity,
+                'entity_id': change.obj.id,
+                'status': change.status,
+                'previous_status': change.previous,
+                'occurred_at': now,
+            }
+            for key, attr in spec.references.items():
+                item[key] = getattr(change.obj, attr)
+            pending.append(item)
+
+    def _before_commit(self, session) -> None:
+        if not self.enabled():
+            return
+        # Flush first so changes made since the last flush are logged too
+        session.flush()
+        pending = session.info.pop(SESSION_KEY, None)
+        if pending:
+            self.write(session.connection(), pending)
+            # Core inserts bypass the cache's flush hook
+            response_cache.mark_changed(session, (StatusEvent.__tablename__,))
+
+    @staticmethod
+    def _after_rollback(session) -> None:
+        session.info.pop(SESSION_KEY, None)
+
+    @staticmethod
+    def write(conn, items: List[Dict[str, Any]]) -> int:
+        """
+        Resolve the production/sales order of collected events and insert them
+
+        Args:
+            conn: Connection of the transaction making the changes
+            items: Events with entity, entity_id, status, previous_status,
+                occurred_at and any of production/sales/product/dispatch ids
+
+        Returns:
+            int: Number of events written
+        """
+        dispatch_ids = {item['dispatch'] for item in items if item.get('dispatch')}
+        dispatches = {}
+        for chunk in chunks(dispatch_ids):
+            for row in conn.execute(select(
+                DispatchRequest.id, DispatchRequest.sales_order_id, DispatchRequest.showroom_product_id
+            ).where(DispatchRequest.id.in_(chunk))):
+                dispatches[row.id] = row
+        for item in items:
+            dispatch = dispatches.get(item.get('dispatch'))
+            if dispatch is not None:
+                item.setdefault('sales', dispatch.sales_order_id)
+                item.setdefault('product', dispatch.showroom_product_id)
+
+        product_ids = {item['product'] for item in items if item.get('product') and not item.get('production')}
+        products = {}
+        for chunk in chunks(product_ids):
+            products.update(conn.execute(select(
+                ShowroomProduct.id, ShowroomProduct.production_order_id
+            ).where(ShowroomProduct.id.in_(chunk))).all())
+
+        rows = [{
+            'entity': item['entity'],
+            'entity_id': item['entity_id'],
+            'status': item['status'],
+            'previous_status': item['previous_status'],
+            'production_order_id': item.get('production') or products.get(item.get('product')),
+            'sales_order_id': item.get('sales'),
+            'occurred_at': item['occurred_at'],
+        } for item in items]
+        conn.execute(StatusEvent.__table__.insert(), rows)
+        return len(rows)
+
+    # Queries
+
+    @staticmethod
+    def history(entity: Optional[str] = None, entity_id: Optional[int] = None,
+                production_order_id: Optional[int] = None, sales_order_id: Optional[int] = None) -> List[StatusEvent]:
+        """
+        Events of one record or one order, oldest first
+
+        Pass ``entity`` and ``entity_id`` for a single record, or a production
+        and/or sales order id for the order across departments.
+        """
+        query = StatusEvent.query
+        if entity is not None:
+            query = query.filter(StatusEvent.entity == entity, StatusEvent.entity_id == entity_id)
+        elif production_order_id is not None and sales_order_id is not None:
+            # A sale's history: its own events plus the production chain's, but
+            # not the events of other sales of the same production order
+            events = {e.id: e for e in StatusLog.history(production_order_id=production_order_id)
+                      if e.sales_order_id in (None, sales_order_id)}
+            events.update((e.id, e) for e in StatusLog.history(sales_order_id=sales_order_id))
+            return sorted(events.values(), key=lambda e: (e.occurred_at, e.id))
+        elif production_order_id is not None:
+            query = query.filter(StatusEvent.production_order_id == production_order_id)
+        elif sales_order_id is not None:
+            query = query.filter(StatusEvent.sales_order_id == sales_order_id)
+        else:
+            raise ValueError('An entity or an order id is required')
+        return query.order_by(StatusEvent.occurred_at.asc(), StatusEvent.id.asc()).all()
+
+    @staticmethod
+    def latest(column, ids: Iterable[int]) -> Dict[int, StatusEvent]:
+        """
+        Newest event per order, for many orders at once
+
+        Args:
+            column: StatusEvent.production_order_id or StatusEvent.sales_order_id
+            ids: Order ids
+
+        Returns:
+            dict: {order id: newest StatusEvent}
+        """
+        result = {}
+        for chunk in chunks(set(ids)):
+            # Ids grow with insertion, so the highest id is the newest event
+            newest = db.session.query(func.max(StatusEvent.id)).filter(column.in_(chunk)).group_by(column)
+            for item in StatusEvent.query.filter(StatusEvent.id.in_(newest.subquery().select())).all():
+                result[getattr(item, column.key)] = item
+        return result
+
+    @staticmethod
+    def stage_durations(entity: str, since: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Time records of an entity spent in each status
+
+        A status lasts until the record's next event; the current status of a
+        record is not counted. ``since`` limits to events after that time.
+
+        Returns:
+            dict: {status: {count, avgHours, p50Hours, p90Hours, maxHours}}
+        """
+        left_at = func.lead(StatusEvent.occurred_at).over(
+            partition_by=StatusEvent.entity_id, order_by=(StatusEvent.occurred_at, StatusEvent.id)
+        )
+        statement = select(StatusEvent.status, StatusEvent.occurred_at, left_at.label('left_at')).where(
+            StatusEvent.entity == entity
+        )
+        if since is not None:
+            statement = statement.where(StatusEvent.occurred_at >= since)
+        spans = statement.subquery()
+
+        durations: Dict[str, List[float]] = {}
+        for status, entered, left in db.session.execute(
+            select(spans.c.status, spans.c.occurred_at, spans.c.left_at).where(spans.c.left_at.isnot(None))
+        ):
+            durations.setdefault(status, []).append((_as_datetime(left) - _as_datetime(entered)).total_seconds())
+        return {status: summarize_hours(values) for status, values in durations.items()}
+
+    @staticmethod
+    def cycle_times(entity: str, from_status: str, to_status: str,
+                    since: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Time from first reaching ``from_status`` to first reaching ``to_status``
+
+        Args:
+            entity: Entity name in the log (e.g. production_order)
+            from_status: Starting status
+            to_status: Ending status
+            since: Only records that reached from_status after this time
+
+        Returns:
+            dict: {count, avgHours, p50Hours, p90Hours, maxHours}
+        """
+        def first_reached(status):
+            statement = select(
+                StatusEvent.entity_id, func.min(StatusEvent.occurred_at).label('reached_at')
+            ).where(StatusEvent.entity == entity, StatusEvent.status == status)
+            if since is not None:
+                statement = statement.where(StatusEvent.occurred_at >= since)
+            return statement.group_by(StatusEvent.entity_id).subquery()
+
+        start, end = first_reached(from_status), first_reached(to_status)
+        rows = db.session.execute(select(start.c.reached_at, end.c.reached_at).join(
+            end, and_(end.c.entity_id == start.c.entity_id, end.c.reached_at >= start.c.reached_at)
+        )).all()
+        return summarize_hours([(_as_datetime(ended) - _as_datetime(started)).total_seconds() for started, ended in rows])
+
+
+def _as_datetime(value):
+    # SQLite returns window/aggregate results over DateTime columns as strings
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+status_log = StatusLog()
+status_log.track(ProductionOrder, production='id')
+status_log.track(PurchaseOrder, production='production_order_id')
+status_log.track(AssemblyOrder, production='production_order_id')
+status_log.track(ShowroomProduct, 'showroom_status', production='production_order_id')
+status_log.track(SalesOrder, 'order_status', sales='id', product='showroom_product_id')
+status_log.track(SalesOrder, 'payment_status', entity='sales_payment', sales='id', product='showroom_product_id')
+status_log.track(DispatchRequest, sales='sales_order_id', product='showroom_product_id')
+status_log.track(TransportJob, dispatch='dispatch_request_id')
+status_log.track(GatePass, dispatch='dispatch_request_id')
@@ -12,6 +12,7 @@ import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@
 import { Dialog, DialogContent, DialogDescription, DialogFooter, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { useToast } from '@/components/ui/use-toast';
 import { useAuth } from '@/hooks/useAuth';
+import { useStatusEvents } from '@/hooks/useStatusEvents';
 import { 
     Package, 
     Truck, 
@@ -70,14 +71,13 @@ const DispatchDepartment = () => {
 
     useEffect(() => {
         fetchData();
-        
-        // Set up polling for notifications
-        const interval = setInterval(() => {
-            fetchNotifications();
-        }, 30000); // Poll every 30 seconds
-        
-        return () => clearInterval(interval);
     }, []);
+
+    // Refresh notifications and counts when dispatch, gate pass or transport statuses change
+    useStatusEvents(['dispatch'], () => {
+        fetchNotifications();
+        fetchSummary();
+    });
     
     // Update notification counts when dispatchSummary changes
     useEffect(() => {
@@ -168,6 +168,17 @@ const DispatchDepartment = () => {
         }
     };
 
+    const fetchSummary = async () => {
+        try {
+            const res = await fetch(`${API_BASE}/dispatch/summary`);
+            if (res.ok) {
+                setDispatchSummary(await res.json());
+            }
+        } catch (error) {
+            console.error('Error fetching dispatch summary:', error);
+        }
+    };
+
     const handleProcessOrder = async (orderId, deliveryType) => {
         try {
             const processData = {
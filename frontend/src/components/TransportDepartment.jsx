@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '@/hooks/useAuth';
+import { useStatusEvents } from '@/hooks/useStatusEvents';
 import {
   Card,
   CardContent,
@@ -160,27 +161,24 @@ const TransportDepartment = () => {
     fetchPendingApprovals(); // NEW: Fetch pending approvals
   }, []);
 
-  // Optional: Auto-refresh data every 30 seconds to keep fleet status updated
-  useEffect(() => {
-    const interval = setInterval(async () => {
-      try {
-        // Silently refresh data in background (no error toasts)
-        await Promise.all([
-          fetchVehicles(),
-          fetchDashboardData(true),
-          fetchDeliveries(true),
-          fetchActiveTransportOrders(true),
-          fetchCompletedTransportOrders(true),
-          fetchPartLoadOrders(true),
-          fetchCompletedPartLoads(true)
-        ]);
-      } catch (error) {
-        console.log('Background refresh failed:', error);
-      }
-    }, 30000); // 30 seconds
-
-    return () => clearInterval(interval);
-  }, []);
+  // Refresh in the background when transport jobs or approvals change status
+  useStatusEvents(['transport'], async () => {
+    try {
+      // Silently refresh data in background (no error toasts)
+      await Promise.all([
+        fetchVehicles(),
+        fetchDashboardData(true),
+        fetchDeliveries(true),
+        fetchActiveTransportOrders(true),
+        fetchCompletedTransportOrders(true),
+        fetchPartLoadOrders(true),
+        fetchCompletedPartLoads(true),
+        fetchPendingApprovals(true)
+      ]);
+    } catch (error) {
+      console.log('Background refresh failed:', error);
+    }
+  });
 
   // Reset approval form when dialog closes or action changes
   useEffect(() => {
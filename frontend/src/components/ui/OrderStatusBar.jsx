@@ -22,6 +22,7 @@ import {
   AlertCircle
 } from 'lucide-react';
 import { API_BASE } from '@/lib/api';
+import { useStatusEvents } from '@/hooks/useStatusEvents';
 
 // Department icons mapping
 const DEPARTMENT_ICONS = {
@@ -66,11 +67,11 @@ const OrderStatusBar = ({ className = "" }) => {
     }
 
     fetchOrderStatus();
-
-    const interval = setInterval(fetchOrderStatus, 30000);
-    return () => clearInterval(interval);
   }, [searchTerm]);
 
+  // Refetch the searched orders only when an order status actually changes
+  useStatusEvents(['orders'], () => fetchOrderStatus(), { enabled: Boolean(searchTerm.trim()) });
+
   const fetchOrderStatus = async () => {
     if (!searchTerm.trim()) {
       // Do not fetch when there is no search term
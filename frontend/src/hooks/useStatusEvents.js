@@ -0,0 +1,71 @@
+import { useEffect, useRef } from 'react';
+import { API_BASE } from '@/lib/api';
+
+// Subscribe to committed status changes for the given department topics
+// (e.g. ['dispatch', 'transport']). `onEvent` is called with the event, batched
+// so a burst of changes triggers one refresh. EventSource reconnects on its own
+// and resumes from the last event id; if the stream is unavailable the hook
+// falls back to polling every `fallbackInterval` ms with `onEvent(null)`.
+// Status events are off by default on the server, and a stream served by one
+// worker misses commits made on another, so `onEvent(null)` is also called
+// every `safetyInterval` ms while the stream is open.
+export const useStatusEvents = (
+  topics,
+  onEvent,
+  { enabled = true, debounce = 500, fallbackInterval = 30000, safetyInterval = 120000 } = {}
+) => {
+  const handlerRef = useRef(onEvent);
+  handlerRef.current = onEvent;
+  const topicKey = (topics || []).join(',');
+
+  useEffect(() => {
+    if (!enabled) return undefined;
+
+    let timer = null;
+    let pollTimer = null;
+    let lastEvent = null;
+    const flush = () => {
+      timer = null;
+      handlerRef.current?.(lastEvent);
+    };
+    const schedule = (event) => {
+      lastEvent = event;
+      if (!timer) timer = setTimeout(flush, debounce);
+    };
+    const startPolling = (interval = fallbackInterval) => {
+      clearInterval(pollTimer);
+      pollTimer = setInterval(() => handlerRef.current?.(null), interval);
+    };
+
+    if (typeof window === 'undefined' || !window.EventSource) {
+      startPolling();
+      return () => clearInterval(pollTimer);
+    }
+
+    const query = topicKey ? `?topics=${encodeURIComponent(topicKey)}` : '';
+    const source = new EventSource(`${API_BASE}/events/stream${query}`);
+    startPolling(safetyInterval);
+    const handle = (message) => {
+      try {
+        schedule(JSON.parse(message.data));
+      } catch (error) {
+        console.error('Invalid status event:', error);
+      }
+    };
+    source.addEventListener('status', handle);
+    // History expired while disconnected: refresh everything once
+    source.addEventListener('resync', handle);
+    source.onerror = () => {
+      // CLOSED means the server refused the stream (e.g. events disabled); transient errors reconnect
+      if (source.readyState === EventSource.CLOSED) startPolling();
+    };
+
+    return () => {
+      source.close();
+      clearTimeout(timer);
+      clearInterval(pollTimer);
+    };
+  }, [topicKey, enabled, debounce, fallbackInterval, safetyInterval]);
+};
+
+export default useStatusEvents;
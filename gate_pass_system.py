@@ -1,4 +1,5 @@
-import sys, os, time, pickle
+import sys, os, time, pickle, json, math
+from collections import deque
 from datetime import datetime, date
 import cv2
 import numpy as np
@@ -144,97 +145,404 @@ def setup_excel_file():
             wb.save(EXCEL_FILE)
         wb.close()
 
+# ---------------------------
+# Presence State
+# ---------------------------
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def parse_log_time(value):
+    """Parse a timestamp cell (datetime or 'YYYY-MM-DD HH:MM:SS' string), None if missing/invalid"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(str(value), TIME_FORMAT)
+    except (ValueError, TypeError):
+        return None
+
+class PresenceTracker:
+    """In-memory per-person gate and going-out state.
+
+    Built with one read-only pass over the workbook at startup and updated on
+    every logged event, so the entry/exit/blocked decision for a recognized face
+    is a dictionary lookup instead of a full sheet scan. It also remembers the
+    sheet row of each person's open records, so log writes never search a sheet.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        # name -> {'today': [[row, entry_dt, exit_dt, has_exit]], 'last_row': int, 'last_row_open': bool}
+        self._gate = {}
+        # name -> [[row, going_out_dt, has_going_out_time, reason]] for rows without a return time
+        self._going_out = {}
+        self.next_gate_row = 2
+        self.next_going_out_row = 2
+
+    def ensure_loaded(self):
+        """Build the state on first use"""
+        if not self._loaded:
+            self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the state from the workbook"""
+        setup_excel_file()
+        today = date.today()
+        gate, going_out = {}, {}
+        next_gate_row = next_going_out_row = 2
+
+        wb = load_workbook(EXCEL_FILE, read_only=True)
+        try:
+            ws = wb[GATE_SHEET] if GATE_SHEET in wb.sheetnames else wb.active
+            for row_num, row in enumerate(ws.iter_rows(min_row=2, max_col=4, values_only=True), start=2):
+                next_gate_row = row_num + 1
+                name, _, entry_value, exit_value = (tuple(row) + (None,) * 4)[:4]
+                if not name:
+                    continue
+                state = gate.setdefault(name, {'today': [], 'last_row': row_num, 'last_row_open': False})
+                state['last_row'] = row_num
+                state['last_row_open'] = exit_value is None
+                entry_dt = parse_log_time(entry_value)
+                if entry_dt and entry_dt.date() == today:
+                    state['today'].append([row_num, entry_dt, parse_log_time(exit_value), exit_value is not None])
+
+            ws_going_out = wb[GOING_OUT_SHEET]
+            for row_num, row in enumerate(ws_going_out.iter_rows(min_row=2, max_col=5, values_only=True), start=2):
+                next_going_out_row = row_num + 1
+                name, _, out_value, back_value, reason = (tuple(row) + (None,) * 5)[:5]
+                if not name or back_value is not None:
+                    continue
+                going_out.setdefault(name, []).append(
+                    [row_num, parse_log_time(out_value), bool(out_value), reason]
+                )
+        finally:
+            wb.close()
+
+        with self._lock:
+            self._gate = gate
+            self._going_out = going_out
+            self.next_gate_row = next_gate_row
+            self.next_going_out_row = next_going_out_row
+            self._loaded = True
+
+    def gate_status(self, name: str) -> tuple:
+        """Return (status, has_exited_today, last_action_time) for a person"""
+        today = date.today()
+        with self._lock:
+            state = self._gate.get(name)
+            if not state:
+                return "OUTSIDE", False, None
+
+            has_exited_today = False
+            currently_inside = False
+            last_action_time = None
+            for _, entry_dt, exit_dt, has_exit in state['today']:
+                if entry_dt.date() != today:
+                    continue
+                last_action_time = max(entry_dt, exit_dt) if exit_dt else entry_dt
+                if has_exit:
+                    has_exited_today = True
+                else:
+                    currently_inside = True
+
+            if currently_inside:
+                return "INSIDE", has_exited_today, last_action_time
+            elif has_exited_today:
+                return "EXITED_TODAY", has_exited_today, last_action_time
+            elif state['last_row_open']:
+                return "INSIDE", has_exited_today, last_action_time
+            else:
+                return "OUTSIDE", has_exited_today, last_action_time
+
+    def today_gate_row(self, name: str):
+        """Return (row, has_exit) of the person's first gate row today, or None"""
+        today = date.today()
+        with self._lock:
+            state = self._gate.get(name)
+            if not state:
+                return None
+            for row_num, entry_dt, _, has_exit in state['today']:
+                if entry_dt.date() == today:
+                    return row_num, has_exit
+            return None
+
+    def allocate_gate_row(self) -> int:
+        """Reserve the next free Gate_Entries row for an appended record"""
+        with self._lock:
+            row_num = self.next_gate_row
+            self.next_gate_row += 1
+            return row_num
+
+    def allocate_going_out_row(self) -> int:
+        """Reserve the next free Going_Out_Logs row for an appended record"""
+        with self._lock:
+            row_num = self.next_going_out_row
+            self.next_going_out_row += 1
+            return row_num
+
+    def record_entry(self, name: str, row_num: int, when: datetime, appended: bool):
+        """Record an entry written to a new row or to the person's row for today"""
+        with self._lock:
+            state = self._gate.setdefault(name, {'today': [], 'last_row': row_num, 'last_row_open': False})
+            today = when.date()
+            state['today'] = [r for r in state['today'] if r[1].date() == today]
+            if appended:
+                state['today'].append([row_num, when, None, False])
+                state['last_row'] = row_num
+                state['last_row_open'] = True
+                self.next_gate_row = max(self.next_gate_row, row_num + 1)
+            else:
+                for row in state['today']:
+                    if row[0] == row_num:
+                        row[1] = when
+
+    def record_exit(self, name: str, row_num: int, when: datetime, appended: bool):
+        """Record an exit written to the person's row for today or to a new exit-only row"""
+        with self._lock:
+            state = self._gate.setdefault(name, {'today': [], 'last_row': row_num, 'last_row_open': False})
+            if appended:
+                # Exit-only rows have no entry time, so they never count as today's rows
+                state['last_row'] = row_num
+                state['last_row_open'] = False
+                self.next_gate_row = max(self.next_gate_row, row_num + 1)
+            else:
+                for row in state['today']:
+                    if row[0] == row_num:
+                        row[2] = when
+                        row[3] = True
+                if state['last_row'] == row_num:
+                    state['last_row_open'] = False
+
+    def going_out_status(self, name: str) -> tuple:
+        """Return ("OUT", reason, going_out_time) or ("IN_OFFICE", None, None)"""
+        today = date.today()
+        with self._lock:
+            for _, going_out_dt, _, reason in self._going_out.get(name, []):
+                if going_out_dt and going_out_dt.date() == today:
+                    return "OUT", reason or "Unknown", going_out_dt
+            return "IN_OFFICE", None, None
+
+    def last_open_going_out_row(self, name: str):
+        """Return (row, going_out_dt, has_going_out_time) of the person's latest open going-out row, or None"""
+        with self._lock:
+            open_rows = self._going_out.get(name)
+            if not open_rows:
+                return None
+            row_num, going_out_dt, has_time, _ = open_rows[-1]
+            return row_num, going_out_dt, has_time
+
+    def record_going_out(self, name: str, row_num: int, when: datetime, reason: str):
+        """Record a new open going-out row"""
+        with self._lock:
+            self._going_out.setdefault(name, []).append([row_num, when, True, reason])
+            self.next_going_out_row = max(self.next_going_out_row, row_num + 1)
+
+    def record_coming_back(self, name: str, row_num: int, appended: bool = False):
+        """Record a return, closing the given row (or counting an appended closed row)"""
+        with self._lock:
+            if appended:
+                self.next_going_out_row = max(self.next_going_out_row, row_num + 1)
+                return
+            open_rows = [r for r in self._going_out.get(name, []) if r[0] != row_num]
+            if open_rows:
+                self._going_out[name] = open_rows
+            else:
+                self._going_out.pop(name, None)
+
+presence = PresenceTracker()
+
+# ---------------------------
+# Background Excel Writer
+# ---------------------------
+JOURNAL_FILE = EXCEL_FILE + ".journal"
+WRITER_FLUSH_INTERVAL = 2.0
+WRITER_MAX_BATCH = 200
+
+class ExcelLogWriter:
+    """Background writer that batches log writes to the workbook.
+
+    Every write is a set of absolute cell values for one sheet row. submit()
+    appends it to a write-ahead journal (fsync'd) and queues it, so the caller
+    never waits on the workbook. The writer thread coalesces queued writes per
+    row and applies them with a single load/save every WRITER_FLUSH_INTERVAL
+    seconds, when WRITER_MAX_BATCH writes are pending, on flush() or on stop().
+    Flushed entries are trimmed from the journal; anything left in it after a
+    crash is replayed by start(). Replay is idempotent because writes are
+    absolute cell values.
+    """
+
+    def __init__(self, excel_file=EXCEL_FILE, journal_file=JOURNAL_FILE,
+                 flush_interval=WRITER_FLUSH_INTERVAL, max_batch=WRITER_MAX_BATCH):
+        self.excel_file = excel_file
+        self.journal_file = journal_file
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._journal_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._seq = 0
+        self._thread = None
+
+    def start(self):
+        """Create the workbook if needed, replay any journal left by a previous run, then start the writer thread"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            setup_excel_file()
+            pending = self._read_journal()
+            if pending:
+                self._seq = max(op['seq'] for op in pending)
+                self._apply(self._coalesce(pending))
+                self._trim_journal(self._seq)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def submit(self, sheet: str, row: int, cells: dict):
+        """Journal and queue a write of {column_number: value} to one sheet row"""
+        if not (self._thread and self._thread.is_alive()):
+            self.start()
+        with self._journal_lock:
+            self._seq += 1
+            op = {'seq': self._seq, 'sheet': sheet, 'row': row, 'cells': cells}
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(op) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        self._queue.put(op)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Write everything queued so far and wait for it (e.g. before reading the workbook)"""
+        if not (self._thread and self._thread.is_alive()):
+            return True
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 10.0):
+        """Flush pending writes and stop the writer thread"""
+        if self._thread and self._thread.is_alive():
+            done = threading.Event()
+            self._queue.put(('stop', done))
+            done.wait(timeout)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            control = item if isinstance(item, tuple) else None
+            if isinstance(item, dict):
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.time() + self.flush_interval
+
+            due = control is not None or len(pending) >= self.max_batch or (
+                deadline is not None and time.time() >= deadline
+            )
+            if due and pending:
+                try:
+                    self._apply(self._coalesce(pending))
+                    self._trim_journal(pending[-1]['seq'])
+                    pending = []
+                    deadline = None
+                except Exception as e:
+                    # Workbook busy (e.g. open in Excel) - keep the batch and retry later
+                    print(f"Excel writer error: {e}")
+                    deadline = time.time() + self.flush_interval
+
+            if control is not None:
+                control[1].set()
+                if control[0] == 'stop':
+                    return
+
+    @staticmethod
+    def _coalesce(ops: list) -> dict:
+        """Merge writes per (sheet, row), later values winning"""
+        batch = {}
+        for op in ops:
+            batch.setdefault((op['sheet'], op['row']), {}).update(
+                {int(col): value for col, value in op['cells'].items()}
+            )
+        return batch
+
+    def _apply(self, batch: dict):
+        """Apply a coalesced batch with one load/save, replacing the file atomically"""
+        if not os.path.exists(self.excel_file):
+            # Removed while the writer was running (start() created it)
+            setup_excel_file()
+        wb = load_workbook(self.excel_file)
+        try:
+            for (sheet, row), cells in batch.items():
+                ws = wb[sheet] if sheet in wb.sheetnames else wb.active
+                for col, value in cells.items():
+                    ws.cell(row=row, column=col, value=value)
+            tmp_file = self.excel_file + ".tmp"
+            wb.save(tmp_file)
+        finally:
+            wb.close()
+        os.replace(tmp_file, self.excel_file)
+
+    def _read_journal(self) -> list:
+        if not os.path.exists(self.journal_file):
+            return []
+        ops = []
+        with open(self.journal_file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    # Torn final line from a crash mid-write
+                    continue
+        return ops
+
+    def _trim_journal(self, flushed_seq: int):
+        """Drop journal entries up to flushed_seq, keeping later ones"""
+        with self._journal_lock:
+            remaining = [op for op in self._read_journal() if op['seq'] > flushed_seq]
+            if not remaining:
+                open(self.journal_file, "w").close()
+                return
+            tmp_file = self.journal_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                for op in remaining:
+                    f.write(json.dumps(op) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.journal_file)
+
+log_writer = ExcelLogWriter()
+
 # ---------------------------
 # Excel Logging Functions
 # ---------------------------
+def whatsapp_formula(row_num: int, exit_only: bool = False) -> str:
+    """Build the Send WhatsApp hyperlink formula for a gate log row"""
+    if exit_only:
+        return f'=HYPERLINK("https://web.whatsapp.com/send?phone=" & B{row_num} & "&text=" & ENCODEURL("Hi " & A{row_num} & ", your Exit time is " & TEXT(D{row_num},"yyyy-mm-dd hh:mm:ss") & " (Status: " & E{row_num} & ")"), "Send WhatsApp")'
+    return f'=HYPERLINK("https://web.whatsapp.com/send?phone=" & B{row_num} & "&text=" & ENCODEURL("Hi " & A{row_num} & ", your Entry time is " & TEXT(C{row_num},"yyyy-mm-dd hh:mm:ss") & IF(D{row_num}<>"", " and Exit time is " & TEXT(D{row_num},"yyyy-mm-dd hh:mm:ss"), "") & " (Status: " & E{row_num} & ")"), "Send WhatsApp")'
+
 def get_user_status_and_history(name: str) -> tuple:
     """Check user status and return (status, has_exited_today, last_action_time)"""
-    setup_excel_file()
-    
-    wb = load_workbook(EXCEL_FILE)
-    ws = wb[GATE_SHEET] if GATE_SHEET in wb.sheetnames else wb.active
-    
-    today = date.today().strftime("%Y-%m-%d")
-    
-    today_entries = []
-    last_entry = None
-    last_action_time = None
-    
-    for row in ws.iter_rows(min_row=2):
-        if row[0].value == name:
-            last_entry = row
-            
-            if row[2].value:  # Entry_Time is now column 2 (index 2)
-                try:
-                    entry_date = datetime.strptime(str(row[2].value), "%Y-%m-%d %H:%M:%S").date()
-                    if entry_date.strftime("%Y-%m-%d") == today:
-                        today_entries.append(row)
-                        # Get the most recent action time (entry or exit)
-                        entry_time = datetime.strptime(str(row[2].value), "%Y-%m-%d %H:%M:%S")
-                        if row[3].value:  # Exit_Time is now column 3 (index 3)
-                            exit_time = datetime.strptime(str(row[3].value), "%Y-%m-%d %H:%M:%S")
-                            last_action_time = max(entry_time, exit_time)
-                        else:
-                            last_action_time = entry_time
-                except (ValueError, TypeError):
-                    continue
-    
-    has_exited_today = False
-    currently_inside = False
-    
-    for entry in today_entries:
-        if entry[3].value is not None:  # Exit_Time is now column 3
-            has_exited_today = True
-        else:
-            currently_inside = True
-    
-    wb.close()
-    
-    if currently_inside:
-        return "INSIDE", has_exited_today, last_action_time
-    elif has_exited_today:
-        return "EXITED_TODAY", has_exited_today, last_action_time
-    elif last_entry and last_entry[3].value is None:  # Exit_Time is now column 3
-        return "INSIDE", has_exited_today, last_action_time
-    else:
-        return "OUTSIDE", has_exited_today, last_action_time
+    presence.ensure_loaded()
+    return presence.gate_status(name)
 
 def get_going_out_status(name: str) -> tuple:
     """Check if user is currently out for work/personal reasons"""
-    setup_excel_file()
-    
-    wb = load_workbook(EXCEL_FILE)
-    ws_going_out = wb[GOING_OUT_SHEET]
-    
-    today = date.today().strftime("%Y-%m-%d")
-    
-    # Check for open going out entries today
-    for row in ws_going_out.iter_rows(min_row=2):
-        if row[0].value == name and row[2].value:  # Going_Out_Time is now column 2
-            try:
-                going_out_date = datetime.strptime(str(row[2].value), "%Y-%m-%d %H:%M:%S").date()
-                if going_out_date.strftime("%Y-%m-%d") == today and not row[3].value:  # Coming_Back_Time is now column 3
-                    # User is currently out
-                    reason_type = row[4].value or "Unknown"  # Reason_Type is now column 4
-                    going_out_time = datetime.strptime(str(row[2].value), "%Y-%m-%d %H:%M:%S")
-                    wb.close()
-                    return "OUT", reason_type, going_out_time
-            except (ValueError, TypeError):
-                continue
-    
-    wb.close()
-    return "IN_OFFICE", None, None
+    presence.ensure_loaded()
+    return presence.going_out_status(name)
 
 def log_event_excel(name: str, override_cooling=False):
     """Log gate entry/exit events"""
-    setup_excel_file()
     now = datetime.now()
-    now_str = now.strftime("%Y-%m-%d %H:%M:%S")
-    
-    wb = load_workbook(EXCEL_FILE)
-    ws = wb[GATE_SHEET] if GATE_SHEET in wb.sheetnames else wb.active
-    
-    # Remove old override column handling - no longer needed
+    now_str = now.strftime(TIME_FORMAT)
     
     user_status, has_exited_today, last_action_time = get_user_status_and_history(name)
     
@@ -249,89 +557,52 @@ def log_event_excel(name: str, override_cooling=False):
             seconds = remaining_time % 60
             status = f"COOLING_{minutes}m{seconds}s"
             play_sound("blocked")
-            wb.close()
             return status
     
-    phone = get_user_phone(name)
-    today = now.strftime("%Y-%m-%d")
+    if user_status == "EXITED_TODAY":
+        play_sound("blocked")
+        return "BLOCKED"
     
-    # Find existing entry for today
-    existing_row = None
-    for row in ws.iter_rows(min_row=2, values_only=False):
-        if row[0].value == name and row[2].value:
-            # Handle both datetime objects and string formats
-            entry_date = row[2].value
-            if isinstance(entry_date, str):
-                try:
-                    entry_date = datetime.strptime(entry_date, "%Y-%m-%d %H:%M:%S")
-                except ValueError:
-                    continue
-            
-            if entry_date.strftime("%Y-%m-%d") == today:
-                existing_row = row
-                break
+    phone = get_user_phone(name)
+    # Person's first row for today, if any (row number, has exit time)
+    existing_row = presence.today_gate_row(name)
     
     if user_status == "OUTSIDE":
         # User is entering
-        if existing_row and existing_row[3].value:
-            # Already has exit time today, create new entry
-            whatsapp_formula = '=HYPERLINK("https://web.whatsapp.com/send?phone=" & B' + str(ws.max_row + 1) + ' & "&text=" & ENCODEURL("Hi " & A' + str(ws.max_row + 1) + ' & ", your Entry time is " & TEXT(C' + str(ws.max_row + 1) + ',"yyyy-mm-dd hh:mm:ss") & IF(D' + str(ws.max_row + 1) + '<>"", " and Exit time is " & TEXT(D' + str(ws.max_row + 1) + ',"yyyy-mm-dd hh:mm:ss"), "") & " (Status: " & E' + str(ws.max_row + 1) + ')"), "Send WhatsApp")'
-            ws.append([name, phone, now_str, None, "Inside", whatsapp_formula])
-        elif existing_row:
+        if existing_row and not existing_row[1]:
             # Update existing row's entry time
-            existing_row[2].value = now_str
-            existing_row[4].value = "Inside"
-            row_num = existing_row[0].row
-            whatsapp_formula = f'=HYPERLINK("https://web.whatsapp.com/send?phone=" & B{row_num} & "&text=" & ENCODEURL("Hi " & A{row_num} & ", your Entry time is " & TEXT(C{row_num},"yyyy-mm-dd hh:mm:ss") & IF(D{row_num}<>"", " and Exit time is " & TEXT(D{row_num},"yyyy-mm-dd hh:mm:ss"), "") & " (Status: " & E{row_num} & ")"), "Send WhatsApp")'
-            # Handle backward compatibility - add WhatsApp column if it doesn't exist
-            if len(existing_row) > 5:
-                existing_row[5].value = whatsapp_formula
-            else:
-                # Extend row to include WhatsApp column
-                ws.cell(row=existing_row[0].row, column=6, value=whatsapp_formula)
+            row_num, appended = existing_row[0], False
+            log_writer.submit(GATE_SHEET, row_num, {3: now_str, 5: "Inside", 6: whatsapp_formula(row_num)})
         else:
-            # Create new entry
-            whatsapp_formula = '=HYPERLINK("https://web.whatsapp.com/send?phone=" & B' + str(ws.max_row + 1) + ' & "&text=" & ENCODEURL("Hi " & A' + str(ws.max_row + 1) + ' & ", your Entry time is " & TEXT(C' + str(ws.max_row + 1) + ',"yyyy-mm-dd hh:mm:ss") & IF(D' + str(ws.max_row + 1) + '<>"", " and Exit time is " & TEXT(D' + str(ws.max_row + 1) + ',"yyyy-mm-dd hh:mm:ss"), "") & " (Status: " & E' + str(ws.max_row + 1) + ')"), "Send WhatsApp")'
-            ws.append([name, phone, now_str, None, "Inside", whatsapp_formula])
+            # Create new entry (also when today's row already has an exit time)
+            row_num, appended = presence.allocate_gate_row(), True
+            log_writer.submit(GATE_SHEET, row_num, {
+                1: name, 2: phone, 3: now_str, 4: None, 5: "Inside", 6: whatsapp_formula(row_num)
+            })
+        presence.record_entry(name, row_num, now, appended)
         status = "ENTRY_OVERRIDE" if override_cooling else "ENTRY"
         play_sound("entry")
-    elif user_status == "EXITED_TODAY":
-        status = "BLOCKED"
-        play_sound("blocked")
-        wb.close()
-        return status
     else:
         # User is exiting - update existing entry with exit time
         if existing_row:
-            existing_row[3].value = now_str
-            existing_row[4].value = "Exited"
-            row_num = existing_row[0].row
-            whatsapp_formula = f'=HYPERLINK("https://web.whatsapp.com/send?phone=" & B{row_num} & "&text=" & ENCODEURL("Hi " & A{row_num} & ", your Entry time is " & TEXT(C{row_num},"yyyy-mm-dd hh:mm:ss") & IF(D{row_num}<>"", " and Exit time is " & TEXT(D{row_num},"yyyy-mm-dd hh:mm:ss"), "") & " (Status: " & E{row_num} & ")"), "Send WhatsApp")'
-            # Handle backward compatibility - add WhatsApp column if it doesn't exist
-            if len(existing_row) > 5:
-                existing_row[5].value = whatsapp_formula
-            else:
-                # Extend row to include WhatsApp column
-                ws.cell(row=existing_row[0].row, column=6, value=whatsapp_formula)
+            row_num, appended = existing_row[0], False
+            log_writer.submit(GATE_SHEET, row_num, {4: now_str, 5: "Exited", 6: whatsapp_formula(row_num)})
         else:
             # No entry found, create one with exit time only
-            whatsapp_formula = '=HYPERLINK("https://web.whatsapp.com/send?phone=" & B' + str(ws.max_row + 1) + ' & "&text=" & ENCODEURL("Hi " & A' + str(ws.max_row + 1) + ' & ", your Exit time is " & TEXT(D' + str(ws.max_row + 1) + ',"yyyy-mm-dd hh:mm:ss") & " (Status: " & E' + str(ws.max_row + 1) + ')"), "Send WhatsApp")'
-            ws.append([name, phone, None, now_str, "Exited", whatsapp_formula])
+            row_num, appended = presence.allocate_gate_row(), True
+            log_writer.submit(GATE_SHEET, row_num, {
+                1: name, 2: phone, 3: None, 4: now_str, 5: "Exited", 6: whatsapp_formula(row_num, exit_only=True)
+            })
+        presence.record_exit(name, row_num, now, appended)
         status = "EXIT_OVERRIDE" if override_cooling else "EXIT"
         play_sound("exit")
     
-    wb.save(EXCEL_FILE)
-    wb.close()
     return status
 
 def log_going_out_event(name: str, reason_type: str, reason_details: str = ""):
     """Log going out for work/personal reasons"""
-    setup_excel_file()
     now = datetime.now()
-    now_str = now.strftime("%Y-%m-%d %H:%M:%S")
-    
-    wb = load_workbook(EXCEL_FILE)
-    ws_going_out = wb[GOING_OUT_SHEET]
+    now_str = now.strftime(TIME_FORMAT)
     
     # Check current going out status
     going_out_status, current_reason, going_out_time = get_going_out_status(name)
@@ -339,42 +610,39 @@ def log_going_out_event(name: str, reason_type: str, reason_details: str = ""):
     if going_out_status == "IN_OFFICE":
         # User is going out
         phone = get_user_phone(name)
-        ws_going_out.append([name, phone, now_str, None, reason_type, reason_details, "Out", None])
+        row_num = presence.allocate_going_out_row()
+        log_writer.submit(GOING_OUT_SHEET, row_num, {
+            1: name, 2: phone, 3: now_str, 4: None, 5: reason_type, 6: reason_details, 7: "Out", 8: None
+        })
+        presence.record_going_out(name, row_num, now, reason_type)
         status = "GOING_OUT"
         play_sound("going_out")
     else:
-        # User is coming back
-        # Find the open going out entry
-        found_open = None
-        for row in reversed(list(ws_going_out.iter_rows(min_row=2))):
-            if row[0].value == name and row[3].value is None:  # Coming_Back_Time is now column 3
-                found_open = row
-                break
+        # User is coming back - close the latest open going out entry
+        found_open = presence.last_open_going_out_row(name)
         
         if found_open:
-            found_open[3].value = now_str  # Coming back time (column 3)
-            found_open[6].value = "Returned"  # Status (column 6)
+            row_num, going_out_dt, has_going_out_time = found_open
+            cells = {4: now_str, 7: "Returned"}  # Coming back time, status
             
             # Calculate duration in minutes
-            if found_open[2].value:  # Going_Out_Time is column 2
-                try:
-                    going_out_dt = datetime.strptime(str(found_open[2].value), "%Y-%m-%d %H:%M:%S")
-                    duration = (now - going_out_dt).total_seconds() / 60
-                    found_open[7].value = round(duration, 1)  # Duration_Minutes is column 7
-                except:
-                    found_open[7].value = 0
-            
-            status = "COMING_BACK"
-            play_sound("coming_back")
+            if going_out_dt:
+                cells[8] = round((now - going_out_dt).total_seconds() / 60, 1)
+            elif has_going_out_time:
+                cells[8] = 0
+            log_writer.submit(GOING_OUT_SHEET, row_num, cells)
+            presence.record_coming_back(name, row_num)
         else:
             # Shouldn't happen, but handle it
             phone = get_user_phone(name)
-            ws_going_out.append([name, phone, None, now_str, reason_type, reason_details, "Returned", None])
-            status = "COMING_BACK"
-            play_sound("coming_back")
+            row_num = presence.allocate_going_out_row()
+            log_writer.submit(GOING_OUT_SHEET, row_num, {
+                1: name, 2: phone, 3: None, 4: now_str, 5: reason_type, 6: reason_details, 7: "Returned", 8: None
+            })
+            presence.record_coming_back(name, row_num, appended=True)
+        status = "COMING_BACK"
+        play_sound("coming_back")
     
-    wb.save(EXCEL_FILE)
-    wb.close()
     return status
 
 # ---------------------------
@@ -439,6 +707,375 @@ def get_user_phone(name: str) -> str:
     phones = load_user_phones()
     return phones.get(name, "")
 
+# ---------------------------
+# Face Matching Index
+# ---------------------------
+class FaceMatcher:
+    """Batched nearest-neighbour matcher over the registered face encodings.
+
+    Encodings live in one contiguous float32 (N, 128) matrix with their squared
+    norms precomputed, so every face in a frame is matched against every known
+    face with a single matrix product:
+
+        ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b
+
+    add() and remove() build new arrays and swap them in under a lock, so the
+    camera thread always matches against a consistent snapshot and users can be
+    registered or deleted while scanning is running.
+    """
+
+    def __init__(self, known_faces: dict = None, tolerance: float = MATCH_TOLERANCE):
+        self.tolerance = tolerance
+        self._lock = threading.Lock()
+        self._names = []
+        self._encodings = np.empty((0, 128), dtype=np.float32)
+        self._sq_norms = np.empty((0,), dtype=np.float32)
+        if known_faces:
+            self.load(known_faces)
+
+    def __len__(self):
+        return len(self._names)
+
+    def load(self, known_faces: dict) -> None:
+        """Replace the index with the given {name: encoding} mapping"""
+        names = list(known_faces.keys())
+        if names:
+            encodings = np.ascontiguousarray(
+                np.stack([np.asarray(known_faces[n], dtype=np.float32) for n in names])
+            )
+        else:
+            encodings = np.empty((0, 128), dtype=np.float32)
+        self._swap(names, encodings)
+
+    def add(self, name: str, encoding) -> None:
+        """Add or replace a single user's encoding"""
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(1, 128)
+        with self._lock:
+            names = list(self._names)
+            encodings = self._encodings
+        if name in names:
+            encodings = encodings.copy()
+            encodings[names.index(name)] = encoding[0]
+        else:
+            names.append(name)
+            encodings = np.concatenate([encodings, encoding])
+        self._swap(names, np.ascontiguousarray(encodings))
+
+    def remove(self, name: str) -> None:
+        """Remove a user from the index (no-op if unknown)"""
+        with self._lock:
+            names = list(self._names)
+            encodings = self._encodings
+        if name not in names:
+            return
+        index = names.index(name)
+        del names[index]
+        self._swap(names, np.ascontiguousarray(np.delete(encodings, index, axis=0)))
+
+    def _swap(self, names: list, encodings: np.ndarray) -> None:
+        sq_norms = np.einsum('ij,ij->i', encodings, encodings)
+        with self._lock:
+            self._names = names
+            self._encodings = encodings
+            self._sq_norms = sq_norms
+
+    def match(self, face_encodings) -> list:
+        """Match every face in a frame at once.
+
+        Returns one (name, distance) tuple per input encoding; name is None
+        when the nearest known face is farther than the tolerance.
+        """
+        if len(face_encodings) == 0:
+            return []
+        with self._lock:
+            names, encodings, sq_norms = self._names, self._encodings, self._sq_norms
+        if not names:
+            return [(None, None)] * len(face_encodings)
+
+        queries = np.asarray(face_encodings, dtype=np.float32).reshape(-1, 128)
+        query_sq_norms = np.einsum('ij,ij->i', queries, queries)
+        # (M, N) squared distances in one GEMM
+        sq_distances = query_sq_norms[:, None] + sq_norms[None, :] - 2.0 * (queries @ encodings.T)
+        best = np.argmin(sq_distances, axis=1)
+        best_distances = np.sqrt(np.maximum(sq_distances[np.arange(len(queries)), best], 0.0))
+
+        return [
+            (names[idx] if dist <= self.tolerance else None, float(dist))
+            for idx, dist in zip(best, best_distances)
+        ]
+
+# ---------------------------
+# Recognition Pipeline
+# ---------------------------
+DETECTION_SCALE = 0.25          # Detection/encoding run on a quarter-size frame
+DETECTION_BUDGET = 0.5          # Share of the camera frame period detection may use
+MAX_DETECT_INTERVAL = 15        # Detect at least every N processed frames
+TRACK_MIN_SCORE = 0.5           # Template match score below which a track is lost
+TRACK_CHANGE_IOU = 0.5          # Re-encode a track when its detected box moves more than this
+TRACK_MATCH_IOU = 0.3           # Minimum overlap to associate a detection with a track
+UNKNOWN_RETRY_SECONDS = 1.0     # Re-encode unrecognized faces at most this often
+REVERIFY_SECONDS = 5.0          # Re-encode recognized faces at least this often
+
+def box_iou(a, b) -> float:
+    """Overlap of two (top, right, bottom, left) boxes"""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    if bottom <= top or right <= left:
+        return 0.0
+    inter = (bottom - top) * (right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return inter / float(area_a + area_b - inter)
+
+class PipelineStats:
+    """FPS and per-stage latency counters for the camera pipeline.
+
+    Latencies are exponentially weighted averages in seconds; frame rates are
+    measured over a sliding window of recent timestamps.
+    """
+
+    def __init__(self, alpha: float = 0.1, window: int = 60):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._frames = {}
+        self._window = window
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            previous = self._latency.get(stage)
+            self._latency[stage] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def tick(self, counter: str, when: float = None) -> None:
+        with self._lock:
+            stamps = self._frames.setdefault(counter, deque(maxlen=self._window))
+            stamps.append(time.perf_counter() if when is None else when)
+
+    def average(self, stage: str) -> float:
+        with self._lock:
+            return self._latency.get(stage, 0.0)
+
+    def rate(self, counter: str) -> float:
+        """Frames per second for a counter (0 until two ticks are recorded)"""
+        with self._lock:
+            stamps = self._frames.get(counter)
+            if not stamps or len(stamps) < 2 or stamps[-1] <= stamps[0]:
+                return 0.0
+            return (len(stamps) - 1) / (stamps[-1] - stamps[0])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latency_ms = {stage: round(value * 1000, 1) for stage, value in self._latency.items()}
+        return {
+            'capture_fps': round(self.rate('capture'), 1),
+            'process_fps': round(self.rate('process'), 1),
+            'latency_ms': latency_ms,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency.clear()
+            self._frames.clear()
+
+class FaceTrack:
+    """A face followed across frames, with the identity from its last encoding"""
+
+    def __init__(self, track_id: int, box, template):
+        self.track_id = track_id
+        self.box = box
+        self.template = template
+        self.name = None
+        self.distance = None
+        self.encoded_box = None
+        self.encoded_at = 0.0
+        self.misses = 0
+
+    def needs_encoding(self, box, now: float) -> bool:
+        if self.encoded_box is None or box_iou(self.encoded_box, box) < TRACK_CHANGE_IOU:
+            return True
+        retry = UNKNOWN_RETRY_SECONDS if self.name is None else REVERIFY_SECONDS
+        return now - self.encoded_at >= retry
+
+class FaceTracker:
+    """Cheap face tracking between detections.
+
+    Between detection frames each track's box is moved to the best template
+    match of its last detected appearance within a window around the previous
+    box (normalized cross-correlation on the small grayscale frame). Detection
+    frames re-anchor the tracks by box overlap; only new tracks and tracks
+    whose box changed or whose identity is due for a re-check are encoded.
+    """
+
+    def __init__(self):
+        self.tracks = []
+        self._next_id = 1
+
+    def clear(self) -> None:
+        self.tracks = []
+
+    def follow(self, gray) -> bool:
+        """Move tracks to this frame; returns False if any track was lost"""
+        height, width = gray.shape[:2]
+        kept = []
+        for track in self.tracks:
+            top, right, bottom, left = track.box
+            box_h, box_w = bottom - top, right - left
+            pad_y, pad_x = max(box_h // 2, 4), max(box_w // 2, 4)
+            y0, y1 = max(top - pad_y, 0), min(bottom + pad_y, height)
+            x0, x1 = max(left - pad_x, 0), min(right + pad_x, width)
+            window = gray[y0:y1, x0:x1]
+            if track.template.size == 0 or window.shape[0] < box_h or window.shape[1] < box_w:
+                continue
+            scores = cv2.matchTemplate(window, track.template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (dx, dy) = cv2.minMaxLoc(scores)
+            if score < TRACK_MIN_SCORE:
+                continue
+            track.box = (y0 + dy, x0 + dx + box_w, y0 + dy + box_h, x0 + dx)
+            kept.append(track)
+        lost = len(kept) != len(self.tracks)
+        self.tracks = kept
+        return not lost
+
+    def update(self, boxes, gray, now: float) -> list:
+        """Re-anchor tracks on detected boxes; returns (track, box) pairs to encode"""
+        unmatched = list(self.tracks)
+        to_encode = []
+        updated = []
+        for box in boxes:
+            best, best_iou = None, TRACK_MATCH_IOU
+            for track in unmatched:
+                iou = box_iou(track.box, box)
+                if iou >= best_iou:
+                    best, best_iou = track, iou
+            top, right, bottom, left = box
+            template = gray[top:bottom, left:right].copy()
+            if best is None:
+                best = FaceTrack(self._next_id, box, template)
+                self._next_id += 1
+            else:
+                unmatched.remove(best)
+                best.box, best.template, best.misses = box, template, 0
+            if best.needs_encoding(box, now):
+                to_encode.append((best, box))
+            updated.append(best)
+
+        # Keep tracks the detector missed once, in case of a single missed detection
+        for track in unmatched:
+            track.misses += 1
+            if track.misses <= 1:
+                updated.append(track)
+        self.tracks = updated
+        return to_encode
+
+DISPLAY_SIZE = (640, 480)       # Main window video size, matches the registration window
+
+class LatestFrameSlot:
+    """Single-slot handoff that always holds the newest frame.
+
+    put() replaces any frame the consumer has not taken yet (counted in
+    `dropped`), so a slow consumer sees current frames instead of a growing
+    backlog, and memory stays at one frame.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self.dropped = 0
+
+    def put(self, frame) -> None:
+        with self._lock:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+
+    def take(self):
+        """Return the newest frame and empty the slot (None if no new frame)"""
+        with self._lock:
+            frame, self._frame = self._frame, None
+            return frame
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frame = None
+            self.dropped = 0
+
+class RecognitionPipeline:
+    """Detection, tracking and encoding stages for one camera stream.
+
+    Detection runs every `detect_interval` frames, chosen from the measured
+    detection cost so that it uses at most DETECTION_BUDGET of the camera's
+    frame period; the frames in between are only tracked. Encodings are
+    computed just for new tracks or tracks whose box changed, and all of a
+    frame's encodings are matched in one FaceMatcher call.
+    """
+
+    def __init__(self, matcher: FaceMatcher, stats: PipelineStats = None):
+        self.matcher = matcher
+        self.stats = stats or PipelineStats()
+        self.tracker = FaceTracker()
+        self.detect_interval = 1
+        self._since_detect = 0
+
+    def reset(self) -> None:
+        self.tracker.clear()
+        self.detect_interval = 1
+        self._since_detect = 0
+
+    def process(self, frame) -> list:
+        """Run one BGR camera frame through the pipeline.
+
+        Returns (name, distance) for every currently tracked face that has
+        been recognized.
+        """
+        started = time.perf_counter()
+        small_frame = cv2.resize(frame, (0, 0), fx=DETECTION_SCALE, fy=DETECTION_SCALE)
+        gray = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+
+        self._since_detect += 1
+        detect = self._since_detect >= self.detect_interval
+        if not detect and self.tracker.tracks:
+            t0 = time.perf_counter()
+            # A lost track means the scene changed - re-detect right away
+            detect = not self.tracker.follow(gray)
+            self.stats.record('track', time.perf_counter() - t0)
+        if detect:
+            self._detect(small_frame, gray)
+
+        self.stats.record('total', time.perf_counter() - started)
+        self.stats.tick('process')
+        return [(track.name, track.distance) for track in self.tracker.tracks if track.name]
+
+    def _detect(self, small_frame, gray) -> None:
+        self._since_detect = 0
+        rgb_small_frame = np.ascontiguousarray(small_frame[:, :, ::-1])
+
+        t0 = time.perf_counter()
+        face_locations = face_recognition.face_locations(rgb_small_frame)
+        t1 = time.perf_counter()
+        self.stats.record('detect', t1 - t0)
+
+        to_encode = self.tracker.update(face_locations, gray, time.time())
+        if to_encode:
+            encodings = face_recognition.face_encodings(rgb_small_frame, [box for _, box in to_encode])
+            t2 = time.perf_counter()
+            self.stats.record('encode', t2 - t1)
+            now = time.time()
+            for (track, box), (name, distance) in zip(to_encode, self.matcher.match(encodings)):
+                track.name, track.distance = name, distance
+                track.encoded_box, track.encoded_at = box, now
+            self.stats.record('match', time.perf_counter() - t2)
+        self._adapt_interval()
+
+    def _adapt_interval(self) -> None:
+        """Pick N so detection stays within its share of the camera frame period"""
+        capture_fps = self.stats.rate('capture')
+        if not capture_fps:
+            return
+        cost = self.stats.average('detect') + self.stats.average('encode')
+        frame_period = 1.0 / capture_fps
+        interval = int(math.ceil(cost / (frame_period * DETECTION_BUDGET)))
+        self.detect_interval = min(max(interval, 1), MAX_DETECT_INTERVAL)
+
 # ---------------------------
 # GUI Application Class
 # ---------------------------
@@ -456,8 +1093,15 @@ class GatePassGUI:
         self.is_scanning = False
         self.camera = None
         self.known_faces = {}
+        self.face_matcher = FaceMatcher()
+        self.pipeline_stats = PipelineStats()
+        self.pipeline = RecognitionPipeline(self.face_matcher, self.pipeline_stats)
         self.last_scan = {}
-        self.frame_queue = queue.Queue()
+        self.display_slot = LatestFrameSlot()  # Latest display-ready frame, stale ones dropped
+        self.event_queue = queue.Queue()  # Recognition results, never dropped
+        self.capture_cond = threading.Condition()
+        self.captured_frame = (0, None)  # (sequence number, latest BGR frame)
+        self.last_stats_update = 0.0
         
         # Colors
         self.colors = {
@@ -476,6 +1120,8 @@ class GatePassGUI:
         self.setup_ui()
         self.load_faces()
         setup_excel_file()
+        log_writer.start()  # Replays writes left in the journal by an unclean shutdown
+        presence.rebuild()
         
     def setup_ui(self):
         # Title Bar
@@ -729,6 +1375,7 @@ class GatePassGUI:
     def load_faces(self):
         """Load known faces from file"""
         self.known_faces = load_known_faces()
+        self.face_matcher.load(self.known_faces)
         
     def toggle_recognition(self):
         """Start/stop face recognition"""
@@ -769,7 +1416,14 @@ class GatePassGUI:
                 fg=self.colors['success']
             )
 
-            # Start camera thread
+            self.pipeline.reset()
+            self.pipeline_stats.reset()
+            self.display_slot.clear()
+            self.captured_frame = (0, None)
+
+            # Start capture and recognition threads
+            self.capture_thread = threading.Thread(target=self.capture_loop, daemon=True)
+            self.capture_thread.start()
             self.camera_thread = threading.Thread(target=self.camera_loop, daemon=True)
             self.camera_thread.start()
 
@@ -783,6 +1437,8 @@ class GatePassGUI:
     def stop_recognition(self):
         """Stop face recognition process"""
         self.is_scanning = False
+        with self.capture_cond:
+            self.capture_cond.notify_all()
         
         if self.camera:
             self.camera.release()
@@ -803,82 +1459,95 @@ class GatePassGUI:
             text="Camera Off\n\nClick 'Start Recognition' to begin"
         )
         
-    def camera_loop(self):
-        """Camera capture loop running in separate thread"""
-        known_names = list(self.known_faces.keys())
-        known_encodings = np.stack(list(self.known_faces.values())) if known_names else np.empty((0, 128))
-        
-        while self.is_scanning and self.camera and self.camera.isOpened():
-            ret, frame = self.camera.read()
+    def capture_loop(self):
+        """Camera read loop - keeps only the latest frame for the recognition thread"""
+        camera = self.camera
+        while self.is_scanning and camera and camera.isOpened():
+            t0 = time.perf_counter()
+            ret, frame = camera.read()
             if not ret:
                 break
-                
-            # Resize for faster processing
-            small_frame = cv2.resize(frame, (0, 0), fx=0.25, fy=0.25)
-            rgb_small_frame = small_frame[:, :, ::-1]
-            
-            # Find faces
-            face_locations = face_recognition.face_locations(rgb_small_frame)
-            face_encodings = face_recognition.face_encodings(rgb_small_frame, face_locations)
+            self.pipeline_stats.record('capture', time.perf_counter() - t0)
+            self.pipeline_stats.tick('capture')
+            with self.capture_cond:
+                self.captured_frame = (self.captured_frame[0] + 1, frame)
+                self.capture_cond.notify()
+        with self.capture_cond:
+            self.capture_cond.notify_all()
+
+    def camera_loop(self):
+        """Recognition loop running in separate thread"""
+        last_seq = 0
+        while self.is_scanning:
+            with self.capture_cond:
+                # Wait for a frame newer than the last one processed; older ones are skipped
+                while self.is_scanning and self.captured_frame[0] == last_seq:
+                    if not self.capture_thread.is_alive():
+                        return
+                    self.capture_cond.wait(0.5)
+                last_seq, frame = self.captured_frame
+            if not self.is_scanning:
+                break
             
-            for face_encoding in face_encodings:
-                if known_encodings.size > 0:
-                    matches = face_recognition.compare_faces(known_encodings, face_encoding, tolerance=MATCH_TOLERANCE)
-                    face_distances = face_recognition.face_distance(known_encodings, face_encoding)
+            # Detection every N frames, tracking in between, encoding only new/changed faces
+            for name, _distance in self.pipeline.process(frame):
+                current_time = time.time()
+                
+                # Check cooldown
+                if name not in self.last_scan or (current_time - self.last_scan[name]) > COOLDOWN_SECONDS:
+                    status = log_event_excel(name)
+                    self.last_scan[name] = current_time
                     
-                    if len(face_distances) > 0:
-                        best_match_index = np.argmin(face_distances)
-                        
-                        if matches[best_match_index]:
-                            name = known_names[best_match_index]
-                            current_time = time.time()
-                            
-                            # Check cooldown
-                            if name not in self.last_scan or (current_time - self.last_scan[name]) > COOLDOWN_SECONDS:
-                                status = log_event_excel(name)
-                                self.last_scan[name] = current_time
-                                
-                                # Queue the result for UI update
-                                self.frame_queue.put(('recognition', name, status))
+                    # Queue the result for UI update
+                    self.event_queue.put((name, status))
             
-            # Queue frame for display
-            # Convert BGR to RGB for tkinter
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.frame_queue.put(('frame', rgb_frame, None))
-            
-            time.sleep(0.03)  # ~30 FPS
+            # Prepare the display frame here so the UI thread only wraps it for Tk
+            t0 = time.perf_counter()
+            display_frame = cv2.resize(frame, DISPLAY_SIZE)
+            rgb_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
+            self.display_slot.put(Image.fromarray(rgb_frame))
+            self.pipeline_stats.record('display', time.perf_counter() - t0)
             
     def process_frames(self):
         """Process frames from camera thread and update UI"""
+        # Deliver every recognition result
         try:
-            while not self.frame_queue.empty():
-                item = self.frame_queue.get_nowait()
-                
-                if item[0] == 'frame':
-                    # Update video display
-                    rgb_frame = item[1]
-                    # Resize frame for display - match registration window size
-                    display_frame = cv2.resize(rgb_frame, (640, 480))
-                    
-                    # Convert to PIL Image and then to PhotoImage
-                    pil_image = Image.fromarray(display_frame)
-                    photo = ImageTk.PhotoImage(image=pil_image)
-                    
-                    self.video_frame.config(image=photo, text="")
-                    self.video_frame.image = photo  # Keep a reference
-                    
-                elif item[0] == 'recognition':
-                    # Update recognition result
-                    name, status = item[1], item[2]
-                    self.show_recognition_result(name, status)
-                    
+            while True:
+                name, status = self.event_queue.get_nowait()
+                self.show_recognition_result(name, status)
         except queue.Empty:
             pass
         
+        # Show only the newest frame
+        pil_image = self.display_slot.take()
+        if pil_image is not None and self.is_scanning:
+            photo = ImageTk.PhotoImage(image=pil_image)
+            self.video_frame.config(image=photo, text="")
+            self.video_frame.image = photo  # Keep a reference
+        
+        # Refresh pipeline counters about once a second
+        if self.is_scanning and time.time() - self.last_stats_update >= 1.0:
+            self.last_stats_update = time.time()
+            self.show_pipeline_stats()
+        
         # Schedule next frame processing
         if self.is_scanning:
             self.root.after(30, self.process_frames)
             
+    def show_pipeline_stats(self):
+        """Show FPS, detection interval and per-stage latency in the status bar"""
+        stats = self.pipeline_stats.snapshot()
+        latency = stats['latency_ms']
+        stages = " ".join(
+            f"{stage} {latency[stage]:.0f}ms"
+            for stage in ('detect', 'track', 'encode', 'total') if stage in latency
+        )
+        self.status_label.config(
+            text=(f"🔍 Scanning | {stats['process_fps']:.1f}/{stats['capture_fps']:.1f} FPS | "
+                  f"detect 1/{self.pipeline.detect_interval} | {stages}"),
+            fg=self.colors['success']
+        )
+            
     def show_recognition_result(self, name, status):
         """Show recognition result in UI"""
         current_time = datetime.now().strftime("%H:%M:%S")
@@ -1207,6 +1876,7 @@ class GatePassGUI:
             
         # Save the face
         self.known_faces[name] = face_encodings[0]
+        self.face_matcher.add(name, face_encodings[0])
         save_known_faces(self.known_faces)
         
         # Save the phone number with +91 prefix if not empty
@@ -1422,6 +2092,7 @@ class GatePassGUI:
                 f"Are you sure you want to delete '{name}'?\n\nThis action cannot be undone."
             ):
                 del self.known_faces[name]
+                self.face_matcher.remove(name)
                 save_known_faces(self.known_faces)
                 messagebox.showinfo("Success", f"User '{name}' has been deleted.")
                 delete_window.destroy()
@@ -1539,6 +2210,7 @@ class GatePassGUI:
     def load_logs(self, text_widget, today_only=True):
         """Load and display gate logs"""
         try:
+            log_writer.flush()
             wb = load_workbook(EXCEL_FILE)
             ws = wb[GATE_SHEET] if GATE_SHEET in wb.sheetnames else wb.active
             
@@ -1716,6 +2388,7 @@ class GatePassGUI:
     def load_logs(self, text_widget, today_only=True):
         """Load and display gate logs"""
         try:
+            log_writer.flush()
             wb = load_workbook(EXCEL_FILE)
             ws = wb[GATE_SHEET] if GATE_SHEET in wb.sheetnames else wb.active
             
@@ -2177,6 +2850,7 @@ class GatePassGUI:
     def load_going_out_logs(self, text_widget, today_only=True):
         """Load and display going out logs"""
         try:
+            log_writer.flush()
             wb = load_workbook(EXCEL_FILE)
             if GOING_OUT_SHEET not in wb.sheetnames:
                 text_widget.config(state='normal')
@@ -2252,6 +2926,7 @@ class GatePassGUI:
             if self.is_scanning:
                 self.stop_recognition()
             cv2.destroyAllWindows()
+            log_writer.stop()
             self.root.quit()
             self.root.destroy()
     
@@ -2267,6 +2942,7 @@ class GatePassGUI:
             if self.is_scanning:
                 self.stop_recognition()
             cv2.destroyAllWindows()
+            log_writer.stop()
 
 
 # ---------------------------